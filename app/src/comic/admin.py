@@ -21,12 +21,23 @@ class VolumeInline(admin.TabularInline):
 
 @admin.register(Series)
 class SeriesAdmin(admin.ModelAdmin):
-    list_display = ("title_tw", "title_jp", "status_jp", "latest_volume_tw_display")
+    list_display = (
+        "title_tw",
+        "title_jp",
+        "status_jp",
+        "latest_volume_tw_display",
+        "volume_gap",
+    )
     list_filter = ("status_jp",)
     search_fields = ("title_jp", "title_tw", "author_jp", "author_tw")
     autocomplete_fields = ["latest_volume_jp", "latest_volume_tw"]
     inlines = [VolumeInline]
 
+    def save_related(self, request, form, formsets, change):
+        super().save_related(request, form, formsets, change)
+        # 單行本 inline 儲存後重新計算出版進度摘要
+        Series.objects.filter(pk=form.instance.pk).refresh_summary()
+
     @admin.display(description="最新單行本 (台)")
     def latest_volume_tw_display(self, obj):
         return obj.latest_volume_tw
@@ -53,3 +64,16 @@ class VolumeAdmin(admin.ModelAdmin):
         (None, {"fields": ("series", "region", "volume_number", "variant")}),
         ("出版詳細資料", {"fields": ("publisher", "release_date", "isbn")}),
     )
+
+    def save_model(self, request, obj, form, change):
+        previous_series_id = form.initial.get("series")
+        super().save_model(request, obj, form, change)
+        # 更新新舊所屬漫畫的出版進度摘要
+        Series.objects.filter(
+            pk__in=[obj.series_id, previous_series_id]
+        ).refresh_summary()
+
+    def delete_model(self, request, obj):
+        series_id = obj.series_id
+        super().delete_model(request, obj)
+        Series.objects.filter(pk=series_id).refresh_summary()
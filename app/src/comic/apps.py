@@ -4,3 +4,7 @@ from django.apps import AppConfig
 class ComicConfig(AppConfig):
     default_auto_field = "django.db.models.BigAutoField"
     name = "comic"
+
+    def ready(self):
+        # 註冊 signal handlers
+        from . import signals  # noqa: F401
@@ -0,0 +1,150 @@
+"""
+API 回應快取
+
+快取鍵包含「目錄版本號」，只要 Publisher / Series / Volume 有任何寫入就會
+遞增版本號，舊的快取自然失效，不需要逐一刪除。
+"""
+
+import hashlib
+import threading
+import time
+
+from django.conf import settings
+from django.core.cache import caches
+from django.core.cache.backends.dummy import DummyCache
+from django.core.cache.backends.locmem import LocMemCache
+from django.db import transaction
+
+CATALOG_VERSION_KEY = "comic:catalog_version"
+RESPONSE_KEY_PREFIX = "comic:series"
+
+
+def get_cache():
+    """取得 API 回應快取使用的 cache backend"""
+    return caches[settings.SERIES_CACHE_ALIAS]
+
+
+def is_shared_cache(cache=None):
+    """
+    快取是否可跨 process 共用
+
+    local-memory 只存在單一 process 內，爬蟲 (另一個 process) 遞增的版本號
+    Gunicorn workers 看不到，因此不視為共用。
+    """
+    return not isinstance(cache or get_cache(), (LocMemCache, DummyCache))
+
+
+def response_cache_enabled():
+    """
+    是否啟用 API 回應快取
+
+    `SERIES_CACHE_ENABLED` 未設定時，只在快取可跨 process 共用時啟用。
+    """
+    enabled = settings.SERIES_CACHE_ENABLED
+    if enabled is None:
+        return is_shared_cache()
+    return enabled
+
+
+def _now_version():
+    # 以毫秒時間戳作為版本號，快取被清空後重新初始化也不會與舊版本重複
+    return time.time_ns() // 1_000_000
+
+
+def get_catalog_version():
+    """取得目前的目錄版本號"""
+    cache = get_cache()
+    version = cache.get(CATALOG_VERSION_KEY)
+    if version is None:
+        version = _now_version()
+        # 使用 add 避免覆蓋其他 process 剛寫入的版本號
+        cache.add(CATALOG_VERSION_KEY, version, timeout=None)
+        version = cache.get(CATALOG_VERSION_KEY, version)
+    return version
+
+
+def bump_catalog_version():
+    """
+    遞增目錄版本號，使所有已快取的回應失效
+
+    以 `incr` 遞增，Redis / Memcached 上多個寫入者同時遞增也不會得到相同的
+    版本號。尚未初始化 (或快取被清空) 時先以 `add` 寫入時間戳；快取被清空時
+    舊的回應也一併清除，重新初始化的版本號不需大於先前的版本號。
+    """
+    cache = get_cache()
+    for _ in range(2):
+        cache.add(CATALOG_VERSION_KEY, _now_version(), timeout=None)
+        try:
+            return cache.incr(CATALOG_VERSION_KEY)
+        except ValueError:
+            # add 與 incr 之間剛好被清除，重新初始化
+            continue
+    return get_catalog_version()
+
+
+def bump_catalog_version_on_commit(using=None):
+    """
+    寫入後立即遞增版本號，並在交易提交後再遞增一次
+
+    交易提交前其他連線仍讀得到舊資料，若在這段期間以新版本號寫入快取，
+    提交後的第二次遞增可以確保這些快取失效。
+    """
+    bump_catalog_version()
+    transaction.on_commit(bump_catalog_version, using=using)
+
+
+def query_digest(query_params):
+    """
+    將 query string 排序後取摘要
+
+    參數順序不同的相同請求會得到相同的摘要。
+    """
+    query = "&".join(
+        f"{key}={value}"
+        for key in sorted(query_params)
+        for value in query_params.getlist(key)
+    )
+    return hashlib.md5(query.encode("utf-8")).hexdigest()
+
+
+def response_cache_key(action, query_params, pk=None):
+    """依 action、主鍵與 query string 產生快取鍵"""
+    version = get_catalog_version()
+    digest = query_digest(query_params)
+    return f"{RESPONSE_KEY_PREFIX}:{version}:{action}:{pk or ''}:{digest}"
+
+
+class CacheStats:
+    """
+    記錄快取命中 / 未命中次數 (以 process 為單位)
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def record_hit(self):
+        with self._lock:
+            self.hits += 1
+
+    def record_miss(self):
+        with self._lock:
+            self.misses += 1
+
+    def reset(self):
+        with self._lock:
+            self.hits = 0
+            self.misses = 0
+
+    def as_dict(self):
+        with self._lock:
+            total = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / total if total else 0.0,
+            }
+
+
+cache_stats = CacheStats()
@@ -0,0 +1,66 @@
+from datetime import date
+
+from rest_framework import filters
+from rest_framework.exceptions import ValidationError
+
+
+class SeriesPublicationFilter(filters.BaseFilterBackend):
+    """
+    依出版進度篩選漫畫
+
+    - `min_gap`: 台版至少落後日版 N 卷
+    - `jp_released_after` / `tw_released_after`: 最新發售日不早於指定日期 (YYYY-MM-DD)
+
+    日期使用絕對日期而非「最近 N 天」，相同的 query string 才會對應到相同的
+    快取與 ETag。
+    """
+
+    min_gap_query_param = "min_gap"
+    released_after_query_params = {
+        "jp_released_after": "latest_release_date_jp__gte",
+        "tw_released_after": "latest_release_date_tw__gte",
+    }
+
+    def filter_queryset(self, request, queryset, view):
+        min_gap = request.query_params.get(self.min_gap_query_param)
+        if min_gap:
+            queryset = queryset.filter(volume_gap__gte=self.parse_gap(min_gap))
+
+        for param, lookup in self.released_after_query_params.items():
+            value = request.query_params.get(param)
+            if value:
+                queryset = queryset.filter(**{lookup: self.parse_date(param, value)})
+        return queryset
+
+    def parse_gap(self, value):
+        try:
+            return int(value)
+        except ValueError:
+            raise ValidationError({self.min_gap_query_param: "請輸入整數"})
+
+    def parse_date(self, param, value):
+        try:
+            return date.fromisoformat(value)
+        except ValueError:
+            raise ValidationError({param: "請輸入 YYYY-MM-DD 格式的日期"})
+
+    def get_schema_operation_parameters(self, view):
+        return [
+            {
+                "name": self.min_gap_query_param,
+                "required": False,
+                "in": "query",
+                "description": "台版至少落後日版的卷數",
+                "schema": {"type": "integer"},
+            },
+            *(
+                {
+                    "name": param,
+                    "required": False,
+                    "in": "query",
+                    "description": "最新發售日不早於此日期",
+                    "schema": {"type": "string", "format": "date"},
+                }
+                for param in self.released_after_query_params
+            ),
+        ]
@@ -0,0 +1,451 @@
+"""
+本機負載測試
+
+產生合成目錄資料，並以 Django test client 在同一個 process 內對
+`/api/series/` 發出可重現的請求序列，統計延遲分位數、RPS 與每個請求的查詢數。
+"""
+
+import random
+import statistics
+import threading
+import time
+import timeit
+from datetime import date, timedelta
+from urllib.parse import urlencode
+
+from django.conf import settings
+from django.db import connection, transaction
+from django.test import Client, override_settings
+from django.urls import reverse
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from .models import Publisher, Series, Volume
+from .serializers import VolumeRowListSerializer, VolumeSerializer
+
+# 合成資料的標題與出版社名稱前綴，清除時只刪除這些資料
+SYNTHETIC_PREFIX = "[合成] "
+
+# 組合標題用的詞彙，搜尋情境也從這裡取關鍵字
+TITLE_WORDS_TW = [
+    "藍色",
+    "時期",
+    "進擊",
+    "巨人",
+    "魔法",
+    "少女",
+    "迷宮",
+    "料理",
+    "葬送",
+    "勇者",
+]
+TITLE_WORDS_JP = [
+    "ブルー",
+    "ピリオド",
+    "進撃",
+    "巨人",
+    "魔法",
+    "少女",
+    "ダンジョン",
+    "飯",
+    "葬送",
+    "勇者",
+]
+AUTHORS = ["山口つばさ", "諫山創", "九井諒子", "山田鐘人", "藤本タツキ", "芥見下々"]
+VARIANTS = ["特裝版", "首刷限定版", "限定版"]
+
+# 各情境每個請求的查詢數上限 (關閉回應快取時)，與目錄大小無關
+# list / search / ordering: COUNT + 一頁漫畫 (ETag 取自目錄版本號，不查詢資料庫)
+# detail: ETag 的 updated_at + 漫畫與最新單行本 + 單行本與出版社名稱
+QUERY_BUDGETS = {"list": 2, "search": 2, "ordering": 2, "detail": 3}
+
+ORDERINGS = [
+    "title_tw",
+    "-title_jp",
+    "-volume_gap",
+    "-latest_release_date_jp",
+    "-latest_release_date_tw",
+]
+
+
+def _isbn13(prefix, serial):
+    """以流水號產生帶有正確檢查碼的 ISBN-13"""
+    digits = f"{prefix}{serial:0{12 - len(prefix)}d}"
+    total = sum(int(d) * (3 if i % 2 else 1) for i, d in enumerate(digits))
+    return f"{digits}{(10 - total % 10) % 10}"
+
+
+def _title(rng, words, index):
+    return f"{SYNTHETIC_PREFIX}{''.join(rng.sample(words, 2))} {index}"
+
+
+def generate_catalog(
+    series_count,
+    volumes_jp=20,
+    volumes_tw=15,
+    publisher_count=20,
+    variant_rate=0.1,
+    seed=0,
+    batch_size=1000,
+):
+    """
+    以 bulk_create 產生合成目錄
+
+    每部漫畫的日版卷數介於 1 到 `volumes_jp`，台版卷數不超過日版與
+    `volumes_tw`，發售日依卷數遞增、台版晚於日版。`variant_rate` 的
+    單行本另有一本特殊版本。寫入後重建出版進度摘要與最新單行本。
+    相同的 `seed` 會產生相同的資料。
+
+    回傳各 model 新增的筆數。
+    """
+    rng = random.Random(seed)
+    # 從既有的合成資料之後接續編號，標題與 ISBN 才不會重複
+    offset = Series.objects.filter(title_jp__startswith=SYNTHETIC_PREFIX).count()
+    publisher_offset = Publisher.objects.filter(
+        name__startswith=SYNTHETIC_PREFIX
+    ).count()
+
+    with transaction.atomic():
+        publishers = Publisher.objects.bulk_create(
+            [
+                Publisher(
+                    name=f"{SYNTHETIC_PREFIX}出版社 {publisher_offset + i}",
+                    region=Publisher.Region.JAPAN if i % 2 else Publisher.Region.TAIWAN,
+                )
+                for i in range(publisher_count)
+            ],
+            batch_size=batch_size,
+        )
+        publishers_by_region = {
+            region: [p for p in publishers if p.region == region]
+            or list(Publisher.objects.filter(region=region)[:1])
+            for region in Publisher.Region.values
+        }
+
+        series_list = Series.objects.bulk_create(
+            [
+                Series(
+                    title_jp=_title(rng, TITLE_WORDS_JP, offset + i),
+                    title_tw=(
+                        _title(rng, TITLE_WORDS_TW, offset + i)
+                        if rng.random() < 0.9
+                        else None
+                    ),
+                    author_jp=rng.choice(AUTHORS),
+                    author_tw=rng.choice(AUTHORS) if rng.random() < 0.5 else None,
+                    status_jp=rng.choice(Series.JapanStatus.values),
+                )
+                for i in range(series_count)
+            ],
+            batch_size=batch_size,
+        )
+
+        volumes = []
+        serial = Volume.objects.filter(
+            series__title_jp__startswith=SYNTHETIC_PREFIX
+        ).count()
+        for series in series_list:
+            count_jp = rng.randint(1, max(volumes_jp, 1))
+            count_tw = min(rng.randint(0, max(volumes_tw, 0)), count_jp)
+            first_release = date(2000, 1, 1) + timedelta(days=rng.randint(0, 8000))
+            for region, count, delay, isbn_prefix in (
+                (Volume.Region.JAPAN, count_jp, 0, "9784"),
+                (Volume.Region.TAIWAN, count_tw, 240, "9786"),
+            ):
+                publisher = rng.choice(publishers_by_region[region] or [None])
+                for number in range(1, count + 1):
+                    release_date = first_release + timedelta(days=number * 120 + delay)
+                    editions = [""]
+                    if rng.random() < variant_rate:
+                        editions.append(rng.choice(VARIANTS))
+                    for variant in editions:
+                        serial += 1
+                        volumes.append(
+                            Volume(
+                                series=series,
+                                publisher=publisher,
+                                region=region,
+                                volume_number=number,
+                                variant=variant,
+                                release_date=release_date,
+                                isbn=_isbn13(isbn_prefix, serial),
+                            )
+                        )
+        volumes = Volume.objects.bulk_create(volumes, batch_size=batch_size)
+
+        latest = {}
+        for volume in volumes:
+            key = (volume.series_id, volume.region)
+            if not volume.variant and (
+                key not in latest or volume.volume_number > latest[key].volume_number
+            ):
+                latest[key] = volume
+        for series in series_list:
+            series.latest_volume_jp = latest.get((series.pk, Volume.Region.JAPAN))
+            series.latest_volume_tw = latest.get((series.pk, Volume.Region.TAIWAN))
+        Series.objects.bulk_update(
+            series_list,
+            ["latest_volume_jp", "latest_volume_tw"],
+            batch_size=batch_size,
+        )
+
+        ids = [series.pk for series in series_list]
+        for start in range(0, len(ids), batch_size):
+            Series.objects.filter(
+                pk__in=ids[start : start + batch_size]
+            ).refresh_summary()
+
+    return {
+        "publishers": len(publishers),
+        "series": len(series_list),
+        "volumes": len(volumes),
+    }
+
+
+def clear_synthetic_catalog():
+    """刪除 generate_catalog 產生的資料，回傳刪除的漫畫數"""
+    with transaction.atomic():
+        Volume.objects.filter(series__title_jp__startswith=SYNTHETIC_PREFIX).delete()
+        _, deleted = Series.objects.filter(
+            title_jp__startswith=SYNTHETIC_PREFIX
+        ).delete()
+        Publisher.objects.filter(name__startswith=SYNTHETIC_PREFIX).delete()
+    return deleted.get(Series._meta.label, 0)
+
+
+class LoadTestPlan:
+    """
+    依 seed 產生各情境的請求路徑
+
+    - `list`: 隨機頁碼的列表
+    - `search`: 以標題詞彙搜尋
+    - `ordering`: 依摘要欄位排序的隨機頁面
+    - `detail`: 隨機一部漫畫的詳情
+    """
+
+    SCENARIOS = ("list", "search", "ordering", "detail")
+
+    def __init__(self, seed=0):
+        self.rng = random.Random(seed)
+        self.list_url = reverse("comics-list")
+        self.series_ids = list(Series.objects.values_list("pk", flat=True))
+        page_size = settings.REST_FRAMEWORK.get("PAGE_SIZE") or 10
+        self.pages = max(1, -(-len(self.series_ids) // page_size))
+
+    def path(self, scenario):
+        rng = self.rng
+        if scenario == "list":
+            return f"{self.list_url}?page={rng.randint(1, self.pages)}"
+        if scenario == "search":
+            word = rng.choice(TITLE_WORDS_TW + TITLE_WORDS_JP)
+            return f"{self.list_url}?{urlencode({'search': word})}"
+        if scenario == "ordering":
+            # 排序後只看前幾頁，與實際使用情況相近
+            page = rng.randint(1, min(self.pages, 5))
+            return f"{self.list_url}?ordering={rng.choice(ORDERINGS)}&page={page}"
+        if scenario == "detail":
+            if not self.series_ids:
+                return f"{self.list_url}0/"
+            return reverse("comics-detail", args=[rng.choice(self.series_ids)])
+        raise ValueError(f"Unknown scenario: {scenario}")
+
+    def requests(self, scenarios, count):
+        """依序回傳 (情境, 路徑)，各情境輪流發出"""
+        return [
+            (scenarios[i % len(scenarios)], self.path(scenarios[i % len(scenarios)]))
+            for i in range(count)
+        ]
+
+
+class ScenarioResult:
+    """
+    單一情境的統計結果
+
+    latencies 以秒為單位；queries 為每個請求的資料庫查詢數。
+    seconds 為計算 RPS 的時間：總計為實際經過時間，各情境為其請求延遲總和
+    除以並行數。
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.latencies = []
+        self.queries = []
+        self.errors = 0
+        self.seconds = 0.0
+
+    def add(self, latency, queries, ok):
+        self.latencies.append(latency)
+        self.queries.append(queries)
+        if not ok:
+            self.errors += 1
+
+    def over_budget(self, budget):
+        """回傳查詢數超過 budget 的請求數"""
+        return sum(queries > budget for queries in self.queries)
+
+    def percentile(self, p):
+        """回傳延遲的第 p 百分位數 (毫秒)"""
+        if not self.latencies:
+            return 0.0
+        if len(self.latencies) == 1:
+            return self.latencies[0] * 1000
+        cuts = statistics.quantiles(self.latencies, n=100, method="inclusive")
+        return cuts[p - 1] * 1000
+
+    def summary(self):
+        count = len(self.latencies)
+        return {
+            "requests": count,
+            "errors": self.errors,
+            "rps": round(count / self.seconds, 1) if self.seconds > 0 else 0.0,
+            "p50_ms": round(self.percentile(50), 2),
+            "p95_ms": round(self.percentile(95), 2),
+            "p99_ms": round(self.percentile(99), 2),
+            "queries_per_request": (
+                round(statistics.fmean(self.queries), 2) if self.queries else 0.0
+            ),
+        }
+
+    def __str__(self):
+        s = self.summary()
+        return (
+            f"{self.name:<9} {s['requests']:>6} req {s['errors']:>4} err"
+            f" {s['rps']:>8.1f} rps  p50 {s['p50_ms']:>7.2f}ms"
+            f"  p95 {s['p95_ms']:>7.2f}ms  p99 {s['p99_ms']:>7.2f}ms"
+            f"  {s['queries_per_request']:>5.1f} queries/req"
+        )
+
+
+class _QueryCounter:
+    def __init__(self):
+        self.count = 0
+
+    def __call__(self, execute, sql, params, many, context):
+        self.count += 1
+        return execute(sql, params, many, context)
+
+
+def _send(client, path):
+    """發出一個請求，回傳 (延遲秒數, 查詢數, 是否成功)"""
+    counter = _QueryCounter()
+    with connection.execute_wrapper(counter):
+        started = time.perf_counter()
+        response = client.get(path)
+        latency = time.perf_counter() - started
+    return latency, counter.count, response.status_code == 200
+
+
+def run_load_test(
+    scenarios=LoadTestPlan.SCENARIOS,
+    requests=1000,
+    concurrency=1,
+    warmup=20,
+    seed=0,
+    cache_enabled=False,
+):
+    """
+    執行負載測試
+
+    請求序列由 `seed` 決定，`concurrency` 個執行緒各自使用一個 test client
+    與資料庫連線分食請求。預設關閉 API 回應快取，量測查詢與序列化的成本。
+
+    回傳 (各情境的 ScenarioResult, 全部請求的 ScenarioResult)。
+    """
+    scenarios = list(scenarios)
+    plan = LoadTestPlan(seed)
+    warmup_requests = plan.requests(scenarios, warmup)
+    planned = plan.requests(scenarios, requests)
+
+    results = {name: ScenarioResult(name) for name in scenarios}
+    total = ScenarioResult("total")
+    lock = threading.Lock()
+    pending = iter(planned)
+
+    def worker():
+        client = Client()
+        while True:
+            with lock:
+                item = next(pending, None)
+            if item is None:
+                return
+            name, path = item
+            measurement = _send(client, path)
+            with lock:
+                results[name].add(*measurement)
+                total.add(*measurement)
+
+    def thread_worker():
+        try:
+            worker()
+        finally:
+            # 每個執行緒使用自己的資料庫連線
+            connection.close()
+
+    with override_settings(
+        SERIES_CACHE_ENABLED=cache_enabled,
+        ALLOWED_HOSTS=[*settings.ALLOWED_HOSTS, "testserver"],
+    ):
+        warmup_client = Client()
+        for _, path in warmup_requests:
+            warmup_client.get(path)
+
+        started = time.perf_counter()
+        if concurrency <= 1:
+            worker()
+        else:
+            threads = [
+                threading.Thread(target=thread_worker) for _ in range(concurrency)
+            ]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+        total.seconds = time.perf_counter() - started
+
+    for result in results.values():
+        # 各情境交錯執行，以請求延遲總和估算各自花費的時間
+        result.seconds = sum(result.latencies) / max(concurrency, 1)
+    return results, total
+
+
+def _volume_serializers(series_pk):
+    """回傳比較用的兩種單行本序列化方式，皆包含查詢"""
+
+    def fields():
+        # 原本的做法：預先載入單行本與出版社，逐欄位序列化
+        series = Series.objects.prefetch_related("volumes__publisher").get(pk=series_pk)
+        return serializers.ListSerializer(
+            child=VolumeSerializer(), instance=series.volumes.all()
+        ).data
+
+    def rows():
+        series = Series.objects.get(pk=series_pk)
+        return VolumeRowListSerializer(
+            child=VolumeSerializer(), instance=series.volumes
+        ).data
+
+    return {"fields": fields, "rows": rows}
+
+
+def benchmark_volume_serializers(series, repeat=5):
+    """
+    比較單行本的逐欄位序列化與 VolumeRowListSerializer
+
+    兩者都從查詢開始計時，並確認輸出的 JSON 完全相同。
+    回傳各方式每次詳情的 (秒數, 查詢數)，以及 JSON 是否相同。
+    """
+    paths = _volume_serializers(series.pk)
+    rendered = {
+        name: JSONRenderer().render(serialize()) for name, serialize in paths.items()
+    }
+
+    results = {}
+    for name, serialize in paths.items():
+        counter = _QueryCounter()
+        with connection.execute_wrapper(counter):
+            serialize()
+        timer = timeit.Timer(serialize)
+        loops, _ = timer.autorange()
+        best = min(timer.repeat(repeat=repeat, number=loops)) / loops
+        results[name] = (best, counter.count)
+    return results, rendered["fields"] == rendered["rows"]
@@ -0,0 +1,66 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from comic.loadtest import benchmark_volume_serializers, generate_catalog
+from comic.models import Series
+
+
+class Command(BaseCommand):
+    help = (
+        "Compare field-by-field volume serialization with the row-based fast path"
+        " on a generated long series, in a throwaway database"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--volumes",
+            type=int,
+            default=300,
+            help="Most volumes per region of the generated series (default: 300)",
+        )
+        parser.add_argument(
+            "--variant-rate",
+            type=float,
+            default=0.3,
+            help="Fraction of volumes that also have a special edition (default: 0.3)",
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timings per path, of which the best counts (default: 5)",
+        )
+
+    def handle(self, *args, **options):
+        # 合成資料寫入暫時的資料庫，不影響目錄
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            generate_catalog(
+                10,
+                volumes_jp=options["volumes"],
+                volumes_tw=options["volumes"],
+                publisher_count=4,
+                variant_rate=options["variant_rate"],
+            )
+            series = max(Series.objects.all(), key=lambda s: s.volumes.count())
+            volume_count = series.volumes.count()
+            results, identical = benchmark_volume_serializers(
+                series, repeat=options["repeat"]
+            )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write(f"Series with {volume_count} volumes:")
+        for name, (seconds, queries) in results.items():
+            self.stdout.write(
+                f"  {name:<7} {seconds * 1000:>8.2f}ms per detail"
+                f" {seconds / volume_count * 1e6:>7.2f}us per volume"
+                f" {queries:>3} queries"
+            )
+        speedup = results["fields"][0] / results["rows"][0]
+        self.stdout.write(f"Row-based path is {speedup:.1f}x faster.")
+        if not identical:
+            raise CommandError("The two paths rendered different JSON.")
+        self.stdout.write("Both paths render identical JSON.")
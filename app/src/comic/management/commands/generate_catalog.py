@@ -0,0 +1,76 @@
+from django.core.management.base import BaseCommand
+
+from comic.loadtest import clear_synthetic_catalog, generate_catalog
+
+
+class Command(BaseCommand):
+    help = (
+        "Generate a synthetic catalog of series, volumes and publishers for load tests"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--series",
+            type=int,
+            default=1000,
+            help="Number of series to generate (default: 1000)",
+        )
+        parser.add_argument(
+            "--volumes-jp",
+            type=int,
+            default=20,
+            help="Most Japanese volumes per series (default: 20)",
+        )
+        parser.add_argument(
+            "--volumes-tw",
+            type=int,
+            default=15,
+            help="Most Taiwanese volumes per series, never more than in Japan"
+            " (default: 15)",
+        )
+        parser.add_argument(
+            "--publishers",
+            type=int,
+            default=20,
+            help="Number of publishers, split between the regions (default: 20)",
+        )
+        parser.add_argument(
+            "--variant-rate",
+            type=float,
+            default=0.1,
+            help="Fraction of volumes that also have a special edition (default: 0.1)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated data"
+        )
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Rows per INSERT statement (default: 1000)",
+        )
+        parser.add_argument(
+            "--clear",
+            action="store_true",
+            help="Delete previously generated data first",
+        )
+
+    def handle(self, *args, **options):
+        if options["clear"]:
+            deleted = clear_synthetic_catalog()
+            self.stdout.write(f"Deleted {deleted} generated series.")
+
+        self.stdout.write(f"Generating {options['series']} series...")
+        counts = generate_catalog(
+            options["series"],
+            volumes_jp=options["volumes_jp"],
+            volumes_tw=options["volumes_tw"],
+            publisher_count=options["publishers"],
+            variant_rate=options["variant_rate"],
+            seed=options["seed"],
+            batch_size=options["batch_size"],
+        )
+        self.stdout.write(
+            f"Generated {counts['series']} series, {counts['volumes']} volumes"
+            f" and {counts['publishers']} publishers."
+        )
@@ -0,0 +1,116 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from comic.loadtest import QUERY_BUDGETS, LoadTestPlan, run_load_test
+
+
+class Command(BaseCommand):
+    help = (
+        "Send a reproducible sequence of /api/series/ requests in-process and"
+        " report latency percentiles, requests per second and queries per request"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--scenarios",
+            nargs="+",
+            choices=LoadTestPlan.SCENARIOS,
+            default=list(LoadTestPlan.SCENARIOS),
+            help="Request types to send, taking turns (default: all)",
+        )
+        parser.add_argument(
+            "--requests",
+            type=int,
+            default=1000,
+            help="Number of measured requests (default: 1000)",
+        )
+        parser.add_argument(
+            "--concurrency",
+            type=int,
+            default=1,
+            help="Threads sending requests, each with its own connection (default: 1)",
+        )
+        parser.add_argument(
+            "--warmup",
+            type=int,
+            default=20,
+            help="Unmeasured requests sent first (default: 20)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the request sequence"
+        )
+        parser.add_argument(
+            "--cache",
+            action="store_true",
+            help="Keep the API response cache on (default: off)",
+        )
+        parser.add_argument(
+            "--check-query-budget",
+            action="store_true",
+            help="Fail if a request ran more queries than its scenario allows",
+        )
+        parser.add_argument("--output", help="Write the results to a JSON file")
+        parser.add_argument(
+            "--compare", help="Show the change from the results of an earlier run"
+        )
+
+    def handle(self, *args, **options):
+        if options["requests"] < 1:
+            raise CommandError("--requests must be at least 1")
+
+        results, total = run_load_test(
+            scenarios=options["scenarios"],
+            requests=options["requests"],
+            concurrency=options["concurrency"],
+            warmup=options["warmup"],
+            seed=options["seed"],
+            cache_enabled=options["cache"],
+        )
+        summary = {
+            result.name: result.summary() for result in [*results.values(), total]
+        }
+
+        self.stdout.write("Results:")
+        for result in [*results.values(), total]:
+            self.stdout.write(f"  {result}")
+
+        if options.get("compare"):
+            with open(options["compare"]) as f:
+                earlier = json.load(f)
+            self.stdout.write(f"Change from {options['compare']}:")
+            for name, metrics in summary.items():
+                if name not in earlier:
+                    continue
+                changes = []
+                for metric in (
+                    "rps",
+                    "p50_ms",
+                    "p95_ms",
+                    "p99_ms",
+                    "queries_per_request",
+                ):
+                    before = earlier[name].get(metric)
+                    if before:
+                        changes.append(
+                            f"{metric} {(metrics[metric] - before) / before:+.1%}"
+                        )
+                self.stdout.write(f"  {name:<9} " + "  ".join(changes))
+
+        if options.get("output"):
+            with open(options["output"], "w") as f:
+                json.dump(summary, f, indent=2)
+                f.write("\n")
+            self.stdout.write(f"Saved results to {options['output']}.")
+
+        if options["check_query_budget"]:
+            exceeded = [
+                f"{result.name}: {result.over_budget(QUERY_BUDGETS[result.name])}"
+                f" requests over {QUERY_BUDGETS[result.name]} queries"
+                f" (max {max(result.queries)})"
+                for result in results.values()
+                if result.over_budget(QUERY_BUDGETS[result.name])
+            ]
+            if exceeded:
+                raise CommandError("Query budget exceeded:\n  " + "\n  ".join(exceeded))
+            self.stdout.write("All requests within the query budget.")
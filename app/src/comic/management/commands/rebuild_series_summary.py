@@ -0,0 +1,27 @@
+from django.core.management.base import BaseCommand
+
+from comic.models import Series
+
+
+class Command(BaseCommand):
+    help = "Rebuild the publication-gap summary columns of every series"
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--batch-size",
+            type=int,
+            default=1000,
+            help="Number of series updated per UPDATE statement (default: 1000)",
+        )
+
+    def handle(self, *args, **options):
+        batch_size = options["batch_size"]
+        ids = list(Series.objects.order_by("pk").values_list("pk", flat=True))
+        self.stdout.write(f"Rebuilding summary for {len(ids)} series...")
+
+        updated = 0
+        for start in range(0, len(ids), batch_size):
+            batch = ids[start : start + batch_size]
+            updated += Series.objects.filter(pk__in=batch).refresh_summary()
+
+        self.stdout.write(f"Rebuilt summary for {updated} series.")
@@ -0,0 +1,410 @@
+"""
+API 效能指標
+
+`ApiMetricsMiddleware` 記錄每個請求的查詢數、查詢時間、回應大小與總延遲，
+`MetricsMixin` 補上 action 與序列化時間。數據依 (view, action) 累計在
+process 內，由 `metrics_view` 以 Prometheus text format 輸出。
+
+每個請求只多出每道查詢一次計時與結束時一次加鎖累加，可在正式環境常駐開啟。
+Gunicorn 的每個 worker 各自累計：設定 `API_METRICS_DIR` 後各 worker 把累計值
+寫入共用目錄，抓取時合併所有 worker 的數據；未設定時輸出帶有 `pid` 標籤，
+只代表回應抓取的那個 worker。
+"""
+
+import bisect
+import glob
+import json
+import os
+import threading
+import time
+import uuid
+from contextlib import ExitStack
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+METRIC_PREFIX = "comicchase_api"
+
+# 請求延遲 histogram 的上界 (秒)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+
+_current = ContextVar("api_metrics", default=None)
+
+
+def current_request_metrics():
+    """取得目前請求的 RequestMetrics，未啟用時為 None"""
+    return _current.get()
+
+
+class RequestMetrics:
+    """
+    單一請求的量測值
+
+    本身作為 execute wrapper 安裝在資料庫連線上，計算查詢數與查詢時間。
+    """
+
+    __slots__ = ("action", "queries", "db_seconds", "serializer_seconds")
+
+    def __init__(self):
+        self.action = None
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+
+    def __call__(self, execute, sql, params, many, context):
+        started = time.perf_counter()
+        try:
+            return execute(sql, params, many, context)
+        finally:
+            self.db_seconds += time.perf_counter() - started
+            self.queries += 1
+
+
+class _ViewMetrics:
+    __slots__ = (
+        "statuses",
+        "buckets",
+        "latency_sum",
+        "count",
+        "queries",
+        "db_seconds",
+        "serializer_seconds",
+        "response_bytes",
+    )
+
+    def __init__(self, bucket_count):
+        self.statuses = {}
+        self.buckets = [0] * bucket_count
+        self.latency_sum = 0.0
+        self.count = 0
+        self.queries = 0
+        self.db_seconds = 0.0
+        self.serializer_seconds = 0.0
+        self.response_bytes = 0
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    return ",".join(f'{name}="{_escape(value)}"' for name, value in labels.items())
+
+
+class MetricsRegistry:
+    """
+    依 (view, action) 累計的請求指標，可由多個執行緒同時寫入
+    """
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = tuple(buckets)
+        self._lock = threading.Lock()
+        self._views = {}
+
+    def record(
+        self,
+        view,
+        action,
+        status,
+        latency,
+        queries=0,
+        db_seconds=0.0,
+        serializer_seconds=0.0,
+        response_bytes=0,
+    ):
+        """累計一個請求的量測值"""
+        index = bisect.bisect_left(self.buckets, latency)
+        with self._lock:
+            metrics = self._views.get((view, action))
+            if metrics is None:
+                metrics = self._views[(view, action)] = _ViewMetrics(len(self.buckets))
+            metrics.statuses[status] = metrics.statuses.get(status, 0) + 1
+            if index < len(self.buckets):
+                metrics.buckets[index] += 1
+            metrics.latency_sum += latency
+            metrics.count += 1
+            metrics.queries += queries
+            metrics.db_seconds += db_seconds
+            metrics.serializer_seconds += serializer_seconds
+            metrics.response_bytes += response_bytes
+
+    def reset(self):
+        with self._lock:
+            self._views.clear()
+
+    def snapshot(self):
+        """取得所有累計值，可轉為 JSON"""
+        with self._lock:
+            return [
+                {
+                    "view": view,
+                    "action": action,
+                    **{
+                        attribute: getattr(metrics, attribute)
+                        for attribute in _ViewMetrics.__slots__
+                        if attribute != "statuses"
+                    },
+                    "statuses": {str(k): v for k, v in metrics.statuses.items()},
+                }
+                for (view, action), metrics in self._views.items()
+            ]
+
+    def merge(self, snapshot):
+        """把 `snapshot()` 取得的累計值加進來"""
+        with self._lock:
+            for entry in snapshot:
+                key = (entry["view"], entry["action"])
+                metrics = self._views.get(key)
+                if metrics is None:
+                    metrics = self._views[key] = _ViewMetrics(len(self.buckets))
+                for status, count in entry["statuses"].items():
+                    status = int(status)
+                    metrics.statuses[status] = metrics.statuses.get(status, 0) + count
+                for index, count in enumerate(entry["buckets"][: len(self.buckets)]):
+                    metrics.buckets[index] += count
+                for attribute in (
+                    "latency_sum",
+                    "count",
+                    "queries",
+                    "db_seconds",
+                    "serializer_seconds",
+                    "response_bytes",
+                ):
+                    setattr(
+                        metrics,
+                        attribute,
+                        getattr(metrics, attribute) + entry[attribute],
+                    )
+
+    def render(self, labels=None):
+        """
+        以 Prometheus text exposition format 輸出所有指標
+
+        `labels` 為每個 sample 都帶上的固定標籤，例如 `{"pid": 123}`。
+        """
+        with self._lock:
+            views = sorted(
+                ((key, self._copy(metrics)) for key, metrics in self._views.items()),
+                key=lambda item: item[0],
+            )
+
+        p = METRIC_PREFIX
+        base = labels or {}
+        lines = []
+
+        def header(name, kind, help_text):
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {kind}")
+
+        header(f"{p}_requests_total", "counter", "API requests by response status.")
+        for (view, action), m in views:
+            for status, count in sorted(m.statuses.items()):
+                labels = _labels(**base, view=view, action=action, status=status)
+                lines.append(f"{p}_requests_total{{{labels}}} {count}")
+
+        header(
+            f"{p}_request_duration_seconds",
+            "histogram",
+            "Time from the first to the last middleware.",
+        )
+        for (view, action), m in views:
+            labels = _labels(**base, view=view, action=action)
+            cumulative = 0
+            for bound, count in zip(self.buckets, m.buckets):
+                cumulative += count
+                lines.append(
+                    f'{p}_request_duration_seconds_bucket{{{labels},le="{bound}"}}'
+                    f" {cumulative}"
+                )
+            lines.append(
+                f'{p}_request_duration_seconds_bucket{{{labels},le="+Inf"}} {m.count}'
+            )
+            lines.append(
+                f"{p}_request_duration_seconds_sum{{{labels}}} {m.latency_sum}"
+            )
+            lines.append(f"{p}_request_duration_seconds_count{{{labels}}} {m.count}")
+
+        for name, attribute, help_text in (
+            ("db_queries_total", "queries", "SQL queries run by API requests."),
+            (
+                "db_duration_seconds_total",
+                "db_seconds",
+                "Time API requests spent in SQL queries.",
+            ),
+            (
+                "serializer_duration_seconds_total",
+                "serializer_seconds",
+                "Time API requests spent serializing, including the queries"
+                " it triggered.",
+            ),
+            (
+                "response_size_bytes_total",
+                "response_bytes",
+                "Bytes of API response bodies.",
+            ),
+        ):
+            header(f"{p}_{name}", "counter", help_text)
+            for (view, action), m in views:
+                labels = _labels(**base, view=view, action=action)
+                lines.append(f"{p}_{name}{{{labels}}} {getattr(m, attribute)}")
+
+        return "\n".join(lines) + "\n"
+
+    @staticmethod
+    def _copy(metrics):
+        copy = _ViewMetrics(0)
+        for attribute in _ViewMetrics.__slots__:
+            value = getattr(metrics, attribute)
+            setattr(copy, attribute, value.copy() if hasattr(value, "copy") else value)
+        return copy
+
+
+# 整個 process 共用的指標
+registry = MetricsRegistry()
+
+
+class MetricsFileStore:
+    """
+    讓多個 process 共用指標的檔案目錄
+
+    每個 process 把自己的累計值寫入 `api-<pid>-<token>.json`，抓取時合併目錄
+    內所有檔案。已結束 worker 的檔案會保留，計數器才不會倒退；伺服器啟動時
+    應清空目錄 (見 Gunicorn 設定的 `on_starting`)。記錄後最多延遲
+    `flush_interval` 秒寫入，0 表示每個請求都寫入。
+    """
+
+    def __init__(self, directory, flush_interval=1.0):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._pid = None
+        self._path = None
+        self._timer = None
+
+    @property
+    def path(self):
+        """此 process 的檔案路徑，fork 出的 process 會換一個檔案"""
+        pid = os.getpid()
+        if self._pid != pid:
+            self._pid = pid
+            self._timer = None
+            self._path = os.path.join(
+                self.directory, f"api-{pid}-{uuid.uuid4().hex[:8]}.json"
+            )
+        return self._path
+
+    def flush(self, registry):
+        """寫入 `registry` 目前的累計值"""
+        with self._lock:
+            self._timer = None
+            path = self.path
+            os.makedirs(self.directory, exist_ok=True)
+            with open(f"{path}.tmp", "w") as file:
+                json.dump(registry.snapshot(), file)
+            # 以 rename 取代，讀取端不會讀到寫到一半的檔案
+            os.replace(f"{path}.tmp", path)
+
+    def schedule_flush(self, registry):
+        """在 `flush_interval` 秒內寫入，期間的其他請求共用同一次寫入"""
+        if self.flush_interval <= 0:
+            self.flush(registry)
+            return
+        with self._lock:
+            self.path  # fork 後的 process 沒有排定的寫入
+            if self._timer is not None:
+                return
+            self._timer = threading.Timer(
+                self.flush_interval, self.flush, args=(registry,)
+            )
+            self._timer.daemon = True
+            self._timer.start()
+
+    def collect(self, buckets=LATENCY_BUCKETS):
+        """合併所有 process 寫入的累計值"""
+        merged = MetricsRegistry(buckets)
+        for path in glob.glob(os.path.join(self.directory, "api-*.json")):
+            try:
+                with open(path) as file:
+                    merged.merge(json.load(file))
+            except (OSError, ValueError):
+                # 檔案在讀取前被清除
+                continue
+        return merged
+
+
+_stores = {}
+
+
+def metrics_store():
+    """取得 `API_METRICS_DIR` 的 MetricsFileStore，未設定時為 None"""
+    directory = settings.API_METRICS_DIR
+    if not directory:
+        return None
+    store = _stores.get(directory)
+    if store is None:
+        store = _stores.setdefault(
+            directory,
+            MetricsFileStore(directory, settings.API_METRICS_FLUSH_INTERVAL),
+        )
+    return store
+
+
+def render_metrics():
+    """
+    輸出 `/metrics` 的內容
+
+    設定 `API_METRICS_DIR` 時合併所有 process 的累計值，否則只輸出此
+    process 的累計值並帶上 `pid` 標籤。
+    """
+    store = metrics_store()
+    if store is None:
+        return registry.render(labels={"pid": os.getpid()})
+    store.flush(registry)
+    return store.collect(registry.buckets).render()
+
+
+class ApiMetricsMiddleware:
+    """
+    量測每個請求的查詢數、查詢時間、回應大小與總延遲
+
+    `API_METRICS_ENABLED` 關閉時不會載入。只記錄有對應 URL 的請求，
+    view 為 URL 名稱，action 由 `MetricsMixin` 提供，其餘 view 以 HTTP
+    method 代替。放在 MIDDLEWARE 最前面，延遲才會包含其他 middleware。
+    """
+
+    def __init__(self, get_response):
+        if not settings.API_METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        metrics = RequestMetrics()
+        token = _current.set(metrics)
+        started = time.perf_counter()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(connection.execute_wrapper(metrics))
+                response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        latency = time.perf_counter() - started
+
+        match = getattr(request, "resolver_match", None)
+        if match is not None:
+            registry.record(
+                match.view_name or match._func_path,
+                metrics.action or request.method.lower(),
+                response.status_code,
+                latency,
+                queries=metrics.queries,
+                db_seconds=metrics.db_seconds,
+                serializer_seconds=metrics.serializer_seconds,
+                response_bytes=(0 if response.streaming else len(response.content)),
+            )
+            store = metrics_store()
+            if store is not None:
+                store.schedule_flush(registry)
+        return response
@@ -0,0 +1,22 @@
+# Generated by Django 5.2.8 on 2026-10-16 23:59
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic", "0004_remove_series_latest_release_date_jp_and_more"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="series",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+        ),
+        migrations.AddField(
+            model_name="volume",
+            name="updated_at",
+            field=models.DateTimeField(auto_now=True, verbose_name="更新時間"),
+        ),
+    ]
@@ -0,0 +1,26 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:00
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic", "0005_series_volume_updated_at"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(
+                fields=[
+                    "title_tw",
+                    "title_jp",
+                    "id",
+                    "author_tw",
+                    "author_jp",
+                    "status_jp",
+                ],
+                name="series_keyset_idx",
+            ),
+        ),
+    ]
@@ -0,0 +1,89 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:01
+
+from django.db import migrations, models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def populate_summary(apps, schema_editor):
+    """以現有單行本資料填入摘要欄位 (與 SeriesQuerySet.refresh_summary 相同)"""
+    Series = apps.get_model("comic", "Series")
+    Volume = apps.get_model("comic", "Volume")
+
+    def volumes(region):
+        return Volume.objects.filter(series=OuterRef("pk"), region=region).order_by()
+
+    def volume_count(region):
+        counts = (
+            volumes(region)
+            .filter(volume_number__isnull=False)
+            .values("series")
+            .annotate(count=Count("volume_number", distinct=True))
+            .values("count")
+        )
+        return Coalesce(Subquery(counts), 0)
+
+    def latest_release_date(region):
+        dates = (
+            volumes(region)
+            .values("series")
+            .annotate(latest=Max("release_date"))
+            .values("latest")
+        )
+        return Subquery(dates)
+
+    Series.objects.update(
+        volume_count_jp=volume_count("JP"),
+        volume_count_tw=volume_count("TW"),
+        volume_gap=volume_count("JP") - volume_count("TW"),
+        latest_release_date_jp=latest_release_date("JP"),
+        latest_release_date_tw=latest_release_date("TW"),
+    )
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic", "0006_series_keyset_index"),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name="series",
+            name="latest_release_date_jp",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="日版最新發售日"
+            ),
+        ),
+        migrations.AddField(
+            model_name="series",
+            name="latest_release_date_tw",
+            field=models.DateField(
+                blank=True, editable=False, null=True, verbose_name="台版最新發售日"
+            ),
+        ),
+        migrations.AddField(
+            model_name="series",
+            name="volume_count_jp",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="日版卷數"
+            ),
+        ),
+        migrations.AddField(
+            model_name="series",
+            name="volume_count_tw",
+            field=models.PositiveIntegerField(
+                default=0, editable=False, verbose_name="台版卷數"
+            ),
+        ),
+        migrations.AddField(
+            model_name="series",
+            name="volume_gap",
+            field=models.IntegerField(
+                default=0,
+                editable=False,
+                help_text="日版卷數減台版卷數",
+                verbose_name="卷數落差",
+            ),
+        ),
+        migrations.RunPython(populate_summary, migrations.RunPython.noop),
+    ]
@@ -0,0 +1,28 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:03
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic", "0007_series_publication_summary"),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(fields=["volume_gap", "id"], name="series_gap_idx"),
+        ),
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(
+                fields=["latest_release_date_jp", "id"], name="series_jp_release_idx"
+            ),
+        ),
+        migrations.AddIndex(
+            model_name="series",
+            index=models.Index(
+                fields=["latest_release_date_tw", "id"], name="series_tw_release_idx"
+            ),
+        ),
+    ]
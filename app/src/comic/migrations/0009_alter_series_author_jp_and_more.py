@@ -0,0 +1,53 @@
+# Generated by Django 5.2.8 on 2026-10-17 09:12
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic", "0008_series_publication_indexes"),
+    ]
+
+    operations = [
+        migrations.AlterField(
+            model_name="series",
+            name="author_jp",
+            field=models.CharField(max_length=100, verbose_name="作者原名"),
+        ),
+        migrations.AlterField(
+            model_name="series",
+            name="author_tw",
+            field=models.CharField(
+                blank=True, max_length=100, null=True, verbose_name="作者譯名"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="series",
+            name="title_jp",
+            field=models.CharField(
+                db_index=True, max_length=255, unique=True, verbose_name="原名"
+            ),
+        ),
+        migrations.AlterField(
+            model_name="series",
+            name="title_tw",
+            field=models.CharField(
+                blank=True,
+                db_index=True,
+                max_length=255,
+                null=True,
+                verbose_name="譯名",
+            ),
+        ),
+        migrations.AlterField(
+            model_name="volume",
+            name="variant",
+            field=models.CharField(
+                blank=True,
+                default="",
+                help_text="如：特裝版、首刷限定。普通版留空。",
+                max_length=50,
+                verbose_name="版本備註",
+            ),
+        ),
+    ]
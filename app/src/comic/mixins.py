@@ -0,0 +1,161 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import ValidationError
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date, quote_etag
+from rest_framework import status
+from rest_framework.response import Response
+
+from .cache import (
+    cache_stats,
+    get_cache,
+    get_catalog_version,
+    query_digest,
+    response_cache_enabled,
+    response_cache_key,
+)
+from .metrics import current_request_metrics
+
+
+class CachedResponseMixin:
+    """
+    快取 list / retrieve 的回應資料
+
+    快取鍵包含目錄版本號與 query string (分頁、搜尋、排序)，
+    資料異動時版本號遞增，舊快取即失效。
+    回應會帶上 `X-Cache: HIT` 或 `X-Cache: MISS` 標頭。
+    """
+
+    def list(self, request, *args, **kwargs):
+        return self._cached_response(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self._cached_response(super().retrieve, request, *args, **kwargs)
+
+    def _cached_response(self, handler, request, *args, **kwargs):
+        if not response_cache_enabled():
+            return handler(request, *args, **kwargs)
+
+        cache = get_cache()
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        key = response_cache_key(
+            self.action, request.query_params, pk=kwargs.get(lookup_url_kwarg)
+        )
+        data = cache.get(key)
+        if data is not None:
+            cache_stats.record_hit()
+            response = Response(data)
+            response["X-Cache"] = "HIT"
+            return response
+
+        cache_stats.record_miss()
+        response = handler(request, *args, **kwargs)
+        if response.status_code == status.HTTP_200_OK:
+            cache.set(key, response.data, timeout=settings.SERIES_CACHE_TIMEOUT)
+        response["X-Cache"] = "MISS"
+        return response
+
+
+class ConditionalGetMixin:
+    """
+    為 list / retrieve 提供 ETag 與 Last-Modified
+
+    list 的 ETag 為目錄版本號與 query string 摘要，不需查詢資料庫；
+    retrieve 為該漫畫的 updated_at。客戶端資料仍是最新時直接回傳 304，
+    不會查詢單行本也不會序列化。
+
+    目錄版本號只在快取可跨 process 共用時可靠 (與回應快取相同的條件)：
+    local-memory 快取每個 process 各有一份，爬蟲 process 的寫入不會反映在
+    Gunicorn workers 的版本號上，此時 list 不帶 ETag。
+    """
+
+    def list(self, request, *args, **kwargs):
+        if not response_cache_enabled():
+            return super().list(request, *args, **kwargs)
+
+        etag = self._format_etag(
+            get_catalog_version(), query_digest(request.query_params)
+        )
+        return self._conditional_response(
+            super().list, etag, None, request, *args, **kwargs
+        )
+
+    def retrieve(self, request, *args, **kwargs):
+        lookup_url_kwarg = self.lookup_url_kwarg or self.lookup_field
+        pk = kwargs.get(lookup_url_kwarg)
+        try:
+            updated_at = (
+                self.queryset.model.objects.filter(**{self.lookup_field: pk})
+                .values_list("updated_at", flat=True)
+                .first()
+            )
+        except (TypeError, ValueError, ValidationError):
+            updated_at = None
+        if updated_at is None:
+            # 交由原本的流程回傳 404
+            return super().retrieve(request, *args, **kwargs)
+
+        etag = self._format_etag(pk, int(updated_at.timestamp() * 1_000_000))
+        return self._conditional_response(
+            super().retrieve,
+            etag,
+            int(updated_at.timestamp()),
+            request,
+            *args,
+            **kwargs,
+        )
+
+    def _format_etag(self, *parts):
+        # 不同的 renderer (JSON / Browsable API) 內容不同，需各自驗證
+        parts = (*parts, self.request.accepted_renderer.format)
+        return quote_etag("-".join(str(part) for part in parts))
+
+    def _conditional_response(
+        self, handler, etag, last_modified, request, *args, **kwargs
+    ):
+        response = get_conditional_response(
+            request, etag=etag, last_modified=last_modified
+        )
+        if response is None:
+            response = handler(request, *args, **kwargs)
+            if response.status_code != status.HTTP_200_OK:
+                return response
+
+        response["ETag"] = etag
+        if last_modified is not None:
+            response["Last-Modified"] = http_date(last_modified)
+        # 允許客戶端快取，但每次使用前都要向伺服器驗證
+        patch_cache_control(response, no_cache=True)
+        return response
+
+
+class MetricsMixin:
+    """
+    提供 ApiMetricsMiddleware 的 action 與序列化時間
+
+    只計時最外層 serializer 的 to_representation (包含它觸發的查詢)，
+    middleware 未啟用時不做任何事。
+    """
+
+    def initial(self, request, *args, **kwargs):
+        metrics = current_request_metrics()
+        if metrics is not None:
+            metrics.action = self.action
+        super().initial(request, *args, **kwargs)
+
+    def get_serializer(self, *args, **kwargs):
+        serializer = super().get_serializer(*args, **kwargs)
+        metrics = current_request_metrics()
+        if metrics is not None:
+            to_representation = serializer.to_representation
+
+            def timed_to_representation(instance):
+                started = time.perf_counter()
+                try:
+                    return to_representation(instance)
+                finally:
+                    metrics.serializer_seconds += time.perf_counter() - started
+
+            serializer.to_representation = timed_to_representation
+        return serializer
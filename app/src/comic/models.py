@@ -1,6 +1,11 @@
 from django.db import models
+from django.db.models import Count, Max, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+from django.utils import timezone
 from django.utils.translation import gettext_lazy as _
 
+from .cache import bump_catalog_version_on_commit
+
 
 class Publisher(models.Model):
     """
@@ -28,6 +33,54 @@ class Publisher(models.Model):
         return f"{self.name} ({self.get_region_display()})"
 
 
+class SeriesQuerySet(models.QuerySet):
+    def refresh_summary(self):
+        """
+        重新計算出版進度摘要欄位
+
+        以一道 UPDATE 搭配子查詢完成，可用於單一漫畫的增量更新，
+        也可用於整批重建。卷數以不重複的 volume_number 計算，不含特殊版本。
+        """
+
+        def volumes(region):
+            return Volume.objects.filter(
+                series=OuterRef("pk"), region=region
+            ).order_by()
+
+        def volume_count(region):
+            counts = (
+                volumes(region)
+                .filter(volume_number__isnull=False)
+                .values("series")
+                .annotate(count=Count("volume_number", distinct=True))
+                .values("count")
+            )
+            return Coalesce(Subquery(counts), 0)
+
+        def latest_release_date(region):
+            dates = (
+                volumes(region)
+                .values("series")
+                .annotate(latest=Max("release_date"))
+                .values("latest")
+            )
+            return Subquery(dates)
+
+        jp, tw = Volume.Region.JAPAN, Volume.Region.TAIWAN
+        updated = self.update(
+            volume_count_jp=volume_count(jp),
+            volume_count_tw=volume_count(tw),
+            volume_gap=volume_count(jp) - volume_count(tw),
+            latest_release_date_jp=latest_release_date(jp),
+            latest_release_date_tw=latest_release_date(tw),
+            updated_at=timezone.now(),
+        )
+        # update() 不會觸發 signal，需自行使 API 快取失效
+        if updated:
+            bump_catalog_version_on_commit(using=self.db)
+        return updated
+
+
 class Series(models.Model):
     """
     系列漫畫 Model
@@ -73,11 +126,59 @@ class Series(models.Model):
         verbose_name=_("最新單行本 (台)"),
     )
 
+    # 出版進度摘要，由 SeriesQuerySet.refresh_summary 維護
+    volume_count_jp = models.PositiveIntegerField(
+        _("日版卷數"), default=0, editable=False
+    )
+    volume_count_tw = models.PositiveIntegerField(
+        _("台版卷數"), default=0, editable=False
+    )
+    volume_gap = models.IntegerField(
+        _("卷數落差"),
+        default=0,
+        editable=False,
+        help_text=_("日版卷數減台版卷數"),
+    )
+    latest_release_date_jp = models.DateField(
+        _("日版最新發售日"), null=True, blank=True, editable=False
+    )
+    latest_release_date_tw = models.DateField(
+        _("台版最新發售日"), null=True, blank=True, editable=False
+    )
+
+    # 單行本異動時也會更新，作為 API 的 ETag / Last-Modified 依據
+    updated_at = models.DateTimeField(_("更新時間"), auto_now=True)
+
+    objects = SeriesQuerySet.as_manager()
+
     class Meta:
         verbose_name = _("系列漫畫")
         verbose_name_plural = _("系列漫畫")
         ordering = ["title_tw", "title_jp"]
 
+        indexes = [
+            # keyset 分頁的排序鍵，並涵蓋列表所需欄位，可直接由索引取得資料
+            models.Index(
+                fields=[
+                    "title_tw",
+                    "title_jp",
+                    "id",
+                    "author_tw",
+                    "author_jp",
+                    "status_jp",
+                ],
+                name="series_keyset_idx",
+            ),
+            # 依出版進度落差、最新發售日篩選與排序
+            models.Index(fields=["volume_gap", "id"], name="series_gap_idx"),
+            models.Index(
+                fields=["latest_release_date_jp", "id"], name="series_jp_release_idx"
+            ),
+            models.Index(
+                fields=["latest_release_date_tw", "id"], name="series_tw_release_idx"
+            ),
+        ]
+
     def __str__(self):
         return self.title_tw or self.title_jp
 
@@ -140,6 +241,8 @@ class Volume(models.Model):
         _("ISBN"), max_length=13, null=True, blank=True, unique=True
     )
 
+    updated_at = models.DateTimeField(_("更新時間"), auto_now=True)
+
     class Meta:
         verbose_name = _("單行本")
         verbose_name_plural = _("單行本")
@@ -0,0 +1,165 @@
+import base64
+import binascii
+import json
+
+from django.db.models import F
+from django.db.models.fields.tuple_lookups import Tuple, TupleGreaterThan
+from django.db.models.lookups import GreaterThan
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.settings import api_settings
+from rest_framework.utils.urls import replace_query_param
+
+
+class RowValueGreaterThan(TupleGreaterThan):
+    """
+    以 row value 比較 `(a, b, c) > (x, y, z)`
+
+    Django 在 SQLite 上會改寫為 `a > x OR (a = x AND ...)`，無法作為索引範圍
+    掃描的起點；SQLite 3.15 起已支援 row value，這裡一律使用原生語法。
+    """
+
+    def as_sqlite(self, compiler, connection):
+        return GreaterThan.as_sql(self, compiler, connection)
+
+
+class SeriesKeysetPagination(BasePagination):
+    """
+    以 (title_tw, title_jp, id) 進行 keyset 分頁
+
+    以上一頁最後一筆的排序值作為游標，只查詢「排在它之後」的資料，
+    不需要 COUNT(*) 也不需要 OFFSET 掃描，爬蟲同時新增資料也不會造成
+    重複或遺漏。title_tw 可能為空值，一律排在最後。
+
+    分兩個階段查詢，每個階段都是 `series_keyset_idx` 的一段範圍掃描：
+    先以 `(title_tw, title_jp, id) > 游標` 取得有譯名者，取完後再以
+    `title_tw IS NULL AND (title_jp, id) > 游標` 取得沒有譯名者。
+    游標的 title_tw 為 null 即表示位於第二階段；跨越兩階段的那一頁多一道查詢。
+    """
+
+    cursor_query_param = "cursor"
+    page_size = api_settings.PAGE_SIZE
+    invalid_cursor_message = "Invalid cursor"
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        self.base_url = request.build_absolute_uri()
+
+        position = self.decode_cursor(request)
+        # 多取一筆判斷是否還有下一頁
+        limit = self.page_size + 1
+        rows = []
+        if position is None or position[0] is not None:
+            rows = list(self.titled_queryset(queryset, position)[:limit])
+        if len(rows) < limit:
+            untitled = self.untitled_queryset(queryset, position)
+            rows += list(untitled[: limit - len(rows)])
+
+        self.has_next = len(rows) > self.page_size
+        rows = rows[: self.page_size]
+        self.next_position = self.get_position(rows[-1]) if self.has_next else None
+        return rows
+
+    @staticmethod
+    def titled_queryset(queryset, position=None):
+        """第一階段：有譯名者，排在游標之後"""
+        queryset = queryset.filter(title_tw__isnull=False).order_by(
+            "title_tw", "title_jp", "id"
+        )
+        if position is not None:
+            queryset = queryset.filter(
+                RowValueGreaterThan(
+                    Tuple(F("title_tw"), F("title_jp"), F("id")), position
+                )
+            )
+        return queryset
+
+    @staticmethod
+    def untitled_queryset(queryset, position=None):
+        """第二階段：沒有譯名者；游標仍在第一階段時從頭開始"""
+        queryset = queryset.filter(title_tw__isnull=True).order_by("title_jp", "id")
+        if position is not None and position[0] is None:
+            queryset = queryset.filter(
+                RowValueGreaterThan(Tuple(F("title_jp"), F("id")), position[1:])
+            )
+        return queryset
+
+    def get_paginated_response(self, data):
+        return Response({"next": self.get_next_link(), "results": data})
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            "type": "object",
+            "required": ["results"],
+            "properties": {
+                "next": {"type": "string", "nullable": True, "format": "uri"},
+                "results": schema,
+            },
+        }
+
+    def get_next_link(self):
+        if self.next_position is None:
+            return None
+        return replace_query_param(
+            self.base_url,
+            self.cursor_query_param,
+            self.encode_cursor(self.next_position),
+        )
+
+    @staticmethod
+    def get_position(row):
+        if isinstance(row, dict):
+            return row["title_tw"], row["title_jp"], row["id"]
+        return row.title_tw, row.title_jp, row.id
+
+    def encode_cursor(self, position):
+        payload = json.dumps(position, ensure_ascii=False, separators=(",", ":"))
+        return base64.urlsafe_b64encode(payload.encode("utf-8")).decode("ascii")
+
+    def decode_cursor(self, request):
+        encoded = request.query_params.get(self.cursor_query_param)
+        if not encoded:
+            return None
+
+        try:
+            payload = base64.urlsafe_b64decode(encoded.encode("ascii"))
+            title_tw, title_jp, pk = json.loads(payload.decode("utf-8"))
+            if not isinstance(pk, int) or not isinstance(title_jp, str):
+                raise ValueError
+            if title_tw is not None and not isinstance(title_tw, str):
+                raise ValueError
+        except (TypeError, ValueError, UnicodeError, binascii.Error):
+            raise NotFound(self.invalid_cursor_message)
+        return title_tw, title_jp, pk
+
+
+class SeriesPagination(PageNumberPagination):
+    """
+    預設使用頁碼分頁
+
+    帶入 `pagination=keyset` (第一頁) 或 `cursor` (後續頁面) 時改用
+    SeriesKeysetPagination，回應不包含 count 與 previous，
+    且固定以 (title_tw, title_jp, id) 排序。
+    """
+
+    mode_query_param = "pagination"
+    keyset_class = SeriesKeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if self.use_keyset(request):
+            self.keyset = self.keyset_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
+
+    def use_keyset(self, request):
+        return (
+            request.query_params.get(self.mode_query_param) == "keyset"
+            or self.keyset_class.cursor_query_param in request.query_params
+        )
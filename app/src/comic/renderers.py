@@ -0,0 +1,63 @@
+"""
+API 回應的 JSON renderer
+
+有安裝 orjson 時以它編碼，未安裝時退回 DRF 的 `JSONRenderer` (標準函式庫
+json)。兩者輸出相同：不跳脫中日文、緊湊分隔符號、跳脫 U+2028 / U+2029。
+"""
+
+from rest_framework.renderers import JSONRenderer
+
+try:
+    import orjson
+except ImportError:  # orjson 為選用套件
+    orjson = None
+
+
+class FastJSONRenderer(JSONRenderer):
+    """
+    以 orjson 編碼的 JSONRenderer
+
+    orjson 不支援的型別 (Decimal、lazy 字串、QuerySet 等) 交給 DRF 的
+    `JSONEncoder.default` 轉換。日期時間也交給它處理，UTC 的 datetime
+    才會與標準函式庫一樣以 `Z` 結尾。需要縮排 (Browsable API、
+    `Accept: application/json; indent=4`)、設定非預設的 `UNICODE_JSON` /
+    `COMPACT_JSON`、或 orjson 無法編碼 (例如超過 64 位元的整數) 時，
+    改用標準函式庫編碼。
+
+    唯一的差異是 NaN / Infinity：orjson 輸出 null，標準函式庫輸出 NaN
+    (不是合法的 JSON)；API 目前沒有浮點數欄位。
+    """
+
+    options = (
+        (
+            orjson.OPT_NON_STR_KEYS
+            | orjson.OPT_PASSTHROUGH_DATETIME
+            | orjson.OPT_PASSTHROUGH_DATACLASS
+        )
+        if orjson is not None
+        else 0
+    )
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        if (
+            orjson is None
+            or data is None
+            or self.ensure_ascii
+            or not self.compact
+            or self.get_indent(accepted_media_type, renderer_context or {}) is not None
+        ):
+            return super().render(data, accepted_media_type, renderer_context)
+
+        try:
+            ret = orjson.dumps(
+                data, default=self.encoder_class().default, option=self.options
+            )
+        except orjson.JSONEncodeError:
+            return super().render(data, accepted_media_type, renderer_context)
+
+        # 與 JSONRenderer 相同，跳脫 U+2028 / U+2029 讓輸出也是合法的 JavaScript
+        if b"\xe2\x80" in ret:
+            ret = ret.replace(b"\xe2\x80\xa8", b"\\u2028").replace(
+                b"\xe2\x80\xa9", b"\\u2029"
+            )
+        return ret
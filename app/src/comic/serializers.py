@@ -1,3 +1,4 @@
+from django.db import models
 from rest_framework import serializers
 
 from .models import Publisher, Series, Volume
@@ -34,11 +35,98 @@ class VolumeSerializer(serializers.ModelSerializer):
         ]
 
 
+class VolumeRowListSerializer(serializers.ListSerializer):
+    """
+    單行本的唯讀快速序列化
+
+    以一道 values_list 查詢取得單行本，出版社名稱以 JOIN 取得，逐筆直接組成
+    dict。輸出與 VolumeSerializer 逐欄位序列化相同，沒有出版社時同樣省略
+    publisher_name。已預先載入 (prefetch) 的單行本直接使用快取。
+    """
+
+    row_fields = (
+        "id",
+        "volume_number",
+        "region",
+        "variant",
+        "release_date",
+        "isbn",
+        "publisher_id",
+        "publisher__name",
+    )
+
+    def to_representation(self, data):
+        if isinstance(data, models.manager.BaseManager):
+            data = data.all()
+        if isinstance(data, models.QuerySet) and data._result_cache is None:
+            rows = data.values_list(*self.row_fields)
+        else:
+            rows = [
+                (
+                    volume.id,
+                    volume.volume_number,
+                    volume.region,
+                    volume.variant,
+                    volume.release_date,
+                    volume.isbn,
+                    volume.publisher_id,
+                    volume.publisher.name if volume.publisher_id else None,
+                )
+                for volume in data
+            ]
+
+        date_to_representation = self.child.fields["release_date"].to_representation
+        volumes = []
+        for (
+            pk,
+            volume_number,
+            region,
+            variant,
+            release_date,
+            isbn,
+            publisher_id,
+            publisher_name,
+        ) in rows:
+            volume = {
+                "id": pk,
+                "volume_number": volume_number,
+                "region": region,
+                "variant": variant,
+                "release_date": (
+                    None
+                    if release_date is None
+                    else date_to_representation(release_date)
+                ),
+                "isbn": isbn,
+                "publisher": publisher_id,
+            }
+            if publisher_id is not None:
+                volume["publisher_name"] = publisher_name
+            volumes.append(volume)
+        return volumes
+
+
+class SeriesListRowSerializer(serializers.ListSerializer):
+    """
+    漫畫清單的快速序列化
+
+    列表以 values() 取得資料列，逐筆直接組成 dict，
+    不經過每個欄位的 get_attribute 與 to_representation。
+    """
+
+    def to_representation(self, data):
+        rows = data.all() if isinstance(data, models.manager.BaseManager) else data
+        return [self.child.represent_row(row) for row in rows]
+
+
 class SeriesListSerializer(serializers.ModelSerializer):
     """
     漫畫清單的序列化器
     """
 
+    # 列表需要的 Series 欄位，list action 只查詢這些欄位
+    row_fields = ("id", "title_tw", "title_jp", "author_tw", "author_jp", "status_jp")
+
     traditional_chinese_title = serializers.CharField(source="title_tw")
     japanese_title = serializers.CharField(source="title_jp")
     status_japan = serializers.CharField(source="status_jp")
@@ -54,18 +142,33 @@ class SeriesListSerializer(serializers.ModelSerializer):
             "author",
             "status_japan",
         ]
+        list_serializer_class = SeriesListRowSerializer
 
     def get_author(self, obj):
         return obj.author_tw or obj.author_jp
 
+    def represent_row(self, row):
+        """
+        由 values() 的資料列 (或 Series 物件) 組成與 to_representation 相同的 dict
+        """
+        if not isinstance(row, dict):
+            row = {field: getattr(row, field) for field in self.row_fields}
+        return {
+            "id": row["id"],
+            "traditional_chinese_title": row["title_tw"],
+            "japanese_title": row["title_jp"],
+            "author": row["author_tw"] or row["author_jp"],
+            "status_japan": row["status_jp"],
+        }
+
 
 class SeriesDetailSerializer(SeriesListSerializer):
     """
     漫畫詳情的序列化器
     """
 
-    # 巢狀引入 VolumeSerializer
-    volumes = VolumeSerializer(many=True, read_only=True)
+    # 巢狀引入 VolumeSerializer，以唯讀快速序列化一次取得所有單行本
+    volumes = VolumeRowListSerializer(child=VolumeSerializer(), read_only=True)
 
     latest_volume_jp_number = serializers.IntegerField(
         source="latest_volume_jp.volume_number", read_only=True, allow_null=True
@@ -75,6 +178,8 @@ class SeriesDetailSerializer(SeriesListSerializer):
     )
 
     class Meta(SeriesListSerializer.Meta):
+        # 詳情包含單行本，多筆時仍逐欄位序列化
+        list_serializer_class = serializers.ListSerializer
         # 繼承 'fields' 並加上 'volumes'
         fields = SeriesListSerializer.Meta.fields + [
             "latest_volume_jp_number",
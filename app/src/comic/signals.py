@@ -0,0 +1,44 @@
+from django.db.models.signals import post_delete, post_save, pre_delete
+from django.dispatch import receiver
+from django.utils import timezone
+
+from .cache import bump_catalog_version_on_commit
+from .models import Publisher, Series, Volume
+
+
+@receiver(post_save, sender=Publisher)
+@receiver(post_save, sender=Series)
+@receiver(post_save, sender=Volume)
+@receiver(post_delete, sender=Publisher)
+@receiver(post_delete, sender=Series)
+@receiver(post_delete, sender=Volume)
+def invalidate_catalog_cache(sender, instance, using, **kwargs):
+    """
+    任何目錄資料異動 (包含爬蟲 pipeline 的寫入) 都會使 API 快取失效
+    """
+    bump_catalog_version_on_commit(using=using)
+
+
+@receiver(post_save, sender=Volume)
+@receiver(post_delete, sender=Volume)
+def touch_series_on_volume_change(sender, instance, using, **kwargs):
+    """
+    單行本異動時更新所屬漫畫的 updated_at，讓詳情頁的 ETag 只需查詢 Series
+    """
+    if instance.series_id:
+        Series.objects.using(using).filter(pk=instance.series_id).update(
+            updated_at=timezone.now()
+        )
+
+
+@receiver(post_save, sender=Publisher)
+@receiver(pre_delete, sender=Publisher)
+def touch_series_on_publisher_change(sender, instance, using, **kwargs):
+    """
+    出版社名稱會出現在詳情頁，異動時一併更新相關漫畫的 updated_at
+    """
+    if kwargs.get("created"):
+        return
+    Series.objects.using(using).filter(volumes__publisher=instance).update(
+        updated_at=timezone.now()
+    )
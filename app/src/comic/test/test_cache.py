@@ -0,0 +1,220 @@
+import tempfile
+import threading
+
+from django.core.cache import caches
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.cache import (
+    CATALOG_VERSION_KEY,
+    bump_catalog_version,
+    cache_stats,
+    get_cache,
+    get_catalog_version,
+    response_cache_enabled,
+)
+from comic.models import Publisher, Series, Volume
+
+
+@override_settings(SERIES_CACHE_ENABLED=True)
+class SeriesResponseCacheTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """在所有測試之前建立必要的測試資料"""
+        cls.publisher = Publisher.objects.create(
+            name="東立", region=Publisher.Region.TAIWAN
+        )
+        cls.series = Series.objects.create(
+            title_jp="進撃の巨人",
+            title_tw="進擊的巨人",
+            author_jp="諫山創",
+        )
+        cls.volume = Volume.objects.create(
+            series=cls.series,
+            publisher=cls.publisher,
+            region=Volume.Region.TAIWAN,
+            volume_number=34,
+            isbn="9789861234567",
+        )
+
+    def setUp(self):
+        get_cache().clear()
+        cache_stats.reset()
+
+    def test_second_request_is_served_from_cache(self):
+        """測試相同請求第二次命中快取"""
+        url = reverse("comics-list")
+        first = self.client.get(url)
+        second = self.client.get(url)
+
+        self.assertEqual(first["X-Cache"], "MISS")
+        self.assertEqual(second["X-Cache"], "HIT")
+        self.assertEqual(first.json(), second.json())
+        self.assertEqual(cache_stats.as_dict()["hits"], 1)
+        self.assertEqual(cache_stats.as_dict()["misses"], 1)
+
+    def test_query_params_use_separate_cache_entries(self):
+        """測試分頁、搜尋與排序參數各自快取"""
+        url = reverse("comics-list")
+        self.client.get(url, {"search": "巨人", "ordering": "title_jp"})
+        response = self.client.get(url, {"search": "不存在"})
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["results"]), 0)
+
+        # 參數順序不同仍視為相同請求
+        response = self.client.get(f"{url}?ordering=title_jp&search=巨人")
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_detail_is_cached_per_series(self):
+        """測試詳情頁依 ID 快取"""
+        url = reverse("comics-detail", args=[self.series.id])
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response["X-Cache"], "HIT")
+        self.assertEqual(len(response.data["volumes"]), 1)
+
+    def test_missing_series_is_not_cached(self):
+        """測試 404 回應不寫入快取"""
+        url = reverse("comics-detail", args=[9999])
+        self.client.get(url)
+        response = self.client.get(url)
+
+        self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+        self.assertEqual(cache_stats.as_dict()["hits"], 0)
+
+    def test_model_writes_bump_catalog_version(self):
+        """測試 Publisher / Series / Volume 異動都會遞增版本號"""
+        for write in (
+            lambda: Publisher.objects.create(name="講談社"),
+            lambda: Series.objects.filter(pk=self.series.pk).first().save(),
+            lambda: self.volume.save(),
+        ):
+            version = get_catalog_version()
+            write()
+            self.assertGreater(get_catalog_version(), version)
+
+    def test_volume_write_invalidates_cached_detail(self):
+        """測試新增單行本後詳情頁重新產生"""
+        url = reverse("comics-detail", args=[self.series.id])
+        self.client.get(url)
+
+        Volume.objects.create(
+            series=self.series,
+            region=Volume.Region.JAPAN,
+            volume_number=34,
+            isbn="9784063951234",
+        )
+        response = self.client.get(url)
+
+        self.assertEqual(response["X-Cache"], "MISS")
+        self.assertEqual(len(response.data["volumes"]), 2)
+
+    def test_cache_disabled_skips_lookup(self):
+        """測試關閉快取時不會標記 X-Cache"""
+        with self.settings(SERIES_CACHE_ENABLED=False):
+            response = self.client.get(reverse("comics-list"))
+
+        self.assertNotIn("X-Cache", response)
+
+
+class SeriesFileCacheTests(SeriesResponseCacheTests):
+    """使用 file-based cache backend 重跑相同測試"""
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        settings_override = override_settings(
+            CACHES={
+                "default": {
+                    "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+                    "LOCATION": self.cache_dir.name,
+                }
+            }
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+        super().setUp()
+
+
+class SharedCacheTests(APITestCase):
+    """爬蟲與 Gunicorn workers 各自以不同的 cache client 存取同一個快取"""
+
+    @classmethod
+    def setUpTestData(cls):
+        Series.objects.create(title_jp="進撃の巨人", author_jp="諫山創")
+
+    def setUp(self):
+        self.cache_dir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cache_dir.cleanup)
+        backend = {
+            "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+            "LOCATION": self.cache_dir.name,
+        }
+        settings_override = override_settings(
+            CACHES={"default": backend, "crawler": backend},
+            SERIES_CACHE_ENABLED=None,
+        )
+        settings_override.enable()
+        self.addCleanup(settings_override.disable)
+
+    def test_bump_from_second_client_invalidates_responses(self):
+        """測試由另一個 cache client 遞增版本號後，快取的列表隨之失效"""
+        url = reverse("comics-list")
+        self.client.get(url)
+        self.assertEqual(self.client.get(url)["X-Cache"], "HIT")
+
+        self.assertIsNot(caches["crawler"], caches["default"])
+        with self.settings(SERIES_CACHE_ALIAS="crawler"):
+            bump_catalog_version()
+
+        self.assertEqual(self.client.get(url)["X-Cache"], "MISS")
+
+    def test_enabled_by_default_only_for_shared_cache(self):
+        """測試未設定時只在快取可跨 process 共用時啟用"""
+        self.assertTrue(response_cache_enabled())
+
+        with self.settings(
+            CACHES={
+                "default": {"BACKEND": "django.core.cache.backends.locmem.LocMemCache"}
+            }
+        ):
+            self.assertFalse(response_cache_enabled())
+            response = self.client.get(reverse("comics-list"))
+
+        self.assertNotIn("X-Cache", response)
+
+
+class BumpCatalogVersionTests(SimpleTestCase):
+    def setUp(self):
+        get_cache().delete(CATALOG_VERSION_KEY)
+
+    def test_concurrent_bumps_get_distinct_versions(self):
+        """測試多個寫入者同時遞增時版本號不重複"""
+        start = get_catalog_version()
+        versions = []
+
+        def bump():
+            for _ in range(25):
+                versions.append(bump_catalog_version())
+
+        threads = [threading.Thread(target=bump) for _ in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(set(versions)), 200)
+        self.assertEqual(get_catalog_version(), start + 200)
+
+    def test_bump_after_cache_cleared(self):
+        """測試快取被清空後重新以時間戳初始化"""
+        bump_catalog_version()
+        get_cache().clear()
+
+        version = bump_catalog_version()
+
+        self.assertEqual(get_catalog_version(), version)
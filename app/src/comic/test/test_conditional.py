@@ -0,0 +1,149 @@
+from unittest.mock import patch
+
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.cache import bump_catalog_version, get_cache
+from comic.models import Publisher, Series, Volume
+from comic.serializers import SeriesDetailSerializer
+
+
+@override_settings(SERIES_CACHE_ENABLED=True)
+class SeriesConditionalGetTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """在所有測試之前建立必要的測試資料"""
+        cls.publisher = Publisher.objects.create(
+            name="東立", region=Publisher.Region.TAIWAN
+        )
+        cls.series = Series.objects.create(
+            title_jp="進撃の巨人",
+            title_tw="進擊的巨人",
+            author_jp="諫山創",
+        )
+        cls.volume = Volume.objects.create(
+            series=cls.series,
+            publisher=cls.publisher,
+            region=Volume.Region.TAIWAN,
+            volume_number=34,
+            isbn="9789861234567",
+        )
+
+    def setUp(self):
+        self.detail_url = reverse("comics-detail", args=[self.series.id])
+        self.list_url = reverse("comics-list")
+        get_cache().clear()
+
+    def test_responses_include_validators(self):
+        """測試回應帶有 ETag，詳情另有 Last-Modified"""
+        for url in (self.list_url, self.detail_url):
+            response = self.client.get(url)
+
+            self.assertEqual(response.status_code, status.HTTP_200_OK)
+            self.assertIn("ETag", response)
+            self.assertIn("no-cache", response["Cache-Control"])
+        self.assertIn("Last-Modified", response)
+
+    def test_detail_returns_304_without_serializing(self):
+        """測試 ETag 相符時回傳 304 且不經過 SeriesDetailSerializer"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        with patch.object(SeriesDetailSerializer, "to_representation") as mock_repr:
+            response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+        self.assertEqual(response["ETag"], etag)
+        mock_repr.assert_not_called()
+
+    def test_detail_if_modified_since(self):
+        """測試 If-Modified-Since 未過期時回傳 304"""
+        last_modified = self.client.get(self.detail_url)["Last-Modified"]
+        response = self.client.get(
+            self.detail_url, HTTP_IF_MODIFIED_SINCE=last_modified
+        )
+
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    def test_volume_change_invalidates_detail_etag(self):
+        """測試單行本異動後 ETag 改變"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        Volume.objects.create(
+            series=self.series,
+            region=Volume.Region.JAPAN,
+            volume_number=34,
+            isbn="9784063951234",
+        )
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+        self.assertEqual(len(response.data["volumes"]), 2)
+
+    def test_publisher_rename_invalidates_detail_etag(self):
+        """測試出版社更名後 ETag 改變"""
+        etag = self.client.get(self.detail_url)["ETag"]
+
+        self.publisher.name = "東立出版社"
+        self.publisher.save()
+        response = self.client.get(self.detail_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_returns_304_until_catalog_changes(self):
+        """測試列表在目錄未異動前回傳 304"""
+        etag = self.client.get(self.list_url, {"search": "巨人"})["ETag"]
+
+        response = self.client.get(
+            self.list_url, {"search": "巨人"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+        # 不同的 query string 有不同的 ETag
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+        Series.objects.create(title_jp="ブルーピリオド", author_jp="山口つばさ")
+        response = self.client.get(
+            self.list_url, {"search": "巨人"}, HTTP_IF_NONE_MATCH=etag
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    def test_list_etag_follows_catalog_version(self):
+        """測試其他 process (爬蟲) 遞增目錄版本號後列表 ETag 改變"""
+        etag = self.client.get(self.list_url)["ETag"]
+
+        bump_catalog_version()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotEqual(response["ETag"], etag)
+
+    def test_list_etag_changes_when_series_deleted(self):
+        """測試刪除漫畫後列表 ETag 改變"""
+        older = Series.objects.create(title_jp="ダンジョン飯", author_jp="九井諒子")
+        etag = self.client.get(self.list_url)["ETag"]
+
+        older.delete()
+        response = self.client.get(self.list_url, HTTP_IF_NONE_MATCH=etag)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+
+    @override_settings(SERIES_CACHE_ENABLED=False)
+    def test_list_without_shared_cache_has_no_etag(self):
+        """測試版本號只存在本 process 時列表不帶 ETag，避免回傳過期的 304"""
+        response = self.client.get(self.list_url)
+
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertNotIn("ETag", response)
+        self.assertIn("ETag", self.client.get(self.detail_url))
+
+    def test_missing_series_returns_404(self):
+        """測試不存在或格式錯誤的 ID 仍回傳 404"""
+        for pk in (9999, "abc"):
+            response = self.client.get(reverse("comics-detail", args=[pk]))
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+            self.assertNotIn("ETag", response)
@@ -0,0 +1,74 @@
+from datetime import date
+
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.models import Series
+
+
+class SeriesPublicationFilterTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """建立出版進度不同的漫畫"""
+        cls.far_behind = Series.objects.create(
+            title_jp="作品A",
+            title_tw="作品甲",
+            author_jp="作者",
+            volume_gap=5,
+            latest_release_date_jp=date(2024, 3, 1),
+            latest_release_date_tw=date(2023, 1, 1),
+        )
+        cls.slightly_behind = Series.objects.create(
+            title_jp="作品B",
+            title_tw="作品乙",
+            author_jp="作者",
+            volume_gap=1,
+            latest_release_date_jp=date(2023, 6, 1),
+            latest_release_date_tw=date(2024, 2, 1),
+        )
+        cls.up_to_date = Series.objects.create(
+            title_jp="作品C", title_tw="作品丙", author_jp="作者", volume_gap=0
+        )
+
+    def setUp(self):
+        self.url = reverse("comics-list")
+
+    def get_ids(self, params):
+        response = self.client.get(self.url, params)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return [item["id"] for item in response.data["results"]]
+
+    def test_filter_by_min_gap(self):
+        """測試依台版落後卷數篩選"""
+        ids = self.get_ids({"min_gap": 1})
+
+        self.assertCountEqual(ids, [self.far_behind.id, self.slightly_behind.id])
+
+    def test_filter_by_release_date(self):
+        """測試依日版、台版最新發售日篩選"""
+        self.assertEqual(
+            self.get_ids({"jp_released_after": "2024-01-01"}), [self.far_behind.id]
+        )
+        self.assertEqual(
+            self.get_ids({"tw_released_after": "2024-01-01"}),
+            [self.slightly_behind.id],
+        )
+
+    def test_order_by_gap_and_release_date(self):
+        """測試依落差與最新發售日排序"""
+        self.assertEqual(
+            self.get_ids({"ordering": "-volume_gap"}),
+            [self.far_behind.id, self.slightly_behind.id, self.up_to_date.id],
+        )
+        self.assertEqual(
+            self.get_ids({"ordering": "-latest_release_date_jp", "min_gap": 1}),
+            [self.far_behind.id, self.slightly_behind.id],
+        )
+
+    def test_invalid_params_return_400(self):
+        """測試參數格式錯誤時回傳 400"""
+        for params in ({"min_gap": "abc"}, {"jp_released_after": "2024/01/01"}):
+            response = self.client.get(self.url, params)
+
+            self.assertEqual(response.status_code, status.HTTP_400_BAD_REQUEST)
@@ -0,0 +1,118 @@
+import json
+import tempfile
+from io import StringIO
+from pathlib import Path
+
+from django.core.management import call_command
+from django.test import TestCase
+
+from comic.loadtest import (
+    SYNTHETIC_PREFIX,
+    LoadTestPlan,
+    ScenarioResult,
+    clear_synthetic_catalog,
+    generate_catalog,
+    run_load_test,
+)
+from comic.models import Publisher, Series, Volume
+
+
+class GenerateCatalogTests(TestCase):
+    def test_generates_consistent_catalog(self):
+        """測試合成目錄的筆數、ISBN 與出版進度摘要"""
+        counts = generate_catalog(20, volumes_jp=5, volumes_tw=3, publisher_count=4)
+
+        self.assertEqual(counts["series"], 20)
+        self.assertEqual(Volume.objects.count(), counts["volumes"])
+        self.assertEqual(Publisher.objects.count(), 4)
+        isbns = list(Volume.objects.values_list("isbn", flat=True))
+        self.assertEqual(len(set(isbns)), len(isbns))
+
+        for series in Series.objects.all():
+            volumes = series.volumes.filter(variant="")
+            count_jp = volumes.filter(region=Volume.Region.JAPAN).count()
+            count_tw = volumes.filter(region=Volume.Region.TAIWAN).count()
+            self.assertTrue(1 <= count_jp <= 5)
+            self.assertLessEqual(count_tw, min(count_jp, 3))
+            self.assertEqual(series.volume_count_jp, count_jp)
+            self.assertEqual(series.volume_gap, count_jp - count_tw)
+            self.assertEqual(series.latest_volume_jp.volume_number, count_jp)
+
+    def test_same_seed_generates_same_titles(self):
+        """測試相同 seed 產生相同資料，再次產生時接續編號"""
+        generate_catalog(5, seed=3)
+        first = list(Series.objects.order_by("pk").values_list("title_jp", flat=True))
+        clear_synthetic_catalog()
+        generate_catalog(5, seed=3)
+        generate_catalog(5, seed=3)
+
+        titles = list(Series.objects.order_by("pk").values_list("title_jp", flat=True))
+        self.assertEqual(titles[:5], first)
+        self.assertEqual(len(set(titles)), 10)
+
+    def test_clear_keeps_real_catalog(self):
+        """測試清除時只刪除合成資料"""
+        real = Series.objects.create(title_jp="ブルーピリオド", author_jp="山口つばさ")
+        call_command("generate_catalog", series=3, publishers=2, stdout=StringIO())
+
+        call_command(
+            "generate_catalog", series=0, publishers=0, clear=True, stdout=StringIO()
+        )
+
+        self.assertEqual(list(Series.objects.all()), [real])
+        self.assertFalse(
+            Publisher.objects.filter(name__startswith=SYNTHETIC_PREFIX).exists()
+        )
+
+
+class LoadTestTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        generate_catalog(30, volumes_jp=4, volumes_tw=2, publisher_count=2)
+
+    def test_plan_is_reproducible(self):
+        """測試相同 seed 產生相同的請求序列"""
+        scenarios = list(LoadTestPlan.SCENARIOS)
+
+        requests = LoadTestPlan(seed=1).requests(scenarios, 12)
+
+        self.assertEqual(requests, LoadTestPlan(seed=1).requests(scenarios, 12))
+        self.assertEqual([name for name, _ in requests[:4]], scenarios)
+
+    def test_run_load_test_counts_queries(self):
+        """測試每個情境都有統計延遲、RPS 與查詢數"""
+        results, total = run_load_test(requests=8, warmup=0)
+
+        self.assertEqual(total.summary()["requests"], 8)
+        for name in LoadTestPlan.SCENARIOS:
+            summary = results[name].summary()
+            self.assertEqual(summary["requests"], 2)
+            self.assertEqual(summary["errors"], 0)
+            self.assertGreater(summary["queries_per_request"], 0)
+            self.assertGreater(summary["rps"], 0)
+
+    def test_command_writes_results(self):
+        """測試指令輸出結果檔並與前次結果比較"""
+        with tempfile.TemporaryDirectory() as tmpdir:
+            path = Path(tmpdir, "results.json")
+            out = StringIO()
+            call_command("loadtest_api", requests=4, warmup=0, output=path, stdout=out)
+            call_command("loadtest_api", requests=4, warmup=0, compare=path, stdout=out)
+
+            results = json.loads(path.read_text())
+
+        self.assertEqual(results["total"]["requests"], 4)
+        self.assertIn("p99_ms", results["detail"])
+        self.assertIn("queries_per_request", out.getvalue())
+
+
+class ScenarioResultTests(TestCase):
+    def test_percentiles(self):
+        """測試延遲分位數"""
+        result = ScenarioResult("list")
+        for ms in range(1, 101):
+            result.add(ms / 1000, 3, ok=ms != 100)
+
+        self.assertAlmostEqual(result.percentile(50), 50.5)
+        self.assertAlmostEqual(result.percentile(99), 99.01)
+        self.assertEqual(result.summary()["errors"], 1)
@@ -0,0 +1,180 @@
+import os
+import re
+import tempfile
+
+from django.test import SimpleTestCase, override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.metrics import MetricsFileStore, MetricsRegistry, registry
+from comic.models import Publisher, Series, Volume
+
+
+def sample(text, name, **labels):
+    """取得 Prometheus 輸出中指定指標的數值"""
+    label_text = ",".join(f'{key}="{value}"' for key, value in labels.items())
+    match = re.search(
+        rf"^{re.escape(name)}\{{{re.escape(label_text)}\}} (\S+)$", text, re.M
+    )
+    return float(match.group(1)) if match else None
+
+
+@override_settings(API_METRICS_ENABLED=True, API_METRICS_TOKEN="", API_METRICS_DIR="")
+class ApiMetricsTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        publisher = Publisher.objects.create(
+            name="東立", region=Publisher.Region.TAIWAN
+        )
+        cls.series = Series.objects.create(
+            title_jp="ブルーピリオド", title_tw="藍色時期", author_jp="山口つばさ"
+        )
+        Volume.objects.create(
+            series=cls.series,
+            publisher=publisher,
+            region=Volume.Region.TAIWAN,
+            volume_number=16,
+            isbn="9786260243098",
+        )
+
+    def setUp(self):
+        registry.reset()
+        self.addCleanup(registry.reset)
+
+    def test_records_list_and_detail_requests(self):
+        """測試依 view 與 action 累計請求數、查詢數、序列化時間與回應大小"""
+        list_response = self.client.get(reverse("comics-list"))
+        self.client.get(reverse("comics-list"))
+        self.client.get(reverse("comics-detail", args=[self.series.pk]))
+
+        text = self.client.get(reverse("metrics")).content.decode()
+
+        list_labels = {"pid": os.getpid(), "view": "comics-list", "action": "list"}
+        self.assertEqual(
+            sample(text, "comicchase_api_requests_total", **list_labels, status="200"),
+            2,
+        )
+        self.assertEqual(
+            sample(
+                text, "comicchase_api_request_duration_seconds_count", **list_labels
+            ),
+            2,
+        )
+        self.assertGreater(
+            sample(text, "comicchase_api_db_queries_total", **list_labels), 0
+        )
+        self.assertGreater(
+            sample(
+                text,
+                "comicchase_api_serializer_duration_seconds_total",
+                **list_labels,
+            ),
+            0,
+        )
+        self.assertEqual(
+            sample(text, "comicchase_api_response_size_bytes_total", **list_labels),
+            2 * len(list_response.content),
+        )
+        self.assertEqual(
+            sample(
+                text,
+                "comicchase_api_requests_total",
+                pid=os.getpid(),
+                view="comics-detail",
+                action="retrieve",
+                status="200",
+            ),
+            1,
+        )
+
+    def test_workers_share_metrics_directory(self):
+        """測試設定 API_METRICS_DIR 後合併所有 worker 的數據"""
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        other_worker = MetricsRegistry()
+        other_worker.record("comics-list", "list", 200, 0.01, queries=2)
+        MetricsFileStore(directory.name).flush(other_worker)
+
+        with self.settings(
+            API_METRICS_DIR=directory.name, API_METRICS_FLUSH_INTERVAL=0
+        ):
+            self.client.get(reverse("comics-list"))
+            text = self.client.get(reverse("metrics")).content.decode()
+
+        self.assertEqual(len(os.listdir(directory.name)), 2)
+        self.assertEqual(
+            sample(
+                text,
+                "comicchase_api_requests_total",
+                view="comics-list",
+                action="list",
+                status="200",
+            ),
+            2,
+        )
+        self.assertNotIn("pid=", text)
+
+    @override_settings(API_METRICS_TOKEN="secret")
+    def test_token_required_when_configured(self):
+        """測試設定 token 後需帶上 Bearer token"""
+        response = self.client.get(reverse("metrics"))
+        self.assertEqual(response.status_code, status.HTTP_401_UNAUTHORIZED)
+
+        response = self.client.get(
+            reverse("metrics"), HTTP_AUTHORIZATION="Bearer secret"
+        )
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        self.assertTrue(response["Content-Type"].startswith("text/plain"))
+
+    @override_settings(API_METRICS_ENABLED=False)
+    def test_disabled_by_default(self):
+        """測試未啟用時不記錄也不提供指標"""
+        self.client.get(reverse("comics-list"))
+
+        self.assertEqual(
+            self.client.get(reverse("metrics")).status_code,
+            status.HTTP_404_NOT_FOUND,
+        )
+        self.assertNotIn("comics-list", registry.render())
+
+
+class MetricsRegistryTests(SimpleTestCase):
+    def test_histogram_buckets_are_cumulative(self):
+        """測試延遲 histogram 為累計值，超出上界者只計入 +Inf"""
+        metrics = MetricsRegistry(buckets=(0.1, 1.0))
+        for latency in (0.05, 0.5, 0.7, 3.0):
+            metrics.record("comics-list", "list", 200, latency, queries=2)
+
+        text = metrics.render()
+        labels = {"view": "comics-list", "action": "list"}
+
+        name = "comicchase_api_request_duration_seconds_bucket"
+        self.assertEqual(sample(text, name, **labels, le="0.1"), 1)
+        self.assertEqual(sample(text, name, **labels, le="1.0"), 3)
+        self.assertEqual(sample(text, name, **labels, le="+Inf"), 4)
+        self.assertEqual(sample(text, "comicchase_api_db_queries_total", **labels), 8)
+
+    def test_label_values_are_escaped(self):
+        """測試標籤值中的引號與反斜線會被跳脫"""
+        metrics = MetricsRegistry()
+        metrics.record('a"b\\c', "get", 200, 0.01)
+
+        self.assertIn('view="a\\"b\\\\c"', metrics.render())
+
+    def test_snapshots_merge_into_one_registry(self):
+        """測試多個 process 的累計值合併後與單一 registry 相同"""
+        requests = [
+            ("comics-list", "list", 200, 0.05),
+            ("comics-list", "list", 304, 0.5),
+            ("comics-detail", "retrieve", 404, 3.0),
+        ]
+        single = MetricsRegistry(buckets=(0.1, 1.0))
+        merged = MetricsRegistry(buckets=(0.1, 1.0))
+        for request in requests:
+            single.record(*request, queries=2, response_bytes=10)
+            worker = MetricsRegistry(buckets=(0.1, 1.0))
+            worker.record(*request, queries=2, response_bytes=10)
+            merged.merge(worker.snapshot())
+
+        self.assertEqual(merged.render(), single.render())
@@ -1,4 +1,8 @@
+from datetime import date
+from io import StringIO
+
 from django.core.exceptions import ValidationError
+from django.core.management import call_command
 from django.db import IntegrityError
 from django.test import TestCase
 
@@ -203,3 +207,58 @@ class VolumeModelTests(TestCase):
             isbn="9785555555555",
         )
         self.assertEqual(volume.variant, "")
+
+
+class SeriesSummaryTests(TestCase):
+    def setUp(self):
+        self.series = Series.objects.create(
+            title_jp="ブルーピリオド", title_tw="藍色時期", author_jp="山口つばさ"
+        )
+        volumes = [
+            (Volume.Region.JAPAN, 1, "", date(2017, 12, 22)),
+            (Volume.Region.JAPAN, 1, "特装版", date(2017, 12, 22)),
+            (Volume.Region.JAPAN, 2, "", date(2018, 6, 22)),
+            (Volume.Region.JAPAN, 3, "", date(2018, 12, 21)),
+            (Volume.Region.TAIWAN, 1, "", date(2018, 9, 3)),
+        ]
+        for idx, (region, number, variant, release_date) in enumerate(volumes):
+            Volume.objects.create(
+                series=self.series,
+                region=region,
+                volume_number=number,
+                variant=variant,
+                release_date=release_date,
+                isbn=f"978000000000{idx}",
+            )
+
+    def test_refresh_summary_counts_distinct_volumes(self):
+        """測試摘要以不重複卷數計算，特殊版本不重複計入"""
+        Series.objects.filter(pk=self.series.pk).refresh_summary()
+        self.series.refresh_from_db()
+
+        self.assertEqual(self.series.volume_count_jp, 3)
+        self.assertEqual(self.series.volume_count_tw, 1)
+        self.assertEqual(self.series.volume_gap, 2)
+        self.assertEqual(self.series.latest_release_date_jp, date(2018, 12, 21))
+        self.assertEqual(self.series.latest_release_date_tw, date(2018, 9, 3))
+
+    def test_refresh_summary_without_volumes(self):
+        """測試沒有單行本的漫畫摘要歸零"""
+        series = Series.objects.create(title_jp="新作品", author_jp="作者")
+        Series.objects.filter(pk=series.pk).refresh_summary()
+        series.refresh_from_db()
+
+        self.assertEqual(series.volume_count_jp, 0)
+        self.assertEqual(series.volume_gap, 0)
+        self.assertIsNone(series.latest_release_date_jp)
+
+    def test_rebuild_series_summary_command(self):
+        """測試 rebuild_series_summary 指令整批重建摘要"""
+        Series.objects.create(title_jp="新作品", author_jp="作者")
+        out = StringIO()
+
+        call_command("rebuild_series_summary", "--batch-size", "1", stdout=out)
+
+        self.series.refresh_from_db()
+        self.assertEqual(self.series.volume_gap, 2)
+        self.assertIn("Rebuilt summary for 2 series", out.getvalue())
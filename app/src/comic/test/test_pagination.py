@@ -0,0 +1,161 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.db.models import F
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.models import Series
+from comic.pagination import SeriesKeysetPagination
+from comic.serializers import SeriesListSerializer
+
+
+class SeriesKeysetPaginationTests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        """建立 25 筆漫畫，部分沒有譯名且有重複譯名"""
+        for idx in range(25):
+            if idx % 5 == 0:
+                title_tw = None
+            elif idx % 3 == 0:
+                title_tw = "重複譯名"
+            else:
+                title_tw = f"譯名{idx:02d}"
+            Series.objects.create(
+                title_jp=f"テスト作品{idx:02d}", title_tw=title_tw, author_jp="作者"
+            )
+
+    def setUp(self):
+        self.url = reverse("comics-list")
+
+    def expected_ids(self):
+        return list(
+            Series.objects.order_by(
+                F("title_tw").asc(nulls_last=True), "title_jp", "id"
+            ).values_list("id", flat=True)
+        )
+
+    def walk(self, first_page_params=None):
+        """依 next 連結走完所有頁面"""
+        response = self.client.get(self.url, first_page_params or {})
+        pages = [response]
+        while response.data["next"]:
+            response = self.client.get(response.data["next"])
+            pages.append(response)
+        return pages
+
+    def test_keyset_walks_all_rows_in_order(self):
+        """測試 keyset 分頁依序取得所有資料且不重複"""
+        pages = self.walk({"pagination": "keyset"})
+
+        ids = [item["id"] for page in pages for item in page.data["results"]]
+        self.assertEqual(ids, self.expected_ids())
+        self.assertEqual(len(pages), 3)
+        for page in pages:
+            self.assertEqual(page.status_code, status.HTTP_200_OK)
+            self.assertNotIn("count", page.data)
+            self.assertNotIn("previous", page.data)
+
+    def test_keyset_is_stable_under_concurrent_inserts(self):
+        """測試翻頁期間新增資料不會造成重複或遺漏"""
+        first_page = self.client.get(self.url, {"pagination": "keyset"})
+        seen = [item["id"] for item in first_page.data["results"]]
+        before = set(self.expected_ids())
+
+        # 模擬爬蟲在翻頁期間新增排在最前面的資料
+        Series.objects.create(title_jp="アアア", title_tw="一", author_jp="作者")
+
+        response = self.client.get(first_page.data["next"])
+        while True:
+            seen.extend(item["id"] for item in response.data["results"])
+            if not response.data["next"]:
+                break
+            response = self.client.get(response.data["next"])
+
+        self.assertEqual(len(seen), len(set(seen)))
+        self.assertEqual(set(seen), before)
+
+    def test_keyset_keeps_search_filter(self):
+        """測試 keyset 分頁可與搜尋一起使用"""
+        pages = self.walk({"pagination": "keyset", "search": "重複"})
+
+        titles = {
+            item["traditional_chinese_title"] for item in pages[0].data["results"]
+        }
+        self.assertEqual(titles, {"重複譯名"})
+
+    def test_invalid_cursor_returns_404(self):
+        """測試格式錯誤的游標回傳 404"""
+        for cursor in ("not-base64!", "WzEsMl0="):
+            response = self.client.get(self.url, {"cursor": cursor})
+
+            self.assertEqual(response.status_code, status.HTTP_404_NOT_FOUND)
+
+    def test_page_number_pagination_is_default(self):
+        """測試未指定時維持頁碼分頁"""
+        response = self.client.get(self.url)
+
+        self.assertEqual(response.data["count"], 25)
+        self.assertIn("previous", response.data)
+
+    def test_cursor_in_untitled_phase_skips_titled_rows(self):
+        """測試游標位於沒有譯名的階段時只查詢該階段"""
+        first = Series.objects.filter(title_tw__isnull=True).order_by("title_jp", "id")[
+            0
+        ]
+        cursor = SeriesKeysetPagination().encode_cursor(
+            (None, first.title_jp, first.id)
+        )
+
+        # 只有第二階段一道查詢
+        with self.assertNumQueries(1):
+            response = self.client.get(self.url, {"cursor": cursor})
+
+        ids = [item["id"] for item in response.data["results"]]
+        self.assertEqual(ids, self.expected_ids()[-4:])
+        self.assertIsNone(response.data["next"])
+
+
+class SeriesKeysetQueryShapeTests(APITestCase):
+    """keyset 分頁的每個階段都應是 series_keyset_idx 的範圍掃描"""
+
+    @classmethod
+    def setUpTestData(cls):
+        for idx in range(200):
+            Series.objects.create(
+                title_jp=f"テスト作品{idx:03d}",
+                title_tw=None if idx % 4 == 0 else f"譯名{idx:03d}",
+                author_jp="作者",
+            )
+
+    def queryset(self):
+        return Series.objects.values(*SeriesListSerializer.row_fields)
+
+    def test_seek_uses_row_value_comparison(self):
+        """測試游標條件為 row value 比較，而不是 OR 條件"""
+        sql = str(
+            SeriesKeysetPagination.titled_queryset(
+                self.queryset(), ("譯名100", "テスト作品100", 1)
+            ).query
+        )
+
+        self.assertIn('"comic_series"."id") > (', sql)
+        self.assertNotIn(" OR ", sql)
+
+    @skipUnless(connection.vendor == "sqlite", "EXPLAIN 格式依資料庫而異")
+    def test_each_phase_is_an_index_range_scan(self):
+        """測試兩個階段都由索引範圍掃描取得且不需額外排序"""
+        for queryset in (
+            SeriesKeysetPagination.titled_queryset(
+                self.queryset(), ("譯名100", "テスト作品100", 1)
+            ),
+            SeriesKeysetPagination.untitled_queryset(
+                self.queryset(), (None, "テスト作品100", 1)
+            ),
+        ):
+            plan = queryset[:11].explain()
+            with self.subTest(plan=plan):
+                self.assertIn("SEARCH comic_series USING COVERING INDEX", plan)
+                self.assertIn("series_keyset_idx", plan)
+                self.assertNotIn("TEMP B-TREE", plan)
@@ -0,0 +1,104 @@
+from django.core.cache import caches
+from django.test import override_settings
+from django.urls import reverse
+from rest_framework import status
+from rest_framework.test import APITestCase
+
+from comic.loadtest import QUERY_BUDGETS, LoadTestPlan, generate_catalog
+from comic.models import Series
+
+
+class SeriesQueryBudgetTests(APITestCase):
+    """
+    SeriesViewSet 每個請求的查詢數上限
+
+    每部漫畫有多本單行本與多家出版社，序列化時若多出逐筆查詢
+    (例如 publisher_name 經由 publisher.name 取得) 就會超過上限。
+    """
+
+    @classmethod
+    def setUpTestData(cls):
+        generate_catalog(
+            30, volumes_jp=12, volumes_tw=8, publisher_count=6, variant_rate=0.3
+        )
+        cls.series = Series.objects.filter(volume_count_tw__gt=0).order_by("pk").first()
+
+    def assert_within_budget(self, scenario, path):
+        with self.assertNumQueries(QUERY_BUDGETS[scenario]):
+            response = self.client.get(path)
+        self.assertEqual(response.status_code, status.HTTP_200_OK)
+        return response
+
+    def test_list(self):
+        """測試列表不預先載入單行本"""
+        response = self.assert_within_budget("list", reverse("comics-list"))
+        self.assertEqual(len(response.data["results"]), 10)
+
+        self.assert_within_budget("list", reverse("comics-list") + "?page=3")
+
+    def test_keyset_list_skips_count(self):
+        """測試 keyset 分頁不需要 COUNT，只查詢一頁漫畫"""
+        with self.assertNumQueries(1):
+            self.client.get(reverse("comics-list"), {"pagination": "keyset"})
+
+    def test_search(self):
+        """測試搜尋"""
+        self.assert_within_budget("search", reverse("comics-list") + "?search=巨人")
+
+    def test_ordering_and_filters(self):
+        """測試依摘要欄位排序與篩選"""
+        for params in (
+            "?ordering=-volume_gap",
+            "?ordering=-latest_release_date_tw&page=2",
+            "?min_gap=3&ordering=-latest_release_date_jp",
+        ):
+            with self.subTest(params=params):
+                self.assert_within_budget("ordering", reverse("comics-list") + params)
+
+    def test_detail(self):
+        """測試詳情頁的單行本與出版社以固定查詢數載入"""
+        response = self.assert_within_budget(
+            "detail", reverse("comics-detail", args=[self.series.pk])
+        )
+
+        volumes = response.data["volumes"]
+        self.assertGreater(len(volumes), 1)
+        self.assertTrue(all(volume["publisher_name"] for volume in volumes))
+
+    def test_not_modified_detail_needs_one_query(self):
+        """測試詳情 ETag 相符時只查詢 updated_at"""
+        url = reverse("comics-detail", args=[self.series.pk])
+        etag = self.client.get(url)["ETag"]
+
+        with self.assertNumQueries(1):
+            response = self.client.get(url, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(SERIES_CACHE_ENABLED=True)
+    def test_not_modified_list_needs_no_query(self):
+        """測試列表 ETag 相符時不查詢資料庫"""
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        etag = self.client.get(reverse("comics-list"))["ETag"]
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("comics-list"), HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, status.HTTP_304_NOT_MODIFIED)
+
+    @override_settings(SERIES_CACHE_ENABLED=True)
+    def test_cached_list_needs_no_query(self):
+        """測試回應快取命中時不查詢資料庫"""
+        caches["default"].clear()
+        self.addCleanup(caches["default"].clear)
+        self.client.get(reverse("comics-list"))
+
+        with self.assertNumQueries(0):
+            response = self.client.get(reverse("comics-list"))
+        self.assertEqual(response["X-Cache"], "HIT")
+
+    def test_load_test_plan_within_budget(self):
+        """測試 loadtest_api 的每種請求都在查詢數上限內"""
+        plan = LoadTestPlan(seed=0)
+        for scenario, path in plan.requests(list(LoadTestPlan.SCENARIOS), 20):
+            with self.subTest(path=path):
+                self.assert_within_budget(scenario, path)
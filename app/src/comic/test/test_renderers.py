@@ -0,0 +1,106 @@
+import uuid
+from datetime import date, datetime, time, timezone
+from decimal import Decimal
+from unittest import mock, skipIf
+
+from django.test import SimpleTestCase
+from django.urls import reverse
+from django.utils.translation import gettext_lazy
+from rest_framework.renderers import JSONRenderer
+from rest_framework.test import APITestCase
+
+from comic import renderers
+from comic.models import Publisher, Series, Volume
+from comic.renderers import FastJSONRenderer
+
+SAMPLE = {
+    "title": "藍色時期",
+    "title_jp": "ブルーピリオド",
+    "release_date": date(2025, 3, 14),
+    "updated_at": datetime(2025, 3, 14, 8, 30, 15, 123456, tzinfo=timezone.utc),
+    "local_time": time(8, 30, 15, 123456),
+    "price": Decimal("180.00"),
+    "id": uuid.UUID("12345678-1234-5678-1234-567812345678"),
+    "label": gettext_lazy("Invalid cursor"),
+    "counts": {1: "一", 2: "二"},
+    "separator": "行 段 落",
+    "volumes": [{"volume_number": 16, "variant": "首刷限定版", "isbn": None}],
+    "flags": (True, False),
+    "big": 2**70,
+}
+
+
+class FastJSONRendererTests(SimpleTestCase):
+    def assert_same_output(self, data, accepted_media_type=None, context=None):
+        self.assertEqual(
+            FastJSONRenderer().render(data, accepted_media_type, context),
+            JSONRenderer().render(data, accepted_media_type, context),
+        )
+
+    @skipIf(renderers.orjson is None, "orjson 未安裝")
+    def test_orjson_output_matches_json_renderer(self):
+        """測試以 orjson 編碼時輸出與 JSONRenderer 完全相同"""
+        with mock.patch.object(
+            renderers.orjson, "dumps", wraps=renderers.orjson.dumps
+        ) as dumps:
+            self.assert_same_output(
+                {key: SAMPLE[key] for key in SAMPLE if key != "big"}
+            )
+        dumps.assert_called_once()
+
+    def test_unsupported_values_fall_back(self):
+        """測試 orjson 無法編碼的整數改用標準函式庫"""
+        self.assert_same_output(SAMPLE)
+
+    def test_cjk_is_not_escaped(self):
+        """測試中日文不以 \\u 跳脫，U+2028 / U+2029 仍會跳脫"""
+        content = FastJSONRenderer().render(SAMPLE)
+
+        self.assertIn("藍色時期".encode(), content)
+        self.assertIn(b'"release_date":"2025-03-14"', content)
+        self.assertIn(b'"updated_at":"2025-03-14T08:30:15.123456Z"', content)
+        self.assertIn(b"\\u2028", content)
+
+    def test_indent_and_empty_data(self):
+        """測試縮排與空內容"""
+        self.assert_same_output(SAMPLE, "application/json; indent=4")
+        self.assert_same_output(SAMPLE, context={"indent": 2})
+        self.assertEqual(FastJSONRenderer().render(None), b"")
+
+    def test_falls_back_without_orjson(self):
+        """測試未安裝 orjson 時使用標準函式庫"""
+        with mock.patch.object(renderers, "orjson", None):
+            self.assert_same_output(SAMPLE)
+
+
+class FastJSONRendererAPITests(APITestCase):
+    @classmethod
+    def setUpTestData(cls):
+        publisher = Publisher.objects.create(
+            name="東立", region=Publisher.Region.TAIWAN
+        )
+        cls.series = Series.objects.create(
+            title_jp="ブルーピリオド", title_tw="藍色時期", author_jp="山口つばさ"
+        )
+        Volume.objects.create(
+            series=cls.series,
+            publisher=publisher,
+            region=Volume.Region.TAIWAN,
+            volume_number=16,
+            release_date=date(2025, 3, 14),
+            isbn="9786260243098",
+        )
+
+    def test_api_responses_match_json_renderer(self):
+        """測試列表與詳情回應與 JSONRenderer 的輸出相同"""
+        for url in (
+            reverse("comics-list"),
+            reverse("comics-list") + "?pagination=keyset",
+            reverse("comics-detail", args=[self.series.pk]),
+        ):
+            with self.subTest(url=url):
+                response = self.client.get(url)
+
+                self.assertIsInstance(response.accepted_renderer, FastJSONRenderer)
+                self.assertEqual(response.content, JSONRenderer().render(response.data))
+                self.assertIn("藍色時期".encode(), response.content)
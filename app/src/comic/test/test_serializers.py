@@ -0,0 +1,136 @@
+from datetime import date
+
+from django.test import TestCase
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+
+from comic.loadtest import benchmark_volume_serializers, generate_catalog
+from comic.models import Publisher, Series, Volume
+from comic.serializers import (
+    SeriesDetailSerializer,
+    SeriesListSerializer,
+    VolumeRowListSerializer,
+    VolumeSerializer,
+)
+
+
+class SeriesListSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        Series.objects.create(
+            title_jp="ブルーピリオド",
+            title_tw="藍色時期",
+            author_jp="山口つばさ",
+            author_tw="山口飛翔",
+        )
+        Series.objects.create(
+            title_jp="ダンジョン飯",
+            author_jp="九井諒子",
+            status_jp=Series.JapanStatus.COMPLETED,
+        )
+
+    def field_by_field(self, queryset):
+        """以一般 ListSerializer 逐欄位序列化，作為比對基準"""
+        return serializers.ListSerializer(
+            child=SeriesListSerializer(), instance=queryset
+        ).data
+
+    def test_rows_match_field_serialization(self):
+        """測試由 values() 資料列組成的 dict 與逐欄位序列化相同"""
+        queryset = Series.objects.order_by("pk")
+        rows = queryset.values(*SeriesListSerializer.row_fields)
+
+        data = SeriesListSerializer(rows, many=True).data
+
+        self.assertEqual(data, self.field_by_field(queryset))
+        self.assertEqual(list(data[0]), SeriesListSerializer.Meta.fields)
+        self.assertIsNone(data[1]["traditional_chinese_title"])
+        self.assertEqual(data[1]["author"], "九井諒子")
+
+    def test_model_instances_are_supported(self):
+        """測試傳入 Series 物件時結果相同"""
+        queryset = Series.objects.order_by("pk")
+
+        self.assertEqual(
+            SeriesListSerializer(queryset, many=True).data,
+            self.field_by_field(queryset),
+        )
+
+    def test_detail_serializer_keeps_field_serialization(self):
+        """測試詳情序列化器多筆時仍包含單行本"""
+        data = SeriesDetailSerializer(Series.objects.all(), many=True).data
+
+        self.assertIn("volumes", data[0])
+
+
+class VolumeRowListSerializerTests(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        publisher = Publisher.objects.create(
+            name="東立", region=Publisher.Region.TAIWAN
+        )
+        cls.series = Series.objects.create(
+            title_jp="ブルーピリオド", title_tw="藍色時期", author_jp="山口つばさ"
+        )
+        for volume_number, variant, release_date, isbn, volume_publisher in (
+            (16, "", date(2025, 3, 14), "9786260243098", publisher),
+            (16, "首刷限定版", date(2025, 3, 14), "9786260243104", publisher),
+            (17, "", None, None, publisher),
+            (None, "", date(2024, 1, 8), "9784065000003", None),
+        ):
+            Volume.objects.create(
+                series=cls.series,
+                publisher=volume_publisher,
+                region=Volume.Region.TAIWAN,
+                volume_number=volume_number,
+                variant=variant,
+                release_date=release_date,
+                isbn=isbn,
+            )
+
+    def render(self, data):
+        return JSONRenderer().render(data)
+
+    def field_by_field(self):
+        series = Series.objects.prefetch_related("volumes__publisher").get(
+            pk=self.series.pk
+        )
+        return serializers.ListSerializer(
+            child=VolumeSerializer(), instance=series.volumes.all()
+        ).data
+
+    def test_output_is_byte_for_byte_identical(self):
+        """測試以一道查詢組成的輸出與逐欄位序列化的 JSON 完全相同"""
+        with self.assertNumQueries(1):
+            data = VolumeRowListSerializer(
+                child=VolumeSerializer(), instance=self.series.volumes
+            ).data
+
+        self.assertEqual(self.render(data), self.render(self.field_by_field()))
+        # 沒有出版社的單行本與 VolumeSerializer 一樣省略 publisher_name
+        self.assertNotIn("publisher_name", data[0])
+        self.assertEqual(data[1]["publisher_name"], "東立")
+
+    def test_prefetched_volumes_need_no_query(self):
+        """測試已預先載入的單行本直接使用快取"""
+        series = Series.objects.prefetch_related("volumes__publisher").get(
+            pk=self.series.pk
+        )
+
+        with self.assertNumQueries(0):
+            data = VolumeRowListSerializer(
+                child=VolumeSerializer(), instance=series.volumes
+            ).data
+
+        self.assertEqual(self.render(data), self.render(self.field_by_field()))
+
+    def test_benchmark_compares_both_paths(self):
+        """測試 benchmark 量測兩種方式並確認輸出相同"""
+        generate_catalog(1, volumes_jp=30, volumes_tw=20, variant_rate=0.3)
+        series = Series.objects.get(title_jp__startswith="[合成]")
+
+        results, identical = benchmark_volume_serializers(series, repeat=1)
+
+        self.assertTrue(identical)
+        self.assertEqual(results["fields"][1], 3)
+        self.assertEqual(results["rows"][1], 2)
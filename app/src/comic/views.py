@@ -1,23 +1,49 @@
+import hmac
+
+from django.conf import settings
+from django.http import Http404, HttpResponse
 from rest_framework import filters, viewsets
 
+from .filters import SeriesPublicationFilter
+from .metrics import render_metrics
+from .mixins import CachedResponseMixin, ConditionalGetMixin, MetricsMixin
 from .models import Series
+from .pagination import SeriesPagination
 from .serializers import SeriesDetailSerializer, SeriesListSerializer
 
 
-class SeriesViewSet(viewsets.ReadOnlyModelViewSet):
+class SeriesViewSet(
+    MetricsMixin,
+    ConditionalGetMixin,
+    CachedResponseMixin,
+    viewsets.ReadOnlyModelViewSet,
+):
     """
     提供漫畫列表和漫畫詳情
     """
 
-    # 優化查詢
-    queryset = Series.objects.all().prefetch_related("volumes")
+    # 單行本只在詳情頁預先載入，列表不需要
+    queryset = Series.objects.all()
 
-    # 搜尋搜尋與排序功能
-    filter_backends = [filters.SearchFilter, filters.OrderingFilter]
+    # 搜尋、出版進度篩選與排序功能
+    filter_backends = [
+        filters.SearchFilter,
+        SeriesPublicationFilter,
+        filters.OrderingFilter,
+    ]
     search_fields = ["title_jp", "title_tw", "author_jp", "author_tw"]
-    ordering_fields = ["title_tw", "title_jp"]
+    ordering_fields = [
+        "title_tw",
+        "title_jp",
+        "volume_gap",
+        "latest_release_date_jp",
+        "latest_release_date_tw",
+    ]
     ordering = ["title_tw"]  # 預設排序
 
+    # 頁碼分頁，可選用 keyset 分頁 (?pagination=keyset)
+    pagination_class = SeriesPagination
+
     def get_queryset(self):
         """
         根據 list 或 retrieve 動態優化資料庫查詢
@@ -26,15 +52,17 @@ class SeriesViewSet(viewsets.ReadOnlyModelViewSet):
 
         if self.action == "retrieve":
             # === 詳細頁面 (Detail View) ===
+            # 單行本與出版社名稱由 VolumeRowListSerializer 以一道查詢取得
             return queryset.select_related(
                 # 抓取關聯的「最新單行本」資訊，避免額外查詢
                 "latest_volume_jp",
                 "latest_volume_tw",
-            ).prefetch_related("volumes__publisher")
+            )
 
         # === 列表頁面 (List View) ===
-        # 只列 Series 本身的文字資訊，維持輕量化
-        return queryset
+        # 只查詢列表需要的欄位 (皆在 series_keyset_idx 內)，不預先載入單行本，
+        # 資料列由 SeriesListSerializer 直接組成 dict
+        return queryset.values(*SeriesListSerializer.row_fields)
 
     def get_serializer_class(self):
         """
@@ -43,3 +71,22 @@ class SeriesViewSet(viewsets.ReadOnlyModelViewSet):
         if self.action == "list":
             return SeriesListSerializer
         return SeriesDetailSerializer
+
+
+def metrics_view(request):
+    """
+    以 Prometheus text format 輸出 API 效能指標
+
+    `API_METRICS_ENABLED` 關閉時回傳 404；設定 `API_METRICS_TOKEN` 後
+    需帶上 `Authorization: Bearer <token>`。
+    """
+    if not settings.API_METRICS_ENABLED:
+        raise Http404
+    token = settings.API_METRICS_TOKEN
+    if token and not hmac.compare_digest(
+        request.headers.get("Authorization", ""), f"Bearer {token}"
+    ):
+        return HttpResponse(status=401, headers={"WWW-Authenticate": "Bearer"})
+    return HttpResponse(
+        render_metrics(), content_type="text/plain; version=0.0.4; charset=utf-8"
+    )
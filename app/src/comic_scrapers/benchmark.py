@@ -0,0 +1,191 @@
+"""Measure spider and pipeline throughput against recorded responses."""
+
+import json
+import threading
+from pathlib import Path
+
+import scrapy
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from comic_scrapers.items import JpComicItem
+from comic_scrapers.spiders.books_jp import BooksJpSpider
+from comic_scrapers.spiders.books_tw import BooksTWSpider
+
+# Settings of a benchmark crawl: no pacing, no state kept between crawls
+BENCHMARK_SETTINGS = {
+    "POLITENESS_ENABLED": False,
+    "AUTOTHROTTLE_ENABLED": False,
+    "DOWNLOAD_DELAY": 0,
+    "CONCURRENT_REQUESTS_PER_DOMAIN": 8,
+    "ROBOTSTXT_OBEY": False,
+    "HTTPCACHE_ENABLED": False,
+    "CRAWL_WATERMARKS_ENABLED": False,
+    "CRAWL_CHECKPOINT_ENABLED": False,
+    "ISBN_QUEUE_ENABLED": False,
+    "RETRY_ENABLED": False,
+    "LOG_LEVEL": "WARNING",
+}
+
+
+class BooksJpReplaySpider(BooksJpSpider):
+    """Fetch the recorded books.or.jp detail pages over HTTP.
+
+    The Selenium search that finds detail pages cannot be replayed, so the
+    spider starts from the detail pages of the archive instead, with the
+    topic each was recorded under, and parses them like `detail_mode=http`.
+
+    Spider arguments:
+        archive (FixtureArchive): The recorded responses.
+    """
+
+    name = "booksjp_replay"
+
+    def __init__(self, *args, **kwargs):
+        """See base class."""
+        super().__init__(*args, **kwargs)
+        self.topic = "series_name"
+        self.topic_list = []
+        self.target_info = "//span[@class='bookdetail_title_text']"
+
+    async def start(self):
+        """Yield a request for every recorded detail page."""
+        for url in self.archive.urls(host="www.books.or.jp"):
+            topic = self.archive.get(url)["context"].get("topic")
+            if "/book-details/" not in url or not topic:
+                continue
+            item = JpComicItem()
+            item[self.topic] = topic
+            yield scrapy.Request(
+                url, callback=self.parse_detail_page, cb_kwargs={"item": item}
+            )
+
+
+# Spiders whose HTTP requests can be replayed, by benchmark name. eslite.com
+# pages are only rendered in Selenium, so its spiders have no HTTP path.
+BENCHMARK_SPIDERS = {
+    "books_tw": BooksTWSpider,
+    "books_jp_detail": BooksJpReplaySpider,
+}
+
+
+class DbWriteCounter:
+    """Count the rows the database is asked to write, on every thread.
+
+    Counts INSERT, UPDATE and DELETE statements, each row of an
+    `executemany` separately. Installed on the open connections and on
+    those opened while it is active, so the pipeline's writer threads are
+    counted too.
+    """
+
+    WRITES = ("INSERT", "UPDATE", "DELETE")
+
+    def __init__(self):
+        self.count = 0
+        self._lock = threading.Lock()
+
+    def __call__(self, execute, sql, params, many, context):
+        if sql.lstrip()[:6].upper() in self.WRITES:
+            with self._lock:
+                self.count += len(params) if many else 1
+        return execute(sql, params, many, context)
+
+    def _install(self, connection, **kwargs):
+        if self not in connection.execute_wrappers:
+            connection.execute_wrappers.append(self)
+
+    def __enter__(self):
+        for connection in connections.all(initialized_only=True):
+            self._install(connection)
+        connection_created.connect(self._install)
+        return self
+
+    def __exit__(self, *exc_info):
+        connection_created.disconnect(self._install)
+        for connection in connections.all(initialized_only=True):
+            if self in connection.execute_wrappers:
+                connection.execute_wrappers.remove(self)
+
+
+class BenchmarkResult:
+    """Throughput of one benchmark crawl.
+
+    Attributes:
+        name (str): Name of the benchmark.
+        seconds (float): Duration of the crawl.
+        pages (int): Responses received.
+        items (int): Items scraped.
+        writes (int): Database rows written.
+    """
+
+    RATES = ("pages_per_sec", "items_per_sec", "writes_per_sec")
+
+    def __init__(self, name, seconds=0.0, pages=0, items=0, writes=0):
+        self.name = name
+        self.seconds = seconds
+        self.pages = pages
+        self.items = items
+        self.writes = writes
+
+    def _rate(self, count):
+        return count / self.seconds if self.seconds > 0 else 0.0
+
+    @property
+    def pages_per_sec(self):
+        return self._rate(self.pages)
+
+    @property
+    def items_per_sec(self):
+        return self._rate(self.items)
+
+    @property
+    def writes_per_sec(self):
+        return self._rate(self.writes)
+
+    def rates(self):
+        """Return the rates by name, rounded for a baseline file."""
+        return {rate: round(getattr(self, rate), 2) for rate in self.RATES}
+
+    def __str__(self):
+        return (
+            f"{self.name:<16} {self.seconds:>7.2f}s"
+            f" {self.pages:>6} pages {self.pages_per_sec:>8.1f}/s"
+            f" {self.items:>6} items {self.items_per_sec:>8.1f}/s"
+            f" {self.writes:>6} writes {self.writes_per_sec:>8.1f}/s"
+        )
+
+
+def save_baseline(results, path):
+    """Write the rates of `results` as a baseline for later runs."""
+    Path(path).write_text(
+        json.dumps({result.name: result.rates() for result in results}, indent=2) + "\n"
+    )
+
+
+def find_regressions(results, baseline, max_regression=0.3):
+    """Compare results with a baseline.
+
+    Args:
+        results (list): `BenchmarkResult` of this run, or any result with
+            `name` and rate attributes. Rates in its `LOWER_IS_BETTER`
+            regress when they grow instead.
+        baseline (dict): Rates by benchmark name, as written by `save_baseline`.
+        max_regression (float): Fraction a rate may drop below its baseline.
+
+    Returns:
+        list: A message for every rate that dropped further.
+    """
+    regressions = []
+    for result in results:
+        lower_is_better = getattr(result, "LOWER_IS_BETTER", ())
+        for rate, expected in baseline.get(result.name, {}).items():
+            actual = getattr(result, rate)
+            if rate in lower_is_better:
+                regressed = actual > expected * (1 + max_regression)
+            else:
+                regressed = actual < expected * (1 - max_regression)
+            if regressed:
+                regressions.append(
+                    f"{result.name} {rate}: {actual:.2f}, baseline {expected:.2f}"
+                )
+    return regressions
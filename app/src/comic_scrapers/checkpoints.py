@@ -0,0 +1,325 @@
+"""Crawl checkpoints that let an interrupted Selenium crawl be resumed."""
+
+import threading
+
+from django.utils import timezone
+from scrapy import signals
+from twisted.internet import task
+from twisted.internet.threads import deferToThread
+
+from comic_scrapers.models import CrawlCheckpoint
+
+# Progress mark of a topic whose search results were all processed
+TOPIC_DONE = None
+
+
+def _as_bool(value):
+    if isinstance(value, str):
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    return bool(value)
+
+
+class CheckpointStore:
+    """Progress of one crawl, saved periodically so it can be resumed.
+
+    Spiders report a search results page with `page_done` and a topic with
+    `topic_done` once its items and requests have been yielded, and `stage`
+    every item yielded before. Progress only counts once every item staged
+    before it has been stored or deliberately dropped by the pipeline, or
+    `discard`ed because the request producing it failed or was dropped, so a
+    crash never skips an item that was not written yet. Items the pipeline
+    failed to write raise `ItemWriteError`, not `DropItem`, and keep their
+    topic from counting as done.
+
+    The checkpoint is written every `CRAWL_CHECKPOINT_INTERVAL` seconds and
+    when the crawl ends, and deleted once every topic is done. A crawl
+    that is not resumed starts by deleting the checkpoint of the previous one.
+    All methods are thread-safe.
+
+    Attributes:
+        source (str): Name of the spider the checkpoint belongs to.
+        topics (list): Topic items of the crawl.
+        enabled (bool): Whether progress is recorded. A store that is not
+            enabled knows no progress and saves nothing.
+        resumed (bool): Whether the progress of an earlier crawl was loaded.
+    """
+
+    def __init__(self, source, save_interval=60.0):
+        self.source = source
+        self.save_interval = save_interval
+        self.enabled = False
+        self.resumed = False
+        self.started_at = None
+        self.topics = []
+        self._completed = set()
+        self._pages = {}
+        self._marks = {}
+        # id(item) -> topic of the items not written yet
+        self._pending = {}
+        self._failed = set()
+        self._dirty = False
+        self._saving = False
+        self._save_loop = None
+        self._lock = threading.Lock()
+
+    def bind(self, crawler, topics, resume=False):
+        """Load or reset the checkpoint and follow the crawl through its signals.
+
+        Does nothing if `CRAWL_CHECKPOINT_ENABLED` is off.
+
+        Args:
+            crawler (Crawler): The crawler running the spider.
+            topics (list): Topic items the crawl has to process.
+            resume (bool): Whether to continue from the saved checkpoint.
+        """
+        settings = crawler.settings
+        if not settings.getbool("CRAWL_CHECKPOINT_ENABLED", True):
+            return
+        self.topics = list(topics or [])
+        self.save_interval = settings.getfloat(
+            "CRAWL_CHECKPOINT_INTERVAL", self.save_interval
+        )
+        if resume:
+            self.load()
+        else:
+            CrawlCheckpoint.objects.filter(source=self.source).delete()
+        if self.started_at is None:
+            self.started_at = timezone.now()
+        self.enabled = True
+        crawler.signals.connect(self.item_processed, signal=signals.item_scraped)
+        crawler.signals.connect(self.item_processed, signal=signals.item_dropped)
+        crawler.signals.connect(self.item_failed, signal=signals.item_error)
+        crawler.signals.connect(self.request_dropped, signal=signals.request_dropped)
+        crawler.signals.connect(self.spider_opened, signal=signals.spider_opened)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    def load(self):
+        """Read the saved progress of the source, if there is any."""
+        row = CrawlCheckpoint.objects.filter(source=self.source).first()
+        if row is None:
+            return
+        with self._lock:
+            self._completed = set(row.completed_topics)
+            self._pages = dict(row.pages)
+            self.started_at = row.started_at
+            self.resumed = True
+
+    def is_complete(self, topic):
+        """Return whether `topic` was completed by the crawl being resumed."""
+        with self._lock:
+            return topic in self._completed
+
+    def pages_done(self, topic):
+        """Return the number of leading result pages of `topic` already done."""
+        with self._lock:
+            return self._pages.get(topic, 0)
+
+    def stage(self, item, topic):
+        """Remember that `item` of `topic` is on its way to the pipeline."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._pending[id(item)] = topic
+
+    def page_done(self, topic, page):
+        """Record that result page `page` of `topic` was processed."""
+        self._mark(topic, page)
+
+    def topic_done(self, topic):
+        """Record that every result page of `topic` was processed."""
+        self._mark(topic, TOPIC_DONE)
+
+    def _mark(self, topic, page):
+        if not self.enabled:
+            return
+        with self._lock:
+            staged = frozenset(
+                key
+                for key, pending_topic in self._pending.items()
+                if pending_topic == topic
+            )
+            self._marks.setdefault(topic, []).append((page, staged))
+            self._dirty = True
+
+    def item_processed(self, item, **kwargs):
+        """Count a stored or deliberately dropped item as written."""
+        with self._lock:
+            if self._pending.pop(id(item), None) is not None and self._marks:
+                self._dirty = True
+
+    def discard(self, item):
+        """Forget a staged item that will never reach the pipeline.
+
+        Used when the request that should have produced the item failed, so
+        its topic can still be completed.
+        """
+        self.item_processed(item)
+
+    def request_dropped(self, request, **kwargs):
+        """Forget the item of a request the scheduler dropped as a duplicate."""
+        item = request.cb_kwargs.get("item")
+        if item is not None:
+            self.discard(item)
+
+    def item_failed(self, item, **kwargs):
+        """Keep the progress made after a failed item from counting."""
+        with self._lock:
+            if self._pending.pop(id(item), None) is not None:
+                self._failed.add(id(item))
+
+    def _settle(self):
+        """Fold the marks whose items were all written into the progress.
+
+        Must be called with the lock held. Marks of a topic settle in order,
+        and a mark waiting for an item blocks the later ones.
+        """
+        for topic, marks in list(self._marks.items()):
+            while marks:
+                page, staged = marks[0]
+                if staged & self._failed or not staged.isdisjoint(self._pending):
+                    break
+                marks.pop(0)
+                if page is TOPIC_DONE:
+                    self._completed.add(topic)
+                    self._pages.pop(topic, None)
+                else:
+                    self._pages[topic] = max(self._pages.get(topic, 0), page)
+            if not marks:
+                del self._marks[topic]
+
+    def save(self):
+        """Write the settled progress of the crawl.
+
+        Returns:
+            int: Number of completed topics saved.
+        """
+        with self._lock:
+            self._settle()
+            completed = sorted(self._completed)
+            pages = dict(self._pages)
+            # Marks still waiting for items are saved once they settle
+            self._dirty = bool(self._marks)
+        CrawlCheckpoint.objects.update_or_create(
+            source=self.source,
+            defaults={
+                "completed_topics": completed,
+                "pages": pages,
+                "started_at": self.started_at,
+            },
+        )
+        return len(completed)
+
+    def delete(self):
+        """Forget the checkpoint once the crawl finished."""
+        CrawlCheckpoint.objects.filter(source=self.source).delete()
+
+    def _save_in_thread(self, spider):
+        if self._saving or not self._dirty:
+            return None
+        self._saving = True
+
+        def saved(result):
+            self._saving = False
+            return result
+
+        def log_error(failure):
+            spider.logger.error(
+                f"Failed to save the crawl checkpoint: {failure.getErrorMessage()}"
+            )
+
+        return deferToThread(self.save).addBoth(saved).addErrback(log_error)
+
+    def spider_opened(self, spider):
+        self._save_loop = task.LoopingCall(self._save_in_thread, spider)
+        self._save_loop.start(self.save_interval, now=False)
+
+    def close(self, reason):
+        """Delete the checkpoint of a complete crawl, save it otherwise.
+
+        A crawl can finish with topics left over, e.g. when every Selenium
+        session failed, so the checkpoint is only deleted once every topic
+        is done.
+
+        Returns:
+            int: Number of topics left to do, 0 if the checkpoint was deleted.
+        """
+        self.save()
+        with self._lock:
+            remaining = len(set(self.topics) - self._completed)
+        if reason == "finished" and not remaining:
+            self.delete()
+        return remaining
+
+    def spider_closed(self, spider, reason):
+        if self._save_loop is not None and self._save_loop.running:
+            self._save_loop.stop()
+
+        def log_saved(remaining):
+            if remaining:
+                spider.logger.info(
+                    f"Crawl ended with reason {reason!r} and {remaining} topics"
+                    " left, saved a checkpoint; resume it with --resume"
+                )
+
+        return deferToThread(self.close, reason).addCallback(log_saved)
+
+
+class CheckpointMixin:
+    """Give a Selenium pool spider a resumable `CheckpointStore`.
+
+    Topics completed by the resumed crawl are left out of `pending_topics`.
+    Only crawls of the spider's own topic list are checkpointed; a crawl of
+    a `topic_list` passed as spider argument gets a store that is not
+    enabled, as does a spider built without a crawler.
+
+    Spider arguments:
+        resume (bool): Continue from the checkpoint of an interrupted crawl.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.checkpoint = CheckpointStore(self.name)
+        self._explicit_topic_list = bool(kwargs.get("topic_list"))
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        if spider.checkpointed:
+            resume = _as_bool(getattr(spider, "resume", False))
+            spider.checkpoint.bind(crawler, spider.topic_list, resume=resume)
+            if spider.checkpoint.resumed:
+                spider.logger.info(
+                    f"Resuming the crawl started at {spider.checkpoint.started_at}"
+                )
+        return spider
+
+    @property
+    def checkpointed(self):
+        """bool: Whether the progress of the crawl is checkpointed."""
+        return not self._explicit_topic_list
+
+    def pending_topics(self):
+        """See base class."""
+        pending = []
+        for index, topic_item in super().pending_topics():
+            if self.checkpoint.is_complete(topic_item):
+                self._inc_checkpoint_stat("checkpoint/topics_skipped")
+            else:
+                pending.append((index, topic_item))
+        return pending
+
+    def skip_done_page(self, topic_item, page):
+        """Return whether result page `page` was done by the resumed crawl."""
+        if page > self.checkpoint.pages_done(topic_item):
+            return False
+        self.logger.debug(
+            f"parse_search_results(): Page {page} of {self.topic} {topic_item}"
+            " was processed before the crawl was resumed"
+        )
+        self._inc_checkpoint_stat("checkpoint/pages_skipped")
+        return True
+
+    def _inc_checkpoint_stat(self, key, count=1):
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            crawler.stats.inc_value(key, count, spider=self)
@@ -0,0 +1,259 @@
+"""Run the crawl stages in dependency order inside one process and reactor."""
+
+import logging
+import threading
+import time
+from datetime import timedelta
+
+from twisted.internet import defer
+from twisted.python.failure import Failure
+
+from comic_scrapers.spiders.books_jp import BooksJpTitleTwSpider
+from comic_scrapers.spiders.books_tw import BooksTWSpider
+from comic_scrapers.spiders.eslite import EsliteISBNSpider, EsliteTitleTwSpider
+
+logger = logging.getLogger(__name__)
+
+# The Selenium spiders require it, and one process has one reactor
+SELECT_REACTOR = "twisted.internet.selectreactor.SelectReactor"
+
+
+class CrawlStage:
+    """One spider run of a crawl plan.
+
+    Attributes:
+        name (str): Name of the stage.
+        spidercls (type): Spider class to run.
+        after (tuple): Names of the stages whose output the spider reads; the
+            stage starts once all of them finished.
+        selenium (bool): Whether the spider runs a Selenium session pool.
+            Selenium stages starting after the same stages run concurrently
+            and share the sessions of the Selenium server.
+        streams_from (str): Name of a stage whose output the spider consumes
+            while it is produced. The stage runs alongside it and gets an
+            `upstream_done` event, set once that stage ended.
+        spider_kwargs (dict): Arguments passed to the spider.
+    """
+
+    def __init__(
+        self,
+        name,
+        spidercls,
+        after=(),
+        selenium=False,
+        streams_from=None,
+        **spider_kwargs,
+    ):
+        self.name = name
+        self.spidercls = spidercls
+        self.after = tuple(after)
+        self.selenium = selenium
+        self.streams_from = streams_from
+        self.spider_kwargs = spider_kwargs
+
+
+# books_tw adds orphan TW volumes, eslite_isbn maps them to series, and the
+# title searches walk the series that have a TW or JP title
+STAGES = [
+    CrawlStage("books_tw", BooksTWSpider),
+    CrawlStage("eslite_isbn", EsliteISBNSpider, after=["books_tw"], selenium=True),
+    CrawlStage(
+        "eslite_title", EsliteTitleTwSpider, after=["eslite_isbn"], selenium=True
+    ),
+    CrawlStage(
+        "booksjp_title", BooksJpTitleTwSpider, after=["eslite_isbn"], selenium=True
+    ),
+]
+
+# eslite_isbn maps the ISBNs books_tw queues while books_tw is running
+STREAMING_STAGES = [
+    CrawlStage("books_tw", BooksTWSpider),
+    CrawlStage(
+        "eslite_isbn",
+        EsliteISBNSpider,
+        selenium=True,
+        streams_from="books_tw",
+        mode="stream",
+    ),
+    CrawlStage(
+        "eslite_title", EsliteTitleTwSpider, after=["eslite_isbn"], selenium=True
+    ),
+    CrawlStage(
+        "booksjp_title", BooksJpTitleTwSpider, after=["eslite_isbn"], selenium=True
+    ),
+]
+
+
+class StageResult:
+    """Outcome and timing of a crawl stage.
+
+    Attributes:
+        name (str): Name of the stage.
+        status (str): "pending", "running", "skipped", "failed" or the finish
+            reason of the crawl, "finished" when it ran to completion.
+        started_at (float): Clock time the stage started, None if it did not.
+        finished_at (float): Clock time the stage ended.
+        items (int): Number of items scraped.
+        error (str): Error message of a failed stage.
+    """
+
+    def __init__(self, name):
+        self.name = name
+        self.status = "pending"
+        self.started_at = None
+        self.finished_at = None
+        self.items = 0
+        self.error = None
+
+    @property
+    def duration(self):
+        """float: Seconds the stage ran, None if it did not run."""
+        if self.started_at is None or self.finished_at is None:
+            return None
+        return self.finished_at - self.started_at
+
+    def __str__(self):
+        duration = (
+            str(timedelta(seconds=round(self.duration)))
+            if self.duration is not None
+            else "-"
+        )
+        line = f"{self.name:<15} {self.status:<10} {duration:>9} {self.items:>7} items"
+        return f"{line}  {self.error}" if self.error else line
+
+
+class CrawlPlan:
+    """Run crawl stages on one crawler runner as soon as their inputs exist.
+
+    Every stage starts when the stages it runs after finished, so stages
+    without a dependency between them run concurrently. A stage whose
+    upstream stage failed or did not finish (e.g. it was shut down) is
+    skipped, together with everything after it.
+
+    Args:
+        runner (CrawlerRunner): Runner creating and running the crawlers.
+        stages (list): Stages in an order where every stage comes after the
+            stages it depends on.
+        resume (bool): Resume the Selenium stages from their checkpoints.
+        selenium_sessions (int): Sessions the Selenium server can run.
+        clock (callable): Returns the current time in seconds.
+    """
+
+    def __init__(
+        self,
+        runner,
+        stages=None,
+        resume=False,
+        selenium_sessions=1,
+        clock=time.monotonic,
+    ):
+        self.runner = runner
+        self.stages = list(STAGES if stages is None else stages)
+        self.resume = resume
+        self.clock = clock
+        self.results = {stage.name: StageResult(stage.name) for stage in self.stages}
+        self.upstream_done = {
+            stage.name: threading.Event() for stage in self.stages if stage.streams_from
+        }
+        self.pool_sizes = self._split_sessions(selenium_sessions)
+
+    def _split_sessions(self, sessions):
+        """Share the Selenium sessions between concurrent Selenium stages."""
+        groups = {}
+        for stage in self.stages:
+            if stage.selenium:
+                groups.setdefault(stage.after, []).append(stage.name)
+        pool_sizes = {}
+        for names in groups.values():
+            share, extra = divmod(sessions, len(names))
+            for i, name in enumerate(names):
+                pool_sizes[name] = max(1, share + (1 if i < extra else 0))
+        return pool_sizes
+
+    def spider_kwargs(self, stage):
+        """Return the arguments of the spider of `stage`."""
+        kwargs = dict(stage.spider_kwargs)
+        if stage.selenium:
+            kwargs.setdefault("pool_size", self.pool_sizes[stage.name])
+            if self.resume:
+                kwargs.setdefault("resume", True)
+        if stage.streams_from:
+            kwargs["upstream_done"] = self.upstream_done[stage.name]
+        return kwargs
+
+    def run(self):
+        """Start the stages that have their inputs and chain the others.
+
+        Returns:
+            Deferred: Fires with the list of `StageResult` once every stage
+                finished or was skipped.
+
+        Raises:
+            ValueError: If a stage runs after a stage not listed before it.
+        """
+        done = {}
+        for stage in self.stages:
+            inputs = stage.after + ((stage.streams_from,) if stage.streams_from else ())
+            unknown = [name for name in inputs if name not in done]
+            if unknown:
+                raise ValueError(
+                    f"Stage {stage.name} reads from {', '.join(unknown)},"
+                    " which must be listed before it"
+                )
+            if stage.streams_from:
+                event = self.upstream_done[stage.name]
+                done[stage.streams_from].addBoth(
+                    lambda result, event=event: (event.set(), result)[1]
+                )
+            upstream = defer.DeferredList([done[name] for name in stage.after])
+            done[stage.name] = upstream.addCallback(
+                lambda _, stage=stage: self._run_stage(stage)
+            )
+        return defer.DeferredList(list(done.values())).addCallback(
+            lambda _: [self.results[stage.name] for stage in self.stages]
+        )
+
+    def _run_stage(self, stage):
+        result = self.results[stage.name]
+        blocked = [
+            name for name in stage.after if self.results[name].status != "finished"
+        ]
+        if blocked:
+            result.status = "skipped"
+            logger.warning(
+                f"Skipping crawl stage {stage.name} because {', '.join(blocked)}"
+                " did not finish"
+            )
+            return None
+
+        logger.info(f"Starting crawl stage {stage.name}")
+        result.status = "running"
+        result.started_at = self.clock()
+        try:
+            crawler = self.runner.create_crawler(stage.spidercls)
+            d = self.runner.crawl(crawler, **self.spider_kwargs(stage))
+        except Exception:
+            return self._stage_failed(Failure(), stage)
+        return d.addCallbacks(
+            self._stage_finished,
+            self._stage_failed,
+            callbackArgs=(stage, crawler),
+            errbackArgs=(stage,),
+        )
+
+    def _stage_finished(self, _, stage, crawler):
+        result = self.results[stage.name]
+        result.finished_at = self.clock()
+        result.status = crawler.stats.get_value("finish_reason") or "finished"
+        result.items = crawler.stats.get_value("item_scraped_count", 0)
+        logger.info(
+            f"Crawl stage {stage.name} ended with {result.status!r} after"
+            f" {result.duration:.1f}s and {result.items} items"
+        )
+
+    def _stage_failed(self, failure, stage):
+        result = self.results[stage.name]
+        result.finished_at = self.clock()
+        result.status = "failed"
+        result.error = failure.getErrorMessage()
+        logger.error(f"Crawl stage {stage.name} failed: {result.error}")
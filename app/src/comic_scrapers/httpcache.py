@@ -0,0 +1,203 @@
+"""HTTP cache policy, storage and middleware for re-crawling catalog pages."""
+
+import json
+import re
+import sqlite3
+import time
+import zlib
+from pathlib import Path
+
+from scrapy.downloadermiddlewares.httpcache import HttpCacheMiddleware
+from scrapy.extensions.httpcache import RFC2616Policy
+from scrapy.http import Headers
+from scrapy.responsetypes import responsetypes
+from scrapy.utils.project import data_path
+from w3lib.url import url_query_cleaner
+
+# Headers of a 304 response that replace those of the stored response
+REVALIDATION_HEADERS = (
+    b"Date",
+    b"ETag",
+    b"Last-Modified",
+    b"Expires",
+    b"Cache-Control",
+)
+
+
+class TtlCachePolicy(RFC2616Policy):
+    """Cache policy keeping pages for a fixed time per URL pattern.
+
+    Only URLs matching a pattern of `HTTPCACHE_TTL_RULES` are cached, and
+    only their 200 responses. A cached page is served without a request
+    while it is younger than the TTL of its pattern; once stale, it is
+    revalidated with `If-None-Match`/`If-Modified-Since` when the site sent
+    an ETag or Last-Modified header, and refetched otherwise. The
+    `Cache-Control` headers of the site are ignored, since the TTLs encode
+    how often we want to look at a page rather than how often it changes.
+
+    The age of a page is taken from the time `SqliteCacheStorage` stored it
+    (the `httpcache_stored_at` request meta key) rather than from its `Date`
+    header, which may be missing or set by a lagging server clock. Pages of
+    a storage that does not record it are always revalidated.
+
+    Attributes:
+        ttl_rules (list): `(pattern, seconds)` pairs, first match wins.
+    """
+
+    def __init__(self, settings):
+        super().__init__(settings)
+        self.ttl_rules = [
+            (re.compile(pattern), float(ttl))
+            for pattern, ttl in settings.getdict("HTTPCACHE_TTL_RULES").items()
+        ]
+
+    def ttl(self, url):
+        """Return the seconds a page at `url` stays fresh, None if uncached."""
+        for pattern, ttl in self.ttl_rules:
+            if pattern.search(url):
+                return ttl
+        return None
+
+    def should_cache_request(self, request):
+        """See base class."""
+        return self.ttl(request.url) is not None and super().should_cache_request(
+            request
+        )
+
+    def should_cache_response(self, response, request):
+        """See base class."""
+        return response.status == 200
+
+    def is_cached_response_fresh(self, cachedresponse, request):
+        """See base class."""
+        stored_at = request.meta.get("httpcache_stored_at")
+        if stored_at is not None and time.time() - stored_at < self.ttl(request.url):
+            return True
+        self._set_conditional_validators(request, cachedresponse)
+        return False
+
+
+class RevalidatingHttpCacheMiddleware(HttpCacheMiddleware):
+    """HTTP cache middleware restarting the TTL of revalidated pages.
+
+    Scrapy's middleware serves the cached page when the site answers a
+    revalidation with 304 Not Modified, but keeps the stored copy as it was,
+    so the page would be revalidated on every later crawl. This middleware
+    stores it again with the headers of the 304 response, which restarts its
+    TTL.
+    """
+
+    def process_response(self, request, response, spider):
+        """See base class."""
+        cachedresponse = request.meta.get("cached_response")
+        result = super().process_response(request, response, spider)
+        if cachedresponse is not None and result is cachedresponse:
+            if response.status == 304:
+                for name in REVALIDATION_HEADERS:
+                    if name in response.headers:
+                        cachedresponse.headers[name] = response.headers[name]
+                self.storage.store_response(spider, request, cachedresponse)
+                self.stats.inc_value("httpcache/refresh", spider=spider)
+        return result
+
+
+class SqliteCacheStorage:
+    """HTTP cache storage keeping the pages of a spider in one SQLite file.
+
+    Pages are stored under their request fingerprint with zlib-compressed
+    bodies in `HTTPCACHE_DIR/<spider name>.sqlite`, instead of a directory
+    per page as with Scrapy's filesystem storage. Entries older than
+    `HTTPCACHE_EXPIRATION_SECS` (when above 0) are ignored.
+
+    Query parameters listed in `HTTPCACHE_IGNORE_QUERY_PARAMS` are left out
+    of the key, so that a page linked with different tracking parameters
+    (e.g. `loc` on books.com.tw) is cached once.
+    """
+
+    def __init__(self, settings):
+        self.cachedir = data_path(settings["HTTPCACHE_DIR"], createdir=True)
+        self.expiration_secs = settings.getint("HTTPCACHE_EXPIRATION_SECS")
+        self.ignore_query_params = settings.getlist("HTTPCACHE_IGNORE_QUERY_PARAMS")
+        self.db = None
+
+    def open_spider(self, spider):
+        """Open the cache file of `spider`, creating it if needed."""
+        self.db = sqlite3.connect(Path(self.cachedir, f"{spider.name}.sqlite"))
+        self.db.execute("PRAGMA synchronous = NORMAL")
+        self.db.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " fingerprint BLOB PRIMARY KEY,"
+            " url TEXT NOT NULL,"
+            " status INTEGER NOT NULL,"
+            " headers TEXT NOT NULL,"
+            " body BLOB NOT NULL,"
+            " stored_at REAL NOT NULL)"
+        )
+        self.db.commit()
+        self._fingerprinter = spider.crawler.request_fingerprinter
+        spider.logger.debug(f"Using SQLite cache storage in {self.cachedir}")
+
+    def close_spider(self, spider):
+        """Close the cache file."""
+        self.db.close()
+        self.db = None
+
+    def _key(self, request):
+        if self.ignore_query_params:
+            request = request.replace(
+                url=url_query_cleaner(
+                    request.url,
+                    self.ignore_query_params,
+                    remove=True,
+                    keep_fragments=True,
+                )
+            )
+        return self._fingerprinter.fingerprint(request)
+
+    def retrieve_response(self, spider, request):
+        """Return the cached response to `request`, None if there is none.
+
+        The time the response was stored is set as the `httpcache_stored_at`
+        meta key of `request`, for `TtlCachePolicy`.
+        """
+        row = self.db.execute(
+            "SELECT url, status, headers, body, stored_at FROM responses"
+            " WHERE fingerprint = ?",
+            (self._key(request),),
+        ).fetchone()
+        if row is None:
+            return None
+        url, status, headers, body, stored_at = row
+        if 0 < self.expiration_secs < time.time() - stored_at:
+            return None
+        request.meta["httpcache_stored_at"] = stored_at
+        headers = Headers(
+            {
+                name: [value.encode("latin-1") for value in values]
+                for name, values in json.loads(headers).items()
+            }
+        )
+        body = zlib.decompress(body)
+        respcls = responsetypes.from_args(headers=headers, url=url, body=body)
+        return respcls(url=url, headers=headers, status=status, body=body)
+
+    def store_response(self, spider, request, response):
+        """Store `response` as the cached response to `request`."""
+        headers = {
+            name.decode("latin-1"): [value.decode("latin-1") for value in values]
+            for name, values in response.headers.items()
+        }
+        self.db.execute(
+            "INSERT OR REPLACE INTO responses"
+            " (fingerprint, url, status, headers, body, stored_at)"
+            " VALUES (?, ?, ?, ?, ?, ?)",
+            (
+                self._key(request),
+                response.url,
+                response.status,
+                json.dumps(headers),
+                zlib.compress(response.body),
+                time.time(),
+            ),
+        )
+        self.db.commit()
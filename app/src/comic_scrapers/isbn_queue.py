@@ -0,0 +1,192 @@
+"""DB-backed queue streaming orphan TW ISBNs from books_tw to eslite_isbn."""
+
+import threading
+import time
+from datetime import timedelta
+
+from comic.models import Volume
+from django.db.models import F, Q
+from django.utils import timezone
+
+from comic_scrapers.models import IsbnQueueEntry
+from comic_scrapers.selenium_pool import TopicQueue
+
+
+class IsbnQueue:
+    """Queue of the ISBNs of orphan TW volumes waiting to be mapped.
+
+    An ISBN is claimed with a conditional update of its row, so concurrent
+    crawls never take the same ISBN, on any database backend. A claim that
+    is neither done nor released within `lease` seconds expires; an ISBN is
+    claimed at most `max_attempts` times. An ISBN whose last claim is released
+    or expires is dropped from the queue, so it does not stay there forever;
+    a batch `eslite_isbn` crawl still maps its volume.
+
+    Attributes:
+        lease (float): Seconds a claim is valid.
+        max_attempts (int): Claims allowed per ISBN.
+        on_dead (callable): Called with every ISBN dropped after its last
+            attempt.
+    """
+
+    def __init__(self, lease=1800.0, max_attempts=3, clock=timezone.now, on_dead=None):
+        self.lease = lease
+        self.max_attempts = max_attempts
+        self.on_dead = on_dead
+        self._clock = clock
+
+    @staticmethod
+    def enqueue(isbns):
+        """Add ISBNs to the queue, ignoring those already queued."""
+        IsbnQueueEntry.objects.bulk_create(
+            [IsbnQueueEntry(isbn=isbn) for isbn in isbns], ignore_conflicts=True
+        )
+
+    def _claimable(self, now):
+        return IsbnQueueEntry.objects.filter(
+            Q(claimed_at__isnull=True)
+            | Q(claimed_at__lt=now - timedelta(seconds=self.lease)),
+            attempts__lt=self.max_attempts,
+        )
+
+    def _drop_dead(self, entries):
+        for pk, isbn in list(entries.values_list("id", "isbn")):
+            # Only the crawl that deletes the row reports it
+            if entries.filter(id=pk).delete()[0] and self.on_dead is not None:
+                self.on_dead(isbn)
+
+    def claim(self):
+        """Take the oldest waiting ISBN.
+
+        ISBNs whose volume was mapped to a series in the meantime are
+        dropped from the queue instead, as are ISBNs whose last claim
+        expired.
+
+        Returns:
+            str: The claimed ISBN, or None if no ISBN is waiting.
+        """
+        self._drop_dead(
+            IsbnQueueEntry.objects.filter(
+                claimed_at__lt=self._clock() - timedelta(seconds=self.lease),
+                attempts__gte=self.max_attempts,
+            )
+        )
+        while True:
+            now = self._clock()
+            candidates = list(
+                self._claimable(now)
+                .order_by("enqueued_at", "id")
+                .values_list("id", "isbn", "claimed_at")[:10]
+            )
+            if not candidates:
+                return None
+            for pk, isbn, claimed_at in candidates:
+                claimed = IsbnQueueEntry.objects.filter(
+                    id=pk, claimed_at=claimed_at
+                ).update(claimed_at=now, attempts=F("attempts") + 1)
+                if not claimed:
+                    # Taken by another crawl
+                    continue
+                if Volume.objects.filter(isbn=isbn, series__isnull=True).exists():
+                    return isbn
+                self.done(isbn)
+
+    def done(self, isbn):
+        """Remove a processed ISBN from the queue."""
+        IsbnQueueEntry.objects.filter(isbn=isbn).delete()
+
+    def release(self, isbn):
+        """Put a claimed ISBN back for another crawl to take.
+
+        An ISBN without attempts left is dropped from the queue instead.
+        """
+        self._drop_dead(
+            IsbnQueueEntry.objects.filter(isbn=isbn, attempts__gte=self.max_attempts)
+        )
+        IsbnQueueEntry.objects.filter(isbn=isbn).update(claimed_at=None)
+
+    def waiting(self):
+        """Return the number of ISBNs that can be claimed."""
+        return self._claimable(self._clock()).count()
+
+
+class IsbnTopicQueue(TopicQueue):
+    """ISBN topics that leave the `IsbnQueue` once they are processed."""
+
+    def __init__(self, topics=(), isbn_queue=None):
+        super().__init__(topics)
+        self.isbn_queue = isbn_queue or IsbnQueue()
+
+    def done(self, index, topic_item):
+        """See base class."""
+        self.isbn_queue.done(topic_item)
+
+
+class IsbnStream(IsbnTopicQueue):
+    """ISBN topics claimed from the `IsbnQueue` as `books_tw` finds them.
+
+    Claimed ISBNs are appended to `topic_list`, so the index of a topic is
+    its position there. Workers wait for new ISBNs until the upstream crawl
+    is done, or until no ISBN arrived for `idle_timeout` seconds.
+
+    Args:
+        topic_list (list): The spider's topic list.
+        isbn_queue (IsbnQueue): Queue to claim the ISBNs from.
+        upstream_done (threading.Event, optional): Set once the crawl adding
+            ISBNs to the queue has ended.
+        closing (threading.Event, optional): Set when the workers must stop.
+        idle_timeout (float): Seconds to wait for an ISBN to arrive.
+        poll_interval (float): Seconds between two looks at the queue.
+    """
+
+    open_ended = True
+
+    def __init__(
+        self,
+        topic_list,
+        isbn_queue=None,
+        upstream_done=None,
+        closing=None,
+        idle_timeout=600.0,
+        poll_interval=5.0,
+        sleep=time.sleep,
+        clock=time.monotonic,
+    ):
+        super().__init__(isbn_queue=isbn_queue)
+        self.topic_list = topic_list
+        self.upstream_done = upstream_done or threading.Event()
+        self.closing = closing or threading.Event()
+        self.idle_timeout = idle_timeout
+        self.poll_interval = poll_interval
+        self._sleep = sleep
+        self._clock = clock
+        self._lock = threading.Lock()
+
+    def take(self):
+        """Claim the next ISBN, waiting for one to arrive.
+
+        Returns:
+            tuple: `(index, isbn)`, or None once the stream is over.
+        """
+        idle_since = self._clock()
+        while not self.closing.is_set():
+            # Read before claiming, so ISBNs added right before the upstream
+            # crawl ended are still claimed
+            upstream_done = self.upstream_done.is_set()
+            isbn = self.isbn_queue.claim()
+            if isbn is not None:
+                with self._lock:
+                    self.topic_list.append(isbn)
+                    return len(self.topic_list) - 1, isbn
+            if upstream_done or self._clock() - idle_since >= self.idle_timeout:
+                return None
+            self._sleep(self.poll_interval)
+        return None
+
+    def give_back(self, index, topic_item):
+        """See base class."""
+        self.isbn_queue.release(topic_item)
+
+    def remaining(self):
+        """See base class."""
+        return self.isbn_queue.waiting()
@@ -0,0 +1,79 @@
+"""Bounded in-process lookup cache used by the item pipeline."""
+
+import threading
+from collections import OrderedDict
+
+
+class LookupCache:
+    """Thread-safe LRU cache that keeps hit and miss counts.
+
+    Pipeline methods run in the `deferToThread` thread pool, so every access
+    is guarded by a lock. Values are returned as stored; callers that mutate
+    them must store copies.
+
+    Attributes:
+        maxsize (int): Maximum number of entries kept before the least
+            recently used one is evicted.
+        hits (int): Number of lookups that found an entry.
+        misses (int): Number of lookups that did not.
+    """
+
+    def __init__(self, maxsize=10000):
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        with self._lock:
+            return len(self._data)
+
+    def get(self, key, default=None):
+        """Return the cached value for `key` and record a hit or a miss.
+
+        Args:
+            key: The lookup key.
+            default: Value returned when `key` is not cached.
+
+        Returns:
+            The cached value, or `default` if `key` is not cached.
+        """
+        with self._lock:
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+                return default
+            self._data.move_to_end(key)
+            self.hits += 1
+            return value
+
+    def set(self, key, value):
+        """Store `value` under `key`, evicting the oldest entry when full."""
+        if self.maxsize <= 0:
+            return
+        with self._lock:
+            self._data[key] = value
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def discard(self, key):
+        """Remove `key` from the cache if present."""
+        with self._lock:
+            self._data.pop(key, None)
+
+    def clear(self):
+        """Remove every entry and reset the counters."""
+        with self._lock:
+            self._data.clear()
+            self.hits = 0
+            self.misses = 0
+
+    @property
+    def hit_rate(self):
+        """float: Fraction of lookups that were hits, 0.0 before any lookup."""
+        with self._lock:
+            total = self.hits + self.misses
+            return self.hits / total if total else 0.0
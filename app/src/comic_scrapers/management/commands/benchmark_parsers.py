@@ -0,0 +1,101 @@
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from comic_scrapers.benchmark import find_regressions, save_baseline
+from comic_scrapers.parser_benchmark import (
+    PARSER_BENCHMARKS,
+    check_corpus,
+    get_parsers,
+    load_corpus,
+    run_parser_benchmark,
+    synthetic_cases,
+)
+
+
+class Command(BaseCommand):
+    help = (
+        "Check the title and date parsers against the recorded corpus and"
+        " report their calls per second and bytes allocated per call"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--parsers",
+            nargs="+",
+            choices=list(PARSER_BENCHMARKS),
+            default=list(PARSER_BENCHMARKS),
+            help="Parsers to benchmark (default: all)",
+        )
+        parser.add_argument(
+            "--synthetic",
+            type=int,
+            default=5000,
+            help="Generated cases added to the recorded ones (default: 5000)",
+        )
+        parser.add_argument(
+            "--seed", type=int, default=0, help="Seed of the generated cases"
+        )
+        parser.add_argument(
+            "--repeat",
+            type=int,
+            default=5,
+            help="Timings per parser, of which the best counts (default: 5)",
+        )
+        parser.add_argument(
+            "--baseline", help="Fail if a parser got slower or allocates more"
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=0.3,
+            help="Fraction a rate may worsen from the baseline (default: 0.3)",
+        )
+        parser.add_argument(
+            "--save-baseline", help="Write the rates of this run to a baseline file"
+        )
+
+    def handle(self, *args, **options):
+        corpus = load_corpus()
+        parsers = get_parsers()
+
+        mismatches = []
+        for name in options["parsers"]:
+            mismatches += [
+                f"{name} {message}"
+                for message in check_corpus(
+                    parsers[name], corpus[PARSER_BENCHMARKS[name]]
+                )
+            ]
+        if mismatches:
+            raise CommandError(
+                "Parsers disagree with the corpus:\n  " + "\n  ".join(mismatches)
+            )
+        self.stdout.write("All parsers match the recorded corpus.")
+
+        results = []
+        for name in options["parsers"]:
+            corpus_name = PARSER_BENCHMARKS[name]
+            cases = corpus[corpus_name] + synthetic_cases(
+                corpus, corpus_name, options["synthetic"], seed=options["seed"]
+            )
+            results.append(
+                run_parser_benchmark(
+                    name, parsers[name], cases, repeat=options["repeat"]
+                )
+            )
+
+        self.stdout.write("Benchmarks:")
+        for result in results:
+            self.stdout.write(f"  {result}")
+
+        if options.get("save_baseline"):
+            save_baseline(results, options["save_baseline"])
+            self.stdout.write(f"Saved baseline to {options['save_baseline']}.")
+        if options.get("baseline"):
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(results, baseline, options["max_regression"])
+            if regressions:
+                raise CommandError("Parsers regressed:\n  " + "\n  ".join(regressions))
+            self.stdout.write("No regression against the baseline.")
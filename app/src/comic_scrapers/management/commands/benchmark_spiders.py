@@ -0,0 +1,134 @@
+import json
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
+from twisted.internet.error import ReactorNotRunning
+
+from comic_scrapers.benchmark import (
+    BENCHMARK_SETTINGS,
+    BENCHMARK_SPIDERS,
+    BenchmarkResult,
+    DbWriteCounter,
+    find_regressions,
+    save_baseline,
+)
+from comic_scrapers.crawl_plan import SELECT_REACTOR
+from comic_scrapers.replay import FixtureArchive, ReplayServer
+
+
+class Command(BaseCommand):
+    help = (
+        "Replay recorded responses from a local server and report the pages,"
+        " items and database writes per second of each spider"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--archive", required=True, help="Fixture archive written by replay_record"
+        )
+        parser.add_argument(
+            "--spiders",
+            nargs="+",
+            choices=list(BENCHMARK_SPIDERS),
+            default=list(BENCHMARK_SPIDERS),
+            help="Benchmarks to run (default: all)",
+        )
+        parser.add_argument(
+            "--baseline", help="Fail if a rate dropped below this baseline file"
+        )
+        parser.add_argument(
+            "--max-regression",
+            type=float,
+            default=0.3,
+            help="Fraction a rate may drop below the baseline (default: 0.3)",
+        )
+        parser.add_argument(
+            "--save-baseline", help="Write the rates of this run to a baseline file"
+        )
+
+    def handle(self, *args, **options):
+        archive = FixtureArchive.load(options["archive"])
+        self.stdout.write(f"Loaded {len(archive.entries)} recorded responses.")
+
+        # Items go to a throwaway database, never to the catalog
+        old_name = connection.creation.create_test_db(
+            verbosity=0, autoclobber=True, serialize=False
+        )
+        try:
+            with ReplayServer(archive) as server:
+                results = self.run_benchmarks(
+                    archive, server, options["spiders"], options.get("verbosity", 1)
+                )
+                self.stdout.write(
+                    f"Served {server.served} responses, {server.missed} not recorded."
+                )
+        finally:
+            connection.creation.destroy_test_db(old_name, verbosity=0)
+
+        self.stdout.write("Benchmarks:")
+        for result in results:
+            self.stdout.write(f"  {result}")
+
+        if options.get("save_baseline"):
+            save_baseline(results, options["save_baseline"])
+            self.stdout.write(f"Saved baseline to {options['save_baseline']}.")
+        if options.get("baseline"):
+            with open(options["baseline"]) as f:
+                baseline = json.load(f)
+            regressions = find_regressions(results, baseline, options["max_regression"])
+            if regressions:
+                raise CommandError(
+                    "Throughput regressed:\n  " + "\n  ".join(regressions)
+                )
+            self.stdout.write("No regression against the baseline.")
+
+    def run_benchmarks(self, archive, server, names, verbosity):
+        settings = get_project_settings()
+        settings.setdict(BENCHMARK_SETTINGS, priority="cmdline")
+        settings.set("TWISTED_REACTOR", SELECT_REACTOR, priority="cmdline")
+        settings.set("REPLAY_SERVER_URL", server.url, priority="cmdline")
+        if verbosity < 2:
+            settings.set("LOG_FILE", None, priority="cmdline")
+        process = CrawlerProcess(settings)
+        results = []
+
+        @defer.inlineCallbacks
+        def run():
+            with DbWriteCounter() as writes:
+                for name in names:
+                    crawler = process.create_crawler(BENCHMARK_SPIDERS[name])
+                    writes_before = writes.count
+                    started = time.perf_counter()
+                    yield process.crawl(crawler, archive=archive)
+                    results.append(
+                        BenchmarkResult(
+                            name,
+                            seconds=time.perf_counter() - started,
+                            pages=crawler.stats.get_value("response_received_count", 0),
+                            items=crawler.stats.get_value("item_scraped_count", 0),
+                            writes=writes.count - writes_before,
+                        )
+                    )
+
+        def stop(result):
+            from twisted.internet import reactor
+
+            reactor.callWhenRunning(stop_reactor, reactor)
+            return result
+
+        def stop_reactor(reactor):
+            try:
+                reactor.stop()
+            except ReactorNotRunning:
+                pass
+
+        failures = []
+        run().addErrback(failures.append).addBoth(stop)
+        process.start(stop_after_crawl=False)
+        if failures:
+            raise CommandError(f"Benchmark failed: {failures[0].getErrorMessage()}")
+        return results
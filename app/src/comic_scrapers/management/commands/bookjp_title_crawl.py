@@ -8,11 +8,21 @@ from comic_scrapers.spiders.books_jp import BooksJpTitleTwSpider
 class Command(BaseCommand):
     help = "Crawl book titles from books.or.jp to update Japanese comic titles"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
+
     def handle(self, *args, **options):
+        resume = options.get("resume")
         self.stdout.write(
-            "Starting books.or.jp title crawl using existing jp titles..."
+            "Resuming books.or.jp title crawl using existing jp titles..."
+            if resume
+            else "Starting books.or.jp title crawl using existing jp titles..."
         )
         process = CrawlerProcess(get_project_settings())
-        process.crawl(BooksJpTitleTwSpider)
+        process.crawl(BooksJpTitleTwSpider, resume=resume)
         process.start()
         self.stdout.write("books.or.jp title crawl completed.")
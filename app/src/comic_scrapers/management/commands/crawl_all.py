@@ -0,0 +1,62 @@
+from django.core.management.base import BaseCommand, CommandError
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from twisted.internet.error import ReactorNotRunning
+
+from comic_scrapers.crawl_plan import SELECT_REACTOR, STREAMING_STAGES, CrawlPlan
+
+
+class Command(BaseCommand):
+    help = (
+        "Run every crawl in one process: books.com.tw, then eslite.com by ISBN,"
+        " then eslite.com and books.or.jp by title concurrently"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue the Selenium crawls from their checkpoints",
+        )
+        parser.add_argument(
+            "--stream-isbns",
+            action="store_true",
+            help="Map the ISBNs books.com.tw finds while its crawl is still running",
+        )
+
+    def handle(self, *args, **options):
+        settings = get_project_settings()
+        # Every crawler of the process shares the reactor the Selenium spiders need
+        settings.set("TWISTED_REACTOR", SELECT_REACTOR)
+        process = CrawlerProcess(settings)
+        plan = CrawlPlan(
+            process,
+            stages=STREAMING_STAGES if options.get("stream_isbns") else None,
+            resume=options.get("resume"),
+            selenium_sessions=settings.getint("SELENIUM_POOL_SIZE", 1),
+        )
+
+        self.stdout.write("Starting all crawls...")
+        results = []
+
+        def stop(stage_results):
+            from twisted.internet import reactor
+
+            results.extend(stage_results)
+            reactor.callWhenRunning(stop_reactor, reactor)
+
+        def stop_reactor(reactor):
+            try:
+                reactor.stop()
+            except ReactorNotRunning:
+                pass
+
+        plan.run().addCallback(stop)
+        process.start(stop_after_crawl=False)
+
+        self.stdout.write("Crawl stages:")
+        for result in results:
+            self.stdout.write(f"  {result}")
+        if any(result.status != "finished" for result in results):
+            raise CommandError("Not every crawl stage finished.")
+        self.stdout.write("All crawls finished.")
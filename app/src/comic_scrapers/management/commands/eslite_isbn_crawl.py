@@ -8,9 +8,31 @@ from comic_scrapers.spiders.eslite import EsliteISBNSpider
 class Command(BaseCommand):
     help = "Crawl eslite.com for mapping orphan tw volumes"
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
+        parser.add_argument(
+            "--stream",
+            action="store_true",
+            help="Map the ISBNs queued by booktw_crawl as they arrive, until"
+            " none arrived for ISBN_QUEUE_IDLE_TIMEOUT seconds",
+        )
+
     def handle(self, *args, **options):
-        self.stdout.write("Starting eslite.com crawl using isbn...")
+        resume = options.get("resume")
         process = CrawlerProcess(get_project_settings())
-        process.crawl(EsliteISBNSpider)
+        if options.get("stream"):
+            self.stdout.write("Starting eslite.com crawl using queued isbns...")
+            process.crawl(EsliteISBNSpider, mode="stream")
+        else:
+            self.stdout.write(
+                "Resuming eslite.com crawl using isbn..."
+                if resume
+                else "Starting eslite.com crawl using isbn..."
+            )
+            process.crawl(EsliteISBNSpider, resume=resume)
         process.start()
         self.stdout.write("eslite.com crawl finished.")
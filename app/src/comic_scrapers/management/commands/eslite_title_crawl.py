@@ -15,17 +15,29 @@ class Command(BaseCommand):
             help='Series name to crawl (e.g., "排球少年", '
             '"迴天的阿爾帕斯", "藍色時期", etc.)',
         )
+        parser.add_argument(
+            "--resume",
+            action="store_true",
+            help="Continue an interrupted crawl from its checkpoint",
+        )
 
     def handle(self, *args, **options):
         series_name = options.get("series_name")
+        resume = options.get("resume")
         process = CrawlerProcess(get_project_settings())
 
         if series_name:
+            if resume:
+                self.stderr.write("--resume is ignored when crawling a single series")
             self.stdout.write(f"Starting eslite.com crawl for series: {series_name}")
             process.crawl(EsliteTitleTwSpider, topic_list=[series_name])
         else:
-            self.stdout.write("Starting eslite.com crawl using title...")
-            process.crawl(EsliteTitleTwSpider)
+            self.stdout.write(
+                "Resuming eslite.com crawl using title..."
+                if resume
+                else "Starting eslite.com crawl using title..."
+            )
+            process.crawl(EsliteTitleTwSpider, resume=resume)
 
         process.start()
         self.stdout.write("eslite.com crawl finished.")
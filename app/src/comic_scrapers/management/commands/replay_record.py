@@ -0,0 +1,69 @@
+from django.core.management.base import BaseCommand
+from scrapy.crawler import CrawlerProcess
+from scrapy.utils.project import get_project_settings
+from twisted.internet import defer
+from twisted.internet.error import ReactorNotRunning
+
+from comic_scrapers.crawl_plan import SELECT_REACTOR
+from comic_scrapers.spiders.books_jp import BooksJpTitleTwSpider
+from comic_scrapers.spiders.books_tw import BooksTWSpider
+
+# Crawls whose downloads make up the fixture archive, with their arguments
+RECORDED_SPIDERS = {
+    "books_tw": (BooksTWSpider, {}),
+    "booksjp_title": (BooksJpTitleTwSpider, {"detail_mode": "http"}),
+}
+
+
+class Command(BaseCommand):
+    help = (
+        "Crawl the live sites and record every downloaded response into a"
+        " fixture archive for benchmark_spiders"
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            "--archive",
+            required=True,
+            help="Zip file to record into; responses are added to an existing one",
+        )
+        parser.add_argument(
+            "--spiders",
+            nargs="+",
+            choices=list(RECORDED_SPIDERS),
+            default=list(RECORDED_SPIDERS),
+            help="Crawls to record (default: all)",
+        )
+
+    def handle(self, *args, **options):
+        settings = get_project_settings()
+        settings.set("TWISTED_REACTOR", SELECT_REACTOR)
+        settings.set("REPLAY_RECORD_PATH", options["archive"])
+        # Fetch every page, not only those new since the last crawl
+        settings.set("HTTPCACHE_ENABLED", False)
+        settings.set("CRAWL_WATERMARKS_ENABLED", False)
+        settings.set("CRAWL_CHECKPOINT_ENABLED", False)
+        process = CrawlerProcess(settings)
+
+        @defer.inlineCallbacks
+        def record():
+            # One crawl at a time, each adding to the archive of the previous
+            for name in options["spiders"]:
+                spidercls, kwargs = RECORDED_SPIDERS[name]
+                self.stdout.write(f"Recording {name}...")
+                yield process.crawl(spidercls, **kwargs)
+
+        def stop(_):
+            from twisted.internet import reactor
+
+            reactor.callWhenRunning(stop_reactor, reactor)
+
+        def stop_reactor(reactor):
+            try:
+                reactor.stop()
+            except ReactorNotRunning:
+                pass
+
+        record().addBoth(stop)
+        process.start(stop_after_crawl=False)
+        self.stdout.write(f"Recorded responses to {options['archive']}.")
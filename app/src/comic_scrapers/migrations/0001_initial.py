@@ -0,0 +1,39 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:23
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    initial = True
+
+    dependencies = []
+
+    operations = [
+        migrations.CreateModel(
+            name="CrawlWatermark",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=50)),
+                ("topic", models.CharField(max_length=255)),
+                ("last_release_date", models.DateField(blank=True, null=True)),
+                ("seen_keys", models.JSONField(blank=True, default=list)),
+                ("last_crawled_at", models.DateTimeField(blank=True, null=True)),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                "constraints": [
+                    models.UniqueConstraint(
+                        fields=("source", "topic"), name="unique_crawl_watermark"
+                    )
+                ],
+            },
+        ),
+    ]
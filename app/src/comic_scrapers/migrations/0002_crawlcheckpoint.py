@@ -0,0 +1,31 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:33
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic_scrapers", "0001_initial"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="CrawlCheckpoint",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("source", models.CharField(max_length=50, unique=True)),
+                ("completed_topics", models.JSONField(blank=True, default=list)),
+                ("pages", models.JSONField(blank=True, default=dict)),
+                ("started_at", models.DateTimeField()),
+                ("updated_at", models.DateTimeField(auto_now=True)),
+            ],
+        ),
+    ]
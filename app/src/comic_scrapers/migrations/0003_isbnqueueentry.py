@@ -0,0 +1,30 @@
+# Generated by Django 5.2.8 on 2026-10-17 00:42
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+    dependencies = [
+        ("comic_scrapers", "0002_crawlcheckpoint"),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name="IsbnQueueEntry",
+            fields=[
+                (
+                    "id",
+                    models.BigAutoField(
+                        auto_created=True,
+                        primary_key=True,
+                        serialize=False,
+                        verbose_name="ID",
+                    ),
+                ),
+                ("isbn", models.CharField(max_length=13, unique=True)),
+                ("enqueued_at", models.DateTimeField(auto_now_add=True, db_index=True)),
+                ("claimed_at", models.DateTimeField(blank=True, null=True)),
+                ("attempts", models.PositiveSmallIntegerField(default=0)),
+            ],
+        ),
+    ]
@@ -0,0 +1,86 @@
+from django.db import models
+
+
+class CrawlWatermark(models.Model):
+    """Incremental crawl state of one topic of one crawl source.
+
+    A source is a spider name and a topic is what the spider searched for
+    (a series title, an ISBN or a listing URL). Spiders skip search results
+    that are not newer than `last_release_date` or whose key is in
+    `seen_keys`, and stop paginating once a whole page is known.
+
+    Attributes:
+        source (str): Name of the spider the state belongs to.
+        topic (str): Topic item of the spider's `topic_list`.
+        last_release_date (date): Newest release date seen for the topic.
+        seen_keys (list): Most recently seen result keys, newest last. The key
+            is the last path segment of the detail URL, i.e. the ISBN on
+            books.or.jp and the product ID on books.com.tw and eslite.com.
+        last_crawled_at (datetime): End of the last crawl that finished with
+            the topic processed.
+    """
+
+    source = models.CharField(max_length=50)
+    topic = models.CharField(max_length=255)
+    last_release_date = models.DateField(null=True, blank=True)
+    seen_keys = models.JSONField(default=list, blank=True)
+    last_crawled_at = models.DateTimeField(null=True, blank=True)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        constraints = [
+            models.UniqueConstraint(
+                fields=["source", "topic"], name="unique_crawl_watermark"
+            )
+        ]
+
+    def __str__(self):
+        return f"{self.source}: {self.topic}"
+
+
+class CrawlCheckpoint(models.Model):
+    """Progress of an unfinished crawl of one crawl source.
+
+    Written while a Selenium spider crawls its topic list, kept when the
+    crawl ends with topics left, and deleted once every topic is done.
+
+    Attributes:
+        source (str): Name of the spider the progress belongs to.
+        completed_topics (list): Topic items whose results were all stored.
+        pages (dict): Number of leading result pages stored per topic item,
+            for the topics that are not completed.
+        started_at (datetime): Start of the crawl, kept across resumes.
+    """
+
+    source = models.CharField(max_length=50, unique=True)
+    completed_topics = models.JSONField(default=list, blank=True)
+    pages = models.JSONField(default=dict, blank=True)
+    started_at = models.DateTimeField()
+    updated_at = models.DateTimeField(auto_now=True)
+
+    def __str__(self):
+        return f"{self.source}: {len(self.completed_topics)} topics done"
+
+
+class IsbnQueueEntry(models.Model):
+    """ISBN of an orphan TW volume waiting to be mapped on eslite.com.
+
+    Added by the pipeline when `books_tw` creates an orphan volume and
+    deleted once `eslite_isbn` processed the ISBN.
+
+    Attributes:
+        isbn (str): ISBN of the orphan volume.
+        enqueued_at (datetime): When the volume was found.
+        claimed_at (datetime): When a crawl took the ISBN, None while it waits.
+            A claim older than the queue's lease expires, so the ISBNs of a
+            crawl that died are taken again.
+        attempts (int): Number of times the ISBN was claimed.
+    """
+
+    isbn = models.CharField(max_length=13, unique=True)
+    enqueued_at = models.DateTimeField(auto_now_add=True, db_index=True)
+    claimed_at = models.DateTimeField(null=True, blank=True)
+    attempts = models.PositiveSmallIntegerField(default=0)
+
+    def __str__(self):
+        return self.isbn
@@ -0,0 +1,225 @@
+"""Measure the speed, allocations and correctness of the title and date parsers."""
+
+import json
+import random
+import timeit
+import tracemalloc
+from pathlib import Path
+
+from comic_scrapers.pipelines import ComicScrapersPipeline
+from comic_scrapers.spiders.books_jp import BooksJpSpider
+from comic_scrapers.spiders.eslite import EsliteSpider
+
+# Recorded titles and descriptions, with what each parser returns for them
+CORPUS_PATH = Path(__file__).with_name("parser_corpus.json")
+
+FULL_WIDTH_DIGITS = str.maketrans("0123456789", "０１２３４５６７８９")
+
+# Parsers run for every scraped item, by benchmark name, with their corpus
+PARSER_BENCHMARKS = {
+    "title_tw": "title_tw",
+    "title_jp": "title_jp",
+    "release_date_jp": "release_date",
+    "release_date_books_jp": "release_date",
+    "release_date_eslite": "release_date",
+}
+
+
+def load_corpus(path=CORPUS_PATH):
+    """Read the recorded corpus.
+
+    Returns:
+        dict: Cases by corpus name. A case holds the `args` of a parser call
+            and either the `expected` return value, with tuples as lists, or
+            the name of the `error` it raises.
+    """
+    with open(path, encoding="utf-8") as f:
+        return json.load(f)
+
+
+def get_parsers():
+    """Return the parser of every benchmark, bound to a fresh instance."""
+    pipeline = ComicScrapersPipeline()
+    return {
+        "title_tw": pipeline._get_book_title_tw,
+        "title_jp": pipeline._get_book_title_jp,
+        "release_date_jp": pipeline._get_book_release_date_jp,
+        "release_date_books_jp": BooksJpSpider()._get_book_release_date,
+        "release_date_eslite": EsliteSpider()._get_book_release_date,
+    }
+
+
+def _digits(number, rng):
+    # A quarter of the numbers in full-width digits, as some listings have them
+    text = str(number)
+    return text.translate(FULL_WIDTH_DIGITS) if rng.random() < 0.25 else text
+
+
+def _synthetic_title_tw(rng, corpus):
+    series = rng.choice(
+        [case["expected"][0] for case in corpus["title_tw"] if "expected" in case]
+    )
+    volume = _digits(rng.randint(1, 120), rng)
+    suffix = rng.choice(
+        ["", "", "", " (首刷限定版)", " (特裝版)", " (完)", " (限定版)"]
+    )
+    return [f"{series} {volume}{suffix}"]
+
+
+def _synthetic_title_jp(rng, corpus):
+    series = rng.choice([case["args"][1] for case in corpus["title_jp"]])
+    volume = _digits(rng.randint(1, 120), rng)
+    number = rng.choice(["（{}）", "({})", " {}", "　{}"]).format(volume)
+    variant = rng.choice(["", "", "", "特装版", " 限定版", "実写映画化記念特装版"])
+    return [f"{series}{number}{variant}", series]
+
+
+def _synthetic_release_date(rng, corpus):
+    prefix = rng.choice(["発売日：", "発売予定日：", "出版日期：", ""])
+    month, day = rng.randint(1, 12), rng.randint(1, 28)
+    if rng.random() < 0.5:
+        month, day = f"{month:02d}", f"{day:02d}"
+    date = f"{rng.randint(1990, 2030)}年{month}月{day}日"
+    if rng.random() < 0.1:
+        date = date.translate(FULL_WIDTH_DIGITS)
+    return [prefix + date + rng.choice(["", "\n", "\n判型：B6"])]
+
+
+SYNTHETIC_GENERATORS = {
+    "title_tw": _synthetic_title_tw,
+    "title_jp": _synthetic_title_jp,
+    "release_date": _synthetic_release_date,
+}
+
+
+def synthetic_cases(corpus, name, count, seed=0):
+    """Generate parser arguments in the shape of the recorded ones.
+
+    Titles combine the recorded series names with random volume numbers,
+    partly in full-width digits, and edition suffixes; descriptions hold a
+    random date in the formats the sites use. Unlike recorded cases they
+    have no expected value and only add volume to the timings.
+
+    Args:
+        corpus (dict): The recorded corpus.
+        name (str): Corpus to generate cases for.
+        count (int): Number of cases.
+        seed (int): Seed of the generator, so that runs are comparable.
+
+    Returns:
+        list: Cases with only `args`.
+    """
+    rng = random.Random(f"{name}:{seed}")
+    generate = SYNTHETIC_GENERATORS[name]
+    return [{"args": generate(rng, corpus)} for _ in range(count)]
+
+
+def _call(parser, args):
+    try:
+        return parser(*args), None
+    except Exception as e:
+        return None, type(e).__name__
+
+
+def check_corpus(parser, cases):
+    """Run a parser on recorded cases.
+
+    Returns:
+        list: A message for every case whose result differs from the record.
+    """
+    mismatches = []
+    for case in cases:
+        result, error = _call(parser, case["args"])
+        if isinstance(result, tuple):
+            result = list(result)
+        if error != case.get("error") or result != case.get("expected"):
+            actual = error or json.dumps(result, ensure_ascii=False)
+            recorded = case.get("error") or json.dumps(
+                case.get("expected"), ensure_ascii=False
+            )
+            mismatches.append(f"{case['args']!r}: {actual}, recorded {recorded}")
+    return mismatches
+
+
+def time_parser(parser, cases, repeat=5):
+    """Return the calls per second of `parser` over `cases`, best of `repeat`.
+
+    Each timing runs the whole list often enough to take at least 0.2s.
+    Calls that raise are counted like the others.
+    """
+    calls = [case["args"] for case in cases]
+
+    def run():
+        for args in calls:
+            _call(parser, args)
+
+    timer = timeit.Timer(run)
+    loops, _ = timer.autorange()
+    best = min(timer.repeat(repeat=repeat, number=loops))
+    return loops * len(calls) / best if best > 0 else 0.0
+
+
+def measure_allocations(parser, cases):
+    """Return the average peak of memory allocated during one call, in bytes.
+
+    The parser runs once over `cases` before, so that compiled regular
+    expressions and other caches do not count.
+    """
+    calls = [case["args"] for case in cases]
+    for args in calls:
+        _call(parser, args)
+    total = 0
+    tracemalloc.start()
+    try:
+        for args in calls:
+            tracemalloc.reset_peak()
+            before = tracemalloc.get_traced_memory()[0]
+            _call(parser, args)
+            total += tracemalloc.get_traced_memory()[1] - before
+    finally:
+        tracemalloc.stop()
+    return total / len(calls) if calls else 0.0
+
+
+class ParserResult:
+    """Speed and allocations of one parser.
+
+    Attributes:
+        name (str): Name of the benchmark.
+        calls (int): Cases the parser was run on.
+        errors (int): Cases on which it raised.
+        ops_per_sec (float): Calls per second.
+        alloc_bytes (float): Average peak memory allocated by a call.
+    """
+
+    RATES = ("ops_per_sec", "alloc_bytes")
+    # Rates for which a higher value is the regression
+    LOWER_IS_BETTER = ("alloc_bytes",)
+
+    def __init__(self, name, calls=0, errors=0, ops_per_sec=0.0, alloc_bytes=0.0):
+        self.name = name
+        self.calls = calls
+        self.errors = errors
+        self.ops_per_sec = ops_per_sec
+        self.alloc_bytes = alloc_bytes
+
+    def rates(self):
+        """Return the rates by name, rounded for a baseline file."""
+        return {rate: round(getattr(self, rate), 2) for rate in self.RATES}
+
+    def __str__(self):
+        return (
+            f"{self.name:<22} {self.calls:>7} calls {self.errors:>6} errors"
+            f" {self.ops_per_sec:>12,.0f} ops/s {self.alloc_bytes:>8.0f} B/call"
+        )
+
+
+def run_parser_benchmark(name, parser, cases, repeat=5):
+    """Time `parser` and measure its allocations over `cases`."""
+    return ParserResult(
+        name,
+        calls=len(cases),
+        errors=sum(_call(parser, case["args"])[1] is not None for case in cases),
+        ops_per_sec=time_parser(parser, cases, repeat=repeat),
+        alloc_bytes=measure_allocations(parser, cases),
+    )
@@ -1,13 +1,30 @@
+import copy
 import re
 from datetime import datetime
 
+from comic.cache import bump_catalog_version, bump_catalog_version_on_commit
 from comic.models import Publisher, Series, Volume
-from django.db import IntegrityError
+from django.db import IntegrityError, transaction
+from django.utils import timezone
 from itemadapter import ItemAdapter
 from scrapy.exceptions import DropItem
+from twisted.internet import defer, task
 from twisted.internet.threads import deferToThread
+from twisted.python.failure import Failure
 
+from comic_scrapers.isbn_queue import IsbnQueue
 from comic_scrapers.items import JpComicItem, OrphanMapItem, OrphanVolumeItem
+from comic_scrapers.lookup_cache import LookupCache
+
+
+class ItemWriteError(Exception):
+    """An item could not be parsed or written to the database.
+
+    Unlike `DropItem`, which leaves out incomplete, filtered and duplicate
+    items on purpose, it reaches the spider as the `item_error` signal, so watermarks
+    and checkpoints do not count the item as processed and a later crawl
+    tries it again.
+    """
 
 
 class ComicScrapersPipeline:
@@ -17,10 +34,81 @@ class ComicScrapersPipeline:
     routing them to appropriate processing methods based on their type.
     It uses `deferToThread` to offload database operations to a separate thread,
     preventing blocking of the Scrapy reactor.
+
+    When `PIPELINE_BATCH_SIZE` is greater than 1, items are buffered and written
+    in batches, each inside a single transaction using bulk queries. A batch is
+    flushed when it fills up, every `PIPELINE_FLUSH_INTERVAL` seconds and when
+    the spider closes. If a bulk write fails, the batch is rolled back and its
+    items are written one by one, so every item is still kept or dropped on its
+    own with the usual logging.
+
+    Publisher IDs and Series rows are kept in bounded in-process caches, warmed
+    in `open_spider`, so that the publishers and series seen over and over in
+    a crawl are not looked up again for every volume. The hit rates are
+    reported in the crawl stats.
+
+    When `ISBN_QUEUE_ENABLED` is on, the ISBNs of new orphan volumes are added
+    to the ISBN queue, from which `eslite_isbn` in stream mode maps them while
+    `books_tw` is still running.
     """
 
+    def __init__(
+        self,
+        batch_size=0,
+        flush_interval=5.0,
+        lookup_cache_size=10000,
+        stats=None,
+        queue_isbns=False,
+    ):
+        self.batch_size = batch_size
+        self.queue_isbns = queue_isbns
+        self.flush_interval = flush_interval
+        self._pending = []
+        self._flush_lock = defer.DeferredLock()
+        self._flush_loop = None
+        # (name, region) -> Publisher ID
+        self.publisher_ids = LookupCache(lookup_cache_size)
+        # title_jp -> Series, with latest volumes loaded
+        self.series_cache = LookupCache(lookup_cache_size)
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        """See base class."""
+        return cls(
+            batch_size=crawler.settings.getint("PIPELINE_BATCH_SIZE", 0),
+            flush_interval=crawler.settings.getfloat("PIPELINE_FLUSH_INTERVAL", 5.0),
+            lookup_cache_size=crawler.settings.getint(
+                "PIPELINE_LOOKUP_CACHE_SIZE", 10000
+            ),
+            stats=crawler.stats,
+            queue_isbns=crawler.settings.getbool("ISBN_QUEUE_ENABLED", False),
+        )
+
+    @property
+    def batching(self):
+        return self.batch_size > 1
+
+    def open_spider(self, spider):
+        """See base class."""
+        if self.batching:
+            # Items wait in the buffer until flushed, so a timer is required
+            # for the spider to become idle when the last batch is not full.
+            self._flush_loop = task.LoopingCall(self._flush, spider)
+            self._flush_loop.start(self.flush_interval, now=False)
+        return deferToThread(self._warm_lookup_caches, spider)
+
     def process_item(self, item, spider):
         """See base class."""
+        if self.batching and isinstance(
+            item, (OrphanVolumeItem, OrphanMapItem, JpComicItem)
+        ):
+            d = defer.Deferred()
+            self._pending.append((item, d))
+            if len(self._pending) >= self.batch_size:
+                self._flush(spider)
+            return d
+
         # Process data from books.com.tw
         if isinstance(item, OrphanVolumeItem):
             return deferToThread(self._process_orphan_volume_item, item, spider)
@@ -34,6 +122,538 @@ class ComicScrapersPipeline:
             return deferToThread(self._process_jp_comic_item, item, spider)
         return item
 
+    def close_spider(self, spider):
+        """See base class."""
+        if self._flush_loop is not None and self._flush_loop.running:
+            self._flush_loop.stop()
+
+        d = self._flush(spider)
+        # Model signals already invalidate the API cache on every write,
+        # bump once more so writes bypassing signals are never served stale.
+        d.addBoth(lambda _: bump_catalog_version())
+        d.addCallback(lambda _: self._record_lookup_stats())
+        return d
+
+    def _warm_lookup_caches(self, spider):
+        """Load publishers and the most recently updated series, one query each.
+
+        Args:
+            spider: The spider being opened.
+        """
+        publishers = Publisher.objects.values_list("name", "region", "pk")
+        for name, region, pk in publishers[: self.publisher_ids.maxsize]:
+            self.publisher_ids.set((name, region), pk)
+
+        series_list = Series.objects.select_related(
+            "latest_volume_jp", "latest_volume_tw"
+        ).order_by("-updated_at")
+        # Oldest first, so the most recently updated series are evicted last
+        for series in reversed(series_list[: self.series_cache.maxsize]):
+            self.series_cache.set(series.title_jp, series)
+
+        spider.logger.info(
+            f"Warmed lookup caches with {len(self.publisher_ids)} publishers "
+            f"and {len(self.series_cache)} series"
+        )
+
+    def _record_lookup_stats(self):
+        if self.stats is None:
+            return
+        for name, cache in (
+            ("publisher", self.publisher_ids),
+            ("series", self.series_cache),
+        ):
+            prefix = f"pipeline/lookup_cache/{name}"
+            self.stats.set_value(f"{prefix}/hits", cache.hits)
+            self.stats.set_value(f"{prefix}/misses", cache.misses)
+            self.stats.set_value(f"{prefix}/hit_rate", round(cache.hit_rate, 4))
+
+    def _get_publisher(self, name, region, spider):
+        """Get or create a Publisher, using the lookup cache first.
+
+        Args:
+            name (str): The publisher name.
+            region (str): The publisher region, either "JP" or "TW".
+            spider: The spider which scraped the item.
+
+        Returns:
+            Publisher: The publisher. On a cache hit only its ID, name and region
+            are set, which is all the pipeline needs.
+        """
+        pk = self.publisher_ids.get((name, region))
+        if pk is not None:
+            publisher = Publisher(pk=pk, name=name, region=region)
+            spider.logger.debug(f"Found existing Publisher: {publisher}")
+            return publisher
+
+        publisher, created_pub = Publisher.objects.get_or_create(
+            name=name, region=region
+        )
+        if created_pub:
+            spider.logger.info(f"Created new Publisher: {publisher}")
+        else:
+            spider.logger.debug(f"Found existing Publisher: {publisher}")
+        self._remember_publishers([publisher])
+        return publisher
+
+    def _remember_publishers(self, publishers):
+        # Only cache rows that are committed, a rolled back batch must not leak
+        def remember():
+            for publisher in publishers:
+                self.publisher_ids.set((publisher.name, publisher.region), publisher.pk)
+
+        transaction.on_commit(remember)
+
+    def _get_series(self, title_jp):
+        """Get or create a Series, using the lookup cache first.
+
+        Args:
+            title_jp (str): The Japanese title of the series.
+
+        Returns:
+            tuple: The series and whether it was created. Cached series are
+            copied, so callers can modify and save them freely.
+        """
+        series = self.series_cache.get(title_jp)
+        if series is not None:
+            return copy.copy(series), False
+        return Series.objects.get_or_create(title_jp=title_jp)
+
+    def _remember_series(self, *series_list):
+        series_list = [copy.copy(series) for series in series_list]
+
+        def remember():
+            for series in series_list:
+                self.series_cache.set(series.title_jp, series)
+
+        transaction.on_commit(remember)
+
+    def _flush(self, spider):
+        """Write buffered items, one batch at a time.
+
+        Args:
+            spider: The spider which scraped the items.
+
+        Returns:
+            Deferred: Fires once every item buffered so far has been written.
+        """
+        return self._flush_lock.run(self._flush_pending, spider)
+
+    def _flush_pending(self, spider):
+        if not self._pending:
+            return None
+        batch, self._pending = self._pending, []
+
+        d = deferToThread(self._write_batch, [item for item, _ in batch], spider)
+        d.addCallbacks(
+            self._fire_batch_results,
+            self._fail_batch,
+            callbackArgs=(batch,),
+            errbackArgs=(batch, spider),
+        )
+        return d
+
+    def _fire_batch_results(self, results, batch):
+        for (_, d), result in zip(batch, results):
+            if isinstance(result, Exception):
+                d.errback(Failure(result))
+            else:
+                d.callback(result)
+
+    def _fail_batch(self, failure, batch, spider):
+        spider.logger.error(
+            f"Failed to write batch of {len(batch)} items, error: "
+            f"{failure.getErrorMessage()}"
+        )
+        for _, d in batch:
+            d.errback(Failure(ItemWriteError(f"Batch write failed: {failure.value}")))
+
+    def _write_batch(self, items, spider):
+        """Write a batch of items in one transaction.
+
+        Runs in a worker thread. Items that fail validation, and every item of
+        a batch whose bulk write fails, are replayed through the per-item
+        methods so that they are dropped or stored exactly as in per-item mode.
+
+        Args:
+            items (list): Scraped items of any supported type.
+            spider: The spider which scraped the items.
+
+        Returns:
+            list: For each item, either the item itself or the `DropItem` or
+            `ItemWriteError` raised while processing it.
+        """
+        results = [None] * len(items)
+        records = {OrphanVolumeItem: [], JpComicItem: [], OrphanMapItem: []}
+        for index, item in enumerate(items):
+            try:
+                record = self._prepare_item(item, spider)
+            except Exception:
+                results[index] = self._process_one(item, spider)
+                continue
+            records[type(item)].append((index, record))
+
+        written = [index for group in records.values() for index, _ in group]
+        if not written:
+            return results
+
+        try:
+            with transaction.atomic():
+                self._bulk_write_orphan_volumes(records[OrphanVolumeItem], spider)
+                dropped = self._bulk_write_jp_comics(records[JpComicItem], spider)
+                self._bulk_write_orphan_maps(records[OrphanMapItem], spider)
+                # Bulk queries do not send model signals
+                bump_catalog_version_on_commit()
+        except Exception as e:
+            spider.logger.warning(
+                f"Bulk write of {len(written)} items failed, "
+                f"retrying one by one, error: {str(e)}"
+            )
+            for index in written:
+                results[index] = self._process_one(items[index], spider)
+            return results
+
+        spider.logger.info(f"Wrote batch of {len(written)} items")
+        for index in written:
+            results[index] = dropped.get(index, items[index])
+        return results
+
+    def _prepare_item(self, item, spider):
+        if isinstance(item, OrphanVolumeItem):
+            return self._prepare_orphan_volume_item(item, spider)
+        elif isinstance(item, OrphanMapItem):
+            return self._prepare_orphan_map_item(item, spider)
+        return self._prepare_jp_comic_item(item, spider)
+
+    def _process_one(self, item, spider):
+        try:
+            if isinstance(item, OrphanVolumeItem):
+                return self._process_orphan_volume_item(item, spider)
+            elif isinstance(item, OrphanMapItem):
+                return self._process_orphan_map_item(item, spider)
+            return self._process_jp_comic_item(item, spider)
+        except (DropItem, ItemWriteError) as e:
+            return e
+
+    def _get_publishers(self, names, region, spider):
+        """Get or create Publisher entries by name in bulk.
+
+        Args:
+            names (list): Publisher names, duplicates allowed.
+            region (str): Region of the publishers, either "JP" or "TW".
+            spider: The spider which scraped the items.
+
+        Returns:
+            dict: Publisher instances keyed by name.
+
+        Raises:
+            IntegrityError: If a publisher already exists in another region.
+        """
+        publishers = {}
+        for name in dict.fromkeys(names):
+            pk = self.publisher_ids.get((name, region))
+            if pk is not None:
+                publishers[name] = Publisher(pk=pk, name=name, region=region)
+        missing = [name for name in dict.fromkeys(names) if name not in publishers]
+        if not missing:
+            return publishers
+
+        found = Publisher.objects.in_bulk(missing, field_name="name")
+        for name, publisher in found.items():
+            if publisher.region != region:
+                raise IntegrityError(
+                    f"Publisher {name} already exists in region {publisher.region}"
+                )
+            spider.logger.debug(f"Found existing Publisher: {publisher}")
+
+        created = Publisher.objects.bulk_create(
+            [
+                Publisher(name=name, region=region)
+                for name in missing
+                if name not in found
+            ]
+        )
+        for publisher in created:
+            spider.logger.info(f"Created new Publisher: {publisher}")
+        self._remember_publishers([*found.values(), *created])
+        publishers.update(found)
+        publishers.update((publisher.name, publisher) for publisher in created)
+        return publishers
+
+    def _bulk_write_orphan_volumes(self, records, spider):
+        """Bulk version of `_process_orphan_volume_item`.
+
+        Args:
+            records (list): (index, isbn_tw) pairs from
+                `_prepare_orphan_volume_item`.
+            spider: The BooksTWSpider spider which scraped the items.
+        """
+        if not records:
+            return
+
+        isbns = [isbn_tw for _, isbn_tw in records]
+        existing = set(
+            Volume.objects.filter(isbn__in=isbns).values_list("isbn", flat=True)
+        )
+        new_volumes = {}
+        for isbn_tw in isbns:
+            if isbn_tw in existing or isbn_tw in new_volumes:
+                spider.logger.warning(
+                    f"Found existing Volume with ISBN {isbn_tw}, skipping"
+                )
+            else:
+                new_volumes[isbn_tw] = Volume(isbn=isbn_tw, region="TW", variant="")
+                spider.logger.info(f"Created Orphan Volume with ISBN {isbn_tw}")
+        # A volume inserted by another process since the lookup is kept as is
+        Volume.objects.bulk_create(
+            new_volumes.values(),
+            update_conflicts=True,
+            unique_fields=["isbn"],
+            update_fields=["updated_at"],
+        )
+        if self.queue_isbns:
+            IsbnQueue.enqueue(new_volumes)
+
+    def _bulk_write_jp_comics(self, records, spider):
+        """Bulk version of `_process_jp_comic_item`.
+
+        Series are upserted on `title_jp`. Volumes are written as in per-item
+        mode: one whose ISBN already exists is skipped, and one listed under a
+        new ISBN with the series, volume number and variant of a stored or
+        earlier volume is dropped as a duplicate, leaving the stored row as it
+        is. Only a volume inserted concurrently by another process aborts the
+        batch, which is then written item by item.
+
+        Args:
+            records (list): (index, record) pairs from `_prepare_jp_comic_item`.
+            spider: The JpComicSpider spider which scraped the items.
+
+        Returns:
+            dict: The `DropItem` of each dropped duplicate, by item index.
+        """
+        if not records:
+            return {}
+        indexes = [index for index, _ in records]
+        records = [record for _, record in records]
+
+        publishers = self._get_publishers(
+            [record["publisher_jp"] for record in records], "JP", spider
+        )
+
+        # Later items win, as they would when saved one after another
+        authors = {record["series_name_jp"]: record["author_jp"] for record in records}
+        series_by_title = self._get_cached_series(authors)
+        missing = [title for title in authors if title not in series_by_title]
+        existing_titles = set(
+            Series.objects.filter(title_jp__in=missing).values_list(
+                "title_jp", flat=True
+            )
+        )
+        Series.objects.bulk_create(
+            [
+                Series(title_jp=title, author_jp=author)
+                for title, author in authors.items()
+            ],
+            update_conflicts=True,
+            unique_fields=["title_jp"],
+            update_fields=["author_jp", "updated_at"],
+        )
+        series_by_title.update(self._query_series(missing))
+        for title, author in authors.items():
+            series = series_by_title[title]
+            series.author_jp = author
+            if title in missing and title not in existing_titles:
+                spider.logger.info(f"Created new Series: {series}")
+            else:
+                spider.logger.debug(f"Found existing Series: {series}")
+
+        volumes = Volume.objects.in_bulk(
+            [record["isbn_jp"] for record in records], field_name="isbn"
+        )
+        existing_keys = set(
+            Volume.objects.filter(
+                series__in={series.pk for series in series_by_title.values()},
+                region="JP",
+                volume_number__in={record["volume_number"] for record in records},
+            ).values_list("series_id", "volume_number", "variant")
+        )
+        new_volumes = {}
+        changed_series = {}
+        dropped = {}
+        for index, record in zip(indexes, records):
+            series = series_by_title[record["series_name_jp"]]
+            isbn_jp = record["isbn_jp"]
+            key = (series.pk, record["volume_number"], record["variant"] or "")
+            volume = volumes.get(isbn_jp)
+            if volume is None and key[1] is not None and (
+                key in existing_keys or key in new_volumes
+            ):
+                # The unique_volume_variant constraint rejects it in per-item mode
+                spider.logger.warning(
+                    f"Duplicate data for {record['series_name_jp']}: volume"
+                    f" {key[1]} {key[2]} already has another ISBN than {isbn_jp}"
+                )
+                dropped[index] = DropItem(f"Duplicate Volume: {isbn_jp}")
+                continue
+            elif volume is None:
+                volume = Volume(
+                    isbn=isbn_jp,
+                    series=series,
+                    publisher=publishers[record["publisher_jp"]],
+                    region="JP",
+                    volume_number=record["volume_number"],
+                    variant=record["variant"] or "",
+                    release_date=record["release_date_jp_obj"],
+                )
+                volumes[isbn_jp] = volume
+                new_volumes[key if key[1] is not None else isbn_jp] = volume
+                spider.logger.info(f"Created Volume: {volume}")
+            else:
+                spider.logger.warning(
+                    f"Found existing Volume with ISBN {isbn_jp}, skipping"
+                )
+
+            release_date_jp_obj = record["release_date_jp_obj"]
+            if series.latest_volume_jp is None or (
+                release_date_jp_obj
+                and (
+                    series.latest_volume_jp.release_date is None
+                    or release_date_jp_obj > series.latest_volume_jp.release_date
+                )
+            ):
+                series.latest_volume_jp = volume
+                changed_series[series.pk] = series
+                spider.logger.info(f"Updated Series latest_volume_jp: {series}")
+
+        new_volumes = list(new_volumes.values())
+        Volume.objects.bulk_create(new_volumes)
+        self._bulk_update_series(changed_series.values(), ["latest_volume_jp"])
+        Series.objects.filter(
+            pk__in={volume.series_id for volume in new_volumes}
+        ).refresh_summary()
+        self._remember_series(*series_by_title.values())
+        return dropped
+
+    def _bulk_write_orphan_maps(self, records, spider):
+        """Bulk version of `_process_orphan_map_item`.
+
+        Args:
+            records (list): (index, record) pairs from `_prepare_orphan_map_item`.
+            spider: The EsliteSpider-based spider which scraped the items.
+        """
+        if not records:
+            return
+        records = [record for _, record in records]
+
+        publishers = self._get_publishers(
+            [record["publisher_tw"] for record in records], "TW", spider
+        )
+
+        titles = list(dict.fromkeys(record["title_jp"] for record in records))
+        series_by_title = self._get_cached_series(titles)
+        series_by_title.update(
+            self._query_series(
+                [title for title in titles if title not in series_by_title]
+            )
+        )
+        for series in series_by_title.values():
+            spider.logger.debug(f"Found existing Series: {series}")
+        created = Series.objects.bulk_create(
+            [Series(title_jp=title) for title in titles if title not in series_by_title]
+        )
+        for series in created:
+            series_by_title[series.title_jp] = series
+            spider.logger.info(f"Created new Series: {series}")
+
+        volumes = Volume.objects.in_bulk(
+            [record["isbn_tw"] for record in records], field_name="isbn"
+        )
+        changed_volumes = {}
+        changed_series = {}
+        for record in records:
+            series = series_by_title[record["title_jp"]]
+            # Update Series fields
+            series.title_tw = record["series_name_tw"]
+            series.author_tw = record["author_tw"]
+
+            volume = volumes.get(record["isbn_tw"])
+            if volume:
+                volume.series = series
+                volume.publisher = publishers[record["publisher_tw"]]
+                volume.region = "TW"
+                volume.volume_number = record["volume_number"]
+                volume.variant = record["variant"] or ""
+                volume.release_date = record["release_date_tw_obj"]
+                changed_volumes[volume.pk] = volume
+                spider.logger.info(f"Updated Volume: {volume}")
+            else:
+                spider.logger.warning(
+                    f"Volume with ISBN {record['isbn_tw']} not found to update."
+                )
+
+            release_date_tw_obj = record["release_date_tw_obj"]
+            if (
+                record["is_final_volume"]
+                or series.latest_volume_tw is None
+                or (
+                    release_date_tw_obj
+                    and (
+                        series.latest_volume_tw.release_date is None
+                        or release_date_tw_obj > series.latest_volume_tw.release_date
+                    )
+                )
+            ):
+                series.latest_volume_tw = volume
+                changed_series[series.pk] = series
+                spider.logger.info(f"Updated Series latest_volume_tw: {series}")
+
+        now = timezone.now()
+        for volume in changed_volumes.values():
+            volume.updated_at = now
+        Volume.objects.bulk_update(
+            changed_volumes.values(),
+            [
+                "series",
+                "publisher",
+                "region",
+                "volume_number",
+                "variant",
+                "release_date",
+                "updated_at",
+            ],
+        )
+        self._bulk_update_series(
+            changed_series.values(), ["title_tw", "author_tw", "latest_volume_tw"]
+        )
+        Series.objects.filter(
+            pk__in={volume.series_id for volume in changed_volumes.values()}
+        ).refresh_summary()
+        self._remember_series(*series_by_title.values())
+
+    def _get_cached_series(self, titles):
+        series_by_title = {}
+        for title in titles:
+            series = self.series_cache.get(title)
+            if series is not None:
+                series_by_title[title] = copy.copy(series)
+        return series_by_title
+
+    def _query_series(self, titles):
+        if not titles:
+            return {}
+        return {
+            series.title_jp: series
+            for series in Series.objects.filter(title_jp__in=titles).select_related(
+                "latest_volume_jp", "latest_volume_tw"
+            )
+        }
+
+    def _bulk_update_series(self, series_list, fields):
+        now = timezone.now()
+        for series in series_list:
+            series.updated_at = now
+        Series.objects.bulk_update(series_list, [*fields, "updated_at"])
+
     def _process_orphan_volume_item(self, item: OrphanVolumeItem, spider):
         """Process OrphanVolumeItem by ISBN to create new Volume entry in the database
 
@@ -45,22 +665,15 @@ class ComicScrapersPipeline:
             OrphanVolumeItem: The processed item.
 
         Raises:
-            DropItem: If processing fails due to missing data or database errors,
-            including:
-                - IntegrityError: If duplicate data is encountered in the database.
-                - Exception: If any other error occurs during processing.
+            DropItem: If the item misses data or duplicates data already in
+                the database (IntegrityError).
+            ItemWriteError: If any other error occurs during processing.
         """
         adapter = ItemAdapter(item)
         isbn_tw = adapter.get("isbn_tw")
 
         try:
-            spider.logger.info(f"Processing Orphan Volume with ISBN {isbn_tw}")
-
-            # Protect against missing ISBN
-            if not isbn_tw:
-                raise DropItem(
-                    f"No isbn_tw in OrphanVolumeItem: \n{adapter.items()}\n{'-' * 50}"
-                )
+            isbn_tw = self._prepare_orphan_volume_item(item, spider)
 
             # Create Volume entry in Volume Table
             obj, created = Volume.objects.get_or_create(
@@ -72,6 +685,8 @@ class ComicScrapersPipeline:
             )
             if created:
                 spider.logger.info(f"Created Orphan Volume with ISBN {isbn_tw}")
+                if self.queue_isbns:
+                    IsbnQueue.enqueue([isbn_tw])
             else:
                 spider.logger.warning(
                     f"Found existing Volume with ISBN {isbn_tw}, skipping"
@@ -89,7 +704,31 @@ class ComicScrapersPipeline:
                 f"Failed to process Orphan Volume with ISBN {isbn_tw}, error: {str(e)}",
                 exc_info=True,
             )
-            raise DropItem(f"Processing failed for Orphan Volume: {str(e)}")
+            raise ItemWriteError(f"Processing failed for Orphan Volume: {str(e)}")
+
+    def _prepare_orphan_volume_item(self, item: OrphanVolumeItem, spider):
+        """Validate OrphanVolumeItem before it is written to the database.
+
+        Args:
+            item (OrphanVolumeItem): Item containing the extracted volume information.
+            spider: The BooksTWSpider spider which scraped the item.
+
+        Returns:
+            str: The ISBN of the volume.
+
+        Raises:
+            DropItem: If the item has no ISBN.
+        """
+        adapter = ItemAdapter(item)
+        isbn_tw = adapter.get("isbn_tw")
+        spider.logger.info(f"Processing Orphan Volume with ISBN {isbn_tw}")
+
+        # Protect against missing ISBN
+        if not isbn_tw:
+            raise DropItem(
+                f"No isbn_tw in OrphanVolumeItem: \n{adapter.items()}\n{'-' * 50}"
+            )
+        return isbn_tw
 
     def _get_book_title_tw(self, book_title: str):
         """Process book_title_tw to extract title and volume number
@@ -167,53 +806,30 @@ class ComicScrapersPipeline:
             OrphanMapItem: The processed item.
 
         Raises:
-            DropItem: If processing fails due to missing data or database errors,
-            including:
-                - IntegrityError: If duplicate data is encountered in the database.
-                - Exception: If any other error occurs during processing.
+            DropItem: If the item misses data or duplicates data already in
+                the database (IntegrityError).
+            ItemWriteError: If any other error occurs during processing.
         """
         adapter = ItemAdapter(item)
         isbn_tw = adapter.get("isbn_tw")
         title_jp = adapter.get("title_jp")
 
         try:
-            if not title_jp:
-                raise DropItem(
-                    f"No further information in OrphanMapItem:"
-                    f"\n{adapter.items()}\n{'-' * 50}"
-                )
-
-            spider.logger.info(f"Processing Orphan Map Item for {title_jp}")
-
-            # Process Volume title and volume number
-            (
-                series_name_tw,
-                variant,
-                volume_number,
-                is_final_volume,
-                latest_volume_tw,
-            ) = self._get_book_title_tw(adapter.get("title_tw"))
-            author_tw = adapter.get("author_tw").rsplit("\n", 1)[-1].strip()
-            release_date_tw = (
-                adapter.get("release_date_tw")
-                .rsplit("：", 1)[-1]
-                .strip()
-                .replace("/", "-")
-            )
-            publisher_tw = adapter.get("publisher_tw").rsplit("\n", 1)[-1].strip()
+            record = self._prepare_orphan_map_item(item, spider)
+            series_name_tw = record["series_name_tw"]
+            variant = record["variant"]
+            volume_number = record["volume_number"]
+            is_final_volume = record["is_final_volume"]
+            author_tw = record["author_tw"]
+            release_date_tw_obj = record["release_date_tw_obj"]
+            publisher_tw = record["publisher_tw"]
 
             # Start storing data into database
             # 1. Get or create Publisher
-            publisher, created_pub = Publisher.objects.get_or_create(
-                name=publisher_tw, region="TW"
-            )
-            if created_pub:
-                spider.logger.info(f"Created new Publisher: {publisher}")
-            else:
-                spider.logger.debug(f"Found existing Publisher: {publisher}")
+            publisher = self._get_publisher(publisher_tw, "TW", spider)
 
             # 2. Get or create Series
-            series, created_series = Series.objects.get_or_create(title_jp=title_jp)
+            series, created_series = self._get_series(title_jp)
             if created_series:
                 spider.logger.info(f"Created new Series: {series}")
             else:
@@ -230,7 +846,7 @@ class ComicScrapersPipeline:
                 volume.region = "TW"
                 volume.volume_number = volume_number
                 volume.variant = variant or ""
-                volume.release_date = release_date_tw
+                volume.release_date = release_date_tw_obj
                 volume.save()
                 spider.logger.info(f"Updated Volume: {volume}")
             else:
@@ -239,11 +855,6 @@ class ComicScrapersPipeline:
                 )
 
             # Update series's latest_volume_tw if needed
-            release_date_tw_obj = (
-                datetime.strptime(release_date_tw, "%Y-%m-%d").date()
-                if release_date_tw
-                else None
-            )
             if (
                 is_final_volume
                 or series.latest_volume_tw is None
@@ -256,22 +867,92 @@ class ComicScrapersPipeline:
                 )
             ):
                 series.latest_volume_tw = volume
-                series.save()
+                series.save(
+                    update_fields=[
+                        "title_tw",
+                        "author_tw",
+                        "latest_volume_tw",
+                        "updated_at",
+                    ]
+                )
                 spider.logger.info(f"Updated Series latest_volume_tw: {series}")
 
+            # Refresh publication-gap summary
+            if volume:
+                Series.objects.filter(pk=series.pk).refresh_summary()
+
+            self._remember_series(series)
             return item
 
         except IntegrityError as e:
+            self.series_cache.discard(title_jp)
             spider.logger.warning(f"Duplicate data for {title_jp}: {str(e)}")
             raise DropItem(f"Duplicate data: {str(e)}")
         except DropItem:
             raise
         except Exception as e:
+            self.series_cache.discard(title_jp)
             spider.logger.error(
                 f"Failed to process Orphan Map Item for {title_jp}, error: {str(e)}",
                 exc_info=True,
             )
-            raise DropItem(f"Processing failed for Orphan Map Item: {str(e)}")
+            raise ItemWriteError(f"Processing failed for Orphan Map Item: {str(e)}")
+
+    def _prepare_orphan_map_item(self, item: OrphanMapItem, spider):
+        """Validate and parse OrphanMapItem before it is written to the database.
+
+        Args:
+            item (OrphanMapItem): Item containing the extracted volume information.
+            spider: The EsliteSpider-based spider which scraped the item.
+
+        Returns:
+            dict: The parsed Series, Volume and Publisher fields.
+
+        Raises:
+            DropItem: If the item has no Japanese title.
+            Exception: If any field cannot be parsed.
+        """
+        adapter = ItemAdapter(item)
+        title_jp = adapter.get("title_jp")
+
+        if not title_jp:
+            raise DropItem(
+                f"No further information in OrphanMapItem:"
+                f"\n{adapter.items()}\n{'-' * 50}"
+            )
+
+        spider.logger.info(f"Processing Orphan Map Item for {title_jp}")
+
+        # Process Volume title and volume number
+        (
+            series_name_tw,
+            variant,
+            volume_number,
+            is_final_volume,
+            latest_volume_tw,
+        ) = self._get_book_title_tw(adapter.get("title_tw"))
+        author_tw = adapter.get("author_tw").rsplit("\n", 1)[-1].strip()
+        release_date_tw = (
+            adapter.get("release_date_tw").rsplit("：", 1)[-1].strip().replace("/", "-")
+        )
+        release_date_tw_obj = (
+            datetime.strptime(release_date_tw, "%Y-%m-%d").date()
+            if release_date_tw
+            else None
+        )
+        publisher_tw = adapter.get("publisher_tw").rsplit("\n", 1)[-1].strip()
+
+        return {
+            "isbn_tw": adapter.get("isbn_tw"),
+            "title_jp": title_jp,
+            "series_name_tw": series_name_tw,
+            "variant": variant,
+            "volume_number": volume_number,
+            "is_final_volume": is_final_volume,
+            "author_tw": author_tw,
+            "release_date_tw_obj": release_date_tw_obj,
+            "publisher_tw": publisher_tw,
+        }
 
     DATE_REGEX = re.compile(r"([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日")
 
@@ -331,6 +1012,71 @@ class ComicScrapersPipeline:
 
     ISBN_JP_REGEX = re.compile(r"([0-9]{13})")
 
+    def _prepare_jp_comic_item(self, item: JpComicItem, spider):
+        """Validate and parse JpComicItem before it is written to the database.
+
+        Args:
+            item (JpComicItem): Item containing the extracted volume information.
+            spider: The JpComicSpider spider which scraped the item.
+
+        Returns:
+            dict: The parsed Series, Volume and Publisher fields.
+
+        Raises:
+            DropItem: If the item has no detail URL, its title does not match the
+                series name, or its ISBN is invalid.
+            Exception: If any field cannot be parsed.
+        """
+        adapter = ItemAdapter(item)
+        detail_url = adapter.get("detail_url")
+        series_name_jp = adapter.get("series_name")
+
+        if not detail_url:
+            raise DropItem(
+                f"No further information in JpComicItem:"
+                f"\n{adapter.items()}\n{'-' * 50}"
+            )
+
+        spider.logger.info(f"Processing JP Comic Item: {series_name_jp}")
+        spider.logger.debug(f"Processing JP Comic Item Title {adapter.get('title_jp')}")
+
+        if not adapter.get("title_jp").startswith(series_name_jp):
+            raise DropItem(
+                f"Title JP does not start with series name in JpComicItem:"
+                f"\n{adapter.items()}\n{'-' * 50}"
+            )
+
+        isbn_jp = detail_url.rsplit("/", 1)[-1].strip()
+        if self.ISBN_JP_REGEX.match(isbn_jp) is None:
+            # One episode, not a full volume
+            raise DropItem(
+                f"Invalid ISBN_JP in JpComicItem: \n{adapter.items()}\n{'-' * 50}"
+            )
+
+        publisher_jp = adapter.get("publisher_jp").rsplit("出版社：", 1)[-1].strip()
+        author_jp = adapter.get("author_jp")[2:]
+        author_jp_str = "; ".join(author_jp) if author_jp else ""
+        # status_jp = ""
+        variant, volume_number = self._get_book_title_jp(
+            adapter.get("title_jp"), series_name_jp
+        )
+        release_date_jp = self._get_book_release_date_jp(adapter.get("product_desc"))
+        release_date_jp_obj = (
+            datetime.strptime(release_date_jp, "%Y-%m-%d").date()
+            if release_date_jp
+            else None
+        )
+
+        return {
+            "series_name_jp": series_name_jp,
+            "isbn_jp": isbn_jp,
+            "publisher_jp": publisher_jp,
+            "author_jp": author_jp_str,
+            "variant": variant,
+            "volume_number": volume_number,
+            "release_date_jp_obj": release_date_jp_obj,
+        }
+
     def _process_jp_comic_item(self, item: JpComicItem, spider):
         """Process JpComicItem to update or create Series and Volume entry.
 
@@ -346,72 +1092,35 @@ class ComicScrapersPipeline:
             JpComicItem: The processed item.
 
         Raises:
-            DropItem: If processing fails due to missing data or database errors,
-            including:
-                - IntegrityError: If duplicate data is encountered in the database.
-                - Exception: If any other error occurs during processing.
+            DropItem: If the item misses data or duplicates data already in
+                the database (IntegrityError).
+            ItemWriteError: If any other error occurs during processing.
         """
         adapter = ItemAdapter(item)
-        detail_url = adapter.get("detail_url")
         series_name_jp = adapter.get("series_name")
 
         try:
-            if not detail_url:
-                raise DropItem(
-                    f"No further information in JpComicItem:"
-                    f"\n{adapter.items()}\n{'-' * 50}"
-                )
-
-            spider.logger.info(f"Processing JP Comic Item: {series_name_jp}")
-            spider.logger.debug(
-                f"Processing JP Comic Item Title {adapter.get('title_jp')}"
-            )
-
-            if not adapter.get("title_jp").startswith(series_name_jp):
-                raise DropItem(
-                    f"Title JP does not start with series name in JpComicItem:"
-                    f"\n{adapter.items()}\n{'-' * 50}"
-                )
-
-            isbn_jp = detail_url.rsplit("/", 1)[-1].strip()
-            if self.ISBN_JP_REGEX.match(isbn_jp) is None:
-                # One episode, not a full volume
-                raise DropItem(
-                    f"Invalid ISBN_JP in JpComicItem: \n{adapter.items()}\n{'-' * 50}"
-                )
-
-            publisher_jp = adapter.get("publisher_jp").rsplit("出版社：", 1)[-1].strip()
-            author_jp = adapter.get("author_jp")[2:]
-            author_jp_str = "; ".join(author_jp) if author_jp else ""
-            # status_jp = ""
-            variant, volume_number = self._get_book_title_jp(
-                adapter.get("title_jp"), series_name_jp
-            )
-            release_date_jp = self._get_book_release_date_jp(
-                adapter.get("product_desc")
-            )
+            record = self._prepare_jp_comic_item(item, spider)
+            isbn_jp = record["isbn_jp"]
+            publisher_jp = record["publisher_jp"]
+            author_jp_str = record["author_jp"]
+            variant = record["variant"]
+            volume_number = record["volume_number"]
+            release_date_jp_obj = record["release_date_jp_obj"]
 
             # Start storing data into database
             # 1. Get or create Publisher
-            publisher, created_pub = Publisher.objects.get_or_create(
-                name=publisher_jp, region="JP"
-            )
-            if created_pub:
-                spider.logger.info(f"Created new Publisher: {publisher}")
-            else:
-                spider.logger.debug(f"Found existing Publisher: {publisher}")
+            publisher = self._get_publisher(publisher_jp, "JP", spider)
 
             # 2. Get or create Series
-            series, created_series = Series.objects.get_or_create(
-                title_jp=series_name_jp,
-            )
+            series, created_series = self._get_series(series_name_jp)
             if created_series:
                 spider.logger.info(f"Created new Series: {series}")
             else:
                 spider.logger.debug(f"Found existing Series: {series}")
             # Update Series fields
             series.author_jp = author_jp_str
-            series.save()
+            series.save(update_fields=["author_jp", "updated_at"])
 
             # 3. Update Volume
             volume, created_volume = Volume.objects.get_or_create(
@@ -422,7 +1131,7 @@ class ComicScrapersPipeline:
                     "region": "JP",
                     "volume_number": volume_number,
                     "variant": variant or "",
-                    "release_date": release_date_jp,
+                    "release_date": release_date_jp_obj,
                 },
             )
             if created_volume:
@@ -433,11 +1142,6 @@ class ComicScrapersPipeline:
                 )
 
             # Update series's latest_volume_jp if needed
-            release_date_jp_obj = (
-                datetime.strptime(release_date_jp, "%Y-%m-%d").date()
-                if release_date_jp
-                else None
-            )
             if series.latest_volume_jp is None or (
                 release_date_jp_obj
                 and (
@@ -446,20 +1150,27 @@ class ComicScrapersPipeline:
                 )
             ):
                 series.latest_volume_jp = volume
-                series.save()
+                series.save(update_fields=["latest_volume_jp", "updated_at"])
                 spider.logger.info(f"Updated Series latest_volume_jp: {series}")
 
+            # Refresh publication-gap summary
+            if created_volume:
+                Series.objects.filter(pk=series.pk).refresh_summary()
+
+            self._remember_series(series)
             return item
 
         except IntegrityError as e:
+            self.series_cache.discard(series_name_jp)
             spider.logger.warning(f"Duplicate data for {series_name_jp}: {str(e)}")
             raise DropItem(f"Duplicate Volume: {str(e)}")
         except DropItem:
             raise
         except Exception as e:
+            self.series_cache.discard(series_name_jp)
             spider.logger.error(
                 f"Failed to process JP Comic Item for"
                 f"{series_name_jp}, error: {str(e)}",
                 exc_info=True,
             )
-            raise DropItem(f"Processing failed for JP Comic Item: {str(e)}")
+            raise ItemWriteError(f"Processing failed for JP Comic Item: {str(e)}")
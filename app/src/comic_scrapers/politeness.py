@@ -0,0 +1,396 @@
+"""Per-domain politeness scheduling shared by HTTP and Selenium crawling."""
+
+import threading
+import time
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+from scrapy.exceptions import NotConfigured
+from scrapy.utils.defer import maybe_deferred_to_future
+from scrapy.utils.httpobj import urlparse_cached
+from twisted.internet import task
+
+
+def politeness_key(url_or_domain: str):
+    """Return the key under which requests to a site are paced.
+
+    Args:
+        url_or_domain (str): A URL or a bare domain name.
+
+    Returns:
+        str: The host name without a leading "www.".
+    """
+    host = urlparse(url_or_domain).hostname if "//" in url_or_domain else None
+    host = (host or url_or_domain).lower()
+    return host.removeprefix("www.")
+
+
+def parse_retry_after(value, now=time.time):
+    """Return the seconds a `Retry-After` header asks to wait.
+
+    Args:
+        value (bytes or str): Header value, either a number of seconds or an
+            HTTP date.
+        now (callable): Returns the current UNIX time.
+
+    Returns:
+        float: Seconds to wait, None if the value is missing or invalid.
+    """
+    if not value:
+        return None
+    if isinstance(value, bytes):
+        value = value.decode("latin-1")
+    value = value.strip()
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - now())
+    except (TypeError, ValueError):
+        return None
+
+
+class _Slot:
+    """Pacing state of a single domain."""
+
+    __slots__ = ("delay", "next_at", "paused_until", "strikes", "circuit_breaks")
+
+    def __init__(self, delay):
+        self.delay = delay
+        self.next_at = 0.0
+        # End of the latest backoff; reservations before it are void
+        self.paused_until = 0.0
+        # Rate-limiting responses since the last successful one
+        self.strikes = 0
+        self.circuit_breaks = 0
+
+
+class PolitenessScheduler:
+    """Hand out request times so that each domain sees a bounded request rate.
+
+    Callers reserve the next free time for a domain and wait until then, so
+    time spent downloading and parsing counts towards the interval instead of
+    being added to a fixed sleep. A backoff voids the reservations falling
+    within it, so callers confirm theirs with `reserve_slot` after waiting
+    and wait again if it was moved. The interval never drops below the domain's
+    minimum; it follows the AutoThrottle latency algorithm above that and is
+    doubled when the site answers with a rate-limiting status code. After
+    `breaker_threshold` rate-limiting responses in a row, the circuit breaker
+    of the domain opens: no request is handed out for `breaker_pause`
+    seconds, and every further rate-limiting response before a successful
+    one pauses the domain again.
+
+    One scheduler is shared by every crawler in the process (see
+    `for_crawler`), so that concurrent spiders hitting the same site are paced
+    together. All methods are thread-safe.
+
+    Attributes:
+        min_interval (float): Default minimum seconds between two requests.
+        max_delay (float): Upper bound of the interval.
+        target_concurrency (float): AutoThrottle target concurrency.
+        domain_intervals (dict): Minimum intervals overriding `min_interval`,
+            keyed by domain.
+        breaker_threshold (int): Rate-limiting responses in a row that pause
+            a domain, 0 to never pause.
+        breaker_pause (float): Seconds a domain is paused.
+    """
+
+    _shared = None
+    _shared_lock = threading.Lock()
+
+    def __init__(
+        self,
+        min_interval=2.0,
+        max_delay=60.0,
+        target_concurrency=1.0,
+        domain_intervals=None,
+        breaker_threshold=0,
+        breaker_pause=600.0,
+        clock=time.monotonic,
+    ):
+        self.min_interval = min_interval
+        self.max_delay = max(max_delay, min_interval)
+        self.target_concurrency = target_concurrency
+        self.domain_intervals = {
+            politeness_key(domain): interval
+            for domain, interval in (domain_intervals or {}).items()
+        }
+        self.breaker_threshold = breaker_threshold
+        self.breaker_pause = breaker_pause
+        self._clock = clock
+        self._slots = {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_settings(cls, settings):
+        """Create a scheduler configured from Scrapy settings."""
+        return cls(
+            min_interval=settings.getfloat(
+                "POLITENESS_MIN_INTERVAL", settings.getfloat("DOWNLOAD_DELAY")
+            ),
+            max_delay=settings.getfloat("AUTOTHROTTLE_MAX_DELAY", 60.0),
+            target_concurrency=settings.getfloat(
+                "AUTOTHROTTLE_TARGET_CONCURRENCY", 1.0
+            ),
+            domain_intervals=settings.getdict("POLITENESS_DOMAIN_INTERVALS"),
+            breaker_threshold=settings.getint("POLITENESS_CIRCUIT_BREAKER_THRESHOLD"),
+            breaker_pause=settings.getfloat("POLITENESS_CIRCUIT_BREAKER_PAUSE", 600.0),
+        )
+
+    @classmethod
+    def for_crawler(cls, crawler):
+        """Return the scheduler shared by every crawler in this process.
+
+        The first crawler asking for it decides its configuration.
+        """
+        with cls._shared_lock:
+            if cls._shared is None:
+                cls._shared = cls.from_settings(crawler.settings)
+            return cls._shared
+
+    def min_interval_for(self, domain):
+        return self.domain_intervals.get(domain, self.min_interval)
+
+    def _slot(self, domain):
+        slot = self._slots.get(domain)
+        if slot is None:
+            slot = self._slots[domain] = _Slot(self.min_interval_for(domain))
+        return slot
+
+    def get_delay(self, domain):
+        """Return the current interval of a domain in seconds."""
+        with self._lock:
+            return self._slot(domain).delay
+
+    def reserve(self, domain):
+        """Reserve the next request time of a domain.
+
+        Args:
+            domain (str): The key returned by `politeness_key`.
+
+        Returns:
+            float: Seconds the caller has to wait before sending the request.
+        """
+        return self.reserve_slot(domain)[0]
+
+    def reserve_slot(self, domain, reserved_at=None):
+        """Reserve the next request time of a domain, or confirm a reservation.
+
+        A reservation made before the domain was backed off may fall within
+        the backoff; it is then replaced by the next free time.
+
+        Args:
+            domain (str): The key returned by `politeness_key`.
+            reserved_at (float, optional): Time of a reservation the caller
+                waited for, as returned by an earlier call.
+
+        Returns:
+            tuple: Seconds the caller has to wait before sending the request,
+                0 if the reservation still stands, and the reserved time to
+                confirm once the wait is over.
+        """
+        with self._lock:
+            slot = self._slot(domain)
+            if reserved_at is not None and reserved_at >= slot.paused_until:
+                return 0.0, reserved_at
+            now = self._clock()
+            start = max(now, slot.next_at)
+            slot.next_at = start + slot.delay
+            return start - now, start
+
+    def record_latency(self, domain, latency, status=200):
+        """Adjust the interval of a domain from a download latency.
+
+        Uses the same algorithm as Scrapy's AutoThrottle extension: move half
+        way towards `latency / target_concurrency`, and never shrink the
+        interval on a non-200 response.
+
+        Args:
+            domain (str): The key returned by `politeness_key`.
+            latency (float): Seconds between sending the request and receiving
+                the response headers.
+            status (int): HTTP status of the response.
+        """
+        target = latency / self.target_concurrency
+        with self._lock:
+            slot = self._slot(domain)
+            delay = max(target, (slot.delay + target) / 2.0)
+            delay = min(max(self.min_interval_for(domain), delay), self.max_delay)
+            if status != 200 and delay <= slot.delay:
+                return
+            slot.delay = delay
+
+    def backoff(self, domain, retry_after=None):
+        """Double the interval of a domain after a rate-limiting response.
+
+        The next reservation is pushed back by the new interval, by
+        `retry_after` if the site asked for a longer wait, or by
+        `breaker_pause` if the circuit breaker opens.
+
+        Args:
+            domain (str): The key returned by `politeness_key`.
+            retry_after (float, optional): Seconds from the `Retry-After`
+                header of the response.
+
+        Returns:
+            float: The new interval in seconds.
+        """
+        with self._lock:
+            slot = self._slot(domain)
+            slot.delay = min(slot.delay * 2, self.max_delay)
+            slot.strikes += 1
+            pause = max(slot.delay, retry_after or 0.0)
+            if self.breaker_threshold and slot.strikes >= self.breaker_threshold:
+                slot.circuit_breaks += 1
+                pause = max(pause, self.breaker_pause)
+            slot.paused_until = max(slot.paused_until, self._clock() + pause)
+            slot.next_at = max(slot.next_at, slot.paused_until)
+            return slot.delay
+
+    def record_success(self, domain):
+        """Close the circuit breaker of a domain after a successful response."""
+        with self._lock:
+            self._slot(domain).strikes = 0
+
+    def state(self, domain):
+        """Return the backoff state of a domain.
+
+        Returns:
+            dict: The current interval (`delay`), the rate-limiting responses
+                in a row (`strikes`), how often the circuit breaker opened
+                (`circuit_breaks`) and the seconds until the next request is
+                allowed (`paused_for`).
+        """
+        with self._lock:
+            slot = self._slot(domain)
+            return {
+                "delay": slot.delay,
+                "strikes": slot.strikes,
+                "circuit_breaks": slot.circuit_breaks,
+                "paused_for": max(0.0, slot.next_at - self._clock()),
+            }
+
+
+class PolitenessMiddleware:
+    """Downloader middleware delaying requests with the politeness scheduler.
+
+    Requests wait on a reactor timer instead of `time.sleep`, so the reactor
+    keeps processing responses and items in the meantime. Download latencies
+    feed the scheduler when AutoThrottle is enabled, and responses with a
+    status in `POLITENESS_BACKOFF_HTTP_CODES` back the domain off, for at
+    least as long as their `Retry-After` header asks. The backoff state of a
+    domain is kept in the crawl stats under `politeness/<domain>/`.
+    """
+
+    def __init__(
+        self,
+        scheduler,
+        backoff_http_codes=(429,),
+        adapt_to_latency=True,
+        stats=None,
+    ):
+        self.scheduler = scheduler
+        self.backoff_http_codes = set(backoff_http_codes)
+        self.adapt_to_latency = adapt_to_latency
+        self.stats = stats
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        if not crawler.settings.getbool("POLITENESS_ENABLED"):
+            raise NotConfigured
+        return cls(
+            PolitenessScheduler.for_crawler(crawler),
+            backoff_http_codes=[
+                int(code)
+                for code in crawler.settings.getlist(
+                    "POLITENESS_BACKOFF_HTTP_CODES", [429]
+                )
+            ],
+            adapt_to_latency=crawler.settings.getbool("AUTOTHROTTLE_ENABLED"),
+            stats=crawler.stats,
+        )
+
+    async def process_request(self, request, spider):
+        # Imported here so that importing the module does not install a reactor
+        from twisted.internet import reactor
+
+        domain = politeness_key(urlparse_cached(request).hostname or "")
+        delay, reserved_at = self.scheduler.reserve_slot(domain)
+        while delay > 0:
+            await maybe_deferred_to_future(
+                task.deferLater(reactor, delay, lambda: None)
+            )
+            # The domain may have been backed off in the meantime
+            delay, reserved_at = self.scheduler.reserve_slot(domain, reserved_at)
+        return None
+
+    def process_response(self, request, response, spider):
+        domain = politeness_key(urlparse_cached(request).hostname or "")
+        if response.status in self.backoff_http_codes:
+            breaks = self.scheduler.state(domain)["circuit_breaks"]
+            delay = self.scheduler.backoff(
+                domain, parse_retry_after(response.headers.get(b"Retry-After"))
+            )
+            state = self.scheduler.state(domain)
+            if state["circuit_breaks"] > breaks:
+                spider.logger.warning(
+                    f"Received HTTP {response.status} from {domain}"
+                    f" {state['strikes']} times in a row, pausing the site for"
+                    f" {state['paused_for']:.0f}s"
+                )
+            else:
+                spider.logger.warning(
+                    f"Received HTTP {response.status} from {domain}, "
+                    f"backing off to one request every {delay:.1f}s"
+                )
+            self._record_state(domain, state, spider)
+        else:
+            self.scheduler.record_success(domain)
+            if self.adapt_to_latency and "download_latency" in request.meta:
+                self.scheduler.record_latency(
+                    domain, request.meta["download_latency"], response.status
+                )
+        return response
+
+    def _record_state(self, domain, state, spider):
+        if self.stats is None:
+            return
+        self.stats.inc_value(f"politeness/{domain}/rate_limited", spider=spider)
+        for name, value in state.items():
+            self.stats.set_value(f"politeness/{domain}/{name}", value, spider=spider)
+
+
+class PoliteSpiderMixin:
+    """Pace Selenium page loads of a spider with the politeness scheduler.
+
+    Selenium bypasses the Scrapy downloader, so spiders driving a browser call
+    `wait_politely` right before each navigation. Without a crawler (e.g. in
+    unit tests) or with `POLITENESS_ENABLED` off, no waiting happens.
+    """
+
+    def wait_politely(self, url=None):
+        """Block until the next request to the spider's site is allowed.
+
+        Args:
+            url (str, optional): The URL about to be loaded. Defaults to the
+                first of `allowed_domains`.
+
+        Returns:
+            float: Seconds waited.
+        """
+        crawler = getattr(self, "crawler", None)
+        if crawler is None or not crawler.settings.getbool("POLITENESS_ENABLED"):
+            return 0.0
+
+        domain = politeness_key(url or self.allowed_domains[0])
+        scheduler = PolitenessScheduler.for_crawler(crawler)
+        delay, reserved_at = scheduler.reserve_slot(domain)
+        waited = 0.0
+        while delay > 0:
+            self.logger.debug(f"Waiting {delay:.1f}s before requesting {domain}")
+            time.sleep(delay)
+            waited += delay
+            # The domain may have been backed off in the meantime
+            delay, reserved_at = scheduler.reserve_slot(domain, reserved_at)
+        return waited
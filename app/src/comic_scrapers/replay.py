@@ -0,0 +1,266 @@
+"""Record HTTP responses into a fixture archive and replay them offline."""
+
+import json
+import threading
+import zipfile
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import urlsplit
+
+from scrapy import signals
+from scrapy.exceptions import NotConfigured
+
+# Headers the replay server sets itself
+HOP_BY_HOP_HEADERS = {"connection", "content-length", "transfer-encoding"}
+
+
+def replay_key(url):
+    """Return the key under which the response to `url` is archived.
+
+    The scheme is left out, since responses recorded over HTTPS are replayed
+    over plain HTTP.
+
+    Args:
+        url (str): URL of the request.
+
+    Returns:
+        str: Host, path and query of the URL.
+    """
+    parts = urlsplit(url)
+    key = f"{parts.hostname or ''}{parts.path or '/'}"
+    return f"{key}?{parts.query}" if parts.query else key
+
+
+class FixtureArchive:
+    """Recorded responses, kept in one zip file.
+
+    The archive holds an `index.json` with the URL, status, headers and
+    spider context of every response, and the raw bodies as separate
+    members, compressed by the zip format. A response is looked up by
+    `replay_key` of its URL.
+
+    Attributes:
+        entries (dict): Archived responses by `replay_key`.
+    """
+
+    def __init__(self, entries=None):
+        self.entries = entries or {}
+        self._lock = threading.Lock()
+
+    @classmethod
+    def load(cls, path):
+        """Read an archive written by `save`."""
+        entries = {}
+        with zipfile.ZipFile(path) as archive:
+            for entry in json.loads(archive.read("index.json")):
+                entry["body"] = archive.read(entry.pop("body_file"))
+                entries[replay_key(entry["url"])] = entry
+        return cls(entries)
+
+    def add(self, url, status, headers, body, context=None):
+        """Archive a response, replacing an earlier one for the same key.
+
+        Args:
+            url (str): URL of the request.
+            status (int): HTTP status of the response.
+            headers (dict): Header names mapped to lists of values.
+            body (bytes): Raw response body.
+            context (dict, optional): What the spider knew when it sent the
+                request, e.g. the topic of a detail page.
+        """
+        with self._lock:
+            self.entries[replay_key(url)] = {
+                "url": url,
+                "status": status,
+                "headers": headers,
+                "body": body,
+                "context": context or {},
+            }
+
+    def get(self, url):
+        """Return the archived response to `url`, None if there is none."""
+        return self.entries.get(replay_key(url))
+
+    def urls(self, host=None):
+        """Return the archived URLs, optionally only those of `host`."""
+        return [
+            entry["url"]
+            for entry in self.entries.values()
+            if host is None or urlsplit(entry["url"]).hostname == host
+        ]
+
+    def save(self, path):
+        """Write the archive to `path`."""
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        index = []
+        with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED) as archive:
+            for i, entry in enumerate(self.entries.values()):
+                body_file = f"bodies/{i:06d}"
+                archive.writestr(body_file, entry["body"])
+                index.append(
+                    {key: value for key, value in entry.items() if key != "body"}
+                    | {"body_file": body_file}
+                )
+            archive.writestr("index.json", json.dumps(index, ensure_ascii=False))
+
+
+class ReplayRecorderMiddleware:
+    """Downloader middleware archiving every response a crawl downloads.
+
+    Enabled by setting `REPLAY_RECORD_PATH` to the archive to write, which is
+    saved when the spider closes. It should sit next to the downloader, so
+    that it sees redirects and undecoded bodies as the site sent them. The
+    topic of a request whose callback gets an item is kept as context, so
+    that detail pages can be replayed without the search that found them.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self.archive = FixtureArchive()
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        path = crawler.settings.get("REPLAY_RECORD_PATH")
+        if not path:
+            raise NotConfigured
+        middleware = cls(path)
+        if Path(path).exists():
+            middleware.archive = FixtureArchive.load(path)
+        crawler.signals.connect(middleware.spider_closed, signal=signals.spider_closed)
+        return middleware
+
+    def process_response(self, request, response, spider):
+        context = {}
+        item = request.cb_kwargs.get("item")
+        topic = getattr(spider, "topic", None)
+        if item is not None and topic and item.get(topic):
+            context["topic"] = item[topic]
+        self.archive.add(
+            request.url,
+            response.status,
+            {
+                name.decode("latin-1"): [value.decode("latin-1") for value in values]
+                for name, values in response.headers.items()
+            },
+            response.body,
+            context,
+        )
+        return response
+
+    def spider_closed(self, spider):
+        self.archive.save(self.path)
+        spider.logger.info(
+            f"Recorded {len(self.archive.entries)} responses to {self.path}"
+        )
+
+
+class _ReplayHandler(BaseHTTPRequestHandler):
+    """Serve archived responses, as an HTTP proxy or as the site itself."""
+
+    def do_GET(self):
+        # Proxied requests carry the absolute URL, direct ones the Host header
+        url = (
+            self.path if "://" in self.path else f"//{self.headers['Host']}{self.path}"
+        )
+        entry = self.server.archive.get(url)
+        self.server.count(entry is not None)
+        if entry is None:
+            self.send_error(404, "Not recorded")
+            return
+        self.send_response(entry["status"])
+        for name, values in entry["headers"].items():
+            if name.lower() not in HOP_BY_HOP_HEADERS:
+                for value in values:
+                    self.send_header(name, value)
+        self.send_header("Content-Length", str(len(entry["body"])))
+        self.end_headers()
+        self.wfile.write(entry["body"])
+
+    def log_message(self, format, *args):
+        pass
+
+
+class ReplayServer(ThreadingHTTPServer):
+    """Local HTTP server standing in for the crawled sites.
+
+    Serves the responses of a `FixtureArchive` in a background thread, and
+    404 for everything else. Crawls reach it as an HTTP proxy through
+    `ReplayProxyMiddleware`.
+
+    Args:
+        archive (FixtureArchive): Responses to serve.
+        host (str): Interface to listen on.
+        port (int): Port to listen on, 0 for any free port.
+
+    Attributes:
+        served (int): Requests answered from the archive.
+        missed (int): Requests for URLs not in the archive.
+    """
+
+    daemon_threads = True
+
+    def __init__(self, archive, host="127.0.0.1", port=0):
+        super().__init__((host, port), _ReplayHandler)
+        self.archive = archive
+        self.served = 0
+        self.missed = 0
+        self._count_lock = threading.Lock()
+        self._thread = None
+
+    @property
+    def url(self):
+        """str: Base URL of the server."""
+        host, port = self.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def count(self, hit):
+        with self._count_lock:
+            if hit:
+                self.served += 1
+            else:
+                self.missed += 1
+
+    def start(self):
+        """Serve requests in a background thread."""
+        self._thread = threading.Thread(
+            target=self.serve_forever, name="replay-server", daemon=True
+        )
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket."""
+        self.shutdown()
+        self.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class ReplayProxyMiddleware:
+    """Downloader middleware sending every request to a `ReplayServer`.
+
+    Enabled by setting `REPLAY_SERVER_URL`. HTTPS requests are downgraded to
+    plain HTTP, since the server does not speak TLS; the host stays the same,
+    so allowed domains and URL-based keys keep working. It must run before
+    any middleware that acts on the URL.
+    """
+
+    def __init__(self, server_url):
+        self.server_url = server_url
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        server_url = crawler.settings.get("REPLAY_SERVER_URL")
+        if not server_url:
+            raise NotConfigured
+        return cls(server_url)
+
+    def process_request(self, request, spider):
+        if request.url.startswith("https://"):
+            return request.replace(url="http://" + request.url[len("https://") :])
+        request.meta["proxy"] = self.server_url
+        return None
@@ -1,18 +1,64 @@
 """Custom retry middleware for handling HTTP 484 errors with backoff."""
 
+import random
+
 from scrapy.downloadermiddlewares.retry import RetryMiddleware
+from scrapy.utils.defer import maybe_deferred_to_future
 from scrapy.utils.response import response_status_message
+from twisted.internet import task
+
+from comic_scrapers.politeness import parse_retry_after
 
 
 class Custom484RetryMiddleware(RetryMiddleware):
     """Custom retry middleware that handles HTTP 484 status codes.
 
-    This middleware extends the default RetryMiddleware to specifically handle
-    HTTP 484 errors (rate limiting) by sleeping before retrying the request.
+    This middleware extends the default RetryMiddleware to delay the retries
+    of rate-limited requests (statuses in `RETRY_BACKOFF_HTTP_CODES`, HTTP
+    484 and 429 by default). The n-th retry waits `RETRY_BACKOFF_BASE * 2 **
+    (n - 1)` seconds, capped at `RETRY_BACKOFF_MAX`, of which a random half
+    is left out so that retries do not arrive in bursts. A `Retry-After`
+    header is honoured up to `RETRY_AFTER_MAX` seconds. The wait is a reactor
+    timer, so other requests and items keep being processed meanwhile.
+
+    The delays are counted in the crawl stats under `retry/backoff/`.
     """
 
-    def process_response(self, request, response, spider):
-        """Process the response and retry if status code is 484.
+    def __init__(self, settings, stats=None, rng=random.random):
+        super().__init__(settings)
+        self.backoff_http_codes = {
+            int(code) for code in settings.getlist("RETRY_BACKOFF_HTTP_CODES", [484])
+        }
+        self.backoff_base = settings.getfloat("RETRY_BACKOFF_BASE", 30.0)
+        self.backoff_max = settings.getfloat("RETRY_BACKOFF_MAX", 600.0)
+        self.retry_after_max = settings.getfloat("RETRY_AFTER_MAX", 3600.0)
+        self.stats = stats
+        self._random = rng
+
+    @classmethod
+    def from_crawler(cls, crawler):
+        return cls(crawler.settings, crawler.stats)
+
+    def backoff_delay(self, retry_times, response):
+        """Return the seconds to wait before a retry.
+
+        Args:
+            retry_times (int): Number of the retry, starting at 1.
+            response: The rate-limited response.
+
+        Returns:
+            float: The jittered exponential backoff, or the wait asked by the
+                `Retry-After` header if that is longer.
+        """
+        delay = min(self.backoff_base * 2 ** (retry_times - 1), self.backoff_max)
+        delay = delay / 2 + self._random() * delay / 2
+        retry_after = parse_retry_after(response.headers.get(b"Retry-After"))
+        if retry_after is not None:
+            delay = max(delay, min(retry_after, self.retry_after_max))
+        return delay
+
+    async def process_response(self, request, response, spider):
+        """Process the response and retry it later if it was rate limited.
 
         Args:
             request: The request that resulted in this response
@@ -22,29 +68,33 @@ class Custom484RetryMiddleware(RetryMiddleware):
         Returns:
             Either the original response or a new retry request
         """
-        if response.status == 484:
-            reason = response_status_message(response.status)
-            retry_times = request.meta.get("retry_times", 0) + 1
-            max_retry_times = self.max_retry_times
-
-            if retry_times <= max_retry_times:
-                spider.logger.warning(
-                    f"Received HTTP 484 from {request.url}. "
-                    f"Retrying (attempt {retry_times}/{max_retry_times})"
-                )
-
-                retryreq = request.copy()
-                retryreq.meta["retry_times"] = retry_times
-                retryreq.dont_filter = True
-                # Lower priority to delay retry without blocking
-                retryreq.priority = request.priority - 1
-
-                return retryreq
-            else:
-                spider.logger.error(
-                    f"Gave up retrying {request.url} after {max_retry_times} attempts "
-                    f"(HTTP 484: {reason})"
-                )
-
-        # For all other status codes, use the default behavior
-        return super().process_response(request, response, spider)
+        if response.status not in self.backoff_http_codes or request.meta.get(
+            "dont_retry", False
+        ):
+            # For all other status codes, use the default behavior
+            return super().process_response(request, response, spider)
+
+        retry_times = request.meta.get("retry_times", 0) + 1
+        retryreq = self._retry(
+            request, response_status_message(response.status), spider
+        )
+        if retryreq is None:
+            return response
+
+        delay = self.backoff_delay(retry_times, response)
+        spider.logger.warning(
+            f"Received HTTP {response.status} from {request.url}. Retrying in"
+            f" {delay:.1f}s (attempt {retry_times}/"
+            f"{request.meta.get('max_retry_times', self.max_retry_times)})"
+        )
+        if self.stats is not None:
+            self.stats.inc_value("retry/backoff/count", spider=spider)
+            self.stats.inc_value("retry/backoff/seconds", delay, spider=spider)
+            self.stats.max_value("retry/backoff/max_delay", delay, spider=spider)
+            if b"Retry-After" in response.headers:
+                self.stats.inc_value("retry/backoff/retry_after", spider=spider)
+
+        from twisted.internet import reactor
+
+        await maybe_deferred_to_future(task.deferLater(reactor, delay, lambda: None))
+        return retryreq
@@ -0,0 +1,371 @@
+"""Pool of Selenium WebDriver sessions shared by the browser-driven spiders."""
+
+import abc
+import queue
+import threading
+
+import scrapy
+from scrapy.http import HtmlResponse
+from scrapy.utils.defer import maybe_deferred_to_future
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support import expected_conditions as EC
+from selenium.webdriver.support.ui import WebDriverWait
+from twisted.internet import defer
+
+DEFAULT_REMOTE_URL = "http://selenium:4444/wd/hub"
+
+
+class TopicQueue:
+    """Topics handed out to the workers of a session pool.
+
+    Holds a fixed list of `(index, topic_item)` pairs. Subclasses may hand out
+    topics that arrive while the crawl is running.
+
+    Attributes:
+        open_ended (bool): Whether topics may still arrive when none is
+            queued, in which case the pool starts all of its sessions.
+    """
+
+    open_ended = False
+
+    def __init__(self, topics=()):
+        self._queue = queue.Queue()
+        for index, topic_item in topics:
+            self._queue.put((index, topic_item))
+
+    def take(self):
+        """Return the next `(index, topic_item)` pair, None once none is left."""
+        try:
+            return self._queue.get_nowait()
+        except queue.Empty:
+            return None
+
+    def done(self, index, topic_item):
+        """Record that a worker processed a topic."""
+
+    def give_back(self, index, topic_item):
+        """Queue again a topic that a worker could not process."""
+        self._queue.put((index, topic_item))
+
+    def remaining(self):
+        """Return the number of queued topics."""
+        return self._queue.qsize()
+
+
+class SeleniumPoolMixin(abc.ABC):
+    """Process a spider's `topic_list` on a pool of WebDriver sessions.
+
+    Every worker thread owns one remote session and takes topics from a shared
+    queue, so slow topics do not hold back the others and the topics of a
+    worker that gives up are picked up by the remaining ones. Items are handed
+    to the reactor thread and yielded from `start`, so they go through the
+    item pipeline like items of any other spider.
+
+    `driver` and `wait` refer to the session of the calling thread, which
+    lets the spider's parsing methods stay unaware of the pool. A worker whose
+    session dies is given a fresh one (up to `SELENIUM_MAX_RESTARTS` times)
+    and retries the topic it was processing once.
+
+    Spiders using this mixin implement `create_driver` and `parse_topic`, and
+    set `SEARCH_BOX_XPATH` to the search box `parse_topic` starts from.
+
+    Settings:
+        SELENIUM_POOL_SIZE (int): Number of sessions; the `pool_size` spider
+            argument takes precedence.
+        SELENIUM_REMOTE_URL (str): Selenium Grid or standalone server URL.
+        SELENIUM_MAX_RESTARTS (int): Session restarts allowed per worker.
+    """
+
+    wait_timeout = 10
+    SEARCH_BOX_XPATH = None
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._selenium_local = threading.local()
+        self._sessions = []
+        self._sessions_lock = threading.Lock()
+        self._pool_closing = threading.Event()
+
+    @property
+    def driver(self):
+        """WebDriver: Session of the calling thread, None before one is set."""
+        return getattr(self._selenium_local, "driver", None)
+
+    @driver.setter
+    def driver(self, driver):
+        self._selenium_local.driver = driver
+        self._selenium_local.wait = (
+            WebDriverWait(driver, self.wait_timeout) if driver is not None else None
+        )
+        if driver is not None:
+            with self._sessions_lock:
+                self._sessions.append(driver)
+
+    @driver.deleter
+    def driver(self):
+        self._selenium_local.__dict__.pop("driver", None)
+        self._selenium_local.__dict__.pop("wait", None)
+
+    @property
+    def wait(self):
+        """WebDriverWait: Wait bound to the calling thread's session."""
+        return getattr(self._selenium_local, "wait", None)
+
+    @wait.setter
+    def wait(self, wait):
+        self._selenium_local.wait = wait
+
+    def _get_setting(self, name, default):
+        settings = getattr(self, "settings", None)
+        return settings.get(name, default) if settings is not None else default
+
+    @property
+    def selenium_remote_url(self):
+        """str: URL of the remote WebDriver server."""
+        return self._get_setting("SELENIUM_REMOTE_URL", DEFAULT_REMOTE_URL)
+
+    @property
+    def selenium_pool_size(self):
+        """int: Number of WebDriver sessions to run in parallel."""
+        size = getattr(self, "pool_size", None)
+        if size is None:
+            size = self._get_setting("SELENIUM_POOL_SIZE", 1)
+        return max(1, int(size))
+
+    @property
+    def max_session_restarts(self):
+        """int: Session restarts allowed per worker before it gives up."""
+        return int(self._get_setting("SELENIUM_MAX_RESTARTS", 3))
+
+    @abc.abstractmethod
+    def create_driver(self):
+        """Open a new remote WebDriver session.
+
+        Returns:
+            WebDriver: The new session.
+        """
+
+    @abc.abstractmethod
+    def parse_topic(self, topic_item, index):
+        """Search for one topic item on the current session.
+
+        Args:
+            topic_item (str): The topic item to search for.
+            index (int): The index of the topic item in `topic_list`.
+
+        Yields:
+            scrapy.Item: Items extracted for the topic item.
+        """
+
+    def pending_topics(self):
+        """Return the topics left to process.
+
+        Returns:
+            list: `(index, topic_item)` pairs, index being the position of the
+                topic item in `topic_list`.
+        """
+        return list(enumerate(self.topic_list or []))
+
+    def topic_queue(self):
+        """Return the queue the workers take their topics from.
+
+        Returns:
+            TopicQueue: Queue of the `pending_topics`.
+        """
+        return TopicQueue(self.pending_topics())
+
+    def load_start_page(self):
+        """Load the first of `start_urls` on the calling thread's session.
+
+        Waits until the page shows `SEARCH_BOX_XPATH`, if set.
+
+        Returns:
+            HtmlResponse: Response built from the loaded page.
+        """
+        url = self.start_urls[0]
+        self.wait_politely(url)
+        self.driver.get(url)
+        if self.SEARCH_BOX_XPATH:
+            self.wait.until(
+                EC.presence_of_element_located((By.XPATH, self.SEARCH_BOX_XPATH))
+            )
+
+        self.logger.debug(f"load_start_page(): Loaded homepage {url}")
+
+        return HtmlResponse(
+            url=self.driver.current_url,
+            body=self.driver.page_source,
+            encoding="utf-8",
+            request=scrapy.Request(url=url),
+        )
+
+    async def start(self):
+        """Run the session pool and yield the items it extracts.
+
+        Yields:
+            scrapy.Item: Items extracted by every worker, in arrival order.
+        """
+        from twisted.internet import reactor
+
+        topics = self.topic_queue()
+        size = self.selenium_pool_size
+        if not topics.open_ended:
+            size = min(size, topics.remaining())
+        if size == 0:
+            return
+
+        self.logger.info(
+            f"start(): Processing {topics.remaining()} {self.topic} items"
+            f"{' and those still to come' if topics.open_ended else ''}"
+            f" on {size} Selenium session(s)"
+        )
+        results = defer.DeferredQueue()
+        finished = object()
+
+        def emit(item):
+            reactor.callFromThread(results.put, item)
+
+        for worker_id in range(size):
+            threading.Thread(
+                target=self._run_worker,
+                args=(worker_id, topics, emit, lambda: emit(finished)),
+                name=f"{self.name}-selenium-{worker_id}",
+                daemon=True,
+            ).start()
+
+        running = size
+        while running:
+            item = await maybe_deferred_to_future(results.get())
+            if item is finished:
+                running -= 1
+            else:
+                yield item
+
+        if topics.remaining():
+            self.logger.error(
+                f"start(): {topics.remaining()} {self.topic} items were not processed"
+                " because every Selenium session failed"
+            )
+            self._inc_stat("selenium_pool/topics_skipped", topics.remaining())
+
+    def _run_worker(self, worker_id, topics, emit, done):
+        """Process topics from the shared queue on a session of this thread.
+
+        Args:
+            worker_id (int): Index of the worker, used in log messages.
+            topics (TopicQueue): Queue of the topics to process.
+            emit (callable): Called with every extracted item.
+            done (callable): Called once the worker exits.
+        """
+        self._selenium_local.restarts = 0
+        try:
+            while not self._pool_closing.is_set():
+                entry = topics.take()
+                if entry is None:
+                    return
+                index, topic_item = entry
+                if not self._process_topic(worker_id, index, topic_item, emit):
+                    # Let the remaining workers pick the topic up
+                    topics.give_back(index, topic_item)
+                    return
+                topics.done(index, topic_item)
+        finally:
+            self._close_session()
+            done()
+
+    def _process_topic(self, worker_id, index, topic_item, emit):
+        """Process one topic, retrying it once on a fresh session.
+
+        Returns:
+            bool: False if no working session could be started.
+        """
+        for attempt in range(2):
+            if not self._ensure_session(worker_id):
+                return False
+            try:
+                for item in self.parse_topic(topic_item, index):
+                    emit(item)
+            except Exception as e:
+                self.logger.error(
+                    f"_process_topic(): Worker {worker_id} failed to process"
+                    f" {self.topic} {topic_item}, error: {str(e)}",
+                    exc_info=True,
+                )
+                self._inc_stat("selenium_pool/topics_failed")
+            if self._session_alive():
+                return True
+            self.logger.warning(
+                f"_process_topic(): Worker {worker_id} lost its session while"
+                f" processing {self.topic} {topic_item}"
+            )
+            self._close_session()
+        return True
+
+    def _ensure_session(self, worker_id):
+        """Start a session for this thread unless it has a live one.
+
+        Returns:
+            bool: False once the worker ran out of restarts.
+        """
+        while self.driver is None:
+            if self._pool_closing.is_set():
+                return False
+            local = self._selenium_local
+            if local.restarts > self.max_session_restarts:
+                self.logger.error(
+                    f"_ensure_session(): Worker {worker_id} giving up after"
+                    f" {self.max_session_restarts} session restarts"
+                )
+                return False
+            if local.restarts:
+                self._inc_stat("selenium_pool/restarts")
+            local.restarts += 1
+            try:
+                self.driver = self.create_driver()
+                self.load_start_page()
+            except Exception as e:
+                self.logger.error(
+                    f"_ensure_session(): Worker {worker_id} failed to start a"
+                    f" session, error: {str(e)}"
+                )
+                self._close_session()
+        return True
+
+    def _session_alive(self):
+        if self.driver is None:
+            return False
+        try:
+            self.driver.current_url
+        except Exception:
+            return False
+        return True
+
+    def _close_session(self):
+        """Quit the calling thread's session and forget it."""
+        driver = self.driver
+        if driver is None:
+            return
+        del self.driver
+        with self._sessions_lock:
+            if driver in self._sessions:
+                self._sessions.remove(driver)
+        try:
+            driver.quit()
+        except Exception as e:
+            self.logger.debug(f"_close_session(): Ignoring quit error: {e}")
+
+    def close_sessions(self):
+        """Stop the workers and quit every session that is still open."""
+        self._pool_closing.set()
+        with self._sessions_lock:
+            sessions, self._sessions = self._sessions, []
+        for driver in sessions:
+            try:
+                driver.quit()
+            except Exception as e:
+                self.logger.debug(f"close_sessions(): Ignoring quit error: {e}")
+
+    def _inc_stat(self, key, count=1):
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            crawler.stats.inc_value(key, count, spider=self)
@@ -56,6 +56,14 @@ DOWNLOAD_DELAY = 2  # Base delay between requests
 DOWNLOADER_MIDDLEWARES = {
     "comic_scrapers.retry_middleware.Custom484RetryMiddleware": 550,
     "scrapy.downloadermiddlewares.retry.RetryMiddleware": None,  # Disable default
+    "comic_scrapers.politeness.PolitenessMiddleware": 560,
+    # Before politeness and retries, so that cache hits are not delayed
+    "scrapy.downloadermiddlewares.httpcache.HttpCacheMiddleware": None,
+    "comic_scrapers.httpcache.RevalidatingHttpCacheMiddleware": 540,
+    # Offline replay (comic_scrapers/replay.py), off unless REPLAY_SERVER_URL
+    # or REPLAY_RECORD_PATH is set
+    "comic_scrapers.replay.ReplayProxyMiddleware": 60,
+    "comic_scrapers.replay.ReplayRecorderMiddleware": 950,
 }
 
 # Enable or disable extensions
@@ -70,6 +78,13 @@ ITEM_PIPELINES = {
     "comic_scrapers.pipelines.ComicScrapersPipeline": 300,
 }
 
+# Write items in batches, one transaction per batch (0 or 1 writes item by item)
+PIPELINE_BATCH_SIZE = 50
+# Flush a partially filled batch after this many seconds
+PIPELINE_FLUSH_INTERVAL = 5.0
+# Maximum number of publishers and series kept in the pipeline lookup caches
+PIPELINE_LOOKUP_CACHE_SIZE = 10000
+
 # Enable and configure the AutoThrottle extension (disabled by default)
 # See https://docs.scrapy.org/en/latest/topics/autothrottle.html
 AUTOTHROTTLE_ENABLED = True
@@ -83,13 +98,80 @@ AUTOTHROTTLE_TARGET_CONCURRENCY = 1.0
 # Enable showing throttling stats for every response received:
 # AUTOTHROTTLE_DEBUG = False
 
-# Enable and configure HTTP caching (disabled by default)
-# See https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
-# HTTPCACHE_ENABLED = True
-# HTTPCACHE_EXPIRATION_SECS = 0
-# HTTPCACHE_DIR = "httpcache"
-# HTTPCACHE_IGNORE_HTTP_CODES = []
-# HTTPCACHE_STORAGE = "scrapy.extensions.httpcache.FilesystemCacheStorage"
+# Per-domain politeness scheduler shared by requests and Selenium page loads,
+# see comic_scrapers/politeness.py. AutoThrottle latencies can only raise the
+# interval above the minimum.
+POLITENESS_ENABLED = True
+# Minimum seconds between two requests to the same site
+POLITENESS_MIN_INTERVAL = 20
+# Per-domain overrides of POLITENESS_MIN_INTERVAL, e.g. {"books.or.jp": 10}
+POLITENESS_DOMAIN_INTERVALS = {}
+# Responses that double the interval of their site
+POLITENESS_BACKOFF_HTTP_CODES = [429, 484]
+# Pause a site for POLITENESS_CIRCUIT_BREAKER_PAUSE seconds after this many
+# rate-limiting responses in a row (0 disables the circuit breaker)
+POLITENESS_CIRCUIT_BREAKER_THRESHOLD = 3
+POLITENESS_CIRCUIT_BREAKER_PAUSE = 600
+
+# Selenium spiders (eslite, books_jp) run their topics on a pool of remote
+# WebDriver sessions, see comic_scrapers/selenium_pool.py. The Selenium server
+# must accept as many sessions (SE_NODE_MAX_SESSIONS in docker-compose.yml).
+SELENIUM_REMOTE_URL = "http://selenium:4444/wd/hub"
+SELENIUM_POOL_SIZE = 3
+# Session restarts allowed per worker before it hands its topics back
+SELENIUM_MAX_RESTARTS = 3
+
+# "http" fetches books.or.jp detail pages as Scrapy requests, with Selenium
+# only walking the search results; "selenium" clicks through every result
+BOOKS_JP_DETAIL_MODE = "http"
+
+# Per-topic crawl watermarks (comic_scrapers.models.CrawlWatermark) let spiders
+# skip results seen by earlier crawls; they are saved when a crawl finishes.
+# Set to False to force a full crawl.
+CRAWL_WATERMARKS_ENABLED = True
+# Most recent detail url keys remembered per topic
+CRAWL_WATERMARK_MAX_KEYS = 500
+# Stop a search at a page whose results were all released at or before the
+# release cutoff, instead of paging until the next button times out
+SEARCH_DATE_CUTOFF_ENABLED = True
+
+# Selenium spiders checkpoint the topics and result pages whose items were
+# stored, so that an interrupted crawl continues with --resume
+CRAWL_CHECKPOINT_ENABLED = True
+# Seconds between checkpoint writes
+CRAWL_CHECKPOINT_INTERVAL = 60
+
+# ISBNs of new orphan volumes are queued for `eslite_isbn -a mode=stream`,
+# which maps them while books_tw is still running
+ISBN_QUEUE_ENABLED = True
+# Seconds before the claim of an ISBN by a crawl that died expires
+ISBN_QUEUE_LEASE = 1800
+ISBN_QUEUE_MAX_ATTEMPTS = 3
+# A streaming crawl without upstream crawl ends after this many idle seconds
+ISBN_QUEUE_IDLE_TIMEOUT = 600
+ISBN_QUEUE_POLL_INTERVAL = 5
+
+# HTTP cache for pages fetched through the Scrapy downloader, see
+# comic_scrapers/httpcache.py and
+# https://docs.scrapy.org/en/latest/topics/downloader-middleware.html#httpcache-middleware-settings
+HTTPCACHE_ENABLED = True
+HTTPCACHE_POLICY = "comic_scrapers.httpcache.TtlCachePolicy"
+# One SQLite file per spider under .scrapy/httpcache
+HTTPCACHE_STORAGE = "comic_scrapers.httpcache.SqliteCacheStorage"
+HTTPCACHE_DIR = "httpcache"
+# Drop cache entries older than this many seconds (0 keeps them)
+HTTPCACHE_EXPIRATION_SECS = 0
+# Seconds a page stays fresh, by URL pattern (first match wins). Stale pages
+# are revalidated with ETag/Last-Modified; other URLs are not cached.
+HTTPCACHE_TTL_RULES = {
+    # Product pages rarely change once a title is listed
+    r"^https?://www\.books\.com\.tw/products/": 30 * 24 * 3600,
+    # New-release listing
+    r"^https?://www\.books\.com\.tw/web/sys_compub/": 3600,
+}
+# Query parameters left out of cache keys; books.com.tw tags product links
+# with their position on the listing
+HTTPCACHE_IGNORE_QUERY_PARAMS = ["loc"]
 
 # Set settings whose default value is deprecated to a future-proof value
 FEED_EXPORT_ENCODING = "utf-8"
@@ -110,3 +192,10 @@ LOG_FILE = os.path.join(os.path.dirname(__file__), "logs", "scrapy.log")
 # Retry settings
 RETRY_TIMES = 3  # Maximum number of retries
 RETRY_HTTP_CODES = [500, 502, 503, 504, 522, 524, 408, 429, 484]  # Include 484
+# Rate-limited requests are retried after RETRY_BACKOFF_BASE * 2 ** (n - 1)
+# seconds (jittered, at most RETRY_BACKOFF_MAX) or their Retry-After header
+RETRY_BACKOFF_HTTP_CODES = [429, 484]
+RETRY_BACKOFF_BASE = 30
+RETRY_BACKOFF_MAX = 600
+# Longest Retry-After honoured, in seconds
+RETRY_AFTER_MAX = 3600
@@ -1,22 +1,29 @@
 import re
-import time
 
 import scrapy
 import selenium
 from comic.models import Series
-from django.db import models
 from scrapy.http import HtmlResponse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from comic_scrapers.checkpoints import CheckpointMixin
 from comic_scrapers.items import JpComicItem
-
-
-class BooksJpSpider(scrapy.Spider):
+from comic_scrapers.politeness import PoliteSpiderMixin
+from comic_scrapers.selenium_pool import SeleniumPoolMixin
+from comic_scrapers.watermarks import WatermarkMixin, watermark_key
+
+
+class BooksJpSpider(
+    WatermarkMixin,
+    CheckpointMixin,
+    SeleniumPoolMixin,
+    PoliteSpiderMixin,
+    scrapy.Spider,
+):
     """Spider to scrape Japanese book information from books.or.jp site.
 
     This spider obtain book urls and extracts volume information
@@ -34,21 +41,15 @@ class BooksJpSpider(scrapy.Spider):
     def __init__(self, *args, **kwargs):
         """See base class."""
         super().__init__(*args, **kwargs)
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--start-maximized")
-
-        self.driver = webdriver.Remote(
-            command_executor="http://selenium:4444/wd/hub", options=chrome_options
-        )
-        self.wait = WebDriverWait(self.driver, 10)
         self.topic = None
         self.topic_list = None
         self.target_info = None
         self.last_release_dates = None
 
     DATE_REGEX = re.compile(r"([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日")
+    NEXT_PAGE_XPATH = "//button[@aria-label='1ページ後に進む']"
+    SEARCH_BOX_XPATH = "//input[@id='searchforbooks_title']"
+    RESULT_XPATH = "//a[@class='result_list_button']"
 
     def _get_book_release_date(self, product_desc: str):
         """Process product_desc to extract release date for the current volume.
@@ -73,109 +74,113 @@ class BooksJpSpider(scrapy.Spider):
             return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
         return None
 
-    def start_requests(self):
+    def create_driver(self):
         """See base class."""
-        url = self.start_urls[0]
-        # Load the homepage without waiting for a specific element
-        self.driver.get(url)
-        time.sleep(2)
-
-        self.logger.debug(f"start_requests(): Loaded homepage {url}")
-
-        response = HtmlResponse(
-            url=self.driver.current_url,
-            body=self.driver.page_source,
-            encoding="utf-8",
-            request=scrapy.Request(url=url),
+        chrome_options = Options()
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--start-maximized")
+
+        return webdriver.Remote(
+            command_executor=self.selenium_remote_url, options=chrome_options
         )
-        yield from self.parse(response)
 
-    def parse(self, response: HtmlResponse):
-        """Parse the homepage and perform searches for each topic item.
+    @property
+    def fetch_details_over_http(self):
+        """bool: Whether detail pages are fetched as Scrapy requests.
+
+        Selenium then only walks the search results to collect detail urls.
+        Set with the `detail_mode` spider argument or `BOOKS_JP_DETAIL_MODE`,
+        either "http" or "selenium".
+        """
+        mode = getattr(self, "detail_mode", None)
+        if mode is None:
+            mode = self._get_setting("BOOKS_JP_DETAIL_MODE", "selenium")
+        return mode == "http"
+
+    def parse_topic(self, topic_item: str, index: int):
+        """Search for one topic item and parse its search results.
+
+        Expects the current page to have the site's search box.
 
         Args:
-            response (HtmlResponse): Response object of the homepage.
+            topic_item (str): The topic item to search for.
+            index (int): The index of the topic item in topic_list.
 
         Yields:
             JpComicItem: Item containing the extracted comic information.
-
-        Raises:
-            TimeoutException: If a timeout occurs because elements cannot be found.
-            NoSuchElementException: If expected HTML elements are not found.
-            Exception: If any error occurs during parsing.
         """
-        self.logger.debug(f"parse(): Start parsing from {response.url}")
-
-        input_xpath = "//input[@id='searchforbooks_title']"
         search_buttom_xpath = "//button[@class='searchforbooks_search_button']"
 
-        for i, topic_item in enumerate(self.topic_list):
-            # # TESTING: Stop after processing first 3 items
-            # if i == 2:
-            #     break
-            # # END TESTING
-
-            try:
-                self.logger.debug(
-                    f"parse(): Processing {self.topic}: {topic_item}"
-                    f" ({i + 1}/{len(self.topic_list)})"
-                )
+        try:
+            self.logger.debug(
+                f"parse_topic(): Processing {self.topic}: {topic_item}"
+                f" ({index + 1}/{len(self.topic_list)})"
+            )
 
-                search_box = self.driver.find_element(By.XPATH, input_xpath)
-                search_box.click()
+            search_box = self.driver.find_element(By.XPATH, self.SEARCH_BOX_XPATH)
+            search_box.click()
 
-                # Clear the search box
-                search_box.send_keys(Keys.CONTROL + "a")  # Select all
-                search_box.send_keys(Keys.DELETE)  # Delete
-                time.sleep(0.5)  # Brief wait for field to clear
+            # Clear the search box
+            search_box.send_keys(Keys.CONTROL + "a")  # Select all
+            search_box.send_keys(Keys.DELETE)  # Delete
+            self.wait.until(lambda driver: not search_box.get_attribute("value"))
 
-                # Send the search query
-                search_box.send_keys(topic_item)
-                search_box.send_keys(Keys.RETURN)
+            # Send the search query
+            search_box.send_keys(topic_item)
+            search_url = self.driver.current_url
+            self.wait_politely()
+            search_box.send_keys(Keys.RETURN)
 
-                # Click the search button
-                search_button = self.driver.find_element(By.XPATH, search_buttom_xpath)
-                search_button.click()
+            # Click the search button
+            search_button = self.driver.find_element(By.XPATH, search_buttom_xpath)
+            search_button.click()
 
-                # Wait for search results page to load before parsing
-                time.sleep(3)
+            # Wait for the search results page before parsing
+            self.wait.until(EC.url_changes(search_url))
 
-                yield from self.parse_search_results(topic_item, i)
-                time.sleep(2)
+            for result in self.parse_search_results(topic_item, index):
+                if not isinstance(result, scrapy.Request):
+                    self.checkpoint.stage(result, topic_item)
+                yield result
 
-                self.logger.debug(
-                    f"parse(): Completed processing {topic_item}"
-                    f" ({i + 1}/{len(self.topic_list)})"
-                )
+            self.watermarks.touch(topic_item)
+            self.checkpoint.topic_done(topic_item)
+            self.logger.debug(
+                f"parse_topic(): Completed processing {topic_item}"
+                f" ({index + 1}/{len(self.topic_list)})"
+            )
 
-            except selenium.common.exceptions.TimeoutException as e:
-                self.logger.error(
-                    f"parse(): Timeout while processing"
-                    f" {self.topic} {topic_item}: {e}"
-                )
-            except selenium.common.exceptions.NoSuchElementException as e:
-                self.logger.error(
-                    f"parse(): Element not found while processing"
-                    f" {self.topic} {topic_item}: {e}"
-                )
-            except Exception as e:
-                self.logger.error(
-                    f"parse(): Failed to process"
-                    f" {self.topic} {topic_item},"
-                    f" error: {str(e)}",
-                    exc_info=True,
-                )
+        except selenium.common.exceptions.TimeoutException as e:
+            self.logger.error(
+                f"parse_topic(): Timeout while processing"
+                f" {self.topic} {topic_item}: {e}"
+            )
+        except selenium.common.exceptions.NoSuchElementException as e:
+            self.logger.error(
+                f"parse_topic(): Element not found while processing"
+                f" {self.topic} {topic_item}: {e}"
+            )
+        except Exception as e:
+            self.logger.error(
+                f"parse_topic(): Failed to process"
+                f" {self.topic} {topic_item},"
+                f" error: {str(e)}",
+                exc_info=True,
+            )
 
-    def parse_search_results(self, topic_item: str, series_index: int):
+    def parse_search_results(self, topic_item: str, series_index: int, page: int = 1):
         """Parse the search results page to extract book detail urls.
 
         Parse each search results page to find book detail urls and their release dates.
         If a book's release date is not newer than the last recorded release date,
-        it will be skipped.
+        it will be skipped. Once every result on a page is known, the search
+        for the topic ends without loading the following pages.
 
         Args:
             topic_item (str): The current topic item being processed.
             series_index (int): The index of the current series in topic_list.
+            page (int, optional): The number of the search results page.
 
         Yields:
             JpComicItem: Item containing the extracted comic information.
@@ -189,18 +194,19 @@ class BooksJpSpider(scrapy.Spider):
             f"{self.driver.current_url}"
         )
 
-        time.sleep(2)
+        if self.skip_done_page(topic_item, page):
+            yield from self._parse_next_page(topic_item, series_index, page)
+            return
 
         # Get book detail urls
-        urls_xpath = "//a[@class='result_list_button']"
         urls = None
         volume_release_date_xpath = (
-            "//div[" "@class='result_list_discription_publishdate']"
+            "//div[@class='result_list_discription_publishdate']"
         )
         volume_release_dates = None
         try:
             urls = self.wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, urls_xpath))
+                EC.presence_of_all_elements_located((By.XPATH, self.RESULT_XPATH))
             )
             volume_release_dates = self.wait.until(
                 EC.presence_of_all_elements_located(
@@ -225,6 +231,13 @@ class BooksJpSpider(scrapy.Spider):
 
         # Parse each result url
         n = len(urls)
+        known = 0
+        release_cutoff = self.release_cutoff(topic_item, series_index)
+        release_dates = [
+            self._get_book_release_date(release_date.get_attribute("innerHTML"))
+            for release_date in volume_release_dates
+        ]
+        below_cutoff = 0
         for i in range(n):
             # # TESTING: Stop after processing first 3 urls
             # if i == 2:
@@ -232,23 +245,27 @@ class BooksJpSpider(scrapy.Spider):
             # # END TESTING
 
             # Skip if we already have this or newer volume
-            current_release_date = self._get_book_release_date(
-                volume_release_dates[i].get_attribute("innerHTML")
+            current_release_date = release_dates[i]
+            key = (
+                watermark_key(urls[i].get_attribute("href"))
+                if self.watermarks.enabled
+                else None
             )
-            if (
+            date_known = bool(
                 current_release_date
-                and self.last_release_dates
-                and series_index is not None
-                and series_index < len(self.last_release_dates)
-            ):
-                if current_release_date <= self.last_release_dates[series_index]:
-                    self.logger.debug(
-                        "parse_search_results(): Skipping url"
-                        f"{i + 1}/{n} - already have this volume\n"
-                        f"current_release_date: {current_release_date},"
-                        f" last_release_date: {self.last_release_dates[series_index]}"
-                    )
-                    continue
+                and release_cutoff
+                and current_release_date <= release_cutoff
+            )
+            if date_known or self.watermarks.has_key(topic_item, key):
+                self.logger.debug(
+                    "parse_search_results(): Skipping url"
+                    f"{i + 1}/{n} - already have this volume\n"
+                    f"current_release_date: {current_release_date},"
+                    f" release_cutoff: {release_cutoff}"
+                )
+                known += 1
+                below_cutoff += date_known
+                continue
 
             self.logger.debug(f"parse_search_results(): Processing url {i + 1}/{n}")
 
@@ -256,35 +273,78 @@ class BooksJpSpider(scrapy.Spider):
             item = JpComicItem()
             item[f"{self.topic}"] = topic_item
 
-            yield from self.parse_detail_info(urls[i], item)
-            time.sleep(2)
+            if self.fetch_details_over_http:
+                # Detail pages are addressable, let the downloader fetch them
+                self.checkpoint.stage(item, topic_item)
+                yield scrapy.Request(
+                    urls[i].get_attribute("href"),
+                    callback=self.parse_detail_page,
+                    errback=self.detail_page_failed,
+                    cb_kwargs={
+                        "item": item,
+                        "release_date": current_release_date,
+                        "key": key,
+                    },
+                )
+                continue
+
+            for result in self.parse_detail_info(urls[i], item):
+                if result.get("detail_url"):
+                    self.watermarks.stage(result, topic_item, current_release_date, key)
+                yield result
 
             self.logger.debug(
-                "parse_search_results(): Completed processing url" f"{i + 1}/{n}"
+                f"parse_search_results(): Completed processing url{i + 1}/{n}"
             )
             # Refresh urls list after navigating back to avoid stale element reference
             urls = self.wait.until(
-                EC.presence_of_all_elements_located((By.XPATH, urls_xpath))
+                EC.presence_of_all_elements_located((By.XPATH, self.RESULT_XPATH))
             )
-            time.sleep(2)
+
+        self.count_skipped(known)
+        self.checkpoint.page_done(topic_item, page)
 
         # # Go to next page
         # # TESTING: Stop after first page
         # return
         # # END TESTING
 
-        next_button_xpath = "//button[@aria-label='1ページ後に進む']"
+        reason = self._pagination_stop_reason(n, known, below_cutoff)
+        if reason:
+            self.stop_paginating(
+                topic_item,
+                reason,
+                bool(self.driver.find_elements(By.XPATH, self.NEXT_PAGE_XPATH)),
+            )
+            return
+        yield from self._parse_next_page(topic_item, series_index, page)
+
+    def _parse_next_page(self, topic_item: str, series_index: int, page: int):
+        """Go to the next search results page and parse it.
+
+        Args:
+            topic_item (str): The current topic item being processed.
+            series_index (int): The index of the current series in topic_list.
+            page (int): The number of the current search results page.
+
+        Yields:
+            JpComicItem: Item containing the extracted comic information.
+        """
         try:
             next_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, next_button_xpath))
+                EC.element_to_be_clickable((By.XPATH, self.NEXT_PAGE_XPATH))
             )
+            self.wait_politely()
+            results = self.driver.find_elements(By.XPATH, self.RESULT_XPATH)
             next_button.click()
-            time.sleep(2)
+            # The results are replaced without the URL necessarily changing
+            if results:
+                self.wait.until(EC.staleness_of(results[0]))
             self.logger.debug(
                 "parse_search_results(): Navigated to next page of"
                 f"search results for {self.topic} {topic_item}"
             )
-            yield from self.parse_search_results(topic_item, series_index)
+            yield from self.parse_search_results(topic_item, series_index, page + 1)
         except selenium.common.exceptions.TimeoutException as e:
             self.logger.error(
                 f"parse_search_results(): Timeout because"
@@ -313,12 +373,13 @@ class BooksJpSpider(scrapy.Spider):
             Exception: If any error occurs during parsing.
         """
         self.logger.debug(
-            f"parse_detail_info(): Parsing comic info from" f"{self.driver.current_url}"
+            f"parse_detail_info(): Parsing comic info from{self.driver.current_url}"
         )
 
         product_desc = None
         topic_prevent = None
         try:
+            self.wait_politely()
             url.click()
             # Check if the topic is present in the detail page or if it's a e-book
             topic_prevent_xpath = self.target_info
@@ -341,7 +402,7 @@ class BooksJpSpider(scrapy.Spider):
         except selenium.common.exceptions.TimeoutException as e:
             self.logger.error(f"""
                 parse_detail_info(): Timeout while checking detail page for
-                {self.topic} {item[f'{self.topic}']}, \n
+                {self.topic} {item[f"{self.topic}"]}, \n
                 topic_prevent:       {topic_prevent}, \n
                 product_desc:        {product_desc}, \n
                 error:               {e}
@@ -395,17 +456,107 @@ class BooksJpSpider(scrapy.Spider):
             )
 
         finally:
-            time.sleep(20)
             # Go back to search results page
             self.driver.back()
             yield item
 
+    def detail_page_failed(self, failure):
+        """Give up on a detail page whose request failed.
+
+        The item of the request never reaches the pipeline, so it is removed
+        from the checkpoint; otherwise its topic could never be completed and
+        every resumed crawl would process it again. The volume is picked up
+        by a later crawl, as its watermark was not recorded.
+
+        Args:
+            failure (Failure): Failure of the detail page request.
+        """
+        request = failure.request
+        item = request.cb_kwargs["item"]
+        self.logger.error(
+            f"detail_page_failed(): Failed to fetch {request.url} for"
+            f" {self.topic} {item[f'{self.topic}']}: {failure.getErrorMessage()}"
+        )
+        self.checkpoint.discard(item)
+        self._inc_checkpoint_stat("checkpoint/detail_pages_failed")
+
+    def parse_detail_page(
+        self,
+        response: HtmlResponse,
+        item: JpComicItem,
+        release_date: str = None,
+        key: str = None,
+    ):
+        """Extract series and volume information from a fetched detail page.
+
+        HTTP counterpart of `parse_detail_info`, used when
+        `fetch_details_over_http` is set.
+
+        Args:
+            response (HtmlResponse): Response object of the book detail page.
+            item (JpComicItem): Item containing the extracted comic information.
+            release_date (str, optional): Release date from the search results.
+            key (str, optional): Watermark key of the detail url.
+
+        Yields:
+            JpComicItem: Item containing the extracted comic information.
+        """
+        self.logger.debug(
+            f"parse_detail_page(): Parsing comic info from {response.url}"
+        )
+
+        # Check if the topic is present in the detail page or if it's a e-book
+        topic_prevent = response.xpath(self.target_info)
+        product_desc = response.xpath("//div[@class='otherdata']")
+        if not topic_prevent or not product_desc:
+            self.logger.error(
+                f"parse_detail_page(): Detail page not recognized for"
+                f" {self.topic} {item[f'{self.topic}']}: {response.url}"
+            )
+            yield item
+            return
+        topic_prevent = self._inner_html(topic_prevent[0])
+        product_desc = self._inner_html(product_desc[0])
+        if item[f"{self.topic}"] not in topic_prevent or "JP-eコード" in product_desc:
+            yield item
+            return
+
+        item["detail_url"] = response.url
+        title_jp = response.xpath("//span[@class='bookdetail_title_text']")
+        publisher_jp = response.xpath("//div[@class='bookdetail_publisher']")
+        if not title_jp or not publisher_jp:
+            self.logger.error(
+                f"parse_detail_page(): Element not found on {response.url}"
+            )
+            yield item
+            return
+
+        item["title_jp"] = "".join(title_jp[0].xpath(".//text()").getall()).strip()
+        item["author_jp"] = [
+            self._inner_html(element).strip()
+            for element in response.xpath("//div[@class='bookdetail_author']")
+        ]
+        item["publisher_jp"] = "".join(
+            publisher_jp[0].xpath(".//text()").getall()
+        ).strip()
+        item["product_desc"] = product_desc.strip()
+
+        self.logger.info(
+            f"parse_detail_page(): Successfully parsed comic info from {response.url}"
+        )
+        self.watermarks.stage(item, item[f"{self.topic}"], release_date, key)
+        yield item
+
+    @staticmethod
+    def _inner_html(element):
+        """Return the serialized children of an element, like innerHTML."""
+        return "".join(element.xpath("./node()").getall())
+
     def closed(self, reason):
         """See base class."""
-        self.logger.info("Closing Selenium driver...")
-        if hasattr(self, "driver") and self.driver:
-            self.driver.quit()
-        self.logger.info("Selenium driver closed.")
+        self.logger.info("Closing Selenium drivers...")
+        self.close_sessions()
+        self.logger.info("Selenium drivers closed.")
 
 
 class BooksJpTitleTwSpider(BooksJpSpider):
@@ -418,20 +569,19 @@ class BooksJpTitleTwSpider(BooksJpSpider):
         """See base class."""
         super().__init__(*args, **kwargs)
         self.topic = "series_name"
-        self.topic_list = list(
+        # Titles and dates come from the same rows so they stay aligned
+        rows = list(
             Series.objects.filter(title_jp__isnull=False, author_jp=None).values_list(
-                "title_jp", flat=True
+                "title_jp", "latest_release_date_jp"
             )
         )
+        self.topic_list = [title_jp for title_jp, _ in rows]
         # self.topic_list = ["廻天のアルバス", "ブルーピリオド"]
         # self.topic_list = ["ブルーピリオド"]
         # self.last_release_dates = [datetime.now().strftime("%Y-%m-%d")]
         self.target_info = "//span[@class='bookdetail_title_text']"
         self.last_release_dates = [
-            date.strftime("%Y-%m-%d") if date else None
-            for date in Series.objects.filter(title_jp__isnull=False, author_jp=None)
-            .annotate(last_date=models.F("latest_volume_jp__release_date"))
-            .values_list("last_date", flat=True)
+            date.strftime("%Y-%m-%d") if date else None for _, date in rows
         ]
         self.logger.info(
             f"BooksJpTitleTwSpider: Loaded {len(self.topic_list)}"
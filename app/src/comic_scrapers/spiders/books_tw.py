@@ -1,12 +1,11 @@
-import time
-
 import scrapy
 from scrapy.http import Response
 
 from comic_scrapers.items import OrphanVolumeItem
+from comic_scrapers.watermarks import WatermarkMixin, watermark_key
 
 
-class BooksTWSpider(scrapy.Spider):
+class BooksTWSpider(WatermarkMixin, scrapy.Spider):
     """Spider to scrape book information from books.com.tw Taiwan site.
 
     This spider targets the new releases section to obtain book urls
@@ -24,6 +23,9 @@ class BooksTWSpider(scrapy.Spider):
         "RETRY_HTTP_CODES": [500, 502, 503, 504, 522, 524, 408, 429, 484],
     }
 
+    # Watermark topic under which product pages seen on the listing are kept
+    watermark_topic = "new_releases"
+
     def parse(self, response: Response):
         """Parse the new releases page to obtain book urls.
 
@@ -40,13 +42,45 @@ class BooksTWSpider(scrapy.Spider):
             self.logger.info(f"Parsing Books.com.tw Taiwan page: {response.url}")
             urls = response.xpath("//div[@class='type02_bd-a']/h4/a/@href").getall()
             self.logger.info(f"Found {len(urls)} book urls on the page.")
-            yield from response.follow_all(urls, self.parse_volume_info)
+
+            # Skip product pages fetched by a previous crawl
+            new_urls = [
+                url
+                for url in urls
+                if not self.watermarks.has_key(
+                    self.watermark_topic, watermark_key(response.urljoin(url))
+                )
+            ]
+            if len(new_urls) < len(urls):
+                self.logger.info(
+                    f"Skipping {len(urls) - len(new_urls)} already crawled book urls."
+                )
+                self.count_skipped(len(urls) - len(new_urls))
+            yield from response.follow_all(new_urls, self.parse_volume_info)
+            self.watermarks.touch(self.watermark_topic)
 
         except Exception as e:
             self.logger.error(
                 f"Failed to parse: {response.url}, error: {str(e)}", exc_info=True
             )
 
+    def _stage_watermark(self, item, response):
+        """Stage the product page of a parsed volume in the watermark.
+
+        Only volumes parsed without error are staged, so that a page that
+        failed to parse is fetched again by the next crawl.
+
+        Args:
+            item (OrphanVolumeItem): Item of the product page.
+            response (Response): Response object of the product page.
+        """
+        if self.watermarks.enabled:
+            # Remember the url the listing linked to, before any redirect
+            source_url = response.meta.get("redirect_urls", [response.url])[0]
+            self.watermarks.stage(
+                item, self.watermark_topic, key=watermark_key(source_url)
+            )
+
     def parse_volume_info(self, response: Response):
         """Parse the book volume page to extract volume ISBN.
 
@@ -71,6 +105,7 @@ class BooksTWSpider(scrapy.Spider):
                 "//div[@class='bd']/ul/li[contains(text(), 'EISBN：')]/text()"
             ).get():
                 self.logger.info(f"Skipping EPUB volume: {response.url}")
+                self._stage_watermark(item, response)
             else:
                 self.logger.info(f"Parsing volume info: {response.url}")
                 isbn_tw = response.xpath(
@@ -83,6 +118,7 @@ class BooksTWSpider(scrapy.Spider):
                     self.logger.info(
                         f"Successfully parsed volume ISBN {isbn_tw} from {response.url}"
                     )
+                    self._stage_watermark(item, response)
                 else:
                     self.logger.warning(f"No ISBN found on {response.url}")
 
@@ -95,5 +131,6 @@ class BooksTWSpider(scrapy.Spider):
             )
 
         finally:
-            time.sleep(20)
+            # Pacing is left to PolitenessMiddleware, which does not block the
+            # reactor like a sleep here would
             yield item
@@ -1,21 +1,29 @@
 import re
-import time
 
 import scrapy
 import selenium
 from comic.models import Series, Volume
-from scrapy.http import HtmlResponse
 from selenium import webdriver
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.common.keys import Keys
 from selenium.webdriver.support import expected_conditions as EC
-from selenium.webdriver.support.ui import WebDriverWait
 
+from comic_scrapers.checkpoints import CheckpointMixin
+from comic_scrapers.isbn_queue import IsbnQueue, IsbnStream, IsbnTopicQueue
 from comic_scrapers.items import OrphanMapItem
-
-
-class EsliteSpider(scrapy.Spider):
+from comic_scrapers.politeness import PoliteSpiderMixin
+from comic_scrapers.selenium_pool import SeleniumPoolMixin
+from comic_scrapers.watermarks import WatermarkMixin, watermark_key
+
+
+class EsliteSpider(
+    WatermarkMixin,
+    CheckpointMixin,
+    SeleniumPoolMixin,
+    PoliteSpiderMixin,
+    scrapy.Spider,
+):
     """Spider to scrape taiwan-version book information from eslite.com site.
 
     This spider targets the new releases section to obtain book urls
@@ -33,21 +41,14 @@ class EsliteSpider(scrapy.Spider):
     def __init__(self, *args, **kwargs):
         """See base class."""
         super().__init__(*args, **kwargs)
-        chrome_options = Options()
-        chrome_options.add_argument("--no-sandbox")
-        chrome_options.add_argument("--disable-dev-shm-usage")
-        chrome_options.add_argument("--start-maximized")
-
-        self.driver = webdriver.Remote(
-            command_executor="http://selenium:4444/wd/hub", options=chrome_options
-        )
-        self.wait = WebDriverWait(self.driver, 10)
         self.topic = None
         self.topic_list = None
         self.target_info = None
         self.last_release_dates = None
 
     DATE_REGEX = re.compile(r"([0-9]{4})年([0-9]{1,2})月([0-9]{1,2})日")
+    NEXT_PAGE_XPATH = "//div[@class='page-number']/div[@data-gid='pagination-next']"
+    SEARCH_BOX_XPATH = "//input[@name='query']"
 
     def _get_book_release_date(self, product_desc: str):
         """Process product_desc to extract release date for the current volume.
@@ -72,106 +73,98 @@ class EsliteSpider(scrapy.Spider):
             return f"{year}-{month.zfill(2)}-{day.zfill(2)}"
         return None
 
-    def start_requests(self):
+    def create_driver(self):
         """See base class."""
-        url = self.start_urls[0]
-        # Load the homepage without waiting for a specific element
-        self.driver.get(url)
-        time.sleep(2)
-
-        self.logger.debug(f"start_requests(): Loaded homepage {url}")
-
-        response = HtmlResponse(
-            url=self.driver.current_url,
-            body=self.driver.page_source,
-            encoding="utf-8",
-            request=scrapy.Request(url=url),
+        chrome_options = Options()
+        chrome_options.add_argument("--no-sandbox")
+        chrome_options.add_argument("--disable-dev-shm-usage")
+        chrome_options.add_argument("--start-maximized")
+
+        return webdriver.Remote(
+            command_executor=self.selenium_remote_url, options=chrome_options
         )
-        yield from self.parse(response)
 
-    def parse(self, response: HtmlResponse):
-        """Parse the homepage and perform searches for each topic item.
+    def parse_topic(self, topic_item: str, index: int):
+        """Search for one topic item and parse its search results.
+
+        Expects the current page to have the site's search box.
 
         Args:
-            response (HtmlResponse): Response object of the homepage.
+            topic_item (str): The topic item to search for.
+            index (int): The index of the topic item in topic_list.
 
         Yields:
             OrphanMapItem: Item containing the extracted mapping information.
-
-        Raises:
-            TimeoutException: If a timeout occurs because elements cannot be found.
-            NoSuchElementException: If expected HTML elements are not found.
-            Exception: If any error occurs during parsing.
         """
-        self.logger.debug(f"parse(): Start parsing from {response.url}")
-
-        input_xpath = "//input[@name='query']"
-
-        for i, topic_item in enumerate(self.topic_list):
-            # # TESTING: Stop after processing first 3 items
-            # if i == 2:
-            #     break
-            # # END TESTING
-
-            try:
-                self.logger.debug(
-                    f"parse(): Processing {self.topic} {topic_item}"
-                    f"({i + 1}/{len(self.topic_list)})"
-                )
+        try:
+            self.logger.debug(
+                f"parse_topic(): Processing {self.topic} {topic_item}"
+                f"({index + 1}/{len(self.topic_list)})"
+            )
 
-                search_box = self.driver.find_element(By.XPATH, input_xpath)
-                search_box.click()
+            search_box = self.driver.find_element(By.XPATH, self.SEARCH_BOX_XPATH)
+            search_box.click()
 
-                # Clear the search box
-                search_box.send_keys(Keys.CONTROL + "a")  # Select all
-                search_box.send_keys(Keys.DELETE)  # Delete
-                time.sleep(0.5)  # Brief wait for field to clear
+            # Clear the search box
+            search_box.send_keys(Keys.CONTROL + "a")  # Select all
+            search_box.send_keys(Keys.DELETE)  # Delete
+            self.wait.until(lambda driver: not search_box.get_attribute("value"))
 
-                # Send the search query
-                search_box.send_keys(topic_item)
-                search_box.send_keys(Keys.RETURN)
+            # Send the search query
+            search_box.send_keys(topic_item)
+            search_url = self.driver.current_url
+            self.wait_politely()
+            search_box.send_keys(Keys.RETURN)
 
-                # Wait for search results page to load before parsing
-                time.sleep(3)
+            # Wait for the search results page before parsing
+            self.wait.until(EC.url_changes(search_url))
 
-                yield from self.parse_search_results(topic_item, i)
-                time.sleep(2)
+            for result in self.parse_search_results(topic_item, index):
+                self.checkpoint.stage(result, topic_item)
+                yield result
 
-                self.logger.debug(
-                    f"parse(): Completed processing item {topic_item}"
-                    f"({i + 1}/{len(self.topic_list)})"
-                )
+            self.watermarks.touch(topic_item)
+            self.checkpoint.topic_done(topic_item)
+            self.logger.debug(
+                f"parse_topic(): Completed processing item {topic_item}"
+                f"({index + 1}/{len(self.topic_list)})"
+            )
 
-            except selenium.common.exceptions.TimeoutException as e:
-                self.logger.error(
-                    f"parse(): Timeout while processing"
-                    f"{self.topic} {topic_item}: {e}"
-                )
-            except selenium.common.exceptions.NoSuchElementException as e:
-                self.logger.error(
-                    f"parse(): Element not found while processing"
-                    f"{self.topic} {topic_item}: {e}"
-                )
-            except Exception as e:
-                self.logger.error(
-                    f"parse(): Failed to process {self.topic} {topic_item},"
-                    f"error: {str(e)}",
-                    exc_info=True,
-                )
+        except selenium.common.exceptions.TimeoutException as e:
+            self.logger.error(
+                f"parse_topic(): Timeout while processing{self.topic} {topic_item}: {e}"
+            )
+        except selenium.common.exceptions.NoSuchElementException as e:
+            self.logger.error(
+                f"parse_topic(): Element not found while processing"
+                f"{self.topic} {topic_item}: {e}"
+            )
+        except Exception as e:
+            self.logger.error(
+                f"parse_topic(): Failed to process {self.topic} {topic_item},"
+                f"error: {str(e)}",
+                exc_info=True,
+            )
 
     def parse_search_results(
-        self, topic_item: str, series_index: int, prev_url: str = None
+        self,
+        topic_item: str,
+        series_index: int,
+        prev_url: str = None,
+        page: int = 1,
     ):
         """Parse the search results page to extract book detail urls.
 
         Parse each search results page to find book detail urls and their release dates.
         If a book's release date is not newer than the last recorded release date,
-        it will be skipped.
+        it will be skipped. Once every result on a page is known, the search
+        for the topic ends without loading the following pages.
 
         Args:
             topic_item (str): The current topic item being processed.
             series_index (int): The index of the series in topic_list.
             prev_url (str, optional): The URL of the previous search results page.
+            page (int, optional): The number of the search results page.
 
         Yields:
             OrphanMapItem: Item containing the extracted mapping information.
@@ -188,21 +181,25 @@ class EsliteSpider(scrapy.Spider):
             self.logger.info("No more pages to process")
             return
 
-        time.sleep(2)
         # Only click category filter on the first page (when prev_url is None)
         if prev_url is None:
             try:
                 category_tw = self.wait.until(
                     EC.element_to_be_clickable((By.XPATH, "//div[@title='中文書']"))
                 )
+                unfiltered_url = self.driver.current_url
                 category_tw.click()
-                time.sleep(2)
+                self.wait.until(EC.url_changes(unfiltered_url))
             except selenium.common.exceptions.TimeoutException as e:
                 self.logger.error(
                     f"parse_search_results(): Timeout while applying category filter"
                     f"for {self.topic} {topic_item}: {e}"
                 )
 
+        if self.skip_done_page(topic_item, page):
+            yield from self._parse_next_page(topic_item, series_index, page)
+            return
+
         # Get book detail urls
         urls_xpath = "//div[@class='item-wording-wrap']//a[@data-gid='title-link']"
         urls = None
@@ -235,6 +232,13 @@ class EsliteSpider(scrapy.Spider):
 
         # Parse each book url
         n = len(urls)
+        known = 0
+        release_cutoff = self.release_cutoff(topic_item, series_index)
+        release_dates = [
+            self._get_book_release_date(release_date.get_attribute("innerHTML"))
+            for release_date in volume_release_dates
+        ]
+        below_cutoff = 0
         for i in range(n):
             # # TESTING: Stop after processing first 3 urls
             # if i == 2:
@@ -242,23 +246,27 @@ class EsliteSpider(scrapy.Spider):
             # # END TESTING
 
             # Skip if we already have this or newer volume
-            current_release_date = self._get_book_release_date(
-                volume_release_dates[i].get_attribute("innerHTML")
+            current_release_date = release_dates[i]
+            key = (
+                watermark_key(urls[i].get_attribute("href"))
+                if self.watermarks.enabled
+                else None
             )
-            if (
+            date_known = bool(
                 current_release_date
-                and self.last_release_dates
-                and series_index is not None
-                and series_index < len(self.last_release_dates)
-            ):
-                if current_release_date <= self.last_release_dates[series_index]:
-                    self.logger.debug(
-                        f"parse_search_results(): Skipping url {i + 1}/{n}"
-                        "- already have this volume\n"
-                        f"current_release_date: {current_release_date},"
-                        f" last_release_date: {self.last_release_dates[series_index]}"
-                    )
-                    continue
+                and release_cutoff
+                and current_release_date <= release_cutoff
+            )
+            if date_known or self.watermarks.has_key(topic_item, key):
+                self.logger.debug(
+                    f"parse_search_results(): Skipping url {i + 1}/{n}"
+                    "- already have this volume\n"
+                    f"current_release_date: {current_release_date},"
+                    f" release_cutoff: {release_cutoff}"
+                )
+                known += 1
+                below_cutoff += date_known
+                continue
 
             self.logger.debug(f"parse_search_results(): Processing url {i + 1}/{n}")
 
@@ -267,8 +275,10 @@ class EsliteSpider(scrapy.Spider):
             item[f"{self.topic}"] = topic_item
             item["search_url"] = self.driver.current_url
 
-            yield from self.parse_detail_info(urls[i], item)
-            time.sleep(2)
+            for result in self.parse_detail_info(urls[i], item):
+                if result.get("detail_url"):
+                    self.watermarks.stage(result, topic_item, current_release_date, key)
+                yield result
 
             self.logger.debug(
                 f"parse_search_results(): Completed processing url {i + 1}/{n}"
@@ -277,24 +287,52 @@ class EsliteSpider(scrapy.Spider):
             urls = self.wait.until(
                 EC.presence_of_all_elements_located((By.XPATH, urls_xpath))
             )
-            time.sleep(2)
+
+        self.count_skipped(known)
+        self.checkpoint.page_done(topic_item, page)
 
         # Go to next page
         # # TESTING: Stop after first page
         # return
         # # END TESTING
 
+        reason = self._pagination_stop_reason(n, known, below_cutoff)
+        if reason:
+            self.stop_paginating(
+                topic_item,
+                reason,
+                bool(self.driver.find_elements(By.XPATH, self.NEXT_PAGE_XPATH)),
+            )
+            return
+        yield from self._parse_next_page(topic_item, series_index, page)
+
+    def _parse_next_page(self, topic_item: str, series_index: int, page: int):
+        """Go to the next search results page and parse it.
+
+        Args:
+            topic_item (str): The current topic item being processed.
+            series_index (int): The index of the series in topic_list.
+            page (int): The number of the current search results page.
+
+        Yields:
+            OrphanMapItem: Item containing the extracted mapping information.
+        """
         prev_url = self.driver.current_url
-        next_button_xpath = (
-            "//div[@class='page-number']" "/div[@data-gid='pagination-next']"
-        )
         try:
             next_button = self.wait.until(
-                EC.element_to_be_clickable((By.XPATH, next_button_xpath))
+                EC.element_to_be_clickable((By.XPATH, self.NEXT_PAGE_XPATH))
             )
+            self.wait_politely()
             next_button.click()
-            time.sleep(2)
-            yield from self.parse_search_results(topic_item, series_index, prev_url)
+            # Clicking the last page's next button leaves the URL unchanged
+            try:
+                self.wait.until(EC.url_changes(prev_url))
+            except selenium.common.exceptions.TimeoutException:
+                self.logger.info("No more pages to process")
+                return
+            yield from self.parse_search_results(
+                topic_item, series_index, prev_url, page + 1
+            )
         except selenium.common.exceptions.TimeoutException as e:
             self.logger.error(
                 f"parse_search_results(): Timeout because no next button found for"
@@ -322,13 +360,13 @@ class EsliteSpider(scrapy.Spider):
             Exception: If any error occurs during parsing.
         """
         self.logger.debug(
-            f"parse_detail_info(): Parsing series info from"
-            f"{self.driver.current_url}"
+            f"parse_detail_info(): Parsing series info from{self.driver.current_url}"
         )
 
         product_desc = None
         topic_prevent = None
         try:
+            self.wait_politely()
             url.click()
             topic_prevent_xpath = self.target_info
             topic_prevent_webelement = self.wait.until(
@@ -349,7 +387,7 @@ class EsliteSpider(scrapy.Spider):
         except selenium.common.exceptions.TimeoutException as e:
             self.logger.error(f"""
                 parse_detail_info(): Timeout while checking detail page for
-                {self.topic} {item[f'{self.topic}']}\n
+                {self.topic} {item[f"{self.topic}"]}\n
                 topic_prevent:       {topic_prevent}\n
                 product_desc:        {product_desc}\n
                 error:               {e}
@@ -409,21 +447,30 @@ class EsliteSpider(scrapy.Spider):
             )
 
         finally:
-            time.sleep(20)
             # Go back to search results page
             self.driver.back()
             yield item
 
     def closed(self, reason):
         """See base class."""
-        self.logger.info("Closing Selenium driver...")
-        if self.driver:
-            self.driver.quit()
-        self.logger.info("Selenium driver closed.")
+        self.logger.info("Closing Selenium drivers...")
+        self.close_sessions()
+        self.logger.info("Selenium drivers closed.")
 
 
 class EsliteISBNSpider(EsliteSpider):
-    """Spider to scrape Taiwanese book information from eslite.com by book ISBNs."""
+    """Spider to scrape Taiwanese book information from eslite.com by book ISBNs.
+
+    By default the spider maps every orphan TW volume. With the `mode=stream`
+    spider argument it instead maps the ISBNs queued by the pipeline while
+    `books_tw` runs, as they arrive (see `comic_scrapers.isbn_queue`).
+
+    Spider arguments:
+        mode (str): "batch" (default) or "stream".
+        upstream_done (threading.Event): In stream mode, set once the crawl
+            queueing ISBNs has ended, so that the spider stops when the queue
+            is empty instead of waiting for `ISBN_QUEUE_IDLE_TIMEOUT`.
+    """
 
     name = "eslite_isbn"
 
@@ -431,14 +478,60 @@ class EsliteISBNSpider(EsliteSpider):
         """See base class."""
         super().__init__(*args, **kwargs)
         self.topic = "isbn_tw"
-        self.topic_list = list(
-            Volume.objects.filter(
-                series__isnull=True, isbn__isnull=False, region="TW"
-            ).values_list("isbn", flat=True)
-        )
+        if self.streaming:
+            self.topic_list = []
+        else:
+            self.topic_list = list(
+                Volume.objects.filter(
+                    series__isnull=True, isbn__isnull=False, region="TW"
+                ).values_list("isbn", flat=True)
+            )
         self.target_info = "//div[@class='product-description-schema']"
         self.logger.info(
-            f"EsliteESBNSpider: Loaded {len(self.topic_list)} ISBNs to process."
+            "EsliteESBNSpider: Streaming ISBNs from the ISBN queue."
+            if self.streaming
+            else f"EsliteESBNSpider: Loaded {len(self.topic_list)} ISBNs to process."
+        )
+
+    @property
+    def streaming(self):
+        """bool: Whether ISBNs are taken from the ISBN queue as they arrive."""
+        return getattr(self, "mode", "batch") == "stream"
+
+    @property
+    def checkpointed(self):
+        """See base class."""
+        # The ISBN queue keeps the progress of a streaming crawl
+        return not self.streaming and super().checkpointed
+
+    def isbn_dead(self, isbn):
+        """Record an ISBN dropped from the queue after its last attempt.
+
+        Args:
+            isbn (str): The dropped ISBN.
+        """
+        self.logger.warning(
+            f"isbn_dead(): Dropped {self.topic} {isbn} from the ISBN queue after"
+            " its last attempt"
+        )
+        self._inc_stat("isbn_queue/dead")
+
+    def topic_queue(self):
+        """See base class."""
+        isbn_queue = IsbnQueue(
+            lease=float(self._get_setting("ISBN_QUEUE_LEASE", 1800)),
+            max_attempts=int(self._get_setting("ISBN_QUEUE_MAX_ATTEMPTS", 3)),
+            on_dead=self.isbn_dead,
+        )
+        if not self.streaming:
+            return IsbnTopicQueue(self.pending_topics(), isbn_queue)
+        return IsbnStream(
+            self.topic_list,
+            isbn_queue,
+            upstream_done=getattr(self, "upstream_done", None),
+            closing=self._pool_closing,
+            idle_timeout=float(self._get_setting("ISBN_QUEUE_IDLE_TIMEOUT", 600)),
+            poll_interval=float(self._get_setting("ISBN_QUEUE_POLL_INTERVAL", 5)),
         )
 
 
@@ -455,16 +548,15 @@ class EsliteTitleTwSpider(EsliteSpider):
             self.topic_list = topic_list
             self.last_release_dates = kwargs.get("last_release_dates")
         else:
-            self.topic_list = list(
+            # Titles and dates come from the same rows so they stay aligned
+            rows = list(
                 Series.objects.filter(title_tw__isnull=False).values_list(
-                    "title_tw", flat=True
+                    "title_tw", "latest_release_date_tw"
                 )
             )
+            self.topic_list = [title_tw for title_tw, _ in rows]
             self.last_release_dates = [
-                date.strftime("%Y-%m-%d") if date else None
-                for date in Series.objects.filter(title_tw__isnull=False).values_list(
-                    "latest_volume_tw__release_date", flat=True
-                )
+                date.strftime("%Y-%m-%d") if date else None for _, date in rows
             ]
         self.target_info = "//h1[@class='sans-font-semi-bold']"
         self.logger.info(
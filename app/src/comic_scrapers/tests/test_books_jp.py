@@ -5,6 +5,7 @@ from unittest.mock import MagicMock, patch
 
 from scrapy.http import HtmlResponse, Request
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
+from twisted.python.failure import Failure
 
 from comic_scrapers.items import JpComicItem
 from comic_scrapers.spiders.books_jp import BooksJpSpider, BooksJpTitleTwSpider
@@ -40,7 +41,7 @@ class TestBooksJpSpiderGetBookReleaseDate(unittest.TestCase):
 
 
 class TestBooksJpSpiderParse(unittest.TestCase):
-    """Test cases for the parse() method of BooksJpSpider."""
+    """Test cases for processing the topic_list of BooksJpSpider."""
 
     def setUp(self):
         """Set up test fixtures."""
@@ -52,10 +53,19 @@ class TestBooksJpSpiderParse(unittest.TestCase):
             # Mock driver and its methods
             self.spider.driver = MagicMock()
             self.spider.driver.current_url = "https://www.books.or.jp/"
+            self.spider.wait = MagicMock()
             self.spider.driver.page_source = "<html><body>Test</body></html>"
 
+    def parse_topics(self):
+        """Run parse_topic for every pending topic, as a pool worker does."""
+        return [
+            item
+            for index, topic_item in self.spider.pending_topics()
+            for item in self.spider.parse_topic(topic_item, index)
+        ]
+
     def test_parse_processes_topic_list(self):
-        """Test that parse() processes items from topic_list."""
+        """Test that every topic of topic_list is processed."""
         # Mock search box and button elements
         mock_search_box = MagicMock()
         mock_search_button = MagicMock()
@@ -78,13 +88,7 @@ class TestBooksJpSpiderParse(unittest.TestCase):
         ]
 
         with patch.object(self.spider, "parse_search_results", mock_parse):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
 
             # Should process all 3 items and yield 3 results
             self.assertEqual(
@@ -96,38 +100,26 @@ class TestBooksJpSpiderParse(unittest.TestCase):
             self.assertEqual(mock_parse.call_count, 3)
 
     def test_parse_handles_timeout_exception(self):
-        """Test that parse() handles TimeoutException gracefully."""
+        """Test that parse_topic() handles TimeoutException gracefully."""
         # Make find_element raise TimeoutException
         self.spider.driver.find_element.side_effect = TimeoutException("Timeout")
 
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
             # Should not raise exception
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
             # Should still complete without crashing
             self.assertIsInstance(results, list)
 
     def test_parse_handles_no_such_element_exception(self):
-        """Test that parse() handles NoSuchElementException gracefully."""
+        """Test that parse_topic() handles NoSuchElementException gracefully."""
         # Make find_element raise NoSuchElementException
         self.spider.driver.find_element.side_effect = NoSuchElementException(
             "Not found"
         )
 
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
             # Should not raise exception
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
             # Should still complete without crashing
             self.assertIsInstance(results, list)
 
@@ -415,13 +407,13 @@ class TestBooksJpTitleTwSpiderIntegration(unittest.TestCase):
         mock_date1 = datetime(2025, 12, 18)
         mock_date2 = datetime(2025, 12, 17)
 
-        # Mock Series.objects query - need to mock the full chain
+        # Mock Series.objects query: (title_jp, latest_release_date_jp) rows
         mock_queryset = MagicMock()
-        mock_annotated = MagicMock()
         mock_series.objects.filter.return_value = mock_queryset
-        mock_queryset.values_list.return_value = ["廻天のアルバス", "ブルーピリオド"]
-        mock_queryset.annotate.return_value = mock_annotated
-        mock_annotated.values_list.return_value = [mock_date1, mock_date2]
+        mock_queryset.values_list.return_value = [
+            ("廻天のアルバス", mock_date1),
+            ("ブルーピリオド", mock_date2),
+        ]
 
         spider = BooksJpTitleTwSpider()
 
@@ -429,6 +421,8 @@ class TestBooksJpTitleTwSpiderIntegration(unittest.TestCase):
         self.assertEqual(spider.topic, "series_name")
         self.assertEqual(len(spider.topic_list), 2)
         self.assertIn("廻天のアルバス", spider.topic_list)
+        # Dates stay aligned with their titles
+        self.assertEqual(spider.last_release_dates, ["2025-12-18", "2025-12-17"])
 
     @patch("comic_scrapers.spiders.books_jp.Series")
     @patch("comic_scrapers.spiders.books_jp.webdriver")
@@ -436,11 +430,8 @@ class TestBooksJpTitleTwSpiderIntegration(unittest.TestCase):
         """Test that BooksJpTitleTwSpider sets correct target_info xpath."""
         # Mock Series.objects query - need to mock the full chain
         mock_queryset = MagicMock()
-        mock_annotated = MagicMock()
         mock_series.objects.filter.return_value = mock_queryset
         mock_queryset.values_list.return_value = []
-        mock_queryset.annotate.return_value = mock_annotated
-        mock_annotated.values_list.return_value = []
 
         spider = BooksJpTitleTwSpider()
 
@@ -456,11 +447,8 @@ class TestBooksJpTitleTwSpiderIntegration(unittest.TestCase):
         """Test that BooksJpTitleTwSpider handles empty series list."""
         # Mock Series.objects query - need to mock the full chain
         mock_queryset = MagicMock()
-        mock_annotated = MagicMock()
         mock_series.objects.filter.return_value = mock_queryset
         mock_queryset.values_list.return_value = []
-        mock_queryset.annotate.return_value = mock_annotated
-        mock_annotated.values_list.return_value = []
 
         spider = BooksJpTitleTwSpider()
 
@@ -469,7 +457,7 @@ class TestBooksJpTitleTwSpiderIntegration(unittest.TestCase):
 
 
 class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
-    """Test cases for search button click functionality in parse() method."""
+    """Test cases for search button click functionality in parse_topic()."""
 
     def setUp(self):
         """Set up test fixtures."""
@@ -481,9 +469,10 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
             # Mock driver and its methods
             self.spider.driver = MagicMock()
             self.spider.driver.current_url = "https://www.books.or.jp/"
+            self.spider.wait = MagicMock()
 
     def test_parse_clicks_search_button(self):
-        """Test that parse() clicks the search button after entering query."""
+        """Test that parse_topic() clicks the search button after entering query."""
         # Mock search box and button elements
         mock_search_box = MagicMock()
         mock_search_button = MagicMock()
@@ -499,19 +488,13 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
 
         # Mock parse_search_results to avoid actual processing
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
-            list(self.spider.parse(response))
+            list(self.spider.parse_topic("廻天のアルバス", 0))
 
             # Verify search button was clicked
             mock_search_button.click.assert_called()
 
     def test_parse_sends_keys_to_search_box(self):
-        """Test that parse() sends the topic to search box."""
+        """Test that parse_topic() sends the topic to search box."""
         # Mock search box and button elements
         mock_search_box = MagicMock()
         mock_search_button = MagicMock()
@@ -527,13 +510,7 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
 
         # Mock parse_search_results to avoid actual processing
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
-            list(self.spider.parse(response))
+            list(self.spider.parse_topic("廻天のアルバス", 0))
 
             # Verify topic was sent to search box
             calls = [str(call) for call in mock_search_box.send_keys.call_args_list]
@@ -541,7 +518,7 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
             self.assertTrue(topic_sent, "Should send topic to search box")
 
     def test_parse_clears_search_box_before_typing(self):
-        """Test that parse() clears search box before entering new query."""
+        """Test that parse_topic() clears search box before entering new query."""
         # Mock search box and button elements
         mock_search_box = MagicMock()
         mock_search_button = MagicMock()
@@ -557,13 +534,7 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
 
         # Mock parse_search_results to avoid actual processing
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.books.or.jp/"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
-            list(self.spider.parse(response))
+            list(self.spider.parse_topic("廻天のアルバス", 0))
 
             # Verify search box was cleared (Ctrl+A and DELETE sent)
             self.assertGreater(
@@ -573,5 +544,136 @@ class TestBooksJpSpiderSearchButtonClick(unittest.TestCase):
             )
 
 
+DETAIL_PAGE_HTML = """
+<html><body>
+<span class="bookdetail_title_text">廻天のアルバス <b>７</b></span>
+<div class="bookdetail_author">著者</div>
+<div class="bookdetail_author">作</div>
+<div class="bookdetail_author">栗山 昇</div>
+<div class="bookdetail_publisher">出版社：集英社</div>
+<div class="otherdata"><p>ISBN：9784088843452</p><p>発売日：2025年3月4日</p></div>
+</body></html>
+"""
+
+
+class TestBooksJpSpiderHttpDetails(unittest.TestCase):
+    """Test cases for fetching detail pages as Scrapy requests."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        with patch("comic_scrapers.spiders.books_jp.webdriver"):
+            self.spider = BooksJpSpider(detail_mode="http")
+            self.spider.topic = "series_name"
+            self.spider.target_info = "//span[@class='bookdetail_title_text']"
+
+            self.spider.driver = MagicMock()
+            self.spider.driver.current_url = "https://www.books.or.jp/search"
+            self.spider.wait = MagicMock()
+
+    def make_response(self, body, isbn="9784088843452"):
+        url = f"https://www.books.or.jp/book-details/{isbn}"
+        return HtmlResponse(
+            url=url, request=Request(url=url), body=body.encode(), encoding="utf-8"
+        )
+
+    def test_parse_search_results_yields_detail_requests(self):
+        """Test that result links become requests instead of browser clicks."""
+        links = []
+        for isbn in ("9784088843452", "9784088843453"):
+            link = MagicMock()
+            link.get_attribute.return_value = (
+                f"https://www.books.or.jp/book-details/{isbn}"
+            )
+            links.append(link)
+        date = MagicMock()
+        date.get_attribute.return_value = "発売日：2025年12月18日"
+        self.spider.wait.until.side_effect = [
+            links,
+            [date, date],
+            TimeoutException("No next page"),
+        ]
+
+        with patch.object(self.spider, "parse_detail_info") as mock_detail:
+            results = list(
+                self.spider.parse_search_results("廻天のアルバス", series_index=0)
+            )
+
+        mock_detail.assert_not_called()
+        self.assertEqual(len(results), 2)
+        for link, request in zip(links, results):
+            link.click.assert_not_called()
+            self.assertIsInstance(request, Request)
+            self.assertEqual(request.url, link.get_attribute.return_value)
+            self.assertEqual(request.callback, self.spider.parse_detail_page)
+            self.assertEqual(request.errback, self.spider.detail_page_failed)
+            self.assertEqual(request.cb_kwargs["item"]["series_name"], "廻天のアルバス")
+
+    def test_detail_page_failed_discards_checkpoint_item(self):
+        """Test that a failed detail request no longer blocks its topic."""
+        item = JpComicItem(series_name="廻天のアルバス")
+        request = Request(
+            "https://www.books.or.jp/book-details/9784088843452",
+            cb_kwargs={"item": item, "release_date": None, "key": None},
+        )
+        failure = Failure(ConnectionRefusedError("Connection refused"))
+        failure.request = request
+        self.spider.crawler = MagicMock()
+
+        with patch.object(self.spider.checkpoint, "discard") as mock_discard:
+            self.spider.detail_page_failed(failure)
+
+        mock_discard.assert_called_once_with(item)
+        self.spider.crawler.stats.inc_value.assert_called_once_with(
+            "checkpoint/detail_pages_failed", 1, spider=self.spider
+        )
+
+    def test_parse_detail_page_extracts_fields(self):
+        """Test that parse_detail_page() fills the same fields as Selenium."""
+        item = JpComicItem(series_name="廻天のアルバス")
+
+        results = list(
+            self.spider.parse_detail_page(self.make_response(DETAIL_PAGE_HTML), item)
+        )
+
+        self.assertEqual(len(results), 1)
+        item = results[0]
+        self.assertEqual(
+            item["detail_url"], "https://www.books.or.jp/book-details/9784088843452"
+        )
+        self.assertEqual(item["title_jp"], "廻天のアルバス ７")
+        self.assertEqual(item["author_jp"], ["著者", "作", "栗山 昇"])
+        self.assertEqual(item["publisher_jp"], "出版社：集英社")
+        self.assertIn("発売日：2025年3月4日", item["product_desc"])
+
+    def test_parse_detail_page_skips_ebooks(self):
+        """Test that parse_detail_page() yields a bare item for e-books."""
+        body = DETAIL_PAGE_HTML.replace("ISBN：", "JP-eコード：")
+        item = JpComicItem(series_name="廻天のアルバス")
+
+        results = list(self.spider.parse_detail_page(self.make_response(body), item))
+
+        self.assertEqual(len(results), 1)
+        self.assertNotIn("detail_url", results[0])
+
+    def test_parse_detail_page_handles_unknown_page(self):
+        """Test that parse_detail_page() yields a bare item for other pages."""
+        item = JpComicItem(series_name="廻天のアルバス")
+
+        results = list(
+            self.spider.parse_detail_page(self.make_response("<html></html>"), item)
+        )
+
+        self.assertEqual(len(results), 1)
+        self.assertNotIn("title_jp", results[0])
+
+    def test_detail_mode_defaults_to_selenium(self):
+        """Test that the detail mode falls back to BOOKS_JP_DETAIL_MODE."""
+        with patch("comic_scrapers.spiders.books_jp.webdriver"):
+            spider = BooksJpSpider()
+
+        self.assertTrue(self.spider.fetch_details_over_http)
+        self.assertFalse(spider.fetch_details_over_http)
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -125,7 +125,7 @@ class TestBooksTWSpiderParseVolumeInfo(unittest.TestCase):
             item["isbn_tw"], "9786260261665", "Should extract correct ISBN"
         )
         self.assertEqual(item["source_url"], url, "Should set correct source URL")
-        mock_sleep.assert_called_once_with(20)
+        mock_sleep.assert_not_called()
 
     @patch("time.sleep", return_value=None)
     def test_parse_volume_info_handles_missing_isbn(self, mock_sleep):
@@ -163,7 +163,7 @@ class TestBooksTWSpiderParseVolumeInfo(unittest.TestCase):
         self.assertIsInstance(item, OrphanVolumeItem, "Should yield OrphanVolumeItem")
         self.assertIsNone(item["isbn_tw"], "ISBN should be None when not found")
         self.assertEqual(item["source_url"], url, "Should set correct source URL")
-        mock_sleep.assert_called_once_with(20)
+        mock_sleep.assert_not_called()
 
     @patch("time.sleep", return_value=None)
     def test_parse_volume_info_epub_isbns_are_ignored(self, mock_sleep):
@@ -194,7 +194,7 @@ class TestBooksTWSpiderParseVolumeInfo(unittest.TestCase):
         self.assertNotIn(
             "isbn_tw", item, "Should not set isbn_tw field for EPUB volumes"
         )
-        mock_sleep.assert_called_once_with(20)
+        mock_sleep.assert_not_called()
 
 
 if __name__ == "__main__":
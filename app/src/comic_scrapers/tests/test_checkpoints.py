@@ -0,0 +1,246 @@
+"""Unit tests for crawl checkpoints and resuming Selenium spiders."""
+
+from datetime import datetime, timezone
+from unittest.mock import MagicMock, patch
+
+from django.db import OperationalError
+from django.test import TestCase
+from scrapy import signals
+from scrapy.exceptions import DropItem
+from scrapy.http import Request
+from selenium.common.exceptions import TimeoutException
+from twisted.internet import defer
+
+from comic_scrapers.checkpoints import CheckpointStore
+from comic_scrapers.items import JpComicItem
+from comic_scrapers.models import CrawlCheckpoint
+from comic_scrapers.pipelines import ComicScrapersPipeline
+from comic_scrapers.spiders.books_jp import BooksJpSpider
+from comic_scrapers.tests.test_watermarks import make_crawler
+
+
+class TestCheckpointStore(TestCase):
+    """Test cases for recording, saving and loading crawl progress."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.crawler = make_crawler()
+        self.store = CheckpointStore("books_jp")
+        self.store.bind(self.crawler, ["廻天のアルバス", "ブルーピリオド"])
+
+    def test_progress_waits_for_the_pipeline(self):
+        """Test that a page counts once its items were stored."""
+        first, second = JpComicItem(), JpComicItem()
+        self.store.stage(first, "ブルーピリオド")
+        self.store.page_done("ブルーピリオド", 1)
+        self.store.stage(second, "ブルーピリオド")
+        self.store.page_done("ブルーピリオド", 2)
+
+        self.store.save()
+        self.assertEqual(CrawlCheckpoint.objects.get(source="books_jp").pages, {})
+
+        self.store.item_processed(first)
+        self.store.save()
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.pages, {"ブルーピリオド": 1})
+
+        self.store.item_processed(second)
+        self.store.topic_done("ブルーピリオド")
+        self.store.save()
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, ["ブルーピリオド"])
+        self.assertEqual(row.pages, {})
+
+    def test_items_of_other_topics_do_not_block(self):
+        """Test that a topic does not wait for the items of another topic."""
+        self.store.stage(JpComicItem(), "廻天のアルバス")
+        self.store.topic_done("ブルーピリオド")
+
+        self.store.save()
+
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, ["ブルーピリオド"])
+
+    def test_failed_item_keeps_topic_incomplete(self):
+        """Test that a topic with an item the pipeline failed on is redone."""
+        item = JpComicItem()
+        self.store.stage(item, "ブルーピリオド")
+        self.store.page_done("ブルーピリオド", 1)
+        self.store.topic_done("ブルーピリオド")
+        self.store.item_failed(item)
+
+        self.store.save()
+
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, [])
+        self.assertEqual(row.pages, {})
+
+    def test_discarded_items_do_not_block(self):
+        """Test that items of failed or dropped requests let a topic complete."""
+        failed, dropped = JpComicItem(), JpComicItem()
+        self.store.stage(failed, "ブルーピリオド")
+        self.store.stage(dropped, "ブルーピリオド")
+        self.store.topic_done("ブルーピリオド")
+
+        self.store.discard(failed)
+        self.store.request_dropped(
+            Request(
+                "https://www.books.or.jp/book-details/1", cb_kwargs={"item": dropped}
+            )
+        )
+        self.store.save()
+
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, ["ブルーピリオド"])
+
+    @patch(
+        "comic_scrapers.pipelines.deferToThread",
+        side_effect=lambda f, *args: defer.maybeDeferred(f, *args),
+    )
+    def test_item_of_failed_batch_stays_pending(self, mock_defer_to_thread):
+        """Test that an item whose batch write failed keeps its topic open."""
+        pipeline = ComicScrapersPipeline(batch_size=2)
+        spider = MagicMock()
+        item = JpComicItem()
+        self.store.stage(item, "ブルーピリオド")
+        self.store.topic_done("ブルーピリオド")
+        failures = []
+
+        with patch.object(
+            pipeline, "_write_batch", side_effect=OperationalError("disk I/O error")
+        ):
+            pipeline.process_item(item, spider).addErrback(failures.append)
+            pipeline._flush(spider)
+
+        # The signal Scrapy sends for the exception the pipeline raised
+        failure = failures[0]
+        self.assertIsNone(failure.check(DropItem))
+        self.crawler.signals.send_catch_log(
+            signals.item_error, item=item, response=None, spider=spider, failure=failure
+        )
+        self.store.save()
+
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, [])
+
+    def test_close_deletes_checkpoint_of_complete_crawl(self):
+        """Test that the checkpoint is deleted once every topic is done."""
+        self.store.topic_done("廻天のアルバス")
+        self.store.topic_done("ブルーピリオド")
+
+        self.assertEqual(self.store.close("finished"), 0)
+        self.assertFalse(CrawlCheckpoint.objects.exists())
+
+    def test_close_keeps_checkpoint_with_topics_left(self):
+        """Test that a crawl finishing with topics left keeps its checkpoint."""
+        self.store.topic_done("廻天のアルバス")
+
+        self.assertEqual(self.store.close("finished"), 1)
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.completed_topics, ["廻天のアルバス"])
+
+    def test_bind_resets_or_resumes(self):
+        """Test that only a resumed crawl loads the previous checkpoint."""
+        started_at = datetime(2026, 10, 1, tzinfo=timezone.utc)
+        CrawlCheckpoint.objects.create(
+            source="books_jp",
+            completed_topics=["廻天のアルバス"],
+            pages={"ブルーピリオド": 3},
+            started_at=started_at,
+        )
+
+        store = CheckpointStore("books_jp")
+        store.bind(make_crawler(), ["廻天のアルバス"], resume=True)
+        self.assertTrue(store.resumed)
+        self.assertTrue(store.is_complete("廻天のアルバス"))
+        self.assertEqual(store.pages_done("ブルーピリオド"), 3)
+        self.assertEqual(store.started_at, started_at)
+
+        store = CheckpointStore("books_jp")
+        store.bind(make_crawler(), ["廻天のアルバス"])
+        self.assertFalse(store.is_complete("廻天のアルバス"))
+        self.assertFalse(CrawlCheckpoint.objects.exists())
+
+    def test_checkpoints_can_be_disabled(self):
+        """Test that CRAWL_CHECKPOINT_ENABLED=False records nothing."""
+        store = CheckpointStore("books_jp")
+        store.bind(
+            make_crawler({"CRAWL_CHECKPOINT_ENABLED": False}),
+            ["廻天のアルバス"],
+            resume=True,
+        )
+        store.topic_done("廻天のアルバス")
+
+        self.assertFalse(store.enabled)
+        self.assertFalse(store.is_complete("廻天のアルバス"))
+
+
+@patch("comic_scrapers.spiders.books_jp.webdriver")
+class TestSpiderResume(TestCase):
+    """Test cases for Selenium spiders resuming an interrupted crawl."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        CrawlCheckpoint.objects.create(
+            source="books_jp",
+            completed_topics=["廻天のアルバス"],
+            pages={"ブルーピリオド": 1},
+            started_at=datetime(2026, 10, 1, tzinfo=timezone.utc),
+        )
+
+    def make_spider(self, **kwargs):
+        crawler = make_crawler({"BOOKS_JP_DETAIL_MODE": "http"})
+        spider = BooksJpSpider.from_crawler(crawler, resume="true", **kwargs)
+        spider.topic = "series_name"
+        if spider.topic_list is None:
+            spider.topic_list = ["廻天のアルバス", "ブルーピリオド", "ダンジョン飯"]
+        return spider
+
+    def test_completed_topics_are_not_processed(self, mock_webdriver):
+        """Test that topics completed before the resume are left out."""
+        spider = self.make_spider()
+
+        self.assertEqual(
+            spider.pending_topics(), [(1, "ブルーピリオド"), (2, "ダンジョン飯")]
+        )
+        self.assertEqual(spider.crawler.stats.get_value("checkpoint/topics_skipped"), 1)
+
+    def test_completed_pages_are_skipped(self, mock_webdriver):
+        """Test that the search continues at the first page not done yet."""
+        spider = self.make_spider()
+        spider.driver = MagicMock()
+        spider.wait = MagicMock()
+        next_button = MagicMock()
+        link = MagicMock()
+        link.get_attribute.return_value = (
+            "https://www.books.or.jp/book-details/9784065000003"
+        )
+        release = MagicMock()
+        release.get_attribute.return_value = "発売日：2025年12月18日"
+        spider.wait.until.side_effect = [
+            next_button,
+            True,  # Results of the skipped page replaced
+            [link],
+            [release],
+            TimeoutException("last page"),
+        ]
+
+        requests = list(spider.parse_search_results("ブルーピリオド", 1))
+
+        next_button.click.assert_called_once()
+        self.assertEqual(len(requests), 1)
+        self.assertEqual(spider.crawler.stats.get_value("checkpoint/pages_skipped"), 1)
+        spider.checkpoint.item_processed(requests[0].cb_kwargs["item"])
+        spider.checkpoint.save()
+        row = CrawlCheckpoint.objects.get(source="books_jp")
+        self.assertEqual(row.pages, {"ブルーピリオド": 2})
+
+    def test_explicit_topic_list_is_not_checkpointed(self, mock_webdriver):
+        """Test that a crawl of a given topic list keeps the full crawl's checkpoint."""
+        spider = self.make_spider(topic_list=["廻天のアルバス"])
+        # BooksJpSpider leaves setting topic_list to its subclasses
+        spider.topic_list = ["廻天のアルバス"]
+
+        self.assertFalse(spider.checkpoint.enabled)
+        self.assertEqual(spider.pending_topics(), [(0, "廻天のアルバス")])
+        self.assertTrue(CrawlCheckpoint.objects.exists())
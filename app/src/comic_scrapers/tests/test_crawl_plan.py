@@ -0,0 +1,161 @@
+"""Unit tests for running the crawl stages in one process."""
+
+import unittest
+from unittest.mock import MagicMock
+
+import scrapy
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer
+
+from comic_scrapers.crawl_plan import STAGES, CrawlPlan, CrawlStage
+
+
+class FakeRunner:
+    """Crawler runner whose crawls end when the test fires their deferreds."""
+
+    def __init__(self):
+        self.crawls = {}
+        self.kwargs = {}
+
+    def create_crawler(self, spidercls):
+        crawler = MagicMock()
+        crawler.spidercls = spidercls
+        crawler.stats = MemoryStatsCollector(crawler)
+        return crawler
+
+    def crawl(self, crawler, **kwargs):
+        name = crawler.spidercls.name
+        self.crawls[name] = (crawler, defer.Deferred())
+        self.kwargs[name] = kwargs
+        return self.crawls[name][1]
+
+    def finish(self, name, reason="finished", items=0):
+        crawler, d = self.crawls[name]
+        crawler.stats.set_value("finish_reason", reason)
+        crawler.stats.set_value("item_scraped_count", items)
+        d.callback(None)
+
+
+def make_spider(name):
+    return type(f"{name}Spider", (scrapy.Spider,), {"name": name})
+
+
+class TestCrawlPlan(unittest.TestCase):
+    """Test cases for CrawlPlan."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.runner = FakeRunner()
+        self.now = 0.0
+        self.stages = [
+            CrawlStage("list", make_spider("list")),
+            CrawlStage("map", make_spider("map"), after=["list"], selenium=True),
+            CrawlStage("tw", make_spider("tw"), after=["map"], selenium=True),
+            CrawlStage("jp", make_spider("jp"), after=["map"], selenium=True),
+        ]
+
+    def make_plan(self, **kwargs):
+        return CrawlPlan(
+            self.runner, stages=self.stages, clock=lambda: self.now, **kwargs
+        )
+
+    def test_stages_start_once_their_inputs_exist(self):
+        """Test that stages are chained and independent stages run together."""
+        results = []
+        self.make_plan().run().addCallback(results.extend)
+
+        self.assertEqual(list(self.runner.crawls), ["list"])
+        self.now = 10.0
+        self.runner.finish("list", items=5)
+        self.assertEqual(list(self.runner.crawls), ["list", "map"])
+        self.now = 30.0
+        self.runner.finish("map")
+        self.assertEqual(list(self.runner.crawls), ["list", "map", "tw", "jp"])
+        self.now = 45.0
+        self.runner.finish("jp")
+        self.assertEqual(results, [])
+        self.now = 90.0
+        self.runner.finish("tw")
+
+        self.assertEqual([result.status for result in results], ["finished"] * 4)
+        self.assertEqual(
+            [result.duration for result in results], [10.0, 20.0, 60.0, 15.0]
+        )
+        self.assertEqual(results[0].items, 5)
+
+    def test_stages_after_an_unfinished_stage_are_skipped(self):
+        """Test that a shut down stage keeps the stages after it from starting."""
+        results = []
+        self.make_plan().run().addCallback(results.extend)
+
+        self.runner.finish("list", reason="shutdown")
+
+        self.assertEqual(list(self.runner.crawls), ["list"])
+        self.assertEqual(
+            [result.status for result in results],
+            ["shutdown", "skipped", "skipped", "skipped"],
+        )
+
+    def test_failed_stage_is_reported(self):
+        """Test that a crawl failing to start is reported with its error."""
+        results = []
+        self.make_plan().run().addCallback(results.extend)
+
+        self.runner.crawls["list"][1].errback(RuntimeError("database is down"))
+
+        self.assertEqual(results[0].status, "failed")
+        self.assertEqual(results[0].error, "database is down")
+        self.assertIn("database is down", str(results[0]))
+        self.assertEqual(results[1].status, "skipped")
+
+    def test_concurrent_selenium_stages_share_the_sessions(self):
+        """Test that concurrent Selenium stages split the server's sessions."""
+        plan = self.make_plan(selenium_sessions=3, resume=True)
+        plan.run()
+        self.runner.finish("list")
+        self.runner.finish("map")
+
+        self.assertEqual(self.runner.kwargs["list"], {})
+        self.assertEqual(self.runner.kwargs["map"], {"pool_size": 3, "resume": True})
+        self.assertEqual(self.runner.kwargs["tw"], {"pool_size": 2, "resume": True})
+        self.assertEqual(self.runner.kwargs["jp"], {"pool_size": 1, "resume": True})
+
+    def test_streaming_stage_runs_alongside_its_upstream(self):
+        """Test that a streaming stage starts at once and learns when upstream ends."""
+        self.stages[1] = CrawlStage(
+            "map", make_spider("map"), selenium=True, streams_from="list"
+        )
+        results = []
+        self.make_plan().run().addCallback(results.extend)
+
+        self.assertEqual(list(self.runner.crawls), ["list", "map"])
+        upstream_done = self.runner.kwargs["map"]["upstream_done"]
+        self.assertFalse(upstream_done.is_set())
+        self.runner.finish("list", items=5)
+        self.assertTrue(upstream_done.is_set())
+        self.assertEqual(list(self.runner.crawls), ["list", "map"])
+        self.runner.finish("map")
+        self.runner.finish("tw")
+        self.runner.finish("jp")
+
+        self.assertEqual([result.status for result in results], ["finished"] * 4)
+        self.assertEqual(results[0].items, 5)
+
+    def test_stages_must_follow_their_inputs(self):
+        """Test that a stage listed before its upstream stage is rejected."""
+        self.stages.reverse()
+
+        with self.assertRaises(ValueError):
+            self.make_plan().run()
+
+    def test_default_stages(self):
+        """Test the dependency chain of the project's spiders."""
+        self.assertEqual(
+            [(stage.name, stage.after) for stage in STAGES],
+            [
+                ("books_tw", ()),
+                ("eslite_isbn", ("books_tw",)),
+                ("eslite_title", ("eslite_isbn",)),
+                ("booksjp_title", ("eslite_isbn",)),
+            ],
+        )
@@ -4,7 +4,6 @@ import unittest
 from datetime import datetime
 from unittest.mock import MagicMock, patch
 
-from scrapy.http import HtmlResponse, Request
 from selenium.common.exceptions import NoSuchElementException, TimeoutException
 
 from comic_scrapers.items import OrphanMapItem
@@ -45,7 +44,7 @@ class TestEsliteSpiderGetBookReleaseDate(unittest.TestCase):
 
 
 class TestEsliteSpiderParse(unittest.TestCase):
-    """Test cases for the parse() method of EsliteSpider."""
+    """Test cases for processing the topic_list of EsliteSpider."""
 
     def setUp(self):
         """Set up test fixtures."""
@@ -57,10 +56,19 @@ class TestEsliteSpiderParse(unittest.TestCase):
             # Mock driver and its methods
             self.spider.driver = MagicMock()
             self.spider.driver.current_url = "https://www.eslite.com"
+            self.spider.wait = MagicMock()
             self.spider.driver.page_source = "<html><body>Test</body></html>"
 
+    def parse_topics(self):
+        """Run parse_topic for every pending topic, as a pool worker does."""
+        return [
+            item
+            for index, topic_item in self.spider.pending_topics()
+            for item in self.spider.parse_topic(topic_item, index)
+        ]
+
     def test_parse_processes_topic_list(self):
-        """Test that parse() processes items from topic_list."""
+        """Test that every topic of topic_list is processed."""
         # Mock search box element
         mock_search_box = MagicMock()
         self.spider.driver.find_element.return_value = mock_search_box
@@ -74,13 +82,7 @@ class TestEsliteSpiderParse(unittest.TestCase):
         ]
 
         with patch.object(self.spider, "parse_search_results", mock_parse):
-            url = "https://www.eslite.com"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
 
             # Should process 3 items and yield 3 results
             self.assertEqual(
@@ -92,38 +94,26 @@ class TestEsliteSpiderParse(unittest.TestCase):
             self.assertEqual(mock_parse.call_count, 3)
 
     def test_parse_handles_timeout_exception(self):
-        """Test that parse() handles TimeoutException gracefully."""
+        """Test that parse_topic() handles TimeoutException gracefully."""
         # Make find_element raise TimeoutException
         self.spider.driver.find_element.side_effect = TimeoutException("Timeout")
 
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.eslite.com"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
             # Should not raise exception
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
             # Should still complete without crashing
             self.assertIsInstance(results, list)
 
     def test_parse_handles_no_such_element_exception(self):
-        """Test that parse() handles NoSuchElementException gracefully."""
+        """Test that parse_topic() handles NoSuchElementException gracefully."""
         # Make find_element raise NoSuchElementException
         self.spider.driver.find_element.side_effect = NoSuchElementException(
             "Not found"
         )
 
         with patch.object(self.spider, "parse_search_results", return_value=iter([])):
-            url = "https://www.eslite.com"
-            request = Request(url=url)
-            response = HtmlResponse(
-                url=url, request=request, body=b"<html></html>", encoding="utf-8"
-            )
-
             # Should not raise exception
-            results = list(self.spider.parse(response))
+            results = self.parse_topics()
             # Should still complete without crashing
             self.assertIsInstance(results, list)
 
@@ -163,6 +153,7 @@ class TestEsliteSpiderParseSearchResults(unittest.TestCase):
         # Configure wait to return mocked elements
         self.spider.wait.until.side_effect = [
             mock_category,  # First call: category filter (for prev_url is None)
+            True,  # Filtered results page loaded
             [mock_url1, mock_url2, mock_url3],  # Second call: URLs
             [mock_date1, mock_date2, mock_date3],  # Third call: dates
             [mock_url1, mock_url2, mock_url3],  # After processing URL 1: refresh
@@ -213,6 +204,7 @@ class TestEsliteSpiderParseSearchResults(unittest.TestCase):
 
         self.spider.wait.until.side_effect = [
             mock_category,  # First call: category filter (for prev_url is None)
+            True,  # Filtered results page loaded
             [mock_url1, mock_url2],  # Second call: URLs
             [mock_date1, mock_date2],  # Third call: dates
             TimeoutException(
@@ -225,6 +217,21 @@ class TestEsliteSpiderParseSearchResults(unittest.TestCase):
         # Should skip all URLs due to old dates
         self.assertEqual(len(results), 0, "Should skip all URLs with old release dates")
 
+    def test_next_page_with_unchanged_url_ends_search(self):
+        """Test that a next button which does not change the URL ends the search."""
+        next_button = MagicMock()
+        self.spider.wait.until.side_effect = [
+            next_button,
+            TimeoutException("URL unchanged"),
+        ]
+
+        with patch.object(self.spider, "parse_search_results") as mock_parse:
+            results = list(self.spider._parse_next_page("測試漫畫", 0, 1))
+
+        next_button.click.assert_called_once()
+        mock_parse.assert_not_called()
+        self.assertEqual(results, [])
+
 
 class TestEsliteSpiderParseDetailInfo(unittest.TestCase):
     """Test cases for the parse_detail_info() method of EsliteSpider."""
@@ -396,10 +403,10 @@ class TestEsliteTitleTwSpiderIntegration(unittest.TestCase):
     @patch("comic_scrapers.spiders.eslite.webdriver")
     def test_eslite_title_tw_spider_initialization(self, mock_webdriver, mock_series):
         """Test that EsliteTitleTwSpider initializes with correct topic & topic_list."""
-        # Mock Series.objects query
-        mock_series.objects.filter.return_value.values_list.side_effect = [
-            ["測試漫畫1", "測試漫畫2"],  # title_tw
-            [datetime(2025, 12, 18), datetime(2025, 12, 17)],  # last_release_date
+        # Mock Series.objects query: (title_tw, latest_release_date_tw) rows
+        mock_series.objects.filter.return_value.values_list.return_value = [
+            ("測試漫畫1", datetime(2025, 12, 18)),
+            ("測試漫畫2", None),
         ]
 
         spider = EsliteTitleTwSpider()
@@ -409,6 +416,8 @@ class TestEsliteTitleTwSpiderIntegration(unittest.TestCase):
         self.assertEqual(len(spider.topic_list), 2)
         self.assertEqual(len(spider.last_release_dates), 2)
         self.assertIn("測試漫畫1", spider.topic_list)
+        # Dates stay aligned with their titles
+        self.assertEqual(spider.last_release_dates, ["2025-12-18", None])
 
     @patch("comic_scrapers.spiders.eslite.webdriver")
     def test_eslite_title_tw_spider_custom_topic_list(self, mock_webdriver):
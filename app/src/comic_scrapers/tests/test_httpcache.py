@@ -0,0 +1,236 @@
+"""Unit tests for the HTTP cache of catalog pages."""
+
+import tempfile
+import unittest
+from email.utils import formatdate
+from pathlib import Path
+from unittest.mock import MagicMock, patch
+
+from scrapy.http import HtmlResponse, Request, Response
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from scrapy.utils.request import RequestFingerprinter
+
+from comic_scrapers.httpcache import (
+    RevalidatingHttpCacheMiddleware,
+    SqliteCacheStorage,
+    TtlCachePolicy,
+)
+
+PRODUCT_URL = "https://www.books.com.tw/products/0011035314?loc=P_0004_001"
+LISTING_URL = "https://www.books.com.tw/web/sys_compub/books/16/?loc=P_0001_017"
+NOW = 1_790_000_000.0
+
+
+def make_settings(cachedir):
+    return Settings(
+        {
+            "HTTPCACHE_ENABLED": True,
+            "HTTPCACHE_POLICY": "comic_scrapers.httpcache.TtlCachePolicy",
+            "HTTPCACHE_STORAGE": "comic_scrapers.httpcache.SqliteCacheStorage",
+            "HTTPCACHE_DIR": cachedir,
+            "HTTPCACHE_TTL_RULES": {
+                r"^https?://www\.books\.com\.tw/products/": 30 * 24 * 3600,
+                r"^https?://www\.books\.com\.tw/web/sys_compub/": 3600,
+            },
+            "HTTPCACHE_IGNORE_QUERY_PARAMS": ["loc"],
+        }
+    )
+
+
+def make_response(url, age=0, status=200, **headers):
+    headers["Date"] = formatdate(NOW - age, usegmt=True)
+    return HtmlResponse(url, status=status, headers=headers, body=b"<html>ISBN</html>")
+
+
+def make_cached_request(url, age):
+    """Return a request whose cached response was stored `age` seconds ago."""
+    return Request(url, meta={"httpcache_stored_at": NOW - age})
+
+
+@patch("comic_scrapers.httpcache.time")
+class TestTtlCachePolicy(unittest.TestCase):
+    """Test cases for the per-URL TTLs and revalidation."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.policy = TtlCachePolicy(make_settings("httpcache"))
+
+    def test_only_matching_urls_are_cached(self, mock_time):
+        """Test that URLs without a TTL rule bypass the cache."""
+        self.assertTrue(self.policy.should_cache_request(Request(PRODUCT_URL)))
+        self.assertFalse(
+            self.policy.should_cache_request(
+                Request("https://www.books.or.jp/book-details/9784065000003")
+            )
+        )
+
+    def test_only_successful_responses_are_stored(self, mock_time):
+        """Test that rate-limited responses are not cached."""
+        request = Request(PRODUCT_URL)
+
+        self.assertTrue(
+            self.policy.should_cache_response(make_response(PRODUCT_URL), request)
+        )
+        self.assertFalse(
+            self.policy.should_cache_response(
+                make_response(PRODUCT_URL, status=484), request
+            )
+        )
+
+    def test_freshness_follows_the_ttl_of_the_url(self, mock_time):
+        """Test that product pages stay fresh longer than the listing."""
+        mock_time.time.return_value = NOW
+        day_old_product = make_response(PRODUCT_URL, age=24 * 3600)
+        day_old_listing = make_response(LISTING_URL, age=24 * 3600)
+
+        self.assertTrue(
+            self.policy.is_cached_response_fresh(
+                day_old_product, make_cached_request(PRODUCT_URL, 24 * 3600)
+            )
+        )
+        self.assertFalse(
+            self.policy.is_cached_response_fresh(
+                day_old_listing, make_cached_request(LISTING_URL, 24 * 3600)
+            )
+        )
+
+    def test_freshness_ignores_the_date_header(self, mock_time):
+        """Test that the age is counted from when the page was stored."""
+        mock_time.time.return_value = NOW
+        without_date = make_response(LISTING_URL)
+        del without_date.headers[b"Date"]
+        old_date = make_response(LISTING_URL, age=24 * 3600)
+
+        for cached in (without_date, old_date):
+            with self.subTest(date=cached.headers.get(b"Date")):
+                self.assertTrue(
+                    self.policy.is_cached_response_fresh(
+                        cached, make_cached_request(LISTING_URL, 60)
+                    )
+                )
+        self.assertFalse(
+            self.policy.is_cached_response_fresh(
+                make_response(LISTING_URL), make_cached_request(LISTING_URL, 7200)
+            )
+        )
+        self.assertFalse(
+            self.policy.is_cached_response_fresh(
+                make_response(LISTING_URL), Request(LISTING_URL)
+            )
+        )
+
+    def test_stale_pages_are_revalidated(self, mock_time):
+        """Test that a stale page is requested again with its validators."""
+        mock_time.time.return_value = NOW
+        cached = make_response(
+            PRODUCT_URL,
+            age=31 * 24 * 3600,
+            ETag='"abc"',
+            **{"Last-Modified": "Tue, 01 Sep 2026 00:00:00 GMT"},
+        )
+        request = make_cached_request(PRODUCT_URL, 31 * 24 * 3600)
+
+        self.assertFalse(self.policy.is_cached_response_fresh(cached, request))
+        self.assertEqual(request.headers[b"If-None-Match"], b'"abc"')
+        self.assertEqual(
+            request.headers[b"If-Modified-Since"], b"Tue, 01 Sep 2026 00:00:00 GMT"
+        )
+
+
+class TestSqliteCacheStorage(unittest.TestCase):
+    """Test cases for storing pages in one SQLite file."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.cachedir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.cachedir.cleanup)
+        self.settings = make_settings(self.cachedir.name)
+        self.spider = MagicMock()
+        self.spider.name = "books_tw"
+        self.spider.crawler.request_fingerprinter = RequestFingerprinter()
+        self.stats = MemoryStatsCollector(MagicMock())
+
+    def open_storage(self, **settings):
+        self.settings.setdict(settings)
+        storage = SqliteCacheStorage(self.settings)
+        storage.open_spider(self.spider)
+        self.addCleanup(lambda: storage.db and storage.close_spider(self.spider))
+        return storage
+
+    def test_responses_round_trip(self):
+        """Test that a stored page comes back with its status, headers and body."""
+        storage = self.open_storage()
+        response = make_response(PRODUCT_URL, ETag='"abc"')
+        storage.store_response(self.spider, Request(PRODUCT_URL), response)
+        storage.close_spider(self.spider)
+
+        storage = self.open_storage()
+        cached = storage.retrieve_response(self.spider, Request(PRODUCT_URL))
+
+        self.assertIsInstance(cached, HtmlResponse)
+        self.assertEqual(cached.status, 200)
+        self.assertEqual(cached.headers[b"ETag"], b'"abc"')
+        self.assertEqual(cached.body, b"<html>ISBN</html>")
+        self.assertEqual(
+            [path.name for path in Path(self.cachedir.name).iterdir()],
+            ["books_tw.sqlite"],
+        )
+
+    def test_ignored_query_params_share_an_entry(self):
+        """Test that a product linked from another listing position is a hit."""
+        storage = self.open_storage()
+        storage.store_response(
+            self.spider, Request(PRODUCT_URL), make_response(PRODUCT_URL)
+        )
+
+        other_position = PRODUCT_URL.replace("P_0004_001", "P_0004_074")
+        self.assertIsNotNone(
+            storage.retrieve_response(self.spider, Request(other_position))
+        )
+        self.assertIsNone(
+            storage.retrieve_response(
+                self.spider,
+                Request("https://www.books.com.tw/products/0011036936?loc=P_0004_001"),
+            )
+        )
+
+    @patch("comic_scrapers.httpcache.time")
+    def test_expired_entries_are_ignored(self, mock_time):
+        """Test that HTTPCACHE_EXPIRATION_SECS drops old entries."""
+        storage = self.open_storage(HTTPCACHE_EXPIRATION_SECS=60)
+        mock_time.time.return_value = NOW
+        storage.store_response(
+            self.spider, Request(PRODUCT_URL), make_response(PRODUCT_URL)
+        )
+
+        mock_time.time.return_value = NOW + 61
+        self.assertIsNone(storage.retrieve_response(self.spider, Request(PRODUCT_URL)))
+
+    @patch("comic_scrapers.httpcache.time")
+    def test_not_modified_restarts_the_ttl(self, mock_time):
+        """Test that a page revalidated with 304 is fresh for another TTL."""
+        middleware = RevalidatingHttpCacheMiddleware(self.settings, self.stats)
+        middleware.storage.open_spider(self.spider)
+        self.addCleanup(middleware.storage.close_spider, self.spider)
+        mock_time.time.return_value = NOW - 31 * 24 * 3600
+        stale = make_response(PRODUCT_URL, age=31 * 24 * 3600, ETag='"abc"')
+        middleware.storage.store_response(self.spider, Request(PRODUCT_URL), stale)
+
+        mock_time.time.return_value = NOW
+        request = Request(PRODUCT_URL)
+        self.assertIsNone(middleware.process_request(request, self.spider))
+        self.assertEqual(request.headers[b"If-None-Match"], b'"abc"')
+        not_modified = Response(
+            PRODUCT_URL,
+            status=304,
+            headers={"Date": formatdate(NOW, usegmt=True), "ETag": '"abc"'},
+        )
+        result = middleware.process_response(request, not_modified, self.spider)
+
+        self.assertEqual(result.status, 200)
+        self.assertEqual(result.body, b"<html>ISBN</html>")
+        self.assertEqual(self.stats.get_value("httpcache/refresh"), 1)
+        cached = middleware.process_request(Request(PRODUCT_URL), self.spider)
+        self.assertEqual(cached.body, b"<html>ISBN</html>")
+        self.assertEqual(self.stats.get_value("httpcache/hit"), 1)
@@ -0,0 +1,191 @@
+"""Unit tests for streaming orphan ISBNs from books_tw to eslite_isbn."""
+
+import threading
+from datetime import datetime, timedelta, timezone
+from unittest.mock import MagicMock, call
+
+from comic.models import Series, Volume
+from django.test import TestCase
+
+from comic_scrapers.isbn_queue import IsbnQueue, IsbnStream
+from comic_scrapers.items import OrphanVolumeItem
+from comic_scrapers.models import IsbnQueueEntry
+from comic_scrapers.pipelines import ComicScrapersPipeline
+
+ISBNS = ["9786260243098", "9786260243099", "9786260243100"]
+
+
+class Clock:
+    """Clock the tests move forward by hand."""
+
+    def __init__(self, now):
+        self.now = now
+
+    def __call__(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.now += seconds
+
+
+class TestIsbnQueue(TestCase):
+    """Test cases for claiming ISBNs from the queue."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        for isbn in ISBNS:
+            Volume.objects.create(isbn=isbn, region="TW", variant="")
+        IsbnQueue.enqueue(ISBNS)
+        self.clock = Clock(datetime(2026, 10, 1, tzinfo=timezone.utc))
+        self.queue = IsbnQueue(lease=60, max_attempts=2, clock=self.clock)
+
+    def test_claims_are_exclusive(self):
+        """Test that a claimed ISBN is not handed out again."""
+        IsbnQueue.enqueue(ISBNS[:1])
+
+        claimed = [self.queue.claim() for _ in range(4)]
+
+        self.assertEqual(claimed, [*ISBNS, None])
+        self.assertEqual(self.queue.waiting(), 0)
+
+    def test_done_and_released_isbns(self):
+        """Test that done ISBNs leave the queue and released ones come back."""
+        first, second = self.queue.claim(), self.queue.claim()
+        self.queue.done(first)
+        self.queue.release(second)
+
+        self.assertEqual(self.queue.claim(), second)
+        self.assertFalse(IsbnQueueEntry.objects.filter(isbn=first).exists())
+
+    def test_expired_claims_are_retried_up_to_max_attempts(self):
+        """Test that a claim not done within the lease is taken again."""
+        for _ in ISBNS:
+            self.queue.claim()
+        self.clock.now += timedelta(seconds=61)
+
+        self.assertEqual(self.queue.claim(), ISBNS[0])
+        self.clock.now += timedelta(seconds=61)
+        # ISBNS[0] used up its attempts
+        self.assertEqual(self.queue.claim(), ISBNS[1])
+
+    def test_isbns_out_of_attempts_are_dropped(self):
+        """Test that an ISBN whose last claim is released or expires is dropped."""
+        dead = MagicMock()
+        self.queue.on_dead = dead
+        for _ in range(2):
+            released = self.queue.claim()
+            self.queue.release(released)
+        self.clock.now += timedelta(seconds=61)
+        self.queue.claim()
+        self.clock.now += timedelta(seconds=61)
+        expired = self.queue.claim()
+        self.clock.now += timedelta(seconds=61)
+
+        self.assertEqual(self.queue.claim(), ISBNS[2])
+        self.assertEqual((released, expired), (ISBNS[0], ISBNS[1]))
+        self.assertEqual(
+            list(IsbnQueueEntry.objects.values_list("isbn", flat=True)), [ISBNS[2]]
+        )
+        self.assertEqual(dead.call_args_list, [call(ISBNS[0]), call(ISBNS[1])])
+
+    def test_mapped_volumes_are_dropped(self):
+        """Test that an ISBN mapped to a series in the meantime is not claimed."""
+        series = Series.objects.create(title_jp="ブルーピリオド")
+        Volume.objects.filter(isbn=ISBNS[0]).update(series=series)
+
+        self.assertEqual(self.queue.claim(), ISBNS[1])
+        self.assertFalse(IsbnQueueEntry.objects.filter(isbn=ISBNS[0]).exists())
+
+
+class TestIsbnStream(TestCase):
+    """Test cases for workers taking ISBNs while books_tw is running."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = Clock(0.0)
+        self.upstream_done = threading.Event()
+        self.topic_list = []
+
+    def make_stream(self):
+        return IsbnStream(
+            self.topic_list,
+            IsbnQueue(),
+            upstream_done=self.upstream_done,
+            idle_timeout=30,
+            poll_interval=5,
+            sleep=self.clock.sleep,
+            clock=self.clock,
+        )
+
+    def add_isbn(self, isbn):
+        Volume.objects.create(isbn=isbn, region="TW", variant="")
+        IsbnQueue.enqueue([isbn])
+
+    def test_waits_for_isbns_until_upstream_is_done(self):
+        """Test that the stream polls for new ISBNs and drains after upstream ends."""
+        sleep = self.clock.sleep
+
+        def add_while_waiting(seconds):
+            sleep(seconds)
+            self.add_isbn(ISBNS[1])
+            self.upstream_done.set()
+
+        self.clock.sleep = add_while_waiting
+        stream = self.make_stream()
+        self.add_isbn(ISBNS[0])
+
+        self.assertEqual(stream.take(), (0, ISBNS[0]))
+        stream.done(0, ISBNS[0])
+        self.assertEqual(stream.take(), (1, ISBNS[1]))
+        self.assertIsNone(stream.take())
+        self.assertEqual(self.topic_list, ISBNS[:2])
+        self.assertEqual(self.clock.now, 5)
+
+    def test_idle_timeout(self):
+        """Test that the stream ends when no ISBN arrives for the idle timeout."""
+        stream = self.make_stream()
+
+        self.assertIsNone(stream.take())
+        self.assertEqual(self.clock.now, 30)
+
+    def test_given_back_isbns_are_taken_again(self):
+        """Test that the ISBN of a failed worker goes back to the queue."""
+        self.add_isbn(ISBNS[0])
+        self.upstream_done.set()
+        stream = self.make_stream()
+
+        index, isbn = stream.take()
+        stream.give_back(index, isbn)
+
+        self.assertEqual(stream.remaining(), 1)
+        self.assertEqual(stream.take(), (1, ISBNS[0]))
+
+
+class TestPipelineEnqueue(TestCase):
+    """Test cases for the pipeline queueing new orphan volumes."""
+
+    def test_new_orphan_volumes_are_queued(self):
+        """Test that only the ISBNs of newly created volumes are queued."""
+        Volume.objects.create(isbn=ISBNS[0], region="TW", variant="")
+        items = []
+        for isbn in ISBNS[:2]:
+            item = OrphanVolumeItem()
+            item["isbn_tw"] = isbn
+            items.append(item)
+
+        ComicScrapersPipeline(batch_size=2, queue_isbns=True)._write_batch(
+            items, MagicMock()
+        )
+
+        self.assertEqual(
+            list(IsbnQueueEntry.objects.values_list("isbn", flat=True)), [ISBNS[1]]
+        )
+
+    def test_queue_disabled(self):
+        """Test that nothing is queued without ISBN_QUEUE_ENABLED."""
+        item = OrphanVolumeItem()
+        item["isbn_tw"] = ISBNS[0]
+
+        ComicScrapersPipeline(batch_size=2)._write_batch([item], MagicMock())
+
+        self.assertFalse(IsbnQueueEntry.objects.exists())
@@ -0,0 +1,44 @@
+"""Unit tests for the pipeline lookup cache."""
+
+import unittest
+
+from comic_scrapers.lookup_cache import LookupCache
+
+
+class TestLookupCache(unittest.TestCase):
+    """Test cases for the LookupCache class."""
+
+    def test_get_records_hits_and_misses(self):
+        """Test hit rate is computed from lookups."""
+        cache = LookupCache(maxsize=2)
+        cache.set("a", 1)
+
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+        self.assertEqual(cache.hit_rate, 0.5)
+
+    def test_evicts_least_recently_used(self):
+        """Test the least recently used entry is evicted when full."""
+        cache = LookupCache(maxsize=2)
+        cache.set("a", 1)
+        cache.set("b", 2)
+        cache.get("a")
+
+        cache.set("c", 3)
+
+        self.assertEqual(len(cache), 2)
+        self.assertEqual(cache.get("a"), 1)
+        self.assertIsNone(cache.get("b"))
+
+    def test_zero_size_disables_cache(self):
+        """Test nothing is stored when maxsize is 0."""
+        cache = LookupCache(maxsize=0)
+        cache.set("a", 1)
+
+        self.assertIsNone(cache.get("a"))
+        self.assertEqual(cache.hit_rate, 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
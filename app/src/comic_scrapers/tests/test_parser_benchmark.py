@@ -0,0 +1,78 @@
+"""Unit tests for the title and date parser benchmarks."""
+
+import unittest
+
+from comic_scrapers.benchmark import find_regressions
+from comic_scrapers.parser_benchmark import (
+    PARSER_BENCHMARKS,
+    ParserResult,
+    check_corpus,
+    get_parsers,
+    load_corpus,
+    run_parser_benchmark,
+    synthetic_cases,
+)
+
+
+class TestParserCorpus(unittest.TestCase):
+    """Test cases for the recorded parser corpus."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.corpus = load_corpus()
+        self.parsers = get_parsers()
+
+    def test_parsers_match_recorded_corpus(self):
+        """Test that every parser still returns what was recorded."""
+        for name, corpus_name in PARSER_BENCHMARKS.items():
+            with self.subTest(parser=name):
+                self.assertEqual(
+                    check_corpus(self.parsers[name], self.corpus[corpus_name]), []
+                )
+
+    def test_check_corpus_reports_differences(self):
+        """Test that changed results and errors are reported."""
+        cases = [
+            {"args": ["藍色時期 16 (首刷限定版)"], "expected": ["藍色時期", 16]},
+            {"args": ["藍色時期"], "error": "ValueError"},
+        ]
+
+        mismatches = check_corpus(lambda title: ("藍色時期", 16), cases)
+
+        self.assertEqual(
+            mismatches, ["['藍色時期']: [\"藍色時期\", 16], recorded ValueError"]
+        )
+
+    def test_synthetic_cases_are_reproducible(self):
+        """Test that the same seed generates the same cases."""
+        cases = synthetic_cases(self.corpus, "title_jp", 200, seed=1)
+
+        self.assertEqual(cases, synthetic_cases(self.corpus, "title_jp", 200, seed=1))
+        self.assertNotEqual(cases, synthetic_cases(self.corpus, "title_jp", 200))
+        self.assertEqual(len(cases), 200)
+        full_width = "０１２３４５６７８９"
+        self.assertTrue(any(set(full_width) & set(case["args"][0]) for case in cases))
+
+
+class TestParserBenchmark(unittest.TestCase):
+    """Test cases for measuring the parsers."""
+
+    def test_run_parser_benchmark_counts_errors(self):
+        """Test that a benchmark reports its calls, errors, speed and allocations."""
+        cases = [{"args": ["1"]}, {"args": ["x"]}]
+
+        result = run_parser_benchmark("int", int, cases, repeat=1)
+
+        self.assertEqual((result.calls, result.errors), (2, 1))
+        self.assertGreater(result.ops_per_sec, 0)
+        self.assertGreaterEqual(result.alloc_bytes, 0)
+
+    def test_find_regressions_with_allocations(self):
+        """Test that allocations regress when they grow, speed when it drops."""
+        results = [ParserResult("title_tw", ops_per_sec=900.0, alloc_bytes=500.0)]
+        baseline = {"title_tw": {"ops_per_sec": 1000.0, "alloc_bytes": 300.0}}
+
+        self.assertEqual(
+            find_regressions(results, baseline, max_regression=0.3),
+            ["title_tw alloc_bytes: 500.00, baseline 300.00"],
+        )
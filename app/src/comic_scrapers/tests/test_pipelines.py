@@ -1,12 +1,16 @@
 """Unit tests for the pipeline processing methods."""
 
 import unittest
+from datetime import date
 from unittest.mock import MagicMock, patch
 
+from comic.models import Publisher, Series, Volume
+from django.test import TestCase
 from scrapy.exceptions import DropItem
+from twisted.internet import defer
 
 from comic_scrapers.items import JpComicItem, OrphanMapItem, OrphanVolumeItem
-from comic_scrapers.pipelines import ComicScrapersPipeline
+from comic_scrapers.pipelines import ComicScrapersPipeline, ItemWriteError
 
 
 class TestGetBookTitleTw(unittest.TestCase):
@@ -326,6 +330,8 @@ class TestProcessJpComicItem(unittest.TestCase):
             title_jp="廻天のアルバス"
         )
         self.assertEqual(mock_series_obj.author_jp, "原案：牧 彰久; 絵：箭坪 幹")
+        mock_series.objects.filter.assert_called_with(pk=mock_series_obj.pk)
+        mock_series.objects.filter.return_value.refresh_summary.assert_called_once()
         self.assertEqual(result, item)
 
     def test_process_jp_comic_item_raises_drop_item_on_missing_detail_url(self):
@@ -352,5 +358,212 @@ class TestProcessJpComicItem(unittest.TestCase):
         self.assertIn("Invalid ISBN_JP", str(context.exception))
 
 
+def make_jp_item(isbn, number, release_date):
+    """Build a JpComicItem for the given volume."""
+    item = JpComicItem()
+    item["series_name"] = "廻天のアルバス"
+    item["title_jp"] = f"廻天のアルバス {number}"
+    item["author_jp"] = [
+        "",
+        "少年サンデーコミックス",
+        "原案：牧 彰久",
+        "絵：箭坪 幹",
+    ]
+    item["publisher_jp"] = "出版社：小学館"
+    item["detail_url"] = f"https://www.books.or.jp/book-details/{isbn}"
+    item["product_desc"] = f"発売日：{release_date}"
+    return item
+
+
+class TestBatchWriter(TestCase):
+    """Test cases for the batched writer mode."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.pipeline = ComicScrapersPipeline(batch_size=3)
+        self.spider = MagicMock()
+
+    def test_write_batch_creates_entities_in_bulk(self):
+        """Test a batch of JP items creates Publisher, Series and Volumes."""
+        items = [
+            make_jp_item("9784098500001", 1, "2024年1月18日"),
+            make_jp_item("9784098500002", 2, "2024年6月18日"),
+            make_jp_item("9784098500001", 1, "2024年1月18日"),
+        ]
+
+        results = self.pipeline._write_batch(items, self.spider)
+
+        self.assertEqual(results, items)
+        self.assertEqual(Publisher.objects.filter(name="小学館").count(), 1)
+        series = Series.objects.get(title_jp="廻天のアルバス")
+        self.assertEqual(series.author_jp, "原案：牧 彰久; 絵：箭坪 幹")
+        self.assertEqual(series.latest_volume_jp.isbn, "9784098500002")
+        self.assertEqual(series.volume_count_jp, 2)
+        self.assertEqual(series.latest_release_date_jp, date(2024, 6, 18))
+        self.assertEqual(Volume.objects.filter(series=series).count(), 2)
+
+    def test_write_batch_drops_invalid_items(self):
+        """Test failing items are dropped one by one without losing the batch."""
+        invalid = make_jp_item("9784098500003", 3, "2024年9月18日")
+        invalid["detail_url"] = "https://www.books.or.jp/book-details/episode"
+        valid = make_jp_item("9784098500002", 2, "2024年6月18日")
+
+        results = self.pipeline._write_batch([invalid, valid], self.spider)
+
+        self.assertIsInstance(results[0], DropItem)
+        self.assertEqual(results[1], valid)
+        self.assertEqual(
+            set(Volume.objects.values_list("isbn", flat=True)), {"9784098500002"}
+        )
+
+    @patch(
+        "comic_scrapers.pipelines.deferToThread",
+        side_effect=lambda f, *args: defer.maybeDeferred(f, *args),
+    )
+    def test_conflicting_volumes_match_per_item_mode(self, mock_defer_to_thread):
+        """Test a volume relisted under a new ISBN is dropped in both modes."""
+        stored = make_jp_item("9784098500001", 1, "2024年1月18日")
+        # Same series, volume number and variant as the stored volume
+        relisted = make_jp_item("9784098599999", 1, "2024年1月19日")
+        duplicate = make_jp_item("9784098588888", 2, "2024年6月19日")
+        valid = make_jp_item("9784098500002", 2, "2024年6月18日")
+        outcomes = {}
+        for batch_size in (1, 4):
+            with self.subTest(batch_size=batch_size):
+                Volume.objects.all().delete()
+                Series.objects.all().delete()
+                pipeline = ComicScrapersPipeline(batch_size=batch_size)
+                pipeline.process_item(stored, self.spider)
+                pipeline._flush(self.spider)
+                results = []
+                for item in (relisted, valid, duplicate, stored):
+                    d = pipeline.process_item(item, self.spider)
+                    d.addCallbacks(
+                        lambda _: results.append("kept"),
+                        lambda failure: results.append(type(failure.value).__name__),
+                    )
+                pipeline._flush(self.spider)
+
+                series = Series.objects.get(title_jp="廻天のアルバス")
+                outcomes[batch_size] = (
+                    results,
+                    sorted(
+                        Volume.objects.values_list(
+                            "isbn", "volume_number", "release_date"
+                        )
+                    ),
+                    series.latest_volume_jp.isbn,
+                    series.volume_count_jp,
+                )
+
+        self.assertEqual(outcomes[4], outcomes[1])
+        self.assertEqual(outcomes[1][0], ["DropItem", "kept", "DropItem", "kept"])
+        self.assertEqual(
+            outcomes[1][1],
+            [
+                ("9784098500001", 1, date(2024, 1, 18)),
+                ("9784098500002", 2, date(2024, 6, 18)),
+            ],
+        )
+        warnings = [str(call) for call in self.spider.logger.warning.call_args_list]
+        self.assertFalse(any("one by one" in warning for warning in warnings))
+
+    def test_write_batch_updates_orphan_volumes(self):
+        """Test orphan volumes and their mapping are written in bulk."""
+        volume_item = OrphanVolumeItem()
+        volume_item["isbn_tw"] = "9786260243098"
+        self.pipeline._write_batch([volume_item, volume_item], self.spider)
+
+        map_item = OrphanMapItem()
+        map_item["isbn_tw"] = "9786260243098"
+        map_item["title_jp"] = "ブルーピリオド"
+        map_item["title_tw"] = "藍色時期 16 (首刷限定版)"
+        map_item["author_tw"] = "作\n者：\n山口飛翔"
+        map_item["release_date_tw"] = "出\n版\n日\n期：\n2025/11/27"
+        map_item["publisher_tw"] = "出\n版\n社：\n東立出版社有限公司"
+        results = self.pipeline._write_batch([map_item], self.spider)
+
+        self.assertEqual(results, [map_item])
+        volume = Volume.objects.get(isbn="9786260243098")
+        self.assertEqual(volume.series.title_tw, "藍色時期")
+        self.assertEqual(volume.series.latest_volume_tw, volume)
+        self.assertEqual(volume.series.volume_count_tw, 1)
+        self.assertEqual(volume.publisher.name, "東立出版社有限公司")
+        self.assertEqual(volume.variant, "首刷限定版")
+        self.assertEqual(volume.release_date, date(2025, 11, 27))
+
+    @patch(
+        "comic_scrapers.pipelines.deferToThread",
+        side_effect=lambda f, *args: defer.maybeDeferred(f, *args),
+    )
+    def test_process_item_flushes_when_batch_is_full(self, mock_defer_to_thread):
+        """Test items are buffered until the batch fills up."""
+        items = [
+            make_jp_item(f"978409850000{i}", i, "2024年1月18日") for i in range(1, 4)
+        ]
+        results = []
+
+        deferreds = [self.pipeline.process_item(item, self.spider) for item in items]
+        for d in deferreds:
+            d.addCallback(results.append)
+
+        mock_defer_to_thread.assert_called_once()
+        self.assertEqual(results, items)
+        self.assertEqual(Volume.objects.count(), 3)
+
+
+class TestLookupCaches(TestCase):
+    """Test cases for the Publisher and Series lookup caches."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.stats = MagicMock()
+        self.pipeline = ComicScrapersPipeline(stats=self.stats)
+        self.spider = MagicMock()
+        self.item = make_jp_item("9784098500001", 1, "2024年1月18日")
+
+    def test_warmed_caches_serve_repeated_lookups(self):
+        """Test warmed caches are used and refreshed after each item."""
+        publisher = Publisher.objects.create(name="小学館", region="JP")
+        Series.objects.create(title_jp="廻天のアルバス", author_jp="")
+        self.pipeline._warm_lookup_caches(self.spider)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.pipeline._process_jp_comic_item(self.item, self.spider)
+
+        self.assertEqual(self.pipeline.publisher_ids.hits, 1)
+        self.assertEqual(self.pipeline.series_cache.hits, 1)
+        volume = Volume.objects.get(isbn="9784098500001")
+        self.assertEqual(volume.publisher, publisher)
+        cached = self.pipeline.series_cache.get("廻天のアルバス")
+        self.assertEqual(cached.latest_volume_jp, volume)
+        self.assertEqual(cached.author_jp, "原案：牧 彰久; 絵：箭坪 幹")
+
+    def test_failed_item_is_not_cached(self):
+        """Test a series is dropped from the cache when its item fails."""
+        Series.objects.create(title_jp="廻天のアルバス", author_jp="")
+        self.pipeline._warm_lookup_caches(self.spider)
+        item = make_jp_item("9784098500001", 1, "2024年13月1日")
+
+        with self.assertRaises(ItemWriteError):
+            self.pipeline._process_jp_comic_item(item, self.spider)
+
+        self.assertEqual(len(self.pipeline.series_cache), 0)
+
+    def test_close_spider_reports_hit_rate(self):
+        """Test cache hit rates are written to the crawl stats."""
+        self.pipeline.series_cache.set("廻天のアルバス", MagicMock())
+        self.pipeline.series_cache.get("廻天のアルバス")
+
+        self.pipeline.close_spider(self.spider)
+
+        self.stats.set_value.assert_any_call(
+            "pipeline/lookup_cache/series/hit_rate", 1.0
+        )
+        self.stats.set_value.assert_any_call(
+            "pipeline/lookup_cache/publisher/misses", 0
+        )
+
+
 if __name__ == "__main__":
     unittest.main()
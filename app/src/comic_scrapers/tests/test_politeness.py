@@ -0,0 +1,273 @@
+"""Unit tests for the politeness scheduler and middleware."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from scrapy.http import Request, Response
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer
+from twisted.trial.unittest import SynchronousTestCase
+
+from comic_scrapers.politeness import (
+    PolitenessMiddleware,
+    PolitenessScheduler,
+    PoliteSpiderMixin,
+    parse_retry_after,
+    politeness_key,
+)
+
+
+class FakeClock:
+    """Manually advanced monotonic clock."""
+
+    def __init__(self):
+        self.now = 100.0
+
+    def __call__(self):
+        return self.now
+
+
+class TestPolitenessKey(unittest.TestCase):
+    """Test cases for the politeness_key() function."""
+
+    def test_politeness_key_normalizes_urls_and_domains(self):
+        """Test URLs and domains of the same site share a key."""
+        self.assertEqual(
+            politeness_key("https://www.books.com.tw/web/x"), "books.com.tw"
+        )
+        self.assertEqual(politeness_key("www.Eslite.com"), "eslite.com")
+        self.assertEqual(politeness_key("books.or.jp"), "books.or.jp")
+
+
+class TestParseRetryAfter(unittest.TestCase):
+    """Test cases for the parse_retry_after() function."""
+
+    def test_parse_retry_after_accepts_seconds_and_dates(self):
+        """Test both forms of the header are turned into seconds."""
+        self.assertEqual(parse_retry_after(b"120"), 120.0)
+        self.assertEqual(
+            parse_retry_after(
+                "Thu, 01 Oct 2026 00:02:00 GMT", now=lambda: 1790812800.0
+            ),
+            120.0,
+        )
+        self.assertIsNone(parse_retry_after(None))
+        self.assertIsNone(parse_retry_after(b"soon"))
+
+
+class TestPolitenessScheduler(unittest.TestCase):
+    """Test cases for the PolitenessScheduler class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.clock = FakeClock()
+        self.scheduler = PolitenessScheduler(
+            min_interval=20,
+            max_delay=60,
+            domain_intervals={"www.books.or.jp": 5},
+            clock=self.clock,
+        )
+
+    def test_reserve_spaces_requests_by_min_interval(self):
+        """Test consecutive reservations are spaced by the minimum interval."""
+        delays = [self.scheduler.reserve("eslite.com") for _ in range(3)]
+
+        self.assertEqual(delays, [0, 20, 40])
+        self.assertEqual(self.scheduler.reserve("books.or.jp"), 0)
+        self.assertEqual(self.scheduler.reserve("books.or.jp"), 5)
+
+    def test_reserve_counts_elapsed_time(self):
+        """Test time spent since the last request is not waited again."""
+        self.scheduler.reserve("eslite.com")
+        self.clock.now += 15
+
+        self.assertEqual(self.scheduler.reserve("eslite.com"), 5)
+
+    def test_record_latency_never_goes_below_min_interval(self):
+        """Test latencies follow AutoThrottle above the minimum interval."""
+        self.scheduler.record_latency("eslite.com", 1.0)
+        self.assertEqual(self.scheduler.get_delay("eslite.com"), 20)
+
+        self.scheduler.record_latency("eslite.com", 40.0)
+        self.assertEqual(self.scheduler.get_delay("eslite.com"), 40)
+
+        # Error responses may only slow down
+        self.scheduler.record_latency("eslite.com", 20.0, status=500)
+        self.assertEqual(self.scheduler.get_delay("eslite.com"), 40)
+
+    def test_backoff_doubles_interval_up_to_max_delay(self):
+        """Test backoff doubles the interval and pushes back the next request."""
+        self.assertEqual(self.scheduler.backoff("eslite.com"), 40)
+        self.assertEqual(self.scheduler.reserve("eslite.com"), 40)
+        self.assertEqual(self.scheduler.backoff("eslite.com"), 60)
+
+    def test_backoff_waits_for_retry_after(self):
+        """Test a longer Retry-After pushes back the next request further."""
+        self.scheduler.backoff("eslite.com", retry_after=300)
+
+        self.assertEqual(self.scheduler.reserve("eslite.com"), 300)
+
+    def test_circuit_breaker_pauses_domain(self):
+        """Test repeated rate limiting pauses the domain until a success."""
+        self.scheduler.breaker_threshold = 3
+        self.scheduler.breaker_pause = 600
+        for _ in range(2):
+            self.scheduler.backoff("eslite.com")
+        self.assertEqual(self.scheduler.state("eslite.com")["circuit_breaks"], 0)
+
+        self.scheduler.backoff("eslite.com")
+        state = self.scheduler.state("eslite.com")
+        self.assertEqual(state["circuit_breaks"], 1)
+        self.assertEqual(state["paused_for"], 600)
+        self.assertEqual(self.scheduler.reserve("books.or.jp"), 0)
+
+        # Still rate limited after the pause: pause again at once
+        self.clock.now += 600
+        self.scheduler.backoff("eslite.com")
+        self.assertEqual(self.scheduler.state("eslite.com")["circuit_breaks"], 2)
+
+        self.scheduler.record_success("eslite.com")
+        self.scheduler.backoff("eslite.com")
+        self.assertEqual(self.scheduler.state("eslite.com")["strikes"], 1)
+        self.assertEqual(self.scheduler.state("eslite.com")["circuit_breaks"], 2)
+
+    def test_backoff_voids_reservations_within_it(self):
+        """Test a reservation falling within a backoff is moved after it."""
+        self.scheduler.breaker_threshold = 2
+        self.scheduler.breaker_pause = 600
+        self.scheduler.reserve_slot("eslite.com")
+        delay, reserved_at = self.scheduler.reserve_slot("eslite.com")
+        self.assertEqual((delay, reserved_at), (20, 120))
+        self.assertEqual(self.scheduler.reserve_slot("eslite.com", 120), (0, 120))
+
+        for _ in range(2):
+            self.scheduler.backoff("eslite.com")
+        self.clock.now += 20
+
+        self.assertEqual(self.scheduler.reserve_slot("eslite.com", 120), (580, 700))
+        self.assertEqual(self.scheduler.reserve_slot("eslite.com", 700), (0, 700))
+
+
+class TestPolitenessMiddleware(SynchronousTestCase):
+    """Test cases for the PolitenessMiddleware class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.scheduler = PolitenessScheduler(
+            min_interval=20, breaker_threshold=2, breaker_pause=600, clock=FakeClock()
+        )
+        self.stats = MemoryStatsCollector(MagicMock())
+        self.middleware = PolitenessMiddleware(
+            self.scheduler, backoff_http_codes=[429, 484], stats=self.stats
+        )
+        self.spider = MagicMock()
+        self.request = Request("https://www.books.com.tw/products/0011035314")
+
+    def test_process_response_backs_off_on_rate_limit(self):
+        """Test a 484 response doubles the interval of its site."""
+        response = Response(self.request.url, status=484, request=self.request)
+
+        result = self.middleware.process_response(self.request, response, self.spider)
+
+        self.assertIs(result, response)
+        self.assertEqual(self.scheduler.get_delay("books.com.tw"), 40)
+        self.spider.logger.warning.assert_called_once()
+
+    def test_process_response_records_backoff_state(self):
+        """Test the backoff state of a site is exposed in the stats."""
+        response = Response(
+            self.request.url,
+            status=429,
+            headers={"Retry-After": "900"},
+            request=self.request,
+        )
+
+        for _ in range(2):
+            self.middleware.process_response(self.request, response, self.spider)
+
+        stats = self.stats.get_stats()
+        self.assertEqual(stats["politeness/books.com.tw/rate_limited"], 2)
+        self.assertEqual(stats["politeness/books.com.tw/strikes"], 2)
+        self.assertEqual(stats["politeness/books.com.tw/circuit_breaks"], 1)
+        self.assertEqual(stats["politeness/books.com.tw/paused_for"], 900)
+
+        ok = Response(self.request.url, status=200, request=self.request)
+        self.middleware.process_response(self.request, ok, self.spider)
+        self.assertEqual(self.scheduler.state("books.com.tw")["strikes"], 0)
+
+    def test_process_response_records_latency(self):
+        """Test download latencies raise the interval of its site."""
+        self.request.meta["download_latency"] = 30.0
+        response = Response(self.request.url, status=200, request=self.request)
+
+        self.middleware.process_response(self.request, response, self.spider)
+
+        self.assertEqual(self.scheduler.get_delay("books.com.tw"), 30)
+
+    def test_process_request_waits_again_when_breaker_opens(self):
+        """Test a request waiting when the breaker opens waits out the pause."""
+        clock = self.scheduler._clock
+        waits = []
+
+        def defer_later(reactor, delay, callable):
+            waits.append(delay)
+            if len(waits) == 1:
+                # Two rate-limited responses arrive while the request waits
+                for _ in range(2):
+                    self.scheduler.backoff("books.com.tw")
+            clock.now += delay
+            return defer.succeed(callable())
+
+        self.scheduler.reserve("books.com.tw")
+        with patch("comic_scrapers.politeness.task.deferLater", defer_later):
+            result = defer.Deferred.fromCoroutine(
+                self.middleware.process_request(self.request, self.spider)
+            )
+
+        self.assertIsNone(self.successResultOf(result))
+        self.assertEqual(waits, [20, 580])
+        self.assertEqual(clock.now, 700)
+
+
+class TestPoliteSpiderMixin(unittest.TestCase):
+    """Test cases for the PoliteSpiderMixin class."""
+
+    def test_wait_politely_waits_again_when_breaker_opens(self):
+        """Test a page load waiting when the breaker opens waits out the pause."""
+        clock = FakeClock()
+        scheduler = PolitenessScheduler(
+            min_interval=20, breaker_threshold=2, breaker_pause=600, clock=clock
+        )
+        spider = PoliteSpiderMixin()
+        spider.allowed_domains = ["eslite.com"]
+        spider.crawler = MagicMock()
+        spider.logger = MagicMock()
+        sleeps = []
+
+        def sleep(delay):
+            sleeps.append(delay)
+            if len(sleeps) == 1:
+                for _ in range(2):
+                    scheduler.backoff("eslite.com")
+            clock.now += delay
+
+        scheduler.reserve("eslite.com")
+        with (
+            patch.object(PolitenessScheduler, "for_crawler", return_value=scheduler),
+            patch("comic_scrapers.politeness.time.sleep", sleep),
+        ):
+            waited = spider.wait_politely()
+
+        self.assertEqual(sleeps, [20, 580])
+        self.assertEqual(waited, 600)
+
+    def test_wait_politely_without_crawler_does_not_wait(self):
+        """Test spiders created outside a crawl are not throttled."""
+        spider = PoliteSpiderMixin()
+        spider.allowed_domains = ["eslite.com"]
+
+        self.assertEqual(spider.wait_politely(), 0.0)
+
+
+if __name__ == "__main__":
+    unittest.main()
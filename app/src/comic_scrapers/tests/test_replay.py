@@ -0,0 +1,169 @@
+"""Unit tests for recording, replaying and benchmarking crawls offline."""
+
+import asyncio
+import gzip
+import tempfile
+import unittest
+import urllib.error
+import urllib.request
+from pathlib import Path
+from unittest.mock import MagicMock
+
+from comic.models import Volume
+from django.test import TestCase
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+
+from comic_scrapers.benchmark import (
+    BenchmarkResult,
+    BooksJpReplaySpider,
+    DbWriteCounter,
+    find_regressions,
+)
+from comic_scrapers.items import JpComicItem
+from comic_scrapers.replay import (
+    FixtureArchive,
+    ReplayProxyMiddleware,
+    ReplayRecorderMiddleware,
+    ReplayServer,
+    replay_key,
+)
+from comic_scrapers.tests.test_watermarks import make_crawler
+
+PRODUCT_URL = "https://www.books.com.tw/products/0011035314?loc=P_0004_001"
+DETAIL_URL = "https://www.books.or.jp/book-details/9784065000003"
+
+
+class TestFixtureArchive(unittest.TestCase):
+    """Test cases for storing recorded responses in a zip file."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.tmpdir = tempfile.TemporaryDirectory()
+        self.addCleanup(self.tmpdir.cleanup)
+        self.path = Path(self.tmpdir.name, "replay.zip")
+
+    def test_archive_round_trip(self):
+        """Test that responses come back from the file by URL, whatever the scheme."""
+        archive = FixtureArchive()
+        body = gzip.compress("藍色時期".encode())
+        archive.add(PRODUCT_URL, 200, {"Content-Encoding": ["gzip"]}, body)
+        archive.add(DETAIL_URL, 200, {}, b"<html/>", {"topic": "ブルーピリオド"})
+        archive.save(self.path)
+
+        archive = FixtureArchive.load(self.path)
+
+        entry = archive.get(PRODUCT_URL.replace("https", "http"))
+        self.assertEqual(entry["body"], body)
+        self.assertEqual(entry["headers"], {"Content-Encoding": ["gzip"]})
+        self.assertEqual(
+            archive.get(DETAIL_URL)["context"], {"topic": "ブルーピリオド"}
+        )
+        self.assertEqual(archive.urls(host="www.books.or.jp"), [DETAIL_URL])
+
+    def test_replay_key_keeps_query(self):
+        """Test that pages differing in their query are kept apart."""
+        self.assertEqual(
+            replay_key(PRODUCT_URL),
+            "www.books.com.tw/products/0011035314?loc=P_0004_001",
+        )
+        self.assertEqual(replay_key("http://www.books.or.jp"), "www.books.or.jp/")
+
+    def test_recorder_keeps_topic_and_saves_on_close(self):
+        """Test that a recorded detail page keeps the topic it was fetched for."""
+        crawler = make_crawler({"REPLAY_RECORD_PATH": str(self.path)})
+        middleware = ReplayRecorderMiddleware.from_crawler(crawler)
+        spider = MagicMock(topic="series_name")
+        item = JpComicItem(series_name="ブルーピリオド")
+        request = Request(DETAIL_URL, cb_kwargs={"item": item})
+        response = HtmlResponse(DETAIL_URL, body=b"<html/>", request=request)
+
+        self.assertIs(middleware.process_response(request, response, spider), response)
+        middleware.spider_closed(spider)
+
+        entry = FixtureArchive.load(self.path).get(DETAIL_URL)
+        self.assertEqual(entry["context"], {"topic": "ブルーピリオド"})
+        self.assertEqual(entry["body"], b"<html/>")
+
+
+class TestReplayServer(unittest.TestCase):
+    """Test cases for serving recorded responses locally."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        archive = FixtureArchive()
+        archive.add(
+            PRODUCT_URL,
+            200,
+            {"Content-Type": ["text/html"], "Transfer-Encoding": ["chunked"]},
+            b"<html>ISBN</html>",
+        )
+        self.server = ReplayServer(archive).start()
+        self.addCleanup(self.server.stop)
+        self.opener = urllib.request.build_opener(
+            urllib.request.ProxyHandler({"http": self.server.url})
+        )
+
+    def test_serves_recorded_responses_as_a_proxy(self):
+        """Test that a proxied request gets the response recorded for its URL."""
+        with self.opener.open(PRODUCT_URL.replace("https", "http")) as response:
+            self.assertEqual(response.status, 200)
+            self.assertEqual(response.read(), b"<html>ISBN</html>")
+            self.assertEqual(response.headers["Content-Type"], "text/html")
+            self.assertIsNone(response.headers["Transfer-Encoding"])
+
+        with self.assertRaises(urllib.error.HTTPError) as cm:
+            self.opener.open("http://www.books.com.tw/products/missing")
+        self.assertEqual(cm.exception.code, 404)
+        self.assertEqual((self.server.served, self.server.missed), (1, 1))
+
+    def test_proxy_middleware_routes_requests_to_the_server(self):
+        """Test that HTTPS requests are downgraded and proxied."""
+        middleware = ReplayProxyMiddleware.from_crawler(
+            MagicMock(settings=Settings({"REPLAY_SERVER_URL": self.server.url}))
+        )
+
+        request = middleware.process_request(Request(PRODUCT_URL), MagicMock())
+        self.assertEqual(request.url, PRODUCT_URL.replace("https", "http"))
+        self.assertIsNone(middleware.process_request(request, MagicMock()))
+        self.assertEqual(request.meta["proxy"], self.server.url)
+
+
+class TestBenchmark(TestCase):
+    """Test cases for the benchmark helpers."""
+
+    def test_db_write_counter_counts_written_rows(self):
+        """Test that inserts and updates are counted and reads are not."""
+        with DbWriteCounter() as writes:
+            Volume.objects.create(isbn="9786260243098", region="TW", variant="")
+            Volume.objects.update(variant="首刷限定版")
+            list(Volume.objects.all())
+        Volume.objects.all().delete()
+
+        self.assertEqual(writes.count, 2)
+
+    def test_find_regressions(self):
+        """Test that only rates dropping beyond the tolerance are reported."""
+        results = [BenchmarkResult("books_tw", seconds=2.0, pages=20, items=10)]
+        baseline = {"books_tw": {"pages_per_sec": 12.0, "items_per_sec": 8.0}}
+
+        self.assertEqual(
+            find_regressions(results, baseline, max_regression=0.3),
+            ["books_tw items_per_sec: 5.00, baseline 8.00"],
+        )
+        self.assertEqual(results[0].rates()["pages_per_sec"], 10.0)
+
+    def test_books_jp_replay_requests_recorded_detail_pages(self):
+        """Test that the replay spider starts from the recorded detail pages."""
+        archive = FixtureArchive()
+        archive.add(DETAIL_URL, 200, {}, b"<html/>", {"topic": "ブルーピリオド"})
+        archive.add("https://www.books.or.jp/", 200, {}, b"<html/>")
+        spider = BooksJpReplaySpider(archive=archive)
+
+        async def collect():
+            return [request async for request in spider.start()]
+
+        requests = asyncio.run(collect())
+
+        self.assertEqual([request.url for request in requests], [DETAIL_URL])
+        self.assertEqual(requests[0].cb_kwargs["item"]["series_name"], "ブルーピリオド")
@@ -0,0 +1,100 @@
+"""Unit tests for the delayed retries of rate-limited requests."""
+
+import unittest
+from unittest.mock import MagicMock, patch
+
+from scrapy.http import Request, Response
+from scrapy.settings import Settings
+from scrapy.statscollectors import MemoryStatsCollector
+from twisted.internet import defer
+
+from comic_scrapers.retry_middleware import Custom484RetryMiddleware
+
+
+@patch("comic_scrapers.retry_middleware.task")
+class TestCustom484RetryMiddleware(unittest.TestCase):
+    """Test cases for the Custom484RetryMiddleware class."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.stats = MemoryStatsCollector(MagicMock())
+        self.middleware = Custom484RetryMiddleware(
+            Settings(
+                {
+                    "RETRY_TIMES": 3,
+                    "RETRY_HTTP_CODES": [500, 429, 484],
+                    "RETRY_BACKOFF_HTTP_CODES": [429, 484],
+                    "RETRY_BACKOFF_BASE": 30,
+                    "RETRY_BACKOFF_MAX": 100,
+                    "RETRY_AFTER_MAX": 3600,
+                    "RETRY_EXCEPTIONS": [IOError],
+                }
+            ),
+            stats=self.stats,
+            rng=lambda: 0.5,
+        )
+        self.spider = MagicMock()
+        self.request = Request("https://www.books.com.tw/products/0011035314")
+
+    def process(self, response, request=None):
+        results = []
+        defer.ensureDeferred(
+            self.middleware.process_response(
+                request or self.request, response, self.spider
+            )
+        ).addCallback(results.append)
+        return results[0]
+
+    def test_backoff_delay_is_exponential_and_jittered(self, mock_task):
+        """Test the delay doubles per retry, keeping half of it fixed."""
+        response = Response(self.request.url, status=484)
+
+        self.assertEqual(
+            [self.middleware.backoff_delay(n, response) for n in (1, 2, 3)],
+            [22.5, 45.0, 75.0],
+        )
+        self.middleware._random = lambda: 0.0
+        self.assertEqual(self.middleware.backoff_delay(1, response), 15.0)
+
+    def test_backoff_delay_honours_retry_after(self, mock_task):
+        """Test a Retry-After header longer than the backoff is waited."""
+        response = Response(
+            self.request.url, status=429, headers={"Retry-After": "300"}
+        )
+        self.assertEqual(self.middleware.backoff_delay(1, response), 300.0)
+
+        response.headers["Retry-After"] = "86400"
+        self.assertEqual(self.middleware.backoff_delay(1, response), 3600.0)
+
+    def test_rate_limited_request_is_retried_after_a_delay(self, mock_task):
+        """Test the retry is handed back once the reactor timer fired."""
+        mock_task.deferLater.return_value = defer.succeed(None)
+        response = Response(self.request.url, status=484)
+
+        result = self.process(response)
+
+        self.assertIsInstance(result, Request)
+        self.assertEqual(result.meta["retry_times"], 1)
+        self.assertTrue(result.dont_filter)
+        self.assertEqual(mock_task.deferLater.call_args.args[1], 22.5)
+        self.assertEqual(self.stats.get_value("retry/backoff/count"), 1)
+        self.assertEqual(self.stats.get_value("retry/backoff/max_delay"), 22.5)
+
+    def test_gives_up_after_max_retries(self, mock_task):
+        """Test the response is returned once the retries are used up."""
+        self.request.meta["retry_times"] = 3
+        response = Response(self.request.url, status=484)
+
+        self.assertIs(self.process(response), response)
+        mock_task.deferLater.assert_not_called()
+
+    def test_other_statuses_are_retried_at_once(self, mock_task):
+        """Test server errors keep the default retry behaviour."""
+        result = self.process(Response(self.request.url, status=500))
+
+        self.assertIsInstance(result, Request)
+        mock_task.deferLater.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,208 @@
+"""Unit tests for the Selenium session pool."""
+
+import threading
+import time
+import unittest
+from unittest.mock import MagicMock, PropertyMock
+
+import scrapy
+from scrapy.settings import Settings
+
+from comic_scrapers.politeness import PoliteSpiderMixin
+from comic_scrapers.selenium_pool import SeleniumPoolMixin, TopicQueue
+
+
+class PoolSpider(SeleniumPoolMixin, PoliteSpiderMixin, scrapy.Spider):
+    """Spider yielding one item per topic from the calling thread's driver."""
+
+    name = "pool_test"
+    allowed_domains = ["example.com"]
+    start_urls = ["https://www.example.com"]
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.topic = "title_tw"
+        self.created = []
+        self.created_lock = threading.Lock()
+        self.fail_on = {}
+
+    def create_driver(self):
+        driver = MagicMock()
+        driver.current_url = self.start_urls[0]
+        driver.page_source = "<html><body>Test</body></html>"
+        with self.created_lock:
+            self.created.append(driver)
+        return driver
+
+    def parse_topic(self, topic_item, index):
+        if self.fail_on.get(topic_item):
+            self.fail_on[topic_item] -= 1
+            # Every later command of the session fails too
+            type(self.driver).current_url = PropertyMock(
+                side_effect=RuntimeError("session deleted")
+            )
+            raise RuntimeError("session deleted")
+        # Keep the session busy so that the other workers take topics too
+        time.sleep(0.01)
+        yield {"title_tw": topic_item, "index": index, "driver": id(self.driver)}
+
+
+def make_topics(topic_list):
+    return TopicQueue(enumerate(topic_list))
+
+
+class TestSeleniumPoolWorkers(unittest.TestCase):
+    """Test cases for the worker loop of SeleniumPoolMixin."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        self.spider = PoolSpider()
+        self.spider.settings = Settings({"SELENIUM_MAX_RESTARTS": 2})
+        self.items = []
+        self.done = []
+
+    def run_workers(self, topic_list, size):
+        topics = make_topics(topic_list)
+        threads = [
+            threading.Thread(
+                target=self.spider._run_worker,
+                args=(
+                    worker_id,
+                    topics,
+                    self.items.append,
+                    lambda: self.done.append(1),
+                ),
+            )
+            for worker_id in range(size)
+        ]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        return topics
+
+    def test_topics_are_split_across_sessions(self):
+        """Test that every topic is processed once, each worker on its own session."""
+        topic_list = [f"漫畫{i}" for i in range(12)]
+
+        topics = self.run_workers(topic_list, size=3)
+
+        self.assertEqual(topics.remaining(), 0)
+        self.assertCountEqual([item["title_tw"] for item in self.items], topic_list)
+        self.assertEqual(len(self.done), 3)
+        self.assertEqual(len(self.spider.created), 3)
+        for driver in self.spider.created:
+            driver.get.assert_called_once_with("https://www.example.com")
+            driver.quit.assert_called_once()
+
+    def test_dead_session_is_restarted_and_topic_retried(self):
+        """Test that a worker replaces a dead session and retries the topic once."""
+        self.spider.fail_on = {"漫畫1": 1}
+
+        self.run_workers(["漫畫0", "漫畫1", "漫畫2"], size=1)
+
+        self.assertEqual(
+            [item["title_tw"] for item in self.items], ["漫畫0", "漫畫1", "漫畫2"]
+        )
+        self.assertEqual(len(self.spider.created), 2)
+        self.assertNotEqual(self.items[0]["driver"], self.items[1]["driver"])
+        for driver in self.spider.created:
+            driver.quit.assert_called_once()
+
+    def test_topic_is_not_retried_twice(self):
+        """Test that a topic killing two sessions is skipped."""
+        self.spider.fail_on = {"漫畫0": 2}
+
+        self.run_workers(["漫畫0", "漫畫1"], size=1)
+
+        self.assertEqual([item["title_tw"] for item in self.items], ["漫畫1"])
+
+    def test_worker_gives_up_and_hands_topics_back(self):
+        """Test that a worker which cannot start a session leaves its topic queued."""
+        self.spider.create_driver = MagicMock(side_effect=RuntimeError("no node"))
+
+        topics = self.run_workers(["漫畫0", "漫畫1"], size=1)
+
+        self.assertEqual(self.items, [])
+        self.assertEqual(topics.remaining(), 2)
+        self.assertEqual(len(self.done), 1)
+        # One start and SELENIUM_MAX_RESTARTS restarts
+        self.assertEqual(self.spider.create_driver.call_count, 3)
+
+    def test_closed_pool_stops_workers(self):
+        """Test that workers stop taking topics once the sessions are closed."""
+        self.spider.close_sessions()
+
+        topics = self.run_workers(["漫畫0", "漫畫1"], size=1)
+
+        self.assertEqual(self.items, [])
+        self.assertEqual(topics.remaining(), 2)
+
+
+class TestSeleniumPoolSessions(unittest.TestCase):
+    """Test cases for the per-thread sessions of SeleniumPoolMixin."""
+
+    def test_driver_is_bound_to_the_calling_thread(self):
+        """Test that a driver set in one thread is not visible to another."""
+        spider = PoolSpider()
+        spider.driver = MagicMock()
+        seen = []
+
+        thread = threading.Thread(target=lambda: seen.append(spider.driver))
+        thread.start()
+        thread.join()
+
+        self.assertIsNotNone(spider.driver)
+        self.assertIsNotNone(spider.wait)
+        self.assertEqual(seen, [None])
+
+    def test_close_sessions_quits_every_driver(self):
+        """Test that close_sessions() quits the sessions of every thread."""
+        spider = PoolSpider()
+        drivers = [MagicMock(), MagicMock()]
+
+        def start_session(driver):
+            spider.driver = driver
+
+        thread = threading.Thread(target=start_session, args=(drivers[0],))
+        thread.start()
+        thread.join()
+        start_session(drivers[1])
+        drivers[1].quit.side_effect = RuntimeError("already gone")
+
+        spider.close_sessions()
+
+        for driver in drivers:
+            driver.quit.assert_called_once()
+
+    def test_pool_size_argument_overrides_setting(self):
+        """Test that the pool_size spider argument wins over SELENIUM_POOL_SIZE."""
+        spider = PoolSpider()
+        spider.settings = Settings({"SELENIUM_POOL_SIZE": 4})
+        self.assertEqual(spider.selenium_pool_size, 4)
+
+        spider = PoolSpider(pool_size="2")
+        spider.settings = Settings({"SELENIUM_POOL_SIZE": 4})
+        self.assertEqual(spider.selenium_pool_size, 2)
+
+    def test_pool_size_defaults_to_one_without_settings(self):
+        """Test that a spider without a crawler uses a single session."""
+        self.assertEqual(PoolSpider().selenium_pool_size, 1)
+
+
+class TestSeleniumPoolHooks(unittest.TestCase):
+    """Test cases for the hooks spiders using the pool must implement."""
+
+    def test_spider_without_parse_topic_cannot_be_created(self):
+        """Test a spider missing a hook fails when created, not mid-crawl."""
+
+        class IncompleteSpider(SeleniumPoolMixin, scrapy.Spider):
+            name = "incomplete"
+
+            def create_driver(self):
+                return MagicMock()
+
+        with self.assertRaises(TypeError) as context:
+            IncompleteSpider()
+
+        self.assertIn("parse_topic", str(context.exception))
@@ -0,0 +1,390 @@
+"""Unit tests for the crawl watermark store and its use by the spiders."""
+
+import os
+from datetime import date
+from unittest.mock import MagicMock, patch
+
+from django.test import TestCase
+from scrapy import signals
+from scrapy.http import HtmlResponse, Request
+from scrapy.settings import Settings
+from scrapy.signalmanager import SignalManager
+from scrapy.statscollectors import MemoryStatsCollector
+from selenium.common.exceptions import TimeoutException
+from twisted.python.failure import Failure
+
+from comic_scrapers.items import JpComicItem, OrphanVolumeItem
+from comic_scrapers.models import CrawlWatermark
+from comic_scrapers.pipelines import ItemWriteError
+from comic_scrapers.spiders.books_jp import BooksJpSpider
+from comic_scrapers.spiders.books_tw import BooksTWSpider
+from comic_scrapers.watermarks import WatermarkStore, watermark_key
+
+FILE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+
+def make_crawler(settings=None):
+    """Return a crawler double with real settings, signals and stats."""
+    crawler = MagicMock()
+    crawler.settings = Settings(settings or {})
+    crawler.signals = SignalManager()
+    crawler.stats = MemoryStatsCollector(crawler)
+    return crawler
+
+
+class TestWatermarkStore(TestCase):
+    """Test cases for loading, staging and saving watermarks."""
+
+    def setUp(self):
+        """Set up test fixtures."""
+        CrawlWatermark.objects.create(
+            source="books_jp",
+            topic="ブルーピリオド",
+            last_release_date=date(2025, 6, 1),
+            seen_keys=["9784065000001", "9784065000002"],
+        )
+        CrawlWatermark.objects.create(
+            source="eslite_title_tw", topic="ブルーピリオド", seen_keys=["other"]
+        )
+        self.store = WatermarkStore("books_jp", max_keys=3)
+        self.store.load()
+
+    def test_watermark_key_is_last_path_segment(self):
+        """Test that detail urls are keyed by their last path segment."""
+        self.assertEqual(
+            watermark_key("https://www.books.or.jp/book-details/9784065000001"),
+            "9784065000001",
+        )
+        self.assertEqual(
+            watermark_key("https://www.books.com.tw/products/0011035314?loc=P_01"),
+            "0011035314",
+        )
+
+    def test_load_reads_only_its_source(self):
+        """Test that load() reads the watermarks of the store's source."""
+        self.assertTrue(self.store.enabled)
+        self.assertEqual(
+            self.store.last_release_date("ブルーピリオド"), date(2025, 6, 1)
+        )
+        self.assertTrue(self.store.has_key("ブルーピリオド", "9784065000001"))
+        self.assertFalse(self.store.has_key("ブルーピリオド", "other"))
+        self.assertIsNone(self.store.last_release_date("廻天のアルバス"))
+
+    def test_save_merges_processed_items(self):
+        """Test that save() merges observations of processed items."""
+        old, new, dropped = JpComicItem(), JpComicItem(), JpComicItem()
+        self.store.stage(old, "ブルーピリオド", "2025-01-01", "9784065000002")
+        self.store.stage(new, "ブルーピリオド", "2025-12-18", "9784065000003")
+        self.store.stage(dropped, "廻天のアルバス", None, "9784088000001")
+        for item in (old, new, dropped):
+            self.store.item_processed(item)
+
+        self.assertEqual(self.store.save(), 2)
+
+        row = CrawlWatermark.objects.get(source="books_jp", topic="ブルーピリオド")
+        self.assertEqual(row.last_release_date, date(2025, 12, 18))
+        # Re-seen keys move to the end, the oldest ones are trimmed
+        self.assertEqual(
+            row.seen_keys, ["9784065000001", "9784065000002", "9784065000003"]
+        )
+        self.assertIsNotNone(row.last_crawled_at)
+        row = CrawlWatermark.objects.get(source="books_jp", topic="廻天のアルバス")
+        self.assertIsNone(row.last_release_date)
+        self.assertEqual(row.seen_keys, ["9784088000001"])
+
+    def test_seen_keys_are_bounded(self):
+        """Test that only the max_keys most recent keys are kept."""
+        for isbn in ("9784065000003", "9784065000004"):
+            item = JpComicItem()
+            self.store.stage(item, "ブルーピリオド", key=isbn)
+            self.store.item_processed(item)
+
+        self.store.save()
+
+        row = CrawlWatermark.objects.get(source="books_jp", topic="ブルーピリオド")
+        self.assertEqual(
+            row.seen_keys, ["9784065000002", "9784065000003", "9784065000004"]
+        )
+
+    def test_failed_items_are_not_saved(self):
+        """Test that items the pipeline failed on do not move the watermark."""
+        item = JpComicItem()
+        self.store.stage(item, "ブルーピリオド", "2025-12-18", "9784065000003")
+        self.store.item_failed(item)
+
+        self.assertEqual(self.store.save(), 0)
+        row = CrawlWatermark.objects.get(source="books_jp", topic="ブルーピリオド")
+        self.assertEqual(row.last_release_date, date(2025, 6, 1))
+
+    def test_touched_topics_record_crawl_time(self):
+        """Test that processed topics without new items get a crawl time."""
+        self.store.touch("ブルーピリオド")
+
+        self.assertEqual(self.store.save(), 1)
+        row = CrawlWatermark.objects.get(source="books_jp", topic="ブルーピリオド")
+        self.assertIsNotNone(row.last_crawled_at)
+        self.assertEqual(row.seen_keys, ["9784065000001", "9784065000002"])
+
+    def test_unfinished_crawl_is_not_saved(self):
+        """Test that a crawl closed for another reason keeps the old watermarks."""
+        self.store.touch("ブルーピリオド")
+
+        result = self.store.spider_closed(MagicMock(), reason="shutdown")
+
+        self.assertIsNone(result)
+        row = CrawlWatermark.objects.get(source="books_jp", topic="ブルーピリオド")
+        self.assertIsNone(row.last_crawled_at)
+
+    def test_store_without_load_knows_nothing(self):
+        """Test that a store which was not loaded stages and saves nothing."""
+        store = WatermarkStore("books_jp")
+        item = JpComicItem()
+        store.stage(item, "ブルーピリオド", key="9784065000009")
+        store.touch("ブルーピリオド")
+        store.item_processed(item)
+
+        self.assertFalse(store.has_key("ブルーピリオド", "9784065000001"))
+        self.assertEqual(store.save(), 0)
+
+
+class TestSpiderWatermarks(TestCase):
+    """Test cases for spiders skipping content known from watermarks."""
+
+    def test_bind_follows_pipeline_signals(self):
+        """Test that items reported by the crawler signals are folded in."""
+        crawler = make_crawler()
+        spider = BooksTWSpider.from_crawler(crawler)
+        scraped, dropped = OrphanVolumeItem(), OrphanVolumeItem()
+        spider.watermarks.stage(scraped, "new_releases", key="0011035314")
+        spider.watermarks.stage(dropped, "new_releases", key="0011035315")
+
+        crawler.signals.send_catch_log(
+            signals.item_scraped, item=scraped, response=None, spider=spider
+        )
+        crawler.signals.send_catch_log(
+            signals.item_dropped,
+            item=dropped,
+            response=None,
+            exception=Exception(),
+            spider=spider,
+        )
+        spider.watermarks.save()
+
+        row = CrawlWatermark.objects.get(source="books_tw", topic="new_releases")
+        self.assertEqual(row.seen_keys, ["0011035314", "0011035315"])
+
+    def test_failed_items_are_not_folded_in(self):
+        """Test that items the pipeline failed to write leave the watermark."""
+        crawler = make_crawler()
+        spider = BooksTWSpider.from_crawler(crawler)
+        failed = OrphanVolumeItem()
+        spider.watermarks.stage(failed, "new_releases", key="0011035314")
+
+        crawler.signals.send_catch_log(
+            signals.item_error,
+            item=failed,
+            response=None,
+            spider=spider,
+            failure=Failure(ItemWriteError("Batch write failed")),
+        )
+        spider.watermarks.save()
+
+        self.assertFalse(CrawlWatermark.objects.filter(source="books_tw").exists())
+
+    def test_books_tw_stages_only_parsed_volumes(self):
+        """Test that a product page without an ISBN is fetched again."""
+        spider = BooksTWSpider.from_crawler(make_crawler())
+        for body, staged in (
+            ('<div class="bd"><ul><li>ISBN：9786260243098</li></ul></div>', 1),
+            ('<div class="bd"><ul><li>頁數：192頁</li></ul></div>', 0),
+        ):
+            with self.subTest(staged=staged):
+                url = "https://www.books.com.tw/products/0011035314"
+                response = HtmlResponse(
+                    url=url, request=Request(url=url), body=body, encoding="utf-8"
+                )
+                with patch.object(spider.watermarks, "stage") as mock_stage:
+                    list(spider.parse_volume_info(response))
+
+                self.assertEqual(mock_stage.call_count, staged)
+
+    def test_watermarks_can_be_disabled(self):
+        """Test that CRAWL_WATERMARKS_ENABLED=False forces a full crawl."""
+        CrawlWatermark.objects.create(
+            source="books_tw", topic="new_releases", seen_keys=["0011035314"]
+        )
+        crawler = make_crawler({"CRAWL_WATERMARKS_ENABLED": False})
+        spider = BooksTWSpider.from_crawler(crawler)
+
+        self.assertFalse(spider.watermarks.enabled)
+        self.assertFalse(spider.watermarks.has_key("new_releases", "0011035314"))
+
+    def test_books_tw_skips_known_product_pages(self):
+        """Test that BooksTWSpider does not refetch known product pages."""
+        with open(
+            f"{FILE_DIR}/test_books_tw_forthcoming_page.html", "r", encoding="utf-8"
+        ) as f:
+            body = f.read().encode("utf-8")
+        url = "https://www.books.com.tw/web/sys_compub/books/16/?loc=P_0001_017"
+        response = HtmlResponse(
+            url=url, request=Request(url=url), body=body, encoding="utf-8"
+        )
+        spider = BooksTWSpider.from_crawler(make_crawler())
+        all_requests = list(spider.parse(response))
+
+        CrawlWatermark.objects.create(
+            source="books_tw",
+            topic="new_releases",
+            seen_keys=[watermark_key(request.url) for request in all_requests[:3]],
+        )
+        spider = BooksTWSpider.from_crawler(make_crawler())
+        requests = list(spider.parse(response))
+
+        self.assertEqual(
+            [request.url for request in requests],
+            [request.url for request in all_requests[3:]],
+        )
+
+    @patch("comic_scrapers.spiders.books_jp.webdriver")
+    def test_books_jp_stops_paginating_at_known_results(self, mock_webdriver):
+        """Test that a page of known results ends the search for a topic."""
+        CrawlWatermark.objects.create(
+            source="books_jp",
+            topic="ブルーピリオド",
+            last_release_date=date(2025, 6, 1),
+            seen_keys=["9784065000002"],
+        )
+        spider = BooksJpSpider.from_crawler(make_crawler())
+        spider.topic = "series_name"
+        spider.driver = MagicMock()
+        spider.wait = MagicMock()
+
+        links, dates = [], []
+        for isbn, release_date in (
+            ("9784065000001", "2025年5月1日"),
+            ("9784065000002", "2025年7月1日"),
+        ):
+            link = MagicMock()
+            link.get_attribute.return_value = (
+                f"https://www.books.or.jp/book-details/{isbn}"
+            )
+            links.append(link)
+            release = MagicMock()
+            release.get_attribute.return_value = f"発売日：{release_date}"
+            dates.append(release)
+        spider.wait.until.side_effect = [links, dates, TimeoutException("unused")]
+
+        with patch.object(spider, "parse_detail_info") as mock_detail:
+            results = list(spider.parse_search_results("ブルーピリオド", 0))
+
+        self.assertEqual(results, [])
+        mock_detail.assert_not_called()
+        # The next page button was never looked up
+        self.assertEqual(spider.wait.until.call_count, 2)
+        self.assertEqual(spider.crawler.stats.get_value("watermarks/skipped"), 2)
+
+    @patch("comic_scrapers.spiders.books_jp.webdriver")
+    def test_release_cutoff_uses_newest_known_date(self, mock_webdriver):
+        """Test that the catalog date and the stored watermark are combined."""
+        CrawlWatermark.objects.create(
+            source="books_jp",
+            topic="ブルーピリオド",
+            last_release_date=date(2025, 6, 1),
+        )
+        spider = BooksJpSpider.from_crawler(make_crawler())
+        spider.last_release_dates = ["2025-03-01", None]
+
+        self.assertEqual(spider.release_cutoff("ブルーピリオド", 0), "2025-06-01")
+        self.assertEqual(spider.release_cutoff("ブルーピリオド", 1), "2025-06-01")
+        self.assertIsNone(spider.release_cutoff("廻天のアルバス", 1))
+        self.assertEqual(spider.release_cutoff("廻天のアルバス", 0), "2025-03-01")
+
+
+@patch("comic_scrapers.spiders.books_jp.webdriver")
+class TestReleaseCutoffPagination(TestCase):
+    """Test cases for ending a search at a page of results below the cutoff."""
+
+    def make_spider(self, settings=None):
+        spider = BooksJpSpider.from_crawler(
+            make_crawler({"BOOKS_JP_DETAIL_MODE": "http", **(settings or {})})
+        )
+        spider.topic = "series_name"
+        spider.last_release_dates = ["2025-06-01"]
+        spider.driver = MagicMock()
+        spider.wait = MagicMock()
+        return spider
+
+    def search(self, spider, release_dates):
+        links, dates = [], []
+        for i, release_date in enumerate(release_dates):
+            link = MagicMock()
+            link.get_attribute.return_value = (
+                f"https://www.books.or.jp/book-details/978406500000{i}"
+            )
+            links.append(link)
+            release = MagicMock()
+            release.get_attribute.return_value = f"発売日：{release_date}"
+            dates.append(release)
+        spider.wait.until.side_effect = [links, dates, TimeoutException("last page")]
+        return list(spider.parse_search_results("ブルーピリオド", 0))
+
+    def test_page_below_cutoff_stops(self, mock_webdriver):
+        """Test that a page with every result at or below the cutoff ends the search."""
+        spider = self.make_spider()
+
+        requests = self.search(spider, ["2025年6月1日", "2025年4月1日"])
+
+        self.assertEqual(requests, [])
+        # The next page button was never waited for
+        self.assertEqual(spider.wait.until.call_count, 2)
+        stats = spider.crawler.stats
+        self.assertEqual(stats.get_value("watermarks/skipped"), 2)
+        self.assertEqual(stats.get_value("pagination/topics_stopped_early"), 1)
+
+    def test_page_with_newer_results_keeps_paginating(self, mock_webdriver):
+        """Test that old results listed after newer ones do not end the search."""
+        for release_dates, fetched in (
+            (
+                ["2025年9月1日", "2025年7月1日", "2025年5月1日", "2025年4月1日"],
+                ["2025-09-01", "2025-07-01"],
+            ),
+            (["2025年5月1日", "2025年9月1日", "2025年4月1日"], ["2025-09-01"]),
+            (["2025年5月1日", "近日発売"], [None]),
+        ):
+            with self.subTest(release_dates=release_dates):
+                spider = self.make_spider()
+
+                requests = self.search(spider, release_dates)
+
+                self.assertEqual(
+                    [request.cb_kwargs["release_date"] for request in requests],
+                    fetched,
+                )
+                self.assertEqual(spider.wait.until.call_count, 3)
+                self.assertIsNone(
+                    spider.crawler.stats.get_value("pagination/topics_stopped_early")
+                )
+
+    def test_stop_on_last_page_is_not_counted(self, mock_webdriver):
+        """Test that a stop without a next page is not counted as early."""
+        spider = self.make_spider()
+        spider.driver.find_elements.return_value = []
+
+        self.search(spider, ["2025年5月1日"])
+
+        self.assertEqual(spider.wait.until.call_count, 2)
+        self.assertIsNone(
+            spider.crawler.stats.get_value("pagination/topics_stopped_early")
+        )
+
+    def test_date_cutoff_can_be_disabled(self, mock_webdriver):
+        """Test that SEARCH_DATE_CUTOFF_ENABLED=False only stops on known keys."""
+        spider = self.make_spider({"SEARCH_DATE_CUTOFF_ENABLED": False})
+
+        requests = self.search(spider, ["2025年5月1日", "2025年4月1日"])
+
+        self.assertEqual(requests, [])
+        self.assertEqual(spider.wait.until.call_count, 3)
+        self.assertIsNone(
+            spider.crawler.stats.get_value("pagination/topics_stopped_early")
+        )
@@ -0,0 +1,341 @@
+"""Persistent per-topic crawl watermarks used for incremental crawling."""
+
+import threading
+from datetime import date
+from urllib.parse import urlparse
+
+from django.db import transaction
+from django.utils import timezone
+from scrapy import signals
+from twisted.internet.threads import deferToThread
+
+from comic_scrapers.models import CrawlWatermark
+
+
+def watermark_key(url: str):
+    """Return the key under which a detail URL is remembered.
+
+    Args:
+        url (str): URL of a book detail page.
+
+    Returns:
+        str: The last path segment of the URL, e.g. the ISBN on books.or.jp.
+    """
+    return urlparse(url).path.rstrip("/").rsplit("/", 1)[-1] or None
+
+
+def _as_date(value):
+    if value is None or isinstance(value, date):
+        return value
+    try:
+        return date.fromisoformat(value)
+    except ValueError:
+        return None
+
+
+class WatermarkStore:
+    """Watermarks of one crawl source, saved in one transaction at the end.
+
+    The stored watermarks are read once when the crawl starts. Spiders stage
+    what they extracted with `stage` right before yielding an item; the
+    observation counts once the pipeline has stored or deliberately dropped
+    the item, and is discarded if the pipeline failed on it. Nothing is
+    written unless the crawl finishes normally, so an interrupted crawl
+    leaves the previous watermarks untouched. All methods are thread-safe.
+
+    Attributes:
+        source (str): Name of the spider the watermarks belong to.
+        max_keys (int): Number of most recent keys kept per topic.
+        enabled (bool): Whether stored watermarks were loaded. A store that
+            is not enabled knows nothing and saves nothing.
+    """
+
+    def __init__(self, source, max_keys=500):
+        self.source = source
+        self.max_keys = max_keys
+        self.enabled = False
+        self._release_dates = {}
+        self._keys = {}
+        self._new_release_dates = {}
+        self._new_keys = {}
+        self._crawled = set()
+        self._staged = {}
+        self._lock = threading.Lock()
+
+    def bind(self, crawler):
+        """Load the watermarks and follow the crawl through its signals.
+
+        Does nothing if `CRAWL_WATERMARKS_ENABLED` is off, so that a full
+        crawl can be forced with `-s CRAWL_WATERMARKS_ENABLED=False`.
+
+        Args:
+            crawler (Crawler): The crawler running the spider.
+        """
+        settings = crawler.settings
+        if not settings.getbool("CRAWL_WATERMARKS_ENABLED", True):
+            return
+        self.max_keys = settings.getint("CRAWL_WATERMARK_MAX_KEYS", self.max_keys)
+        self.load()
+        crawler.signals.connect(self.item_processed, signal=signals.item_scraped)
+        crawler.signals.connect(self.item_processed, signal=signals.item_dropped)
+        crawler.signals.connect(self.item_failed, signal=signals.item_error)
+        crawler.signals.connect(self.spider_closed, signal=signals.spider_closed)
+
+    def load(self):
+        """Read the stored watermarks of the source with a single query."""
+        rows = CrawlWatermark.objects.filter(source=self.source).values_list(
+            "topic", "last_release_date", "seen_keys"
+        )
+        with self._lock:
+            self._release_dates = {}
+            self._keys = {}
+            for topic, last_release_date, seen_keys in rows:
+                self._release_dates[topic] = last_release_date
+                self._keys[topic] = set(seen_keys)
+            self.enabled = True
+
+    def last_release_date(self, topic):
+        """Return the newest stored release date of a topic, or None."""
+        with self._lock:
+            return self._release_dates.get(topic)
+
+    def has_key(self, topic, key):
+        """Return whether `key` was seen for `topic` in a previous crawl."""
+        with self._lock:
+            return key in self._keys.get(topic, ())
+
+    def touch(self, topic):
+        """Record that `topic` was processed in this crawl."""
+        if not self.enabled:
+            return
+        with self._lock:
+            self._crawled.add(topic)
+
+    def stage(self, item, topic, release_date=None, key=None):
+        """Remember what an item about to be yielded tells about its topic.
+
+        Args:
+            item (scrapy.Item): The item, used to match the pipeline signals.
+            topic (str): The topic item the item was found for.
+            release_date (str | date, optional): Release date of the item.
+            key (str, optional): Key of the item's detail URL.
+        """
+        if not self.enabled:
+            return
+        with self._lock:
+            self._staged[id(item)] = (topic, _as_date(release_date), key)
+
+    def item_processed(self, item, **kwargs):
+        """Fold the staged observation of a stored or dropped item in.
+
+        Connected to `item_scraped` and `item_dropped`. The pipeline only
+        drops items on purpose (incomplete, filtered or already stored);
+        items it failed to write raise `ItemWriteError` and reach
+        `item_failed` instead, so they are crawled again.
+        """
+        with self._lock:
+            staged = self._staged.pop(id(item), None)
+            if staged is None:
+                return
+            topic, release_date, key = staged
+            self._crawled.add(topic)
+            if release_date is not None:
+                current = self._new_release_dates.get(topic)
+                if current is None or release_date > current:
+                    self._new_release_dates[topic] = release_date
+            if key:
+                self._new_keys.setdefault(topic, []).append(key)
+
+    def item_failed(self, item, **kwargs):
+        """Forget the staged observation of an item the pipeline failed on."""
+        with self._lock:
+            self._staged.pop(id(item), None)
+
+    def spider_closed(self, spider, reason):
+        if reason != "finished":
+            spider.logger.info(
+                f"Crawl ended with reason {reason!r}, crawl watermarks not saved"
+            )
+            return None
+
+        def log_saved(count):
+            spider.logger.info(f"Saved {count} crawl watermarks for {self.source}")
+
+        return deferToThread(self.save).addCallback(log_saved)
+
+    def save(self):
+        """Merge this crawl's observations into the stored watermarks.
+
+        Runs in a single transaction with the source's rows locked, so
+        concurrent crawls of the same source do not lose each other's keys.
+
+        Returns:
+            int: Number of topics written.
+        """
+        with self._lock:
+            topics = self._crawled | set(self._new_release_dates) | set(self._new_keys)
+            crawled = set(self._crawled)
+            new_release_dates = dict(self._new_release_dates)
+            new_keys = {topic: list(keys) for topic, keys in self._new_keys.items()}
+        if not topics:
+            return 0
+
+        now = timezone.now()
+        with transaction.atomic():
+            rows = {
+                row.topic: row
+                for row in CrawlWatermark.objects.select_for_update().filter(
+                    source=self.source
+                )
+            }
+            created, updated = [], []
+            for topic in topics:
+                row = rows.get(topic)
+                if row is None:
+                    row = CrawlWatermark(source=self.source, topic=topic)
+                    created.append(row)
+                else:
+                    updated.append(row)
+
+                release_date = new_release_dates.get(topic)
+                if release_date and (
+                    row.last_release_date is None
+                    or release_date > row.last_release_date
+                ):
+                    row.last_release_date = release_date
+                if topic in new_keys:
+                    fresh = list(dict.fromkeys(new_keys[topic]))
+                    seen = [key for key in row.seen_keys if key not in fresh]
+                    row.seen_keys = (seen + fresh)[-self.max_keys :]
+                if topic in crawled:
+                    row.last_crawled_at = now
+                row.updated_at = now
+
+            CrawlWatermark.objects.bulk_create(
+                created,
+                update_conflicts=True,
+                unique_fields=["source", "topic"],
+                update_fields=[
+                    "last_release_date",
+                    "seen_keys",
+                    "last_crawled_at",
+                    "updated_at",
+                ],
+            )
+            CrawlWatermark.objects.bulk_update(
+                updated,
+                ["last_release_date", "seen_keys", "last_crawled_at", "updated_at"],
+            )
+
+        with self._lock:
+            for topic in topics:
+                self._crawled.discard(topic)
+                self._new_release_dates.pop(topic, None)
+                self._new_keys.pop(topic, None)
+        return len(topics)
+
+
+class WatermarkMixin:
+    """Give a spider a `WatermarkStore` bound to its crawl.
+
+    The store's source is the spider name. Spiders built without a crawler
+    (e.g. in unit tests) get a store that is not enabled.
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.watermarks = WatermarkStore(self.name)
+
+    @classmethod
+    def from_crawler(cls, crawler, *args, **kwargs):
+        spider = super().from_crawler(crawler, *args, **kwargs)
+        spider.watermarks.bind(crawler)
+        return spider
+
+    def release_cutoff(self, topic_item, series_index=None):
+        """Return the newest release date already known for a topic.
+
+        Combines the stored watermark with `last_release_dates`, the newest
+        release date in the catalog, when the spider has them.
+
+        Args:
+            topic_item (str): The topic item being processed.
+            series_index (int, optional): Index of the topic in topic_list.
+
+        Returns:
+            str: The date in YYYY-MM-DD format, or None if nothing is known.
+        """
+        dates = []
+        last_release_dates = getattr(self, "last_release_dates", None)
+        if (
+            last_release_dates
+            and series_index is not None
+            and series_index < len(last_release_dates)
+        ):
+            dates.append(last_release_dates[series_index])
+        stored = self.watermarks.last_release_date(topic_item)
+        if stored is not None:
+            dates.append(stored.isoformat())
+        dates = [d for d in dates if d]
+        return max(dates) if dates else None
+
+    @property
+    def date_cutoff_enabled(self):
+        """bool: Whether results at or below the release cutoff end a search."""
+        settings = getattr(self, "settings", None)
+        if settings is None:
+            return True
+        return settings.getbool("SEARCH_DATE_CUTOFF_ENABLED", True)
+
+    def _pagination_stop_reason(self, n, known, below_cutoff):
+        """Return why the search can stop after a page of results, if it can.
+
+        The result order of a page says nothing certain about the following
+        pages, so a search only stops once every result on a page is known:
+        its watermark is stored or, with the date cutoff enabled, it was
+        released at or before the release cutoff.
+
+        Args:
+            n (int): Number of results on the page.
+            known (int): Results skipped as already known.
+            below_cutoff (int): Known results skipped for their release date.
+
+        Returns:
+            str: The reason for the log, or None to go on to the next page.
+        """
+        if not n or known < n:
+            return None
+        if not below_cutoff:
+            return "Every result on the page is already known"
+        if self.date_cutoff_enabled:
+            return "Every result on the page is known or older than the cutoff"
+        return None
+
+    def stop_paginating(self, topic_item, reason, has_next_page):
+        """Record that the search for a topic ends before its last page.
+
+        Only stops that leave a next page unloaded are counted, under
+        `pagination/topics_stopped_early`; a stop on the last page saves
+        nothing.
+
+        Args:
+            topic_item (str): The topic item being processed.
+            reason (str): Why the following pages are not needed, for the log.
+            has_next_page (bool): Whether the page links to a next page, i.e.
+                whether stopping saves at least one page load.
+        """
+        self.logger.debug(
+            f"parse_search_results(): {reason}, stop paginating for"
+            f" {self.topic} {topic_item}"
+        )
+        if has_next_page:
+            self._inc_watermark_stat("pagination/topics_stopped_early")
+
+    def count_skipped(self, count=1):
+        """Add skipped, already known results to the crawl stats."""
+        self._inc_watermark_stat("watermarks/skipped", count)
+
+    def _inc_watermark_stat(self, key, count=1):
+        crawler = getattr(self, "crawler", None)
+        if crawler is not None and crawler.stats is not None:
+            crawler.stats.inc_value(key, count, spider=self)
@@ -1,4 +1,8 @@
+import glob
 import multiprocessing
+import os
+
+from decouple import config
 
 # WSGI application
 wsgi_app = "config.wsgi:application"
@@ -17,3 +21,11 @@ loglevel = "info"
 
 # Process naming
 proc_name = "gunicorn_comicchase"
+
+
+def on_starting(server):
+    """啟動時清除上次留下的 API 指標檔案 (見 comic.metrics.MetricsFileStore)"""
+    directory = config("API_METRICS_DIR", default="")
+    if directory:
+        for path in glob.glob(os.path.join(directory, "api-*.json*")):
+            os.remove(path)
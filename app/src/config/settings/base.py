@@ -1,6 +1,6 @@
 from pathlib import Path
 
-from decouple import config
+from decouple import config, strtobool
 
 # Build paths inside the project like this: BASE_DIR / 'subdir'.
 BASE_DIR = Path(__file__).resolve().parent.parent.parent
@@ -37,6 +37,8 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    # API 效能指標，需最先執行；API_METRICS_ENABLED 關閉時不會載入
+    "comic.metrics.ApiMetricsMiddleware",
     "django.middleware.security.SecurityMiddleware",
     "django.contrib.sessions.middleware.SessionMiddleware",
     "corsheaders.middleware.CorsMiddleware",
@@ -90,6 +92,40 @@ AUTH_PASSWORD_VALIDATORS = [
 ]
 
 
+# Cache
+# https://docs.djangoproject.com/en/5.2/topics/cache/
+
+# 預設使用 local-memory，多個 process 需共用快取時可改用 file / Redis backend
+CACHES = {
+    "default": {
+        "BACKEND": config(
+            "CACHE_BACKEND", default="django.core.cache.backends.locmem.LocMemCache"
+        ),
+        "LOCATION": config("CACHE_LOCATION", default="comicchase"),
+    }
+}
+
+# SeriesViewSet 回應快取
+# 未設定時只在快取可跨 process 共用 (非 local-memory) 時啟用，
+# 否則爬蟲寫入後 Gunicorn workers 仍會回傳舊的快取
+SERIES_CACHE_ENABLED = config(
+    "SERIES_CACHE_ENABLED",
+    default="",
+    cast=lambda value: bool(strtobool(value)) if value else None,
+)
+SERIES_CACHE_ALIAS = "default"
+SERIES_CACHE_TIMEOUT = config("SERIES_CACHE_TIMEOUT", default=60 * 5, cast=int)
+
+# API 效能指標 (/metrics)，設定 token 後抓取時需帶上 Bearer token
+API_METRICS_ENABLED = config("API_METRICS_ENABLED", default=False, cast=bool)
+API_METRICS_TOKEN = config("API_METRICS_TOKEN", default="")
+# 多個 Gunicorn worker 共用指標的目錄，未設定時每個 worker 各自輸出
+API_METRICS_DIR = config("API_METRICS_DIR", default="")
+API_METRICS_FLUSH_INTERVAL = config(
+    "API_METRICS_FLUSH_INTERVAL", default=1.0, cast=float
+)
+
+
 # Internationalization
 # https://docs.djangoproject.com/en/5.2/topics/i18n/
 
@@ -121,4 +157,9 @@ REST_FRAMEWORK = {
     ],
     "DEFAULT_PAGINATION_CLASS": "rest_framework.pagination.PageNumberPagination",
     "PAGE_SIZE": 10,
+    # 有安裝 orjson 時以它編碼 JSON，未安裝時與預設的 JSONRenderer 相同
+    "DEFAULT_RENDERER_CLASSES": [
+        "comic.renderers.FastJSONRenderer",
+        "rest_framework.renderers.BrowsableAPIRenderer",
+    ],
 }
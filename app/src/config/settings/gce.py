@@ -24,6 +24,14 @@ DATABASES = {
     }
 }
 
+# 爬蟲與 Gunicorn workers 在同一個容器內，使用 file cache 共用目錄版本號
+CACHES = {
+    "default": {
+        "BACKEND": "django.core.cache.backends.filebased.FileBasedCache",
+        "LOCATION": config("CACHE_LOCATION", default="/tmp/comicchase-cache"),
+    }
+}
+
 # Security
 SECRET_KEY = config("SECRET_KEY")
 CSRF_COOKIE_SECURE = True  # Ensure CSRF cookies are only sent over HTTPS
@@ -14,6 +14,8 @@ if "test" in sys.argv or "pytest" in sys.modules:
             "NAME": BASE_DIR / "db.sqlite3",
         }
     }
+    # 避免測試之間共用 API 回應快取
+    SERIES_CACHE_ENABLED = False
 else:
     DATABASES = {
         "default": {
@@ -1,4 +1,4 @@
-from comic.views import SeriesViewSet
+from comic.views import SeriesViewSet, metrics_view
 from django.contrib import admin
 from django.urls import include, path
 from drf_yasg import openapi
@@ -27,6 +27,7 @@ schema_view = get_schema_view(
 urlpatterns = [
     path("admin/", admin.site.urls),
     path("api/", include(router.urls)),
+    path("metrics", metrics_view, name="metrics"),
     path(
         "swagger.<format>/", schema_view.without_ui(cache_timeout=0), name="schema-json"
     ),